@@ -5,6 +5,7 @@ Account that are  controlled by the server.
 """
 
 import time
+from collections import deque
 
 from django.conf import settings
 from django.utils.translation import gettext as _
@@ -16,6 +17,7 @@ from evennia.utils import logger, search, utils
 from evennia.utils.ansi import strip_ansi
 
 _IDLE_TIMEOUT = settings.IDLE_TIMEOUT
+_BOT_OUTBOUND_MAX_QUEUED = settings.BOT_OUTBOUND_MAX_QUEUED
 
 _IRC_ENABLED = settings.IRC_ENABLED
 _RSS_ENABLED = settings.RSS_ENABLED
@@ -107,6 +109,41 @@ class Bot(DefaultAccount):
         """
         super().msg(text=text, from_obj=from_obj, session=session, options=options, **kwargs)
 
+    def msg_outbound(self, **kwargs):
+        """
+        Evennia -> outgoing protocol, for messages relayed to an external service. While
+        the protocol reports it can't keep up (see `at_outbound_busy`), the messages are
+        held here instead of being sent to the Portal.
+
+        Keyword Args:
+            any: Outputfuncs to send, as for `msg`.
+
+        """
+        if self.ndb.outbound_busy:
+            if self.ndb.outbound_held is None:
+                # beyond this, the Portal would drop the messages anyway
+                self.ndb.outbound_held = deque(maxlen=_BOT_OUTBOUND_MAX_QUEUED)
+            self.ndb.outbound_held.append(kwargs)
+        else:
+            Bot.msg(self, **kwargs)
+
+    def at_outbound_busy(self, busy, **kwargs):
+        """
+        Called when the protocol reports that it has more messages waiting than the
+        external service's rate limits let it keep up with, and again when it has caught
+        up. Messages held in the meantime are then sent on.
+
+        Args:
+            busy (bool): If the protocol is busy.
+            **kwargs: Other data from the protocol.
+
+        """
+        self.ndb.outbound_busy = busy
+        if not busy and self.ndb.outbound_held:
+            held, self.ndb.outbound_held = self.ndb.outbound_held, None
+            for outputfuncs in held:
+                Bot.msg(self, **outputfuncs)
+
     def execute_cmd(self, raw_string, session=None):
         """
         Incoming protocol -> Evennia
@@ -273,7 +310,7 @@ class IRCBot(Bot):
             and self.ndb.ev_channel.dbid == options["from_channel"]
         ):
             if not from_obj or from_obj != [self]:
-                super().msg(channel=text)
+                self.msg_outbound(channel=text)
 
     def execute_cmd(self, session=None, txt=None, **kwargs):
         """
@@ -287,8 +324,8 @@ class IRCBot(Bot):
         Keyword Args:
             user (str): The name of the user who sent the message.
             channel (str): The name of channel the message was sent to.
-            type (str): Nature of message. Either 'msg', 'action', 'nicklist'
-                or 'ping'.
+            type (str): Nature of message. Either 'msg', 'action', 'nicklist',
+                'ping' or 'busy'.
             nicklist (list, optional): Set if `type='nicklist'`. This is a list
                 of nicks returned by calling the `self.get_nicklist`. It must look
                 for a list `self._nicklist_callers` which will contain all callers
@@ -297,9 +334,14 @@ class IRCBot(Bot):
                 (in seconds) of a ping request triggered with `self.ping`. The
                 return must look for a list `self._ping_callers` which will contain
                 all callers waiting for the ping return.
+            busy (bool, optional): Set if `type='busy'`. See `self.at_outbound_busy`.
 
         """
-        if kwargs["type"] == "nicklist":
+        if kwargs["type"] == "busy":
+            self.at_outbound_busy(**kwargs)
+            return
+
+        elif kwargs["type"] == "nicklist":
             # the return of a nicklist request
             if hasattr(self, "_nicklist_callers") and self._nicklist_callers:
                 chstr = f"{self.db.irc_channel} ({self.db.irc_network}:{self.db.irc_port})"
@@ -348,7 +390,7 @@ class IRCBot(Bot):
                 text = f"This is an Evennia IRC bot connecting from '{settings.SERVERNAME}'."
             else:
                 text = "I understand 'who' and 'about'."
-            super().msg(privmsg=((text,), {"user": user}))
+            self.msg_outbound(privmsg=((text,), {"user": user}))
         else:
             # something to send to the main channel
             if kwargs["type"] == "action":
@@ -404,12 +446,19 @@ class RSSBot(Bot):
             channel = channel[0]
             self.db.ev_channel = channel
         if rss_url:
+            if rss_url != self.db.rss_url:
+                # a different feed; forget what we saw of the old one
+                self.attributes.remove("rss_state")
             self.db.rss_url = rss_url
         if rss_rate:
             self.db.rss_rate = rss_rate
         # instruct the server and portal to create a new session with
         # the stored configuration
         configdict = {"uid": self.dbid, "url": self.db.rss_url, "rate": self.db.rss_rate}
+        # the entries already relayed and the ETag/Last-Modified of the feed, detached
+        # from the database so it can be sent to the Portal
+        if rss_state := self.db.rss_state:
+            configdict.update(rss_state.deserialize())
         evennia.SESSION_HANDLER.start_bot_session(
             "evennia.server.portal.rss.RSSBotFactory", configdict
         )
@@ -424,9 +473,17 @@ class RSSBot(Bot):
                 command.
             txt (str, optional):  Command string.
             kwargs (dict, optional): Additional Information passed from bot.
-                Not used by the RSSbot by default.
+                If `type='rss_state'`, this is the state of the feed reader, to
+                pass back to it when restarted.
 
         """
+        if kwargs.get("type") == "rss_state":
+            self.db.rss_state = {
+                "etag": kwargs.get("etag"),
+                "modified": kwargs.get("modified"),
+                "seen": kwargs.get("seen", []),
+            }
+            return
         if not self.ndb.ev_channel and self.db.ev_channel:
             # cache channel lookup
             self.ndb.ev_channel = self.db.ev_channel
@@ -634,7 +691,7 @@ class DiscordBot(Bot):
             channel_name = channel.name
             for dc_chan in [dcid for evchan, dcid in channel_list if evchan == channel_name]:
                 # send outputfunc channel(msg, discord channel)
-                super().msg(channel=(strip_ansi(message.strip()), dc_chan))
+                self.msg_outbound(channel=(strip_ansi(message.strip()), dc_chan))
 
     def change_nickname(self, new_nickname, guild_id, user_id, **kwargs):
         """
@@ -753,6 +810,10 @@ class DiscordBot(Bot):
                     channel = channel[0]
                     self.relay_to_channel(txt, channel, sender, channel_name, guild)
 
+        # the protocol can't keep up with the messages we send it
+        elif type == "busy":
+            self.at_outbound_busy(**kwargs)
+
         # direct message
         elif type == "direct":
             # pass on to the DM hook
@@ -184,8 +184,8 @@ class AccountDBManager(TypedObjectManager, UserManager):
         if not matches:
             # try alias match
             matches = self.filter(
-                db_tags__db_tagtype__iexact="alias",
-                **{"db_tags__db_key__iexact" if exact else "db_tags__db_key__icontains": ostring},
+                db_tags__db_tagtype="alias",
+                **{"db_tags__db_key" if exact else "db_tags__db_key__icontains": ostring.lower()},
             )
         return matches
 
@@ -12,6 +12,7 @@ from evennia.accounts.accounts import (
     DefaultAccount,
     DefaultGuest,
 )
+from evennia.accounts.bots import Bot, RSSBot
 from evennia.utils import create
 from evennia.utils.test_resources import BaseEvenniaTest
 from evennia.utils.utils import uses_database
@@ -475,3 +476,58 @@ class TestDefaultAccountEv(BaseEvenniaTest):
 
     def test_msg(self):
         self.account.msg
+
+
+class TestBotOutbound(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.bot = create.create_account("TestBot", None, None, typeclass=Bot)
+        self.addCleanup(self.bot.delete)
+
+    def test_msg_outbound(self):
+        with patch.object(Bot, "msg") as mock_msg:
+            self.bot.msg_outbound(channel="msg 0")
+            mock_msg.assert_called_once_with(self.bot, channel="msg 0")
+            mock_msg.reset_mock()
+
+            # held while the protocol is busy, then sent in order
+            self.bot.at_outbound_busy(True)
+            self.bot.msg_outbound(channel="msg 1")
+            self.bot.msg_outbound(channel="msg 2")
+            mock_msg.assert_not_called()
+            self.bot.at_outbound_busy(False)
+            self.assertEqual(
+                mock_msg.call_args_list,
+                [((self.bot,), {"channel": "msg 1"}), ((self.bot,), {"channel": "msg 2"})],
+            )
+            self.assertIsNone(self.bot.ndb.outbound_held)
+
+
+class TestRSSBot(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.bot = create.create_account("rssbot-test", None, None, typeclass=RSSBot)
+        self.addCleanup(self.bot.delete)
+
+    @patch("evennia.accounts.bots._RSS_ENABLED", True)
+    @patch("evennia.SESSION_HANDLER")
+    def test_rss_state(self, mock_sessionhandler):
+        self.bot.start(rss_url="http://example.com/rss", rss_rate=10)
+        mock_sessionhandler.start_bot_session.assert_called_with(
+            "evennia.server.portal.rss.RSSBotFactory",
+            {"uid": self.bot.dbid, "url": "http://example.com/rss", "rate": 10},
+        )
+        # the reader's state is stored and passed back to it on restart
+        self.bot.execute_cmd(txt="", type="rss_state", etag='"v1"', modified=None, seen=["e1"])
+        state = {"etag": '"v1"', "modified": None, "seen": ["e1"]}
+        self.assertEqual(self.bot.db.rss_state, state)
+        self.bot.start()
+        mock_sessionhandler.start_bot_session.assert_called_with(
+            "evennia.server.portal.rss.RSSBotFactory",
+            {"uid": self.bot.dbid, "url": "http://example.com/rss", "rate": 10, **state},
+        )
+        # what is sent to the Portal is detached from the database
+        self.assertIs(type(mock_sessionhandler.start_bot_session.call_args[0][1]["seen"]), list)
+        # a new feed starts over
+        self.bot.start(rss_url="http://example.com/other")
+        self.assertIsNone(self.bot.db.rss_state)
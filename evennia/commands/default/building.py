@@ -3323,8 +3323,8 @@ class CmdFind(COMMAND_DEFAULT_CLASS):
             if "exact" in switches:
                 keyquery = Q(db_key__iexact=searchstring, id__gte=low, id__lte=high)
                 aliasquery = Q(
-                    db_tags__db_key__iexact=searchstring,
-                    db_tags__db_tagtype__iexact="alias",
+                    db_tags__db_key=searchstring.lower(),
+                    db_tags__db_tagtype="alias",
                     id__gte=low,
                     id__lte=high,
                 )
@@ -3332,7 +3332,7 @@ class CmdFind(COMMAND_DEFAULT_CLASS):
                 keyquery = Q(db_key__istartswith=searchstring, id__gte=low, id__lte=high)
                 aliasquery = Q(
                     db_tags__db_key__istartswith=searchstring,
-                    db_tags__db_tagtype__iexact="alias",
+                    db_tags__db_tagtype="alias",
                     id__gte=low,
                     id__lte=high,
                 )
@@ -3340,7 +3340,7 @@ class CmdFind(COMMAND_DEFAULT_CLASS):
                 keyquery = Q(db_key__icontains=searchstring, id__gte=low, id__lte=high)
                 aliasquery = Q(
                     db_tags__db_key__icontains=searchstring,
-                    db_tags__db_tagtype__iexact="alias",
+                    db_tags__db_tagtype="alias",
                     id__gte=low,
                     id__lte=high,
                 )
@@ -1341,8 +1341,7 @@ class CmdPage(COMMAND_DEFAULT_CLASS):
         pages_we_sent = Msg.objects.get_messages_by_sender(caller).order_by("-db_date_created")
         # get only messages tagged as pages or not tagged at all (legacy pages)
         pages_we_sent = pages_we_sent.filter(
-            Q(db_tags__db_key__iexact="page", db_tags__db_category__iexact="comms")
-            | Q(db_tags__isnull=True)
+            Q(db_tags__db_key="page", db_tags__db_category="comms") | Q(db_tags__isnull=True)
         )
         # we need to default to True to allow for legacy pages
         pages_we_sent = [msg for msg in pages_we_sent if msg.access(caller, "read", default=True)]
@@ -1350,8 +1349,7 @@ class CmdPage(COMMAND_DEFAULT_CLASS):
         # get last messages we've got
         pages_we_got = Msg.objects.get_messages_by_receiver(caller).order_by("-db_date_created")
         pages_we_got = pages_we_got.filter(
-            Q(db_tags__db_key__iexact="page", db_tags__db_category__iexact="comms")
-            | Q(db_tags__isnull=True)
+            Q(db_tags__db_key="page", db_tags__db_category="comms") | Q(db_tags__isnull=True)
         )
         # we need to default to True to allow for legacy pages
         pages_we_got = [msg for msg in pages_we_got if msg.access(caller, "read", default=True)]
@@ -1748,9 +1746,10 @@ class CmdRSS2Chan(COMMAND_DEFAULT_CLASS):
       rss2chan rsschan = http://code.google.com/feeds/p/evennia/updates/basic
 
     This creates an RSS reader  that connects to a given RSS feed url. Updates
-    will be echoed as a title and news link to the given channel. The rate of
-    updating is set with the RSS_UPDATE_INTERVAL variable in settings (default
-    is every 10 minutes).
+    will be echoed as a title and news link to the given channel. The feed is
+    checked every 10 seconds while it has news, and less and less often while
+    it doesn't, up to the RSS_UPDATE_INTERVAL variable in settings (default is
+    every 10 minutes).
 
     When disconnecting you need to supply both the channel and url again so as
     to identify the connection uniquely.
@@ -10,13 +10,17 @@ outside the game in modules given by ``settings.FILE_HELP_ENTRY_MODULES``.
 
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import chain
 
 from django.conf import settings
 
 from evennia.help.filehelp import FILE_HELP_ENTRIES
-from evennia.help.models import HelpEntry
-from evennia.help.utils import help_search_with_index, parse_entry_for_subcategories
+from evennia.help.utils import (
+    HELP_INDEX_CACHE,
+    help_search_with_index,
+    parse_entry_for_subcategories,
+)
 from evennia.locks.lockhandler import LockException
 from evennia.utils import create, evmore
 from evennia.utils.ansi import ANSIString
@@ -39,6 +43,20 @@ HELP_CLICKABLE_TOPICS = settings.HELP_CLICKABLE_TOPICS
 __all__ = ("CmdHelp", "CmdSetHelp")
 
 
+@lru_cache(maxsize=1024)
+def _category_search_index_entry(key):
+    # the same search entry is reused for a category so it can be found in
+    # cached search indexes
+    return {
+        "key": key,
+        "aliases": "",
+        "category": key,
+        "no_prefix": "",
+        "tags": "",
+        "text": "",
+    }
+
+
 @dataclass
 class HelpCategory:
     """
@@ -50,14 +68,7 @@ class HelpCategory:
 
     @property
     def search_index_entry(self):
-        return {
-            "key": self.key,
-            "aliases": "",
-            "category": self.key,
-            "no_prefix": "",
-            "tags": "",
-            "text": "",
-        }
+        return _category_search_index_entry(self.key)
 
     def __hash__(self):
         return hash(id(self))
@@ -419,13 +430,37 @@ class CmdHelp(COMMAND_DEFAULT_CLASS):
         # removing doublets in cmdset, caused by cmdhandler
         # having to allow doublet commands to manage exits etc.
         cmdset.make_unique(caller)
+        cmds = [cmd for cmd in cmdset if cmd]
+        file_entries = FILE_HELP_ENTRIES.all()
+        db_entries = HELP_INDEX_CACHE.get_db_entries()
+
+        # the accessible topics are cached per caller permissions, as long as the
+        # access checks are not customized
+        cache_key = None
+        if (
+            type(self).can_list_topic is CmdHelp.can_list_topic
+            and type(self).can_read_topic is CmdHelp.can_read_topic
+        ):
+            access_key = HELP_INDEX_CACHE.get_access_key(caller)
+            if access_key is not None:
+                cache_key = (
+                    mode,
+                    access_key,
+                    HELP_INDEX_CACHE.version,
+                    tuple(map(id, cmds)),
+                    tuple(map(id, file_entries)),
+                )
+                cached = HELP_INDEX_CACHE.get_topics(cache_key)
+                if cached:
+                    return tuple(dict(dct) for dct in cached)
+
         # retrieve all available commands and database / file-help topics.
         # also check the 'cmd:' lock here
-        cmd_help_topics = [cmd for cmd in cmdset if cmd and cmd.access(caller, "cmd")]
+        cmd_help_topics = [cmd for cmd in cmds if cmd.access(caller, "cmd")]
         # get all file-based help entries, checking perms
-        file_help_topics = {topic.key.lower().strip(): topic for topic in FILE_HELP_ENTRIES.all()}
+        file_help_topics = {topic.key.lower().strip(): topic for topic in file_entries}
         # get db-based help entries, checking perms
-        db_help_topics = {topic.key.lower().strip(): topic for topic in HelpEntry.objects.all()}
+        db_help_topics = {topic.key.lower().strip(): topic for topic in db_entries}
         if mode == "list":
             # check the view lock for all help entries/commands and determine key
             cmd_help_topics = {
@@ -461,7 +496,14 @@ class CmdHelp(COMMAND_DEFAULT_CLASS):
                 if self.can_read_topic(entry, caller)
             }
 
-        return cmd_help_topics, db_help_topics, file_help_topics
+        topics = (cmd_help_topics, db_help_topics, file_help_topics)
+        if cache_key and all(
+            HELP_INDEX_CACHE.can_cache_access(topic)
+            for topic in chain(cmds, file_entries, db_entries)
+        ):
+            HELP_INDEX_CACHE.add_topics(cache_key, topics, sources=(cmds, file_entries))
+            return tuple(dict(dct) for dct in topics)
+        return topics
 
     def do_search(self, query, entries, search_fields=None):
         """
@@ -626,9 +668,10 @@ class CmdHelp(COMMAND_DEFAULT_CLASS):
         all_topics = {**file_db_help_topics, **cmd_help_topics}
 
         # get all categories
-        all_categories = list(
-            set(HelpCategory(topic.help_category) for topic in all_topics.values())
-        )
+        all_categories = [
+            HelpCategory(category)
+            for category in set(topic.help_category for topic in all_topics.values())
+        ]
 
         # all available help options - will be searched in order. We also check # the
         # read-permission here.
@@ -916,9 +959,10 @@ class CmdSetHelp(CmdHelp):
         # commands take priority over the other types
         all_topics = {**file_db_help_topics, **cmd_help_topics}
         # get all categories
-        all_categories = list(
-            set(HelpCategory(topic.help_category) for topic in all_topics.values())
-        )
+        all_categories = [
+            HelpCategory(category)
+            for category in set(topic.help_category for topic in all_topics.values())
+        ]
         # all available help options - will be searched in order. We also check # the
         # read-permission here.
         entries = list(all_topics.values()) + all_categories
@@ -60,14 +60,25 @@ class CmdReload(COMMAND_DEFAULT_CLASS):
 
     Usage:
       reload [reason]
+      reload/hot
+
+    Switch:
+      hot - re-import changed game code (typeclasses, commands,
+            cmdsets, prototypes, lock functions) inside the running
+            server, without restarting it.
 
     This restarts the server. The Portal is not
     affected. Non-persistent scripts will survive a reload (use
     reset to purge) and at_reload() hooks will be called.
+
+    A hot reload keeps all caches and non-persistent data and does
+    not call any reload hooks. Changes to settings or to modules
+    only imported at startup still require a normal reload.
     """
 
     key = "@reload"
     aliases = ["@restart"]
+    switch_options = ("hot",)
     locks = "cmd:perm(reload) or perm(Developer)"
     help_category = "System"
 
@@ -75,6 +86,9 @@ class CmdReload(COMMAND_DEFAULT_CLASS):
         """
         Reload the system.
         """
+        if "hot" in self.switches:
+            self.hot_reload()
+            return
         reason = ""
         if self.args:
             reason = "(Reason: %s) " % self.args.rstrip(".")
@@ -82,6 +96,26 @@ class CmdReload(COMMAND_DEFAULT_CLASS):
             evennia.SESSION_HANDLER.announce_all(f" Server restart initiated {reason}...")
         evennia.SESSION_HANDLER.portal_restart_server()
 
+    def hot_reload(self):
+        """
+        Re-import changed game modules in-process.
+        """
+        from evennia.server.hotreload import HotReloadError, hot_reload
+
+        t0 = time.time()
+        try:
+            modules = hot_reload()
+        except HotReloadError as err:
+            self.msg(f"|rHot reload failed:|n {err}\nFix the error and try again, or use reload.")
+            return
+        if modules:
+            self.msg(
+                f"Hot-reloaded {len(modules)} module(s) in {(time.time() - t0) * 1000:.1f}ms: "
+                f"{iter_to_str(modules)}."
+            )
+        else:
+            self.msg("No changed game modules to hot-reload.")
+
 
 class CmdReset(COMMAND_DEFAULT_CLASS):
     """
@@ -34,8 +34,11 @@ from evennia.commands.default import (
 )
 from evennia.commands.default import help as help_module
 from evennia.commands.default import syscommands, system, unloggedin
+from evennia.commands.default.cmdset_account import AccountCmdSet
 from evennia.commands.default.cmdset_character import CharacterCmdSet
 from evennia.commands.default.muxcommand import MuxCommand
+from evennia.help.models import HelpEntry
+from evennia.help.utils import HELP_INDEX_CACHE
 from evennia.objects.models import ObjectDB
 from evennia.objects.objects import (
     DefaultCharacter,
@@ -230,6 +233,34 @@ class TestHelp(BaseEvenniaCommandTest):
             cmdset=CharacterCmdSet(),
         )
 
+    @patch.object(help_module.CmdHelp, "help_more", False)
+    def test_help_cached_access(self):
+        create.create_help_entry("secrethelp", "Secret text", locks="read:perm(Admin)")
+        # what a puppeting account gets, including the serversetting-locked bot commands
+        cmdset = AccountCmdSet() + CharacterCmdSet()
+
+        def _help(args, expected):
+            self.call(help_module.CmdHelp(), args, expected, caller=self.char2, cmdset=cmdset)
+
+        _help("secrethelp", "No help found")
+        self.assertTrue(HELP_INDEX_CACHE._topics)
+        create.create_help_entry("attrhelp", "Attr text", locks="read:attr(can_read)")
+        _help("attrhelp", "No help found")
+        # a permission change gives another set of cached topics
+        self.account2.permissions.add("Admin")
+        _help("secrethelp", "Help for secrethelp")
+        # non-permission locks are checked every time
+        self.char2.db.can_read = True
+        _help("attrhelp", "Help for attrhelp")
+        # changing or deleting the entry invalidates the cache
+        help_entry = HelpEntry.objects.get(db_key="secrethelp")
+        help_entry.locks.add("read:perm(Developer)")
+        _help("secrethelp", "No help found")
+        self.account2.permissions.add("Developer")
+        _help("secrethelp", "Help for secrethelp")
+        help_entry.delete()
+        _help("secrethelp", "No help found")
+
     @parameterized.expand(
         [
             (
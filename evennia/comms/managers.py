@@ -398,7 +398,7 @@ class ChannelDBManager(TypedObjectManager):
                 pass
         results = self.filter(
             Q(db_key__iexact=channelkey)
-            | Q(db_tags__db_tagtype__iexact="alias", db_tags__db_key__iexact=channelkey)
+            | Q(db_tags__db_tagtype="alias", db_tags__db_key=channelkey.lower())
         ).distinct()
         return results[0] if results else None
 
@@ -442,12 +442,12 @@ class ChannelDBManager(TypedObjectManager):
         if exact:
             channels = self.filter(
                 Q(db_key__iexact=ostring)
-                | Q(db_tags__db_tagtype__iexact="alias", db_tags__db_key__iexact=ostring)
+                | Q(db_tags__db_tagtype="alias", db_tags__db_key=ostring.lower())
             ).distinct()
         else:
             channels = self.filter(
                 Q(db_key__icontains=ostring)
-                | Q(db_tags__db_tagtype__iexact="alias", db_tags__db_key__icontains=ostring)
+                | Q(db_tags__db_tagtype="alias", db_tags__db_key__icontains=ostring)
             ).distinct()
         return channels
 
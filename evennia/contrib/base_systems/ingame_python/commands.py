@@ -217,6 +217,19 @@ class CmdCallback(COMMAND_DEFAULT_CLASS):
                     else:
                         msg += "\nThis callback |rhasn't been|n accepted yet."
 
+                stats = self.handler.get_callback_stats(obj, callback_name, number)
+                if stats["calls"]:
+                    msg += (
+                        "\nCalled {} times since last edit/reload: "
+                        "{:.2f}ms avg, {:.2f}ms max.".format(
+                            stats["calls"],
+                            stats["total"] * 1000 / stats["calls"],
+                            stats["max"] * 1000,
+                        )
+                    )
+                else:
+                    msg += "\nNot called since last edit/reload."
+
                 msg += "\nCallback code:\n"
                 msg += raw(callback["code"])
                 self.msg(msg)
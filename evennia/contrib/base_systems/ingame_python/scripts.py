@@ -4,6 +4,7 @@ Scripts for the in-game Python system.
 
 import re
 import sys
+import time
 import traceback
 from datetime import datetime, timedelta
 from queue import Queue
@@ -60,6 +61,7 @@ class EventHandler(DefaultScript):
         tasks:
 
         -   Create temporarily stored events.
+        -   Reset the cache of compiled callbacks and their timings.
         -   Generate locals (individual events' namespace).
         -   Load eventfuncs, including user-defined ones.
         -   Re-schedule tasks that aren't set to fire anymore.
@@ -70,6 +72,10 @@ class EventHandler(DefaultScript):
         for typeclass, name, variables, help_text, custom_call, custom_add in EVENTS:
             self.add_event(typeclass, name, variables, help_text, custom_call, custom_add)
 
+        # Compiled callbacks and their timings, {(obj, callback_name, number): ...}
+        self.ndb.compiled_callbacks = {}
+        self.ndb.callback_stats = {}
+
         # Generate locals
         self.ndb.current_locals = {}
         self.ndb.fresh_locals = {}
@@ -248,6 +254,8 @@ class EventHandler(DefaultScript):
         # If not valid, set it in 'to_valid'
         if not valid:
             self.db.to_valid.append((obj, callback_name, len(callbacks) - 1))
+        else:
+            self.compile_callback(obj, callback_name, len(callbacks) - 1, code)
 
         # Call the custom_add if needed
         custom_add = self.get_events(obj).get(callback_name, [None, None, None, None])[3]
@@ -298,6 +306,9 @@ class EventHandler(DefaultScript):
         callbacks[number].update(
             {"updated_on": datetime.now(), "updated_by": author, "valid": valid, "code": code}
         )
+        self.clear_compiled_callbacks(obj, callback_name, number)
+        if valid:
+            self.compile_callback(obj, callback_name, number, code)
 
         # If not valid, set it in 'to_valid'
         if not valid and (obj, callback_name, number) not in self.db.to_valid:
@@ -342,6 +353,8 @@ class EventHandler(DefaultScript):
                 "Deleting callback {} {} of {}:\n{}".format(callback_name, number, obj, code)
             )
             del callbacks[number]
+            # the numbers of the following callbacks shift, so forget all of them
+            self.clear_compiled_callbacks(obj, callback_name)
 
         # Change IDs of callbacks to be validated
         i = 0
@@ -391,6 +404,76 @@ class EventHandler(DefaultScript):
         callbacks[number].update({"valid": True})
         if (obj, callback_name, number) in self.db.to_valid:
             self.db.to_valid.remove((obj, callback_name, number))
+        self.compile_callback(obj, callback_name, number, callbacks[number]["code"])
+
+    def compile_callback(self, obj, callback_name, number, code):
+        """
+        Get the compiled code object of a callback, compiling it only if it's
+        not already cached.
+
+        Args:
+            obj (Object): the object containing the callback.
+            callback_name (str): the name of the callback.
+            number (int): the number of the callback.
+            code (str): the Python code of the callback.
+
+        Returns:
+            code (code or None): the compiled code, or `None` if it has a syntax
+                error.  The error will then be reported when the callback is called.
+
+        Note:
+            Compiled callbacks are only cached in memory, keyed on the object,
+            callback name and number and checked against the hash of the code.
+
+        """
+        key = (obj, callback_name, number)
+        code_hash = hash(code)
+        cached = self.ndb.compiled_callbacks.get(key)
+        if cached and cached[0] == code_hash:
+            return cached[1]
+
+        try:
+            compiled = compile(code, "<string>", "exec")
+        except SyntaxError:
+            return None
+        self.ndb.compiled_callbacks[key] = (code_hash, compiled)
+        return compiled
+
+    def clear_compiled_callbacks(self, obj, callback_name, number=None):
+        """
+        Forget the compiled code and timings of callbacks.
+
+        Args:
+            obj (Object): the object containing the callbacks.
+            callback_name (str): the name of the callbacks.
+            number (int, optional): only forget this callback number.
+
+        """
+        for cache in (self.ndb.compiled_callbacks, self.ndb.callback_stats):
+            for key in list(cache):
+                if key[0] == obj and key[1] == callback_name and number in (None, key[2]):
+                    del cache[key]
+
+    def get_callback_stats(self, obj, callback_name, number):
+        """
+        Get the timing counters of a callback since it was last edited
+        or the server was reloaded.
+
+        Args:
+            obj (Object): the object containing the callback.
+            callback_name (str): the name of the callback.
+            number (int): the number of the callback.
+
+        Returns:
+            stats (dict): with keys `calls` (how many times the callback has been
+                executed), `total` and `max` (execution times in seconds).
+
+        """
+        return dict(
+            self.ndb.callback_stats.get(
+                (obj, callback_name, number), {"calls": 0, "total": 0.0, "max": 0.0}
+            )
+        )
 
     def call(self, obj, callback_name, *args, **kwargs):
         """
@@ -461,14 +544,25 @@ class EventHandler(DefaultScript):
             if number is not None and callback["number"] != number:
                 continue
 
+            key = (callback["obj"], callback["name"], callback["number"])
+            code = self.compile_callback(*key, callback["code"]) or callback["code"]
+            start = time.perf_counter()
             try:
-                exec(callback["code"], locals, locals)
+                exec(code, locals, locals)
             except InterruptEvent:
                 return False
             except Exception:
                 etype, evalue, tb = sys.exc_info()
                 trace = traceback.format_exception(etype, evalue, tb)
                 self.handle_error(callback, trace)
+            finally:
+                elapsed = time.perf_counter() - start
+                stats = self.ndb.callback_stats.setdefault(
+                    key, {"calls": 0, "total": 0.0, "max": 0.0}
+                )
+                stats["calls"] += 1
+                stats["total"] += elapsed
+                stats["max"] = max(stats["max"], elapsed)
 
         return True
 
@@ -228,6 +228,40 @@ class TestEventHandler(BaseEvenniaTest):
         self.assertTrue(self.handler.call(self.room1, "dummy", locals={"character": self.char2}))
         self.assertEqual(self.char2.db.health, 0)
 
+    def test_compiled_callbacks(self):
+        """Test that callbacks are compiled once and recompiled when edited."""
+        self.handler.add_callback(
+            self.room1, "dummy", "character.db.health = 10", author=self.char1, valid=True
+        )
+        key = (self.room1, "dummy", 0)
+        self.assertIn(key, self.handler.ndb.compiled_callbacks)
+        compiled = self.handler.ndb.compiled_callbacks[key][1]
+
+        self.assertTrue(self.handler.call(self.room1, "dummy", locals={"character": self.char1}))
+        self.assertTrue(self.handler.call(self.room1, "dummy", locals={"character": self.char1}))
+        self.assertEqual(self.char1.db.health, 10)
+        self.assertIs(self.handler.ndb.compiled_callbacks[key][1], compiled)
+        self.assertEqual(self.handler.get_callback_stats(self.room1, "dummy", 0)["calls"], 2)
+
+        # editing the callback recompiles it and resets the timings
+        self.handler.edit_callback(
+            self.room1, "dummy", 0, "character.db.health = 20", author=self.char1, valid=True
+        )
+        self.assertIsNot(self.handler.ndb.compiled_callbacks[key][1], compiled)
+        self.assertEqual(self.handler.get_callback_stats(self.room1, "dummy", 0)["calls"], 0)
+        self.assertTrue(self.handler.call(self.room1, "dummy", locals={"character": self.char1}))
+        self.assertEqual(self.char1.db.health, 20)
+
+        # unaccepted callbacks are only compiled once accepted
+        self.handler.add_callback(self.room1, "dummy", "pass", author=self.char1, valid=False)
+        self.assertNotIn((self.room1, "dummy", 1), self.handler.ndb.compiled_callbacks)
+        self.handler.accept_callback(self.room1, "dummy", 1)
+        self.assertIn((self.room1, "dummy", 1), self.handler.ndb.compiled_callbacks)
+
+        # deleting forgets all the callbacks of that name, since they are renumbered
+        self.handler.del_callback(self.room1, "dummy", 0)
+        self.assertEqual(self.handler.ndb.compiled_callbacks, {})
+
     def test_handler(self):
         """Test the object handler."""
         self.assertIsNotNone(self.char1.callbacks)
@@ -337,6 +371,12 @@ class TestCmdCallback(BaseEvenniaCommandTest):
         # The last line should be "pass" (the callback code)
         details = self.call(CmdCallback(), "out = traverse 1")
         self.assertEqual(details.splitlines()[-1], "pass")
+        self.assertIn("Not called since last edit/reload.", details)
+
+        # Timing counters are shown once the callback has been called
+        self.handler.call(self.exit, "traverse", locals={})
+        details = self.call(CmdCallback(), "out = traverse 1")
+        self.assertIn("Called 1 times since last edit/reload", details)
 
     def test_add(self):
         """Test to add an callback."""
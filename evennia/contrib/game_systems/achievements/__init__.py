@@ -3,6 +3,8 @@ from .achievements import (
     all_achievements,
     get_achievement,
     get_achievement_progress,
+    save_achievement_progress,
+    save_all_achievement_progress,
     search_achievement,
     track_achievements,
 )
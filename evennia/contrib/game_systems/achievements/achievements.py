@@ -50,14 +50,17 @@ Example:
 """
 
 from collections import Counter
+from copy import deepcopy
 
 from django.conf import settings
 
 from evennia.commands.default.muxcommand import MuxCommand
+from evennia.server.signals import SIGNAL_SERVER_PRE_STOP
 from evennia.utils import logger
 from evennia.utils.evmore import EvMore
 from evennia.utils.utils import (
     all_from_module,
+    delay,
     is_iter,
     make_iter,
     string_partial_matching,
@@ -67,6 +70,13 @@ from evennia.utils.utils import (
 _ACHIEVEMENT_ATTR = make_iter(getattr(settings, "ACHIEVEMENT_CONTRIB_ATTRIBUTE", "achievements"))
 _ATTR_KEY = _ACHIEVEMENT_ATTR[0]
 _ATTR_CAT = _ACHIEVEMENT_ATTR[1] if len(_ACHIEVEMENT_ATTR) > 1 else None
+# how long to wait before writing tracked progress to the database, so a burst of events
+# only costs one write. If 0, every update is written immediately.
+_SAVE_DELAY = getattr(settings, "ACHIEVEMENT_CONTRIB_SAVE_DELAY", 5)
+# progress waiting to be saved, as {(dbclass, pk): (data, stored, task)}. This is keyed on
+# the database id rather than the instance, so the progress is neither lost nor saved over
+# newer progress if the idmapper cache is flushed and the achiever is loaded anew.
+_PENDING_SAVES = {}
 
 # load the achievements data
 _ACHIEVEMENT_DATA = {}
@@ -86,21 +96,177 @@ else:
     logger.log_warn("No achievement modules have been added to settings.")
 
 
-def _read_player_data(achiever):
+class _AchievementIndex:
     """
-    helper function to get a player's achievement data from the database.
+    Lookup tables over the achievement data, so `track_achievements` doesn't
+    have to filter every achievement on every tracked event.
 
-    Args:
-        achiever (Object or Account):   The achieving entity
+    Candidates are indexed on `(category, tracking)`, where either may be `None`
+    for 'any'. Achievements without a `tracking` value match any tracked item in
+    their category and are stored separately in `untracked`. The prereqs form a
+    DAG (a prereq's `dependents` are the achievements that it unlocks).
+
+    """
+
+    def __init__(self, achievement_data):
+        self.source = achievement_data
+        # (category, tracking) -> [keys], sorted in definition order
+        self.candidates = {}
+        # category -> [keys] for achievements with no tracking value
+        self.untracked = {}
+        # key -> tuple of prereq keys
+        self.prereqs = {}
+        # prereq key -> tuple of keys it is a prereq to
+        self.dependents = {}
+        # key -> definition order, for merging candidate lists
+        self.position = {key: pos for pos, key in enumerate(achievement_data)}
+
+        dependents = {}
+        for key, data in achievement_data.items():
+            categories = list(dict.fromkeys(make_iter(data.get("category", [])))) + [None]
+            trackings = list(dict.fromkeys(make_iter(data.get("tracking", []))))
+            for category in categories:
+                if trackings:
+                    for tracking in trackings + [None]:
+                        self.candidates.setdefault((category, tracking), []).append(key)
+                else:
+                    self.candidates.setdefault((category, None), []).append(key)
+                    self.untracked.setdefault(category, []).append(key)
+            prereqs = tuple(make_iter(data.get("prereqs", [])))
+            self.prereqs[key] = prereqs
+            for prereq in prereqs:
+                dependents.setdefault(prereq, []).append(key)
+        self.dependents = {key: tuple(deps) for key, deps in dependents.items()}
+        self._validate_prereqs()
+
+    def _validate_prereqs(self):
+        """
+        Warn about achievements whose prereqs can never be completed.
+
+        """
+        # topologically sort the prereq graph; whatever can't be sorted is part of a cycle
+        remaining = {key: len(prereqs) for key, prereqs in self.prereqs.items()}
+        unlocked = [key for key, nprereqs in remaining.items() if not nprereqs]
+        while unlocked:
+            for dependent in self.dependents.get(unlocked.pop(), ()):
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    unlocked.append(dependent)
+        if circular := [key for key, nprereqs in remaining.items() if nprereqs > 0]:
+            logger.log_warn(f"Achievements with circular or unknown prereqs: {circular}")
+
+    def get_candidates(self, category=None, tracking=None):
+        """
+        Get the keys of all achievements matching a tracked event.
+
+        Args:
+            category (str, optional): The category, or `None` for any category.
+            tracking (str, optional): The tracked item, or `None` for any item.
+
+        Returns:
+            list: The matching achievement keys, in definition order.
+
+        """
+        category = category or None
+        if not tracking:
+            return self.candidates.get((category, None), [])
+        tracked = self.candidates.get((category, tracking), [])
+        untracked = self.untracked.get(category, [])
+        if not untracked:
+            return tracked
+        if not tracked:
+            return untracked
+        return sorted(tracked + untracked, key=self.position.get)
+
+
+_ACHIEVEMENT_INDEX = _AchievementIndex(_ACHIEVEMENT_DATA)
+
+
+def _get_index():
+    """
+    Get the achievement index, (re)building it if the achievement data changed.
+
+    Returns:
+        _AchievementIndex: The index over the current achievement data.
+
+    """
+    global _ACHIEVEMENT_INDEX
+    if _ACHIEVEMENT_INDEX.source is not _ACHIEVEMENT_DATA:
+        _ACHIEVEMENT_INDEX = _AchievementIndex(_ACHIEVEMENT_DATA)
+    return _ACHIEVEMENT_INDEX
+
+
+def _get_key(achiever):
+    """
+    helper function to get the key of an achiever in `_PENDING_SAVES`.
+
+    """
+    return (achiever.__dbclass__, achiever.pk)
+
+
+def _get_stored(achiever):
+    """
+    helper function to get the stored (pickled) value of the achievement Attribute. The
+    Attribute gets a new stored value every time it's written to, so this tells if the
+    Attribute was changed since it was loaded.
+
+    """
+    attr = achiever.attributes.get(_ATTR_KEY, category=_ATTR_CAT, return_obj=True)
+    return attr.db_value if attr else None
+
+
+def _get_cached(achiever):
+    """
+    helper function to get the cached achievement data of a player, loading it from the
+    database the first time, or if the Attribute was changed without going through this
+    module.
 
     Returns:
-        dict:  The deserialized achievement data.
+        tuple: `(data, stored)`, the data and the stored Attribute value it was loaded from.
+
     """
+    key = _get_key(achiever)
+    stored = _get_stored(achiever)
+    cached = _PENDING_SAVES.get(key) or achiever.ndb._achievement_data
+    # a reloaded Attribute has a new but equal stored value
+    if cached and (cached[1] is stored or cached[1] == stored):
+        return cached[:2]
+    if pending := _PENDING_SAVES.pop(key, None):
+        # the Attribute was written to directly; that wins over the unsaved progress
+        pending[2].remove()
     if data := achiever.attributes.get(_ATTR_KEY, default={}, category=_ATTR_CAT):
         # detach the data from the db
         data = data.deserialize()
-    # return the data
-    return data or {}
+    achiever.ndb._achievement_data = (data or {}, stored)
+    return achiever.ndb._achievement_data
+
+
+def _get_player_data(achiever):
+    """
+    helper function to get the cached achievement data for a player, loading it from the
+    database the first time.
+
+    Args:
+        achiever (Object or Account):   The achieving entity
+
+    Returns:
+        dict:  The cached achievement data. Changes to this must be followed by a call to
+            `_save_player_data` to make them persistent.
+    """
+    return _get_cached(achiever)[0]
+
+
+def _read_player_data(achiever):
+    """
+    helper function to get a player's achievement data.
+
+    Args:
+        achiever (Object or Account):   The achieving entity
+
+    Returns:
+        dict:  A copy of the achievement data, safe to modify.
+    """
+    return deepcopy(_get_player_data(achiever))
 
 
 def _write_player_data(achiever, data):
@@ -117,7 +283,81 @@ def _write_player_data(achiever, data):
     Notes:
         This function will overwrite any existing achievement data for the entity.
     """
+    if pending := _PENDING_SAVES.pop(_get_key(achiever), None):
+        pending[2].remove()
     achiever.attributes.add(_ATTR_KEY, data, category=_ATTR_CAT)
+    achiever.ndb._achievement_data = (data, _get_stored(achiever))
+
+
+def _save_player_data(achiever, immediately=False):
+    """
+    helper function to write the cached achievement data back to the database. Unless
+    `immediately` is set, this is delayed by `ACHIEVEMENT_CONTRIB_SAVE_DELAY` seconds so
+    that a burst of tracked events only leads to a single database write.
+
+    Args:
+        achiever (Object or Account):  The achieving entity
+        immediately (bool, optional): Write the data now instead of delaying.
+
+    """
+    data, stored = _get_cached(achiever)
+    if immediately or _SAVE_DELAY <= 0:
+        _write_player_data(achiever, data)
+    elif (key := _get_key(achiever)) not in _PENDING_SAVES:
+        _PENDING_SAVES[key] = (data, stored, delay(_SAVE_DELAY, _save_pending, key))
+
+
+def _save_pending(key):
+    """
+    helper function to write the pending progress of an achiever to the database, looking
+    up the achiever anew in case it was deleted or reloaded since the save was scheduled.
+
+    Args:
+        key (tuple): The `(dbclass, pk)` of the achiever in `_PENDING_SAVES`.
+
+    """
+    if key not in _PENDING_SAVES:
+        return
+    dbclass, pk = key
+    try:
+        if achiever := dbclass.objects.filter(id=pk).first():
+            _save_player_data(achiever, immediately=True)
+    except Exception:
+        logger.log_trace(f"Could not save the achievement progress of {dbclass.__name__} #{pk}.")
+    if pending := _PENDING_SAVES.pop(key, None):
+        # the achiever no longer exists, or could not be saved
+        pending[2].remove()
+
+
+def save_achievement_progress(achiever):
+    """
+    Write any pending achievement progress for an achiever to the database. This is
+    called automatically after `ACHIEVEMENT_CONTRIB_SAVE_DELAY` seconds, but you may want
+    to call it manually, such as before the achiever is deleted. Progress of achievers
+    that no longer exist is discarded.
+
+    Args:
+        achiever (Account or Character):  The entity tracking achievement progress.
+
+    """
+    _save_pending(_get_key(achiever))
+
+
+def save_all_achievement_progress(**kwargs):
+    """
+    Write the pending achievement progress of all achievers to the database. This is
+    called automatically when the server reloads or shuts down, since progress waiting
+    to be saved would otherwise be lost.
+
+    Keyword Args:
+        Any keyword arguments are ignored, so this can be connected to a signal.
+
+    """
+    for key in list(_PENDING_SAVES):
+        _save_pending(key)
+
+
+SIGNAL_SERVER_PRE_STOP.connect(save_all_achievement_progress, weak=False)
 
 
 def track_achievements(achiever, category=None, tracking=None, count=1, **kwargs):
@@ -138,29 +378,29 @@ def track_achievements(achiever, category=None, tracking=None, count=1, **kwargs
         # there are no achievements available, there's nothing to do
         return tuple()
 
+    index = _get_index()
+    if not (candidates := index.get_candidates(category, tracking)):
+        # nothing is tracking this
+        return tuple()
+
     # get the achiever's progress data
-    progress_data = _read_player_data(achiever)
+    progress_data = _get_player_data(achiever)
 
-    # filter all of the achievements down to the relevant ones
+    # filter the candidate achievements down to the available ones
     relevant_achievements = (
-        (key, val)
-        for key, val in _ACHIEVEMENT_DATA.items()
-        if (not category or category in make_iter(val.get("category", [])))  # filter by category
-        and (
-            not tracking
-            or not val.get("tracking")
-            or tracking in make_iter(val.get("tracking", []))
-        )  # filter by tracked item
-        and not progress_data.get(key, {}).get("completed")  # filter by completion status
+        (key, _ACHIEVEMENT_DATA[key])
+        for key in candidates
+        if not progress_data.get(key, {}).get("completed")  # filter by completion status
         and all(
-            progress_data.get(prereq, {}).get("completed")
-            for prereq in make_iter(val.get("prereqs", []))
+            progress_data.get(prereq, {}).get("completed") for prereq in index.prereqs[key]
         )  # filter by prereqs
     )
 
     completed = []
+    updated = False
     # loop through all the relevant achievements and update the progress data
     for achieve_key, achieve_data in relevant_achievements:
+        updated = True
         if target_count := achieve_data.get("count", 1):
             # check if we need to track things individually or not
             separate_totals = achieve_data.get("tracking_type", "sum") == "separate"
@@ -195,8 +435,9 @@ def track_achievements(achiever, category=None, tracking=None, count=1, **kwargs
             progress_data[key] = {}
         progress_data[key]["completed"] = True
 
-    # write the updated progress back to the achievement attribute
-    _write_player_data(achiever, progress_data)
+    if updated:
+        # (lazily) write the updated progress back to the achievement attribute
+        _save_player_data(achiever)
 
     # return all the achievements we just completed
     return tuple(completed)
@@ -242,9 +483,9 @@ def get_achievement_progress(achiever, key):
     Returns:
         dict: The progress data
     """
-    if progress_data := _read_player_data(achiever):
+    if progress_data := _get_player_data(achiever):
         # get the specific key's data
-        return progress_data.get(key, {})
+        return deepcopy(progress_data.get(key, {}))
     else:
         # just return an empty dict
         return {}
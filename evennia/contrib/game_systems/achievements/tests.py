@@ -37,6 +37,11 @@ _dummy_achievements = {
 
 
 class TestAchievements(BaseEvenniaTest):
+    def tearDown(self):
+        # don't leave delayed saves behind to fire after the test objects are gone
+        achievements.save_all_achievement_progress()
+        super().tearDown()
+
     @patch(
         "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
         _dummy_achievements,
@@ -56,11 +61,13 @@ class TestAchievements(BaseEvenniaTest):
         """progressing a counter should update the achiever"""
         # this should not complete any achievements; verify it returns the right empty result
         self.assertEqual(achievements.track_achievements(self.char1, "get", "thing"), tuple())
-        # first, verify that the data is created
+        # first, verify that the data is created once saved
+        achievements.save_achievement_progress(self.char1)
         self.assertTrue(self.char1.attributes.has("achievements"))
         self.assertEqual(self.char1.db.achievements["COUNTING_ACHIEVE"]["progress"], 1)
         # verify that it gets updated
         achievements.track_achievements(self.char1, "get", "thing")
+        achievements.save_achievement_progress(self.char1)
         self.assertEqual(self.char1.db.achievements["COUNTING_ACHIEVE"]["progress"], 2)
 
         # also verify that `get_achievement_progress` returns the correct data
@@ -114,6 +121,124 @@ class TestAchievements(BaseEvenniaTest):
             "SEPARATE_ITEMS", achievements.track_achievements(self.char1, "get", "pear", count=2)
         )
 
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    @patch("evennia.contrib.game_systems.achievements.achievements.delay")
+    def test_lazy_save(self, mock_delay):
+        """progress is saved after a delay"""
+        achievements.track_achievements(self.char1, "get", "thing")
+        achievements.track_achievements(self.char1, "get", "thing")
+        # only one save is scheduled for the burst of progress
+        mock_delay.assert_called_once_with(
+            achievements._SAVE_DELAY,
+            achievements._save_pending,
+            (self.char1.__dbclass__, self.char1.pk),
+        )
+        self.assertFalse(self.char1.attributes.has("achievements"))
+        # the scheduled save writes everything
+        achievements.track_achievements(self.char1, "get", "thing")
+        achievements.save_achievement_progress(self.char1)
+        self.assertTrue(self.char1.db.achievements["COUNTING_ACHIEVE"]["completed"])
+        # nothing more to save
+        with patch.object(self.char1.attributes, "add") as mock_add:
+            achievements.save_achievement_progress(self.char1)
+            mock_add.assert_not_called()
+
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    @patch("evennia.contrib.game_systems.achievements.achievements.delay")
+    def test_save_all(self, mock_delay):
+        """all pending progress is saved at once, such as on server reload"""
+        achievements.track_achievements(self.char1, "get", "thing")
+        achievements.track_achievements(self.char2, "get", "thing")
+        achievements.save_all_achievement_progress()
+        self.assertEqual(self.char1.db.achievements["COUNTING_ACHIEVE"]["progress"], 1)
+        self.assertEqual(self.char2.db.achievements["COUNTING_ACHIEVE"]["progress"], 1)
+        self.assertFalse(achievements._PENDING_SAVES)
+        mock_delay.return_value.remove.assert_called()
+
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    @patch("evennia.contrib.game_systems.achievements.achievements.delay")
+    def test_save_deleted(self, mock_delay):
+        """pending progress of a deleted achiever is discarded"""
+        obj = self.obj1
+        achievements.track_achievements(obj, "get", "thing")
+        obj.delete()
+        with patch.object(obj.attributes, "add") as mock_add:
+            achievements.save_all_achievement_progress()
+            mock_add.assert_not_called()
+        self.assertFalse(achievements._PENDING_SAVES)
+
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    @patch("evennia.contrib.game_systems.achievements.achievements.delay")
+    def test_save_reloaded(self, mock_delay):
+        """pending progress survives the achiever being flushed from the idmapper cache"""
+        achievements.track_achievements(self.char1, "get", "thing")
+        self.char1.flush_from_cache(force=True)
+        char1 = self.char1.__dbclass__.objects.get(id=self.char1.id)
+        self.assertIsNot(char1, self.char1)
+        achievements.track_achievements(char1, "get", "thing")
+        achievements.save_all_achievement_progress()
+        self.assertEqual(char1.db.achievements["COUNTING_ACHIEVE"]["progress"], 2)
+
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    @patch("evennia.contrib.game_systems.achievements.achievements.delay")
+    def test_attribute_changed(self, mock_delay):
+        """changing the achievement Attribute directly replaces the cached progress"""
+        achievements.track_achievements(self.char1, "get", "thing")
+        achievements.save_achievement_progress(self.char1)
+        self.char1.db.achievements = {"COUNTING_ACHIEVE": {"progress": 2}}
+        self.assertEqual(
+            achievements.get_achievement_progress(self.char1, "COUNTING_ACHIEVE"), {"progress": 2}
+        )
+        # also if there is unsaved progress
+        achievements.track_achievements(self.char1, "get", "thing")
+        self.char1.attributes.remove("achievements")
+        self.assertEqual(achievements.get_achievement_progress(self.char1, "COUNTING_ACHIEVE"), {})
+        self.assertFalse(achievements._PENDING_SAVES)
+
+    @patch(
+        "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
+        _dummy_achievements,
+    )
+    def test_index(self):
+        """the index finds the same candidates as filtering all achievements"""
+        index = achievements._get_index()
+        self.assertEqual(index.get_candidates("login"), ["ACHIEVE_ONE"])
+        self.assertEqual(index.get_candidates("login", "first"), ["ACHIEVE_ONE"])
+        self.assertEqual(index.get_candidates("get", "thing"), ["COUNTING_ACHIEVE", "COUNTING_TWO"])
+        self.assertEqual(index.get_candidates("get", "pear"), ["SEPARATE_ITEMS"])
+        self.assertEqual(index.get_candidates(None, "apple"), ["ACHIEVE_ONE", "SEPARATE_ITEMS"])
+        self.assertEqual(index.get_candidates("get", "rat"), [])
+        self.assertEqual(index.dependents, {"COUNTING_ACHIEVE": ("COUNTING_TWO",)})
+
+    @patch("evennia.contrib.game_systems.achievements.achievements.logger")
+    def test_index_circular_prereqs(self, mock_logger):
+        achievements._AchievementIndex(
+            {
+                "A": {"category": "get", "prereqs": "B"},
+                "B": {"category": "get", "prereqs": "A"},
+                "C": {"category": "get", "prereqs": "MISSING"},
+                "D": {"category": "get"},
+            }
+        )
+        mock_logger.log_warn.assert_called_once_with(
+            "Achievements with circular or unknown prereqs: ['A', 'B', 'C']"
+        )
+
     @patch(
         "evennia.contrib.game_systems.achievements.achievements._ACHIEVEMENT_DATA",
         _dummy_achievements,
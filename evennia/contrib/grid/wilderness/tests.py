@@ -167,3 +167,84 @@ class TestWilderness(BaseEvenniaTest):
         self.assertEqual(2, len(w.db.rooms))
         # and verify that obj1 is still at 1,1
         self.assertEqual(self.obj1.location, w.db.rooms[(1, 1)])
+
+    def test_get_objs_at_coordinates(self):
+        wilderness.create_wilderness()
+        w = self.get_wilderness_script()
+        wilderness.enter_wilderness(self.char1, (1, 1))
+        wilderness.enter_wilderness(self.obj1, (1, 1))
+        wilderness.enter_wilderness(self.char2, (3, 1))
+
+        self.assertEqual(w.get_objs_at_coordinates((1, 1)), [self.char1, self.obj1])
+        self.assertEqual(w.get_objs_at_coordinates((3, 1)), [self.char2])
+        self.assertEqual(w.get_objs_at_coordinates((2, 2)), [])
+
+        w.move_obj(self.char2, (2, 2))
+        self.assertEqual(w.get_objs_at_coordinates((3, 1)), [])
+        self.assertEqual(w.get_objs_at_coordinates((2, 2)), [self.char2])
+        self.assertEqual(
+            w.get_objs_in_radius((1, 1), 1), {(1, 1): [self.char1, self.obj1], (2, 2): [self.char2]}
+        )
+        self.assertEqual(w.get_objs_in_radius((0, 0), 1), {(1, 1): [self.char1, self.obj1]})
+
+        # leaving the wilderness removes the object from the index
+        self.char2.move_to(self.room1)
+        self.assertEqual(w.get_objs_at_coordinates((2, 2)), [])
+
+        # a rebuilt index matches the stored coordinates
+        w.ndb.coordinate_index = None
+        self.assertEqual(w.get_objs_at_coordinates((1, 1)), [self.char1, self.obj1])
+        self.assertEqual(len(w.coordinate_index), 2)
+
+    def test_itemcoordinates_stored(self):
+        wilderness.create_wilderness()
+        w = self.get_wilderness_script()
+        wilderness.enter_wilderness(self.char1, (1, 1))
+        wilderness.enter_wilderness(self.obj1, (2, 2))
+        w.move_obj(self.char1, (3, 1))
+
+        # each object's coordinates are saved in an Attribute of their own
+        category = wilderness._ITEM_COORDINATES_CATEGORY
+        self.assertEqual(w.attributes.get(str(self.char1.id), category=category), (3, 1))
+        self.assertEqual(w.attributes.get(str(self.obj1.id), category=category), (2, 2))
+        self.char1.move_to(self.room1)
+        self.assertFalse(w.attributes.has(str(self.char1.id), category=category))
+
+        # objects deleted while in the wilderness are forgotten when reloaded
+        self.obj1.delete()
+        w.at_server_start()
+        self.assertEqual(w.itemcoordinates, {})
+        self.assertEqual(w.attributes.get(category=category, return_list=True), [])
+
+    def test_itemcoordinates_converted(self):
+        wilderness.create_wilderness()
+        w = self.get_wilderness_script()
+        # coordinates stored the old way, all in one Attribute
+        w.db.itemcoordinates = {self.char1: (1, 1), self.obj1: (2, 2)}
+        w.at_server_start()
+        self.assertEqual(w.itemcoordinates, {self.char1: (1, 1), self.obj1: (2, 2)})
+        self.assertFalse(w.attributes.has("itemcoordinates"))
+        self.assertEqual(
+            w.attributes.get(str(self.obj1.id), category=wilderness._ITEM_COORDINATES_CATEGORY),
+            (2, 2),
+        )
+        self.assertEqual(self.char1.ndb.wilderness, w)
+
+
+class TestWildernessCoordinateIndex(BaseEvenniaTest):
+    def test_index(self):
+        index = wilderness.WildernessCoordinateIndex({"a": (0, 0), "b": (0, 0), None: (1, 1)})
+        index.add("c", (40, -3))
+        self.assertEqual(index.get((0, 0)), ["a", "b"])
+        self.assertEqual(len(index), 3)
+
+        index.add("a", (15, 16))
+        self.assertEqual(index.get((0, 0)), ["b"])
+        self.assertEqual(index.get_in_radius((10, 10), 6), {(15, 16): ["a"]})
+        self.assertEqual(index.get_in_radius((10, 10), 5), {})
+        self.assertEqual(index.get_in_radius((35, 0), 5), {(40, -3): ["c"]})
+
+        index.remove("b")
+        index.remove("b")
+        self.assertEqual(index.get((0, 0)), [])
+        self.assertNotIn((0, 0), index.cells)
@@ -121,6 +121,14 @@ create a new wilderness (with the name "default") but using our new map provider
     Rooms are created as needed. Unneeded rooms are stored away to avoid the
     overhead cost of creating new rooms again in the future.
 
+    The coordinates of every object in the wilderness are persisted as one
+    Attribute per object on the WildernessScript (in the
+    `wilderness_item_coordinates` category), so moving an object only saves its
+    own coordinates. From these, an in-memory spatial hash
+    (`WildernessCoordinateIndex`) is built the first time it's needed, so
+    finding the objects at (or around) a given location does not require
+    looking through every object in the wilderness.
+
 """
 
 from evennia import (
@@ -130,9 +138,16 @@ from evennia import (
     create_object,
     create_script,
 )
+from evennia.objects.models import ObjectDB
 from evennia.typeclasses.attributes import AttributeProperty
 from evennia.utils import inherits_from
 
+# Attribute category of the coordinates stored on the WildernessScript, one
+# Attribute per object, keyed by the object's id
+_ITEM_COORDINATES_CATEGORY = "wilderness_item_coordinates"
+# how many objects to load per query when loading the coordinates
+_LOAD_BATCH_SIZE = 500
+
 
 def create_wilderness(name="default", mapprovider=None, preserve_items=False):
     """
@@ -212,6 +227,131 @@ def get_new_coordinates(coordinates, direction):
     return (x, y)
 
 
+class WildernessCoordinateIndex:
+    """
+    An in-memory spatial hash of the objects in a wilderness.
+
+    Objects are stored per `(x, y)` coordinate, and the occupied coordinates
+    are in turn bucketed into square cells of `cell_size` x `cell_size`
+    coordinates. Looking up the objects at one coordinate is a dict lookup and
+    a radius search only needs to check the cells overlapping the search area.
+
+    This is not persisted, it's rebuilt from the wilderness' `itemcoordinates`
+    when first needed.
+
+    """
+
+    cell_size = 16
+
+    def __init__(self, itemcoordinates=None):
+        """
+        Args:
+            itemcoordinates (dict, optional): A mapping `{obj: (x, y)}` to
+                build the index from.
+
+        """
+        # obj -> (x, y)
+        self.obj_coordinates = {}
+        # (x, y) -> {obj: None}, using a dict as an insertion-ordered set
+        self.objs_at = {}
+        # (cell_x, cell_y) -> set of occupied (x, y) in that cell
+        self.cells = {}
+
+        for obj, coordinates in (itemcoordinates or {}).items():
+            if obj is not None:
+                self.add(obj, coordinates)
+
+    def __len__(self):
+        return len(self.obj_coordinates)
+
+    def _cell(self, coordinates):
+        return (coordinates[0] // self.cell_size, coordinates[1] // self.cell_size)
+
+    def add(self, obj, coordinates):
+        """
+        Add an object to the index, or move it if it's already in it.
+
+        Args:
+            obj (Object): The object to add.
+            coordinates (tuple): The `(x, y)` coordinates of the object.
+
+        """
+        coordinates = tuple(coordinates)
+        old_coordinates = self.obj_coordinates.get(obj)
+        if old_coordinates == coordinates:
+            return
+        if old_coordinates is not None:
+            self.remove(obj)
+        self.obj_coordinates[obj] = coordinates
+        if coordinates not in self.objs_at:
+            self.objs_at[coordinates] = {}
+            self.cells.setdefault(self._cell(coordinates), set()).add(coordinates)
+        self.objs_at[coordinates][obj] = None
+
+    def remove(self, obj):
+        """
+        Remove an object from the index.
+
+        Args:
+            obj (Object): The object to remove. Does nothing if it's not
+                in the index.
+
+        """
+        coordinates = self.obj_coordinates.pop(obj, None)
+        if coordinates is None:
+            return
+        objs = self.objs_at[coordinates]
+        objs.pop(obj, None)
+        if not objs:
+            # no more objects at these coordinates
+            del self.objs_at[coordinates]
+            cell = self._cell(coordinates)
+            self.cells[cell].discard(coordinates)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def get(self, coordinates):
+        """
+        Get the objects at certain coordinates.
+
+        Args:
+            coordinates (tuple): The `(x, y)` coordinates.
+
+        Returns:
+            list: The objects at these coordinates.
+
+        """
+        return list(self.objs_at.get(tuple(coordinates), ()))
+
+    def get_in_radius(self, coordinates, radius):
+        """
+        Get the objects within a certain number of steps from the given
+        coordinates. Since you can move diagonally in the wilderness, this
+        is a square area of `2 * radius + 1` coordinates to a side.
+
+        Args:
+            coordinates (tuple): The `(x, y)` coordinates at the center.
+            radius (int): The max number of steps away from the center.
+
+        Returns:
+            dict: A mapping `{(x, y): [obj, ...]}` for all occupied coordinates
+                within the radius.
+
+        """
+        x, y = coordinates
+        xmin, xmax, ymin, ymax = x - radius, x + radius, y - radius, y + radius
+        cxmin, cymin = self._cell((xmin, ymin))
+        cxmax, cymax = self._cell((xmax, ymax))
+
+        result = {}
+        for cell_x in range(cxmin, cxmax + 1):
+            for cell_y in range(cymin, cymax + 1):
+                for coord in self.cells.get((cell_x, cell_y), ()):
+                    if xmin <= coord[0] <= xmax and ymin <= coord[1] <= ymax:
+                        result[coord] = list(self.objs_at[coord])
+        return result
+
+
 class WildernessScript(DefaultScript):
     """
     This is the main "handler" for the wilderness system: inside here the
@@ -223,10 +363,6 @@ class WildernessScript(DefaultScript):
     # Stores the MapProvider class
     mapprovider = AttributeProperty()
 
-    # Stores a dictionary of items on the map with their coordinates
-    # The key is the item, the value are the coordinates as (x, y) tuple.
-    itemcoordinates = AttributeProperty()
-
     # Determines whether or not rooms are recycled despite containing non-player objects
     # True means that leaving behind a non-player object will prevent the room from being recycled
     # in order to preserve the object
@@ -239,10 +375,6 @@ class WildernessScript(DefaultScript):
         """
         self.persistent = True
 
-        # Store the coordinates of every item that is inside the wilderness
-        # Key: object, Value: (x, y)
-        self.db.itemcoordinates = {}
-
         # Store the rooms that are used as views into the wilderness
         # Key: (x, y), Value: room object
         self.db.rooms = {}
@@ -259,13 +391,110 @@ class WildernessScript(DefaultScript):
         for coordinates, room in self.db.rooms.items():
             room.ndb.wildernessscript = self
             room.ndb.active_coordinates = coordinates
-        for item in self.db.itemcoordinates.keys():
-            # Items deleted while in the wilderness can leave None-type 'ghosts'
-            # These need to be cleaned up
-            if item is None:
-                del self.db.itemcoordinates[item]
-                continue
+        self.ndb.itemcoordinates = None
+        for item in self.itemcoordinates:
             item.ndb.wilderness = self
+        # the spatial index is rebuilt on demand
+        self.ndb.coordinate_index = None
+
+    @property
+    def itemcoordinates(self):
+        """
+        The coordinates of every object in the wilderness, loaded from their
+        Attributes on first access. Change it with `set_obj_coordinates` and
+        `remove_obj_coordinates`, which also save the change.
+
+        Returns:
+            dict: A mapping `{obj: (x, y)}`.
+
+        """
+        if self.ndb.itemcoordinates is None:
+            self.ndb.itemcoordinates = self._load_itemcoordinates()
+        return self.ndb.itemcoordinates
+
+    def _load_itemcoordinates(self):
+        """
+        Load the coordinates of every object in the wilderness from their
+        Attributes, removing those of objects deleted while in the wilderness.
+
+        Returns:
+            dict: A mapping `{obj: (x, y)}`.
+
+        """
+        legacy = self.attributes.get("itemcoordinates")
+        if legacy is not None:
+            # from before the coordinates were stored per object
+            self.attributes.batch_add(
+                *(
+                    (str(item.id), tuple(coordinates), _ITEM_COORDINATES_CATEGORY)
+                    for item, coordinates in legacy.items()
+                    if item
+                )
+            )
+            self.attributes.remove("itemcoordinates")
+
+        coordinates = {
+            int(attr.key): attr.value
+            for attr in self.attributes.get(
+                category=_ITEM_COORDINATES_CATEGORY, return_obj=True, return_list=True
+            )
+            if attr
+        }
+        objids = list(coordinates)
+        itemcoordinates = {}
+        for start in range(0, len(objids), _LOAD_BATCH_SIZE):
+            for item in ObjectDB.objects.filter(id__in=objids[start : start + _LOAD_BATCH_SIZE]):
+                itemcoordinates[item] = coordinates.pop(item.id)
+        for objid in coordinates:
+            # deleted while in the wilderness
+            self.attributes.remove(str(objid), category=_ITEM_COORDINATES_CATEGORY)
+        return itemcoordinates
+
+    @property
+    def coordinate_index(self):
+        """
+        The in-memory spatial index of all objects in this wilderness, built
+        from `itemcoordinates` on first access.
+
+        Returns:
+            WildernessCoordinateIndex: The index.
+
+        """
+        if self.ndb.coordinate_index is None:
+            self.ndb.coordinate_index = WildernessCoordinateIndex(self.itemcoordinates)
+        return self.ndb.coordinate_index
+
+    def set_obj_coordinates(self, obj, coordinates):
+        """
+        Store the coordinates of an object in the wilderness, without moving it.
+
+        Args:
+            obj (Object): An object inside the wilderness.
+            coordinates (tuple): The `(x, y)` coordinates of `obj`.
+
+        """
+        self.itemcoordinates[obj] = coordinates
+        # only this object's coordinates are saved
+        self.attributes.add(str(obj.id), coordinates, category=_ITEM_COORDINATES_CATEGORY)
+        self.coordinate_index.add(obj, coordinates)
+
+    def remove_obj_coordinates(self, obj):
+        """
+        Forget the coordinates of an object that left the wilderness.
+
+        Args:
+            obj (Object): The object to remove.
+
+        Returns:
+            tuple or None: The last coordinates of `obj`, if it was in
+                the wilderness.
+
+        """
+        coordinates = self.itemcoordinates.pop(obj, None)
+        if coordinates is not None:
+            self.attributes.remove(str(obj.id), category=_ITEM_COORDINATES_CATEGORY)
+        self.coordinate_index.remove(obj)
+        return coordinates
 
     def is_valid_coordinates(self, coordinates):
         """
@@ -298,22 +527,28 @@ class WildernessScript(DefaultScript):
         """
         Returns a list of every object at certain coordinates.
 
-        Imeplementation detail: this uses a naive iteration through every
-        object inside the wilderness which could cause slow downs when there
-        are a lot of objects in the map.
-
         Args:
             coordinates (tuple): a coordinate tuple like (x, y)
 
         Returns:
             [Object, ]: list of Objects at coordinates
         """
-        result = [
-            item
-            for item, item_coords in self.itemcoordinates.items()
-            if item_coords == coordinates and item is not None
-        ]
-        return list(result)
+        return self.coordinate_index.get(coordinates)
+
+    def get_objs_in_radius(self, coordinates, radius):
+        """
+        Returns every object within a number of steps from certain coordinates.
+
+        Args:
+            coordinates (tuple): a coordinate tuple like (x, y)
+            radius (int): how many steps away from `coordinates` to look. Since
+                you can move diagonally, this covers a square area.
+
+        Returns:
+            dict: a mapping `{(x, y): [Object, ...]}` of every occupied
+                coordinate within the radius.
+        """
+        return self.coordinate_index.get_in_radius(coordinates, radius)
 
     def move_obj(self, obj, new_coordinates):
         """
@@ -324,7 +559,7 @@ class WildernessScript(DefaultScript):
             new_coordinates (tuple): tuple of (x, y) where to move obj to.
         """
         # Update the position of this obj in the wilderness
-        self.itemcoordinates[obj] = new_coordinates
+        self.set_obj_coordinates(obj, new_coordinates)
         old_room = obj.location
 
         # Remove the obj's location. This is needed so that the object does not
@@ -458,7 +693,7 @@ class WildernessScript(DefaultScript):
             obj (object): the object that left
         """
         # Try removing the object from the coordinates system
-        if loc := self.db.itemcoordinates.pop(obj, None):
+        if loc := self.remove_obj_coordinates(obj):
             # The object was removed successfully
             # Make sure there was a room at that location
             if room := self.db.rooms.get(loc):
@@ -530,7 +765,7 @@ class WildernessRoom(DefaultRoom):
             self.wilderness.move_obj(moved_obj, coordinates)
         else:
             # This object wasn't in the wilderness yet. Let's add it.
-            itemcoords[moved_obj] = self.coordinates
+            self.wilderness.set_obj_coordinates(moved_obj, self.coordinates)
 
     def at_object_leave(self, moved_obj, target_location, move_type="move", **kwargs):
         """
@@ -697,7 +932,7 @@ class WildernessExit(DefaultExit):
             bool: True if the traverse is allowed to happen
 
         """
-        itemcoordinates = self.location.wilderness.db.itemcoordinates
+        itemcoordinates = self.location.wilderness.itemcoordinates
 
         current_coordinates = itemcoordinates[traversing_object]
         new_coordinates = get_new_coordinates(current_coordinates, self.key)
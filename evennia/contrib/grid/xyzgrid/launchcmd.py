@@ -98,8 +98,14 @@ _HELP_SPAWN = """
 spawn
 
     spawns/updates the entire database grid based on the added maps. For a new grid, this will
-    spawn all new rooms/exits (and may take a good while!). For updating, rooms may be
-    removed/spawned if a map changed since the last spawn.
+    spawn all new rooms/exits (and may take a good while!). For updating, only the rooms/exits
+    of a map that changed since the last spawn are spawned, updated or removed.
+
+spawn full
+
+    like spawn, but checks and updates every room and exit of the grid against the maps, not
+    just what changed since the last spawn. Use this if rooms/exits were modified or deleted
+    in-game.
 
 spawn "(X,Y,Z|mapname)"
 
@@ -111,6 +117,7 @@ spawn "(X,Y,Z|mapname)"
 Examples:
 
     evennia xyzgrid spawn                  - spawn all
+    evennia xyzgrid spawn full             - spawn all, checking every room/exit
     evennia xyzgrid "(*, *, mymap1)"       - spawn everything of map/zcoord mymap1
     evennia xyzgrid "(12, 5, mymap1)"      - spawn only coordinate (12, 5) on map/zcoord mymap1
 """
@@ -120,8 +127,9 @@ initpath
 
     Recreates the pathfinder matrices for the entire grid. These are used for all shortest-path
     calculations. The result will be cached to disk (in mygame/server/.cache/). If not run, each
-    map will run this automatically first time it's used. Running this will always force to
-    respawn the cache.
+    map of up to 4000 nodes will run this automatically first time it's used, while bigger maps
+    solve paths from each room when first needed. Running this will always force to respawn
+    the cache.
 
 initpath Z|mapname
 
@@ -304,6 +312,10 @@ def _option_spawn(*suboptions):
 
     grid.log = _log
 
+    full = bool(suboptions) and suboptions[0] == "full"
+    if full:
+        suboptions = suboptions[1:]
+
     if suboptions:
         opts = "".join(suboptions).strip("()")
         # coordinate tuple
@@ -334,7 +346,7 @@ def _option_spawn(*suboptions):
         return
 
     print("Starting spawn ...")
-    grid.spawn(xyz=(x, y, z))
+    grid.spawn(xyz=(x, y, z), full=full)
     print(
         "... spawn complete!\nIt's recommended to reload the server to refresh caches if this "
         "modified an existing grid."
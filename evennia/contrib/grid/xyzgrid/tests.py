@@ -10,6 +10,7 @@ from unittest import mock
 from django.test import TestCase
 from parameterized import parameterized
 
+from evennia.typeclasses.tags import TAG_INDEX
 from evennia.utils.test_resources import BaseEvenniaCommandTest, BaseEvenniaTest
 
 from . import commands, xymap, xymap_legend, xyzgrid, xyzroom
@@ -509,6 +510,27 @@ class TestMap1(_MapTest):
         mapstr = self.map.get_visual_range(coord, dist=dist, mode="nodes", character="@")
         self.assertEqual(expected, mapstr.replace("||", "|"))
 
+    def test_get_visual_range__memoized(self):
+        """
+        The map around a node is only calculated once, the character is added per call.
+
+        """
+        display_map = [line[:] for line in self.map.display_map]
+        with mock.patch.object(
+            self.map, "_get_topology_around_coord", wraps=self.map._get_topology_around_coord
+        ) as mock_topology:
+            mapstr = self.map.get_visual_range((0, 0), dist=1, mode="nodes", character="@")
+            self.assertEqual(
+                self.map.get_visual_range((0, 0), dist=1, mode="nodes", character="X"),
+                mapstr.replace("@", "X"),
+            )
+            self.assertEqual(
+                self.map.get_visual_range((0, 0), dist=1, mode="nodes", character="@"), mapstr
+            )
+            mock_topology.assert_called_once()
+        self.map.get_visual_range((0, 0), dist=None, character="@")
+        self.assertEqual(self.map.display_map, display_map)
+
     def test_spawn(self):
         """
         Spawn the map into actual objects.
@@ -1331,6 +1353,50 @@ class TestMapStressTest(TestCase):
         #     print(f"Visual Range calculation for ({Xmax}x{Ymax}) grid "
         #           f"slower than expected {max_time}s.")
 
+    def test_pathfinding_on_demand(self):
+        """
+        Routes solved on demand for big maps are the same as the baked ones.
+
+        """
+        grid = self._get_grid(8, 8)
+        baked = xymap.XYMap({"map": grid}, Z="testmap_baked")
+        baked.parse()
+        baked.calculate_path_matrix(force=True)
+        self.assertIsNotNone(baked.pathfinding_routes)
+
+        ondemand = xymap.XYMap({"map": grid}, Z="testmap_ondemand")
+        ondemand.max_baked_nodes = 10
+        ondemand.max_cached_routes = 2
+        ondemand.parse()
+        ondemand.calculate_path_matrix()
+        self.assertIsNone(ondemand.pathfinding_routes)
+
+        for startcoord, endcoord in (((0, 0), (8, 8)), ((3, 5), (0, 8)), ((8, 0), (2, 2))):
+            self.assertEqual(
+                baked.get_shortest_path(startcoord, endcoord)[0],
+                ondemand.get_shortest_path(startcoord, endcoord)[0],
+            )
+        self.assertEqual(len(ondemand._solved_routes), 2)
+
+    def test_baked_routes_reused(self):
+        mapobj = xymap.XYMap({"map": self._get_grid(4, 4)}, Z="testmap_reused")
+        mapobj.parse()
+        mapobj.calculate_path_matrix(force=True)
+        directions, _ = mapobj.get_shortest_path((0, 0), (4, 4))
+
+        mapobj = xymap.XYMap({"map": self._get_grid(4, 4)}, Z="testmap_reused")
+        mapobj.parse()
+        with mock.patch.object(mapobj, "_bake_routes") as mock_bake:
+            mapobj.calculate_path_matrix()
+            mock_bake.assert_not_called()
+        self.assertEqual(mapobj.get_shortest_path((0, 0), (4, 4))[0], directions)
+
+        # a changed map is solved anew
+        mapobj = xymap.XYMap({"map": self._get_grid(5, 4)}, Z="testmap_reused")
+        mapobj.parse()
+        mapobj.calculate_path_matrix()
+        self.assertEqual(len(mapobj.pathfinding_routes), len(mapobj.node_index_map))
+
 
 class TestXYZGrid(BaseEvenniaTest):
     """
@@ -1366,6 +1432,122 @@ class TestXYZGrid(BaseEvenniaTest):
         self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 4)
         self.assertEqual(xyzroom.XYZExit.objects.all().count(), 8)
 
+    def test_spawn_locks(self):
+        """Spawned rooms and exits get the same default locks as when created directly"""
+        self.grid.spawn()
+        room = xyzroom.XYZRoom.objects.get_xyz(xyz=(0, 1, self.zcoord))
+        exi = room.exits[0]
+        created_room, _ = xyzroom.XYZRoom.create("room", xyz=(10, 10, self.zcoord))
+        created_exit, _ = xyzroom.XYZExit.create(
+            "exit", xyz=(10, 10, self.zcoord), xyz_destination=(0, 1, self.zcoord)
+        )
+        self.assertEqual(str(room.locks), str(created_room.locks))
+        self.assertEqual(str(exi.locks), str(created_exit.locks))
+        self.assertIn("control:perm(Admin)", str(room.locks))
+
+    def test_coordinate_index(self):
+        """Rooms and exits are found by coordinate through the Tag index"""
+        self.grid.spawn()
+        # not indexed unless added to settings.TAG_INDEX_CATEGORIES
+        with self.assertNumQueries(1):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=(0, 1, self.zcoord))
+
+        categories = TAG_INDEX.categories | set(xyzroom.MAP_TAG_CATEGORIES)
+        with mock.patch.object(TAG_INDEX, "categories", categories):
+            self._test_coordinate_index()
+
+    def _test_coordinate_index(self):
+        room = xyzroom.XYZRoom.objects.get_xyz(xyz=(0, 1, self.zcoord))
+        exi = xyzroom.XYZExit.objects.get_xyz_exit(
+            xyz=(0, 1, self.zcoord), xyz_destination=(1, 1, self.zcoord)
+        )
+        self.assertEqual(exi.location, room)
+        with self.assertNumQueries(0):
+            self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(0, 1, self.zcoord)), room)
+            self.assertEqual(
+                xyzroom.XYZExit.objects.get_xyz_exit(
+                    xyz=(0, 1, self.zcoord), xyz_destination=(1, 1, self.zcoord)
+                ),
+                exi,
+            )
+        self.assertEqual(len(xyzroom.XYZRoom.objects.filter_xyz(xyz=("*", 1, self.zcoord))), 2)
+        self.assertEqual(
+            list(xyzroom.XYZExit.objects.filter_xyz_exit(xyz=(0, 1, self.zcoord))),
+            list(room.exits),
+        )
+
+        # the index follows changes to the coordinate tags
+        room.tags.remove("0", category=xyzroom.MAP_X_TAG_CATEGORY)
+        room.tags.add("5", category=xyzroom.MAP_X_TAG_CATEGORY)
+        self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(5, 1, self.zcoord)), room)
+        with self.assertRaises(xyzroom.XYZRoom.DoesNotExist):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=(0, 1, self.zcoord))
+
+        # tags changed behind the TagHandler's back are detected
+        room.db_tags.clear()
+        room.tags.reset_cache()
+        with self.assertRaises(xyzroom.XYZRoom.DoesNotExist):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=(5, 1, self.zcoord))
+
+    def test_spawn_changes(self):
+        """Respawning only spawns what changed on the map since the last spawn"""
+        self.grid.spawn()
+        room = xyzroom.XYZRoom.objects.get_xyz(xyz=(1, 1, self.zcoord))
+
+        with (
+            mock.patch.object(xymap_legend.MapNode, "spawn") as mock_spawn,
+            mock.patch.object(xymap_legend.MapNode, "spawn_links") as mock_spawn_links,
+            mock.patch.object(
+                xyzroom.XYZRoom.objects, "get_xyz", wraps=xyzroom.XYZRoom.objects.get_xyz
+            ) as mock_get_xyz,
+        ):
+            self.grid.spawn()
+            mock_spawn.assert_not_called()
+            mock_spawn_links.assert_not_called()
+            # the rooms of unchanged nodes are not looked up
+            mock_get_xyz.assert_not_called()
+
+        # remove the north-eastern room and add a room to the east of it
+        self.grid.add_maps(
+            {
+                "map": MAP1.replace("1 #-#", "1 #  ")
+                .replace("| |", "|  ")
+                .replace("#-#\n", "#-#-#\n"),
+                "zcoord": self.zcoord,
+            }
+        )
+        self.grid.reload()
+        self.grid.spawn()
+        self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 4)
+        self.assertEqual(xyzroom.XYZExit.objects.all().count(), 6)
+        self.assertFalse(room.pk)
+        room = xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 0, self.zcoord))
+        self.assertEqual([exi.key for exi in room.exits], ["west"])
+        self.assertEqual(
+            room.exits[0].destination, xyzroom.XYZRoom.objects.get_xyz(xyz=(1, 0, self.zcoord))
+        )
+
+        # rooms deleted in-game are spawned again by a full spawn, with the exits leading to them
+        room.delete()
+        self.grid.spawn()
+        self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 3)
+        self.grid.spawn(full=True)
+        room = xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 0, self.zcoord))
+        self.assertEqual(xyzroom.XYZExit.objects.all().count(), 6)
+        self.assertEqual(
+            xyzroom.XYZExit.objects.get_xyz_exit(
+                xyz=(1, 0, self.zcoord), xyz_destination=(2, 0, self.zcoord)
+            ).destination,
+            room,
+        )
+
+        # a full spawn checks all exits
+        room.exits[0].delete()
+        self.grid.spawn()
+        self.assertEqual(xyzroom.XYZExit.objects.all().count(), 5)
+        self.grid.spawn(full=True)
+        self.assertEqual(xyzroom.XYZExit.objects.all().count(), 6)
+
 
 # map transitions
 class Map12aTransition(xymap_legend.TransitionMapNode):
@@ -94,13 +94,15 @@ See `./example.py` for a full grid example.
 """
 
 import pickle
-from collections import defaultdict
-from os import mkdir
+from collections import OrderedDict, defaultdict
+from os import mkdir, replace
 from os.path import isdir, isfile
 from os.path import join as pathjoin
 
 try:
-    from numpy import zeros
+    from numpy import int16, int32
+    from numpy import load as load_array
+    from numpy.lib.format import open_memmap
     from scipy.sparse import csr_matrix
     from scipy.sparse.csgraph import dijkstra
 except ImportError as err:
@@ -109,9 +111,11 @@ except ImportError as err:
         "the SciPy package. Install with `pip install scipy'."
     )
 from django.conf import settings
+from django.core import exceptions as django_exceptions
 
 from evennia.prototypes import prototypes as protlib
 from evennia.prototypes.spawner import flatten_prototype
+from evennia.prototypes.spawner import spawn as spawn_prototypes
 from evennia.utils import logger
 from evennia.utils.utils import is_iter, mod_import, variable_from_module
 
@@ -125,6 +129,7 @@ if hasattr(settings, "XYZGRID_USE_DB_PROTOTYPES"):
 _CACHE_DIR = settings.CACHE_DIR
 _LOADED_PROTOTYPES = None
 _XYZROOMCLASS = None
+_XYZEXITCLASS = None
 
 MAP_DATA_KEYS = ["zcoord", "map", "legend", "prototypes", "options", "module_path"]
 
@@ -177,6 +182,14 @@ class XYMap:
 
     mapcorner_symbol = "+"
     max_pathfinding_length = 500
+    # maps with up to this many nodes have the routes between all nodes solved and baked to
+    # disk when loading. Bigger maps solve the routes from each start node when first needed,
+    # unless baked explicitly (with `calculate_path_matrix(force=True)`).
+    max_baked_nodes = 4000
+    # how many start nodes to keep solved routes for, when not using baked routes
+    max_cached_routes = 256
+    # how many rendered visual ranges (one per center node, distance and mode) to keep
+    max_cached_visual_ranges = 1024
     empty_symbol = " "
     # we normally only accept one single character for the legend key
     legend_key_exceptions = "\\"
@@ -237,6 +250,8 @@ class XYMap:
         self.xygrid = None
         self.XYgrid = None
         self.display_map = None
+        self._visual_ranges = OrderedDict()
+        self._spawn_state = None
         self.max_x = 0
         self.max_y = 0
         self.max_X = 0
@@ -244,14 +259,17 @@ class XYMap:
 
         # Dijkstra algorithm variables
         self.node_index_map = None
-        self.dist_matrix = None
+        self.pathfinding_graph = None
         self.pathfinding_routes = None
+        self._solved_routes = OrderedDict()
 
         self.pathfinder_baked_filename = None
+        self.pathfinder_baked_routes_filename = None
         if Z:
             if not isdir(_CACHE_DIR):
                 mkdir(_CACHE_DIR)
             self.pathfinder_baked_filename = pathjoin(_CACHE_DIR, f"{Z}.P")
+            self.pathfinder_baked_routes_filename = pathjoin(_CACHE_DIR, f"{Z}.npy")
 
         # load data and parse it
         self.reload()
@@ -541,6 +559,8 @@ class XYMap:
 
         # store
         self.display_map = display_map
+        self._visual_ranges = OrderedDict()
+        self._spawn_state = None
 
     def _get_topology_around_coord(self, xy, dist=2):
         """
@@ -599,58 +619,150 @@ class XYMap:
 
     def calculate_path_matrix(self, force=False):
         """
-        Solve the pathfinding problem using Dijkstra's algorithm. This will try to
-        load the solution from disk if possible.
+        Prepare the pathfinding, which uses Dijkstra's algorithm on a sparse graph of the
+        node links. For maps of up to `.max_baked_nodes` nodes, the routes between all nodes
+        are solved and baked to disk, or loaded from disk if baked before for the same map.
+        The baked routes are memory-mapped, so only the parts actually used are read. For
+        bigger maps, the routes from a node are solved the first time a path starts there.
 
         Args:
-            force (bool, optional): If the cache should always be rebuilt.
+            force (bool, optional): Solve and bake the routes between all nodes, also if
+                already baked and regardless of the size of the map.
 
         """
-        if not force and self.pathfinder_baked_filename and isfile(self.pathfinder_baked_filename):
-            # check if the solution for this grid was already solved previously.
+        nnodes = len(self.node_index_map)
+        rows, cols, weights = [], [], []
+        for inode, node in self.node_index_map.items():
+            for inextnode, weight in node.weights.items():
+                rows.append(inode)
+                cols.append(inextnode)
+                weights.append(weight)
+        # a sparse matrix representing link relationships from each node
+        self.pathfinding_graph = csr_matrix((weights, (rows, cols)), shape=(nnodes, nnodes))
+        # as in a dense matrix, 0-weights mean there is no link
+        self.pathfinding_graph.eliminate_zeros()
+        self.pathfinding_graph.sort_indices()
+        self.pathfinding_routes = None
+        self._solved_routes = OrderedDict()
+
+        if not (self.pathfinder_baked_filename and nnodes):
+            return
+        if not force:
+            # check if the solution for this grid was already baked previously
+            self.pathfinding_routes = self._load_baked_routes()
+            if self.pathfinding_routes is not None or nnodes > self.max_baked_nodes:
+                return
+        self._bake_routes()
+        self.pathfinding_routes = self._load_baked_routes()
+
+    def _load_baked_routes(self):
+        """
+        Load baked routes from disk, if baked for the current map.
 
-            mapstr, dist_matrix, pathfinding_routes = "", None, None
-            with open(self.pathfinder_baked_filename, "rb") as fil:
-                try:
-                    mapstr, dist_matrix, pathfinding_routes = pickle.load(fil)
-                except Exception:
-                    logger.log_trace()
-            if (
-                mapstr == self.mapstring
-                and dist_matrix is not None
-                and pathfinding_routes is not None
-            ):
-                # this is important - it means the map hasn't changed so
-                # we can re-use the stored data!
-                self.dist_matrix = dist_matrix
-                self.pathfinding_routes = pathfinding_routes
-
-        # build a matrix representing the map graph, with 0s as impassable areas
+        Returns:
+            ndarray or None: The memory-mapped `(nnodes, nnodes)` array of the
+                predecessor of each end node (column) on the path from each start node (row).
+
+        """
+        if not (
+            isfile(self.pathfinder_baked_filename) and isfile(self.pathfinder_baked_routes_filename)
+        ):
+            return None
+        with open(self.pathfinder_baked_filename, "rb") as fil:
+            try:
+                mapstr, nnodes = pickle.load(fil)
+            except Exception:
+                # also an old-style cache (which stored all distances as well)
+                return None
+        if mapstr != self.mapstring or nnodes != len(self.node_index_map):
+            return None
+        try:
+            return load_array(self.pathfinder_baked_routes_filename, mmap_mode="r")
+        except Exception:
+            logger.log_trace()
+            return None
+
+    def _bake_routes(self, batch_size=100):
+        """
+        Solve the routes between all nodes and save them to disk. They are solved in batches
+        of start nodes and written straight to a memory-mapped file, to limit the memory
+        used for big maps.
+
+        Args:
+            batch_size (int, optional): How many start nodes to solve at a time.
 
+        """
         nnodes = len(self.node_index_map)
-        pathfinding_graph = zeros((nnodes, nnodes))
-        for inode, node in self.node_index_map.items():
-            pathfinding_graph[inode, :] = node.linkweights(nnodes)
+        tmp_filename = self.pathfinder_baked_routes_filename + ".tmp"
+        # predecessor indices (and -9999) fit in 16 bits for most maps
+        dtype = int16 if nnodes < 2**15 else int32
+        routes = open_memmap(tmp_filename, mode="w+", dtype=dtype, shape=(nnodes, nnodes))
+        for istart in range(0, nnodes, batch_size):
+            iend = min(istart + batch_size, nnodes)
+            _, predecessors = dijkstra(
+                self.pathfinding_graph,
+                directed=True,
+                indices=range(istart, iend),
+                return_predecessors=True,
+                limit=self.max_pathfinding_length,
+            )
+            routes[istart:iend] = predecessors
+        routes.flush()
+        del routes
+        replace(tmp_filename, self.pathfinder_baked_routes_filename)
+        with open(self.pathfinder_baked_filename, "wb") as fil:
+            pickle.dump((self.mapstring, nnodes), fil, protocol=4)
+
+    def _get_routes_from(self, istartnode):
+        """
+        Get the solved routes from a start node.
 
-        # create a sparse matrix to represent link relationships from each node
-        pathfinding_matrix = csr_matrix(pathfinding_graph)
+        Args:
+            istartnode (int): The node-index of the start node.
 
-        # solve using Dijkstra's algorithm
-        self.dist_matrix, self.pathfinding_routes = dijkstra(
-            pathfinding_matrix,
-            directed=True,
-            return_predecessors=True,
-            limit=self.max_pathfinding_length,
-        )
+        Returns:
+            ndarray: The node-index of the predecessor of each end node on the path from
+                the start node. This is -9999 for unreachable nodes and the start node itself.
 
-        if self.pathfinder_baked_filename:
-            # try to cache the results
-            with open(self.pathfinder_baked_filename, "wb") as fil:
-                pickle.dump(
-                    (self.mapstring, self.dist_matrix, self.pathfinding_routes), fil, protocol=4
-                )
+        """
+        if self.pathfinding_routes is not None:
+            return self.pathfinding_routes[istartnode]
+        routes = self._solved_routes.get(istartnode)
+        if routes is None:
+            _, routes = dijkstra(
+                self.pathfinding_graph,
+                directed=True,
+                indices=istartnode,
+                return_predecessors=True,
+                limit=self.max_pathfinding_length,
+            )
+            self._solved_routes[istartnode] = routes
+            if len(self._solved_routes) > self.max_cached_routes:
+                self._solved_routes.popitem(last=False)
+        else:
+            self._solved_routes.move_to_end(istartnode)
+        return routes
+
+    def get_spawn_state(self):
+        """
+        Get a fingerprint of what spawning this map would build, for comparing with the last
+        time it was spawned. This is calculated once per parse of the map.
+
+        Returns:
+            dict: `{(X, Y): (room_state, exits_state), ...}` for every node that spawns a room.
+                See `MapNode.get_spawn_state`.
 
-    def spawn_nodes(self, xy=("*", "*")):
+        """
+        if self._spawn_state is None:
+            spawn_state = {}
+            for node in self.node_index_map.values():
+                node_state = node.get_spawn_state()
+                if node_state:
+                    spawn_state[(node.X, node.Y)] = node_state
+            self._spawn_state = spawn_state
+        return self._spawn_state
+
+    def spawn_nodes(self, xy=("*", "*"), previous_state=None):
         """
         Convert the nodes of this XYMap into actual in-world rooms by spawning their
         related prototypes in the correct coordinate positions. This must be done *first*
@@ -659,6 +771,10 @@ class XYMap:
 
         Args:
             xy (tuple, optional): An (X,Y) coordinate of node(s). `'*'` acts as a wildcard.
+            previous_state (dict, optional): The `get_spawn_state` of this map the last time it
+                was spawned. If given, only nodes that changed since then are spawned, and
+                only the rooms of nodes removed since then are deleted. Otherwise all nodes
+                are spawned and all rooms on this map that are not on the map are deleted.
 
         Examples:
             - `xy=(1, 3) - spawn (1,3) coordinate only.
@@ -668,6 +784,15 @@ class XYMap:
         Returns:
             list: A list of nodes that were spawned.
 
+        Notes:
+            Rooms that don't exist yet are created together, in bulk, where possible.
+
+            With `previous_state`, the rooms of unchanged nodes are not looked up at all, so
+            rooms deleted in-game are only spawned again without it (`XYZGrid.spawn(full=True)`).
+            The rooms of changed nodes are looked up one by one, which doesn't need a query
+            per room if the coordinate Tag categories (`xyzroom.MAP_TAG_CATEGORIES`) are added
+            to `settings.TAG_INDEX_CATEGORIES`.
+
         """
         global _XYZROOMCLASS
         if not _XYZROOMCLASS:
@@ -681,20 +806,71 @@ class XYMap:
             (node.X, node.Y)
             for node in sorted(self.node_index_map.values(), key=lambda n: (n.Y, n.X))
         ]
-        for existing_room in _XYZROOMCLASS.objects.filter_xyz(xyz=(x, y, self.Z)):
-            roomX, roomY, _ = existing_room.xyz
-            if (roomX, roomY) not in map_coords:
-                self.log(f"  deleting room at {existing_room.xyz} (not found on map).")
-                existing_room.delete()
+        if previous_state is None:
+            for existing_room in _XYZROOMCLASS.objects.filter_xyz(xyz=(x, y, self.Z)):
+                roomX, roomY, _ = existing_room.xyz
+                if (roomX, roomY) not in map_coords:
+                    self.log(f"  deleting room at {existing_room.xyz} (not found on map).")
+                    existing_room.delete()
+        else:
+            map_coords = set(map_coords)
+            for roomX, roomY in previous_state:
+                if (
+                    (roomX, roomY) not in map_coords
+                    and (x in (wildcard, roomX))
+                    and (y in (wildcard, roomY))
+                ):
+                    for existing_room in _XYZROOMCLASS.objects.filter_xyz(
+                        xyz=(roomX, roomY, self.Z)
+                    ):
+                        self.log(f"  deleting room at {existing_room.xyz} (not found on map).")
+                        existing_room.delete()
+            spawn_state = self.get_spawn_state()
 
         # (re)build nodes (will not build already existing rooms)
+        new_nodes = []
         for node in sorted(self.node_index_map.values(), key=lambda n: (n.Y, n.X)):
             if (x in (wildcard, node.X)) and (y in (wildcard, node.Y)):
+                if not node.prototype:
+                    # a 'virtual' node; nothing to spawn
+                    if previous_state is None:
+                        spawned.append(node)
+                    continue
+                if (
+                    previous_state is not None
+                    and previous_state.get((node.X, node.Y), (None, None))[0]
+                    == spawn_state[(node.X, node.Y)][0]
+                ):
+                    # room unchanged since the last spawn
+                    continue
+                try:
+                    _XYZROOMCLASS.objects.get_xyz(xyz=node.get_spawn_xyz())
+                except django_exceptions.ObjectDoesNotExist:
+                    new_nodes.append(node)
+                    continue
+                except django_exceptions.MultipleObjectsReturned:
+                    # spawn reports this
+                    pass
                 node.spawn()
                 spawned.append(node)
+
+        # create the missing rooms, in bulk where possible
+        prototypes = []
+        for node in new_nodes:
+            prototype = node.get_spawn_prototype()
+            if prototype:
+                self.log(
+                    f"  spawning room at xyz={node.get_spawn_xyz()} ({prototype['typeclass']})"
+                )
+                prototypes.append(prototype)
+            else:
+                node.spawn()
+        if prototypes:
+            spawn_prototypes(*prototypes)
+        spawned.extend(new_nodes)
         return spawned
 
-    def spawn_links(self, xy=("*", "*"), nodes=None, directions=None):
+    def spawn_links(self, xy=("*", "*"), nodes=None, directions=None, previous_state=None):
         """
         Convert links of this XYMap into actual in-game exits by spawning their related
         prototypes. It's possible to only spawn a specic exit by specifying the node and
@@ -707,20 +883,69 @@ class XYMap:
             directions (list, optional): A list of cardinal directions ('n', 'ne' etc). If given,
                 sync only the exit in the given directions (`xy` limits which links out of which
                 nodes should be considered). If unset, there are no limits to directions.
+            previous_state (dict, optional): The `get_spawn_state` of this map the last time it
+                was spawned. If given, only the links out of nodes whose links changed since
+                then are spawned, in addition to those out of (or leading to) the rooms just
+                spawned by `spawn_nodes`, which must then be given as `nodes`.
         Examples:
             - `xy=(1, 3 )`, `direction='ne'` - sync only the north-eastern exit
                 out of the (1, 3) node.
 
+        Notes:
+            The exits out of rooms without exits are created together, in bulk, where possible.
+
         """
+        global _XYZEXITCLASS
+        if not _XYZEXITCLASS:
+            from evennia.contrib.grid.xyzgrid.xyzroom import XYZExit as _XYZEXITCLASS
         x, y = xy
         wildcard = "*"
 
-        if not nodes:
+        if previous_state is not None:
+            # the rooms just spawned, on any map
+            spawned_xyz = set(node.get_spawn_xyz() for node in nodes or () if node.prototype)
+            spawn_state = self.get_spawn_state()
+            nodes = [
+                node
+                for node in self.node_index_map.values()
+                if node.prototype
+                and (
+                    previous_state.get((node.X, node.Y), (None, None))[1]
+                    != spawn_state[(node.X, node.Y)][1]
+                    or node.get_spawn_xyz() in spawned_xyz
+                    or any(
+                        link_node.get_spawn_xyz() in spawned_xyz
+                        for link_node in node.links.values()
+                    )
+                )
+            ]
+            nodes = sorted(nodes, key=lambda n: (n.Z, n.Y, n.X))
+        elif not nodes:
             nodes = sorted(self.node_index_map.values(), key=lambda n: (n.Z, n.Y, n.X))
 
+        prototypes = []
         for node in nodes:
             if (x in (wildcard, node.X)) and (y in (wildcard, node.Y)):
+                if (
+                    not directions
+                    and node.prototype
+                    and not _XYZEXITCLASS.objects.filter_xyz_exit(
+                        xyz=(node.X, node.Y, self.Z)
+                    ).exists()
+                ):
+                    # no exits yet - create them all together with those of other nodes
+                    exit_prototypes = node.get_exit_spawn_prototypes()
+                    if exit_prototypes is not None:
+                        for prototype in exit_prototypes:
+                            self.log(
+                                f"  spawning/updating exit xyz={(node.X, node.Y, self.Z)}, "
+                                f"direction={prototype['key']} ({prototype['typeclass']})"
+                            )
+                        prototypes.extend(exit_prototypes)
+                        continue
                 node.spawn_links(directions=directions)
+        if prototypes:
+            spawn_prototypes(*prototypes)
 
     def get_node_from_coord(self, xy):
         """
@@ -797,20 +1022,20 @@ class XYMap:
                 f"{endnode}. They must both be MapNodes (not Links)"
             )
 
-        if self.pathfinding_routes is None:
+        if self.pathfinding_graph is None:
             self.calculate_path_matrix()
 
-        pathfinding_routes = self.pathfinding_routes
+        routes = self._get_routes_from(istartnode)
         node_index_map = self.node_index_map
 
         path = [endnode]
         directions = []
 
-        while pathfinding_routes[istartnode, inextnode] != -9999:
+        while routes[inextnode] != -9999:
             # the -9999 is set by algorithm for unreachable nodes or if trying
             # to go a node we are already at (the start node in this case since
             # we are working backwards).
-            inextnode = pathfinding_routes[istartnode, inextnode]
+            inextnode = int(routes[inextnode])
             nextnode = node_index_map[inextnode]
             shortest_route_to = nextnode.shortest_route_to_node[path[-1].node_index]
 
@@ -823,6 +1048,78 @@ class XYMap:
 
         return directions, path
 
+    def _get_visual_range_tile(self, xy, dist, mode):
+        """
+        Get the part of the display map visible from a node, without the character,
+        path or cropping. The map is static once parsed, so the result is memoized for
+        every (center, distance, mode) until the map is parsed again.
+
+        Args:
+            xy (tuple): (X,Y) in-world coordinate of the center node.
+            dist (int or None): Distance to show (see `get_visual_range`). If `None`,
+                this is the entire display map.
+            mode (str): One of 'scan' or 'nodes'.
+
+        Returns:
+            tuple: `(tile, ixc, iyc, xmin, xmax, ymin, ymax, width, height)`, where `tile` is
+                the 2D list of display symbols (must not be modified), `ixc, iyc` is the
+                position of `xy` in it, and the rest the limits of the tile on the xygrid.
+
+        Raises:
+            MapError: If `mode` is not valid.
+
+        """
+        key = (tuple(xy), dist, mode)
+        try:
+            self._visual_ranges.move_to_end(key)
+            return self._visual_ranges[key]
+        except KeyError:
+            pass
+
+        iX, iY = xy
+        # convert inputs to xygrid
+        width, height = self.max_x + 1, self.max_y + 1
+        ix, iy = max(0, min(iX * 2, width)), max(0, min(iY * 2, height))
+        display_map = self.display_map
+        xmin, xmax, ymin, ymax = 0, width - 1, 0, height - 1
+
+        if dist is None:
+            # show the entire grid
+            gridmap = display_map
+            ixc, iyc = ix, iy
+
+        elif mode == "nodes":
+            # dist measures only full, reachable nodes.
+            points, xmin, xmax, ymin, ymax = self._get_topology_around_coord(xy, dist=dist)
+
+            ixc, iyc = ix - xmin, iy - ymin
+            # note - override width/height here since our grid is
+            # now different from the original for future cropping
+            width, height = xmax - xmin + 1, ymax - ymin + 1
+            gridmap = [[" "] * width for _ in range(height)]
+            for ix0, iy0 in points:
+                gridmap[iy0 - ymin][ix0 - xmin] = display_map[iy0][ix0]
+
+        elif mode == "scan":
+            # scan-mode - dist measures individual grid points
+
+            xmin, xmax = max(0, ix - dist), min(width, ix + dist + 1)
+            ymin, ymax = max(0, iy - dist), min(height, iy + dist + 1)
+            ixc, iyc = ix - xmin, iy - ymin
+            gridmap = [line[xmin:xmax] for line in display_map[ymin:ymax]]
+
+        else:
+            raise MapError(
+                f"Map.get_visual_range 'mode' was '{mode}' "
+                "- it must be either 'scan' or 'nodes'."
+            )
+
+        tile = (gridmap, ixc, iyc, xmin, xmax, ymin, ymax, width, height)
+        self._visual_ranges[key] = tile
+        if len(self._visual_ranges) > self.max_cached_visual_ranges:
+            self._visual_ranges.popitem(last=False)
+        return tile
+
     def get_visual_range(
         self,
         xy,
@@ -905,48 +1202,18 @@ class XYMap:
                 # @-#
 
         """
-        iX, iY = xy
-        # convert inputs to xygrid
-        width, height = self.max_x + 1, self.max_y + 1
-        ix, iy = max(0, min(iX * 2, width)), max(0, min(iY * 2, height))
-        display_map = self.display_map
-        xmin, xmax, ymin, ymax = 0, width - 1, 0, height - 1
-
-        if dist is None:
-            # show the entire grid
-            gridmap = self.display_map
-            ixc, iyc = ix, iy
-
-        elif dist is None or dist <= 0 or not self.get_node_from_coord(xy):
+        if dist is not None and (dist <= 0 or not self.get_node_from_coord(xy)):
             # There is no node at these coordinates. Show
             # nothing but ourselves or emptiness
             return character if character else self.empty_symbol
 
-        elif mode == "nodes":
-            # dist measures only full, reachable nodes.
-            points, xmin, xmax, ymin, ymax = self._get_topology_around_coord(xy, dist=dist)
-
-            ixc, iyc = ix - xmin, iy - ymin
-            # note - override width/height here since our grid is
-            # now different from the original for future cropping
-            width, height = xmax - xmin + 1, ymax - ymin + 1
-            gridmap = [[" "] * width for _ in range(height)]
-            for ix0, iy0 in points:
-                gridmap[iy0 - ymin][ix0 - xmin] = display_map[iy0][ix0]
-
-        elif mode == "scan":
-            # scan-mode - dist measures individual grid points
-
-            xmin, xmax = max(0, ix - dist), min(width, ix + dist + 1)
-            ymin, ymax = max(0, iy - dist), min(height, iy + dist + 1)
-            ixc, iyc = ix - xmin, iy - ymin
-            gridmap = [line[xmin:xmax] for line in display_map[ymin:ymax]]
+        # the map around the center is the same for everyone looking, so we only
+        # copy it here before adding the character, path etc
+        tile, ixc, iyc, xmin, xmax, ymin, ymax, width, height = self._get_visual_range_tile(
+            xy, dist, mode
+        )
+        gridmap = [line[:] for line in tile]
 
-        else:
-            raise MapError(
-                f"Map.get_visual_range 'mode' was '{mode}' "
-                "- it must be either 'scan' or 'nodes'."
-            )
         if character:
             gridmap[iyc][ixc] = character  # correct indexing; it's a list of lines
 
@@ -16,6 +16,7 @@ except ImportError as err:
         f"{err}\nThe XYZgrid contrib requires the SciPy package. Install with `pip install scipy'."
     )
 
+import hashlib
 import uuid
 from collections import defaultdict
 
@@ -33,6 +34,15 @@ ExitTypeclass = None
 UUID_XYZ_NAMESPACE = uuid.uuid5(uuid.UUID(int=0), "xyzgrid")
 
 
+def _get_spawn_digest(data):
+    """
+    Make a short fingerprint of data used for spawning, for comparing with the data
+    used the last time the grid was spawned.
+
+    """
+    return hashlib.md5(repr(data).encode("utf-8")).hexdigest()
+
+
 # Nodes/Links
 
 
@@ -434,6 +444,148 @@ class MapNode:
                 maplinks[key.lower()][3].prototype, objects=[linkobj], exact=False
             )
 
+    def get_spawn_state(self):
+        """
+        Get a fingerprint of what `spawn` and `spawn_links` would build for this node. The
+        grid compares this with the fingerprint from the last time it was spawned, so only
+        nodes that changed since then have to be spawned again.
+
+        Returns:
+            tuple or None: A tuple `(room_state, exits_state)` of digests of the coordinates
+                and prototypes used for the room and for its exits, or `None` for a 'virtual'
+                node that spawns nothing.
+
+        """
+        if not self.prototype:
+            return None
+        if not self.prototype.get("prototype_key"):
+            self.prototype["prototype_key"] = self.generate_prototype_key()
+
+        exits = []
+        for direction, link in sorted(self.first_links.items()):
+            if not link.prototype.get("prototype_key"):
+                link.prototype["prototype_key"] = self.generate_prototype_key()
+            exits.append(
+                (
+                    self.get_exit_spawn_name(direction),
+                    self.links[direction].get_spawn_xyz(),
+                    link.prototype,
+                )
+            )
+        return (
+            _get_spawn_digest((self.get_spawn_xyz(), self.prototype)),
+            _get_spawn_digest(exits),
+        )
+
+    def get_spawn_prototype(self):
+        """
+        Get a prototype for creating the room of this node with the spawner. Unlike `spawn`,
+        this allows for creating the rooms of many nodes at once, but only for rooms that
+        don't exist yet.
+
+        Returns:
+            dict or None: The prototype, including the XYZ-coordinate tags of the room. This
+                is `None` for a 'virtual' node or if the room's typeclass has a custom
+                `create` method, in which case `spawn` must be used.
+
+        """
+        global NodeTypeclass
+        if not NodeTypeclass:
+            from .xyzroom import XYZRoom as NodeTypeclass
+        from .xyzroom import MAP_X_TAG_CATEGORY, MAP_Y_TAG_CATEGORY, MAP_Z_TAG_CATEGORY
+
+        if not self.prototype:
+            return None
+        typeclass = self.prototype.get("typeclass")
+        if typeclass is None:
+            raise MapError(
+                f"The prototype {self.prototype} for this node has no 'typeclass' key.", self
+            )
+        typeclass = class_from_module(typeclass)
+        if typeclass.create.__func__ is not NodeTypeclass.create.__func__:
+            return None
+        if not self.prototype.get("prototype_key"):
+            self.prototype["prototype_key"] = self.generate_prototype_key()
+
+        X, Y, Z = self.get_spawn_xyz()
+        prototype = dict(self.prototype)
+        prototype.setdefault("key", "An empty room")
+        # the default locks `create` would have set
+        prototype.setdefault("locks", typeclass.get_default_lockstring())
+        prototype["tags"] = list(prototype.get("tags", ())) + [
+            (str(X), MAP_X_TAG_CATEGORY),
+            (str(Y), MAP_Y_TAG_CATEGORY),
+            (str(Z), MAP_Z_TAG_CATEGORY),
+        ]
+        return prototype
+
+    def get_exit_spawn_prototypes(self):
+        """
+        Get prototypes for creating all exits out of the room of this node with the spawner.
+        Unlike `spawn_links`, this allows for creating the exits of many nodes at once, but
+        only for a room that has no exits yet. The rooms at both ends must already exist.
+
+        Returns:
+            list or None: One prototype per exit, including the XYZ-coordinate tags of the
+                exit. This is `None` for a 'virtual' node or if an exit's typeclass has a
+                custom `create` method, in which case `spawn_links` must be used.
+
+        """
+        global NodeTypeclass, ExitTypeclass
+        if not NodeTypeclass:
+            from .xyzroom import XYZRoom as NodeTypeclass
+        if not ExitTypeclass:
+            from .xyzroom import XYZExit as ExitTypeclass
+        from .xyzroom import (
+            MAP_X_TAG_CATEGORY,
+            MAP_XDEST_TAG_CATEGORY,
+            MAP_Y_TAG_CATEGORY,
+            MAP_YDEST_TAG_CATEGORY,
+            MAP_Z_TAG_CATEGORY,
+            MAP_ZDEST_TAG_CATEGORY,
+        )
+
+        if not self.prototype:
+            return None
+
+        xyz = (self.X, self.Y, self.Z)
+        location = NodeTypeclass.objects.get_xyz(xyz=xyz)
+        prototypes = {}
+        for direction, link in self.first_links.items():
+            typeclass = link.prototype.get("typeclass")
+            if typeclass is None:
+                raise MapError(
+                    f"The prototype {link.prototype} for this node has no 'typeclass' key.",
+                    self,
+                )
+            typeclass = class_from_module(typeclass)
+            if typeclass.create.__func__ is not ExitTypeclass.create.__func__:
+                return None
+            if not link.prototype.get("prototype_key"):
+                link.prototype["prototype_key"] = self.generate_prototype_key()
+
+            key, *aliases = self.get_exit_spawn_name(direction)
+            xdest, ydest, zdest = xyz_destination = self.links[direction].get_spawn_xyz()
+            destination = NodeTypeclass.objects.get_xyz(xyz=xyz_destination)
+            # like in `spawn_links`, the link's prototype is applied on top of the exit name
+            prototype = {"key": key, "aliases": aliases}
+            prototype.update(link.prototype)
+            # the default locks `create` would have set
+            prototype.setdefault("locks", typeclass.get_default_lockstring())
+            prototype["location"] = location.dbref
+            prototype["destination"] = destination.dbref
+            prototype["tags"] = list(prototype.get("tags", ())) + [
+                (str(self.X), MAP_X_TAG_CATEGORY),
+                (str(self.Y), MAP_Y_TAG_CATEGORY),
+                (str(self.Z), MAP_Z_TAG_CATEGORY),
+                (str(xdest), MAP_XDEST_TAG_CATEGORY),
+                (str(ydest), MAP_YDEST_TAG_CATEGORY),
+                (str(zdest), MAP_ZDEST_TAG_CATEGORY),
+            ]
+            # like in `spawn_links`, only one exit is spawned per name
+            prototypes[key.lower()] = prototype
+        return list(prototypes.values())
+
     def unspawn(self):
         """
         Remove all spawned objects related to this node and all links.
@@ -219,6 +219,8 @@ class XYZGrid(DefaultScript):
         for zcoord in zcoords:
             if zcoord in self.db.map_data:
                 self.db.map_data.pop(zcoord)
+            if self.db.spawn_states and zcoord in self.db.spawn_states:
+                self.db.spawn_states.pop(zcoord)
             if remove_objects:
                 # we can't batch-delete because we want to run the .delete
                 # method that also wipes exits and moves content to save locations
@@ -236,7 +238,7 @@ class XYZGrid(DefaultScript):
             self.remove_map(*(zcoord for zcoord in self.db.map_data), remove_objects=True)
         super().delete()
 
-    def spawn(self, xyz=("*", "*", "*"), directions=None):
+    def spawn(self, xyz=("*", "*", "*"), directions=None, full=False):
         """
         Create/recreate/update the in-game grid based on the stored Maps or for a specific Map
         or coordinate.
@@ -246,6 +248,11 @@ class XYZGrid(DefaultScript):
                 acts as a wildcard.
             directions (list, optional): A list of cardinal directions ('n', 'ne' etc).
                 Spawn exits only the given direction. If unset, all needed directions are spawned.
+            full (bool, optional): When spawning entire maps, the grid normally only spawns what
+                changed on each map since the last time it was spawned, without checking the
+                rest of the rooms and exits. Set this to check and update every room and exit
+                on the maps against the map, for example after rooms or exits were changed or
+                deleted in-game, since those are otherwise not spawned again.
 
         Examples:
             - `xyz=('*', '*', '*')` (default) - spawn/update all maps.
@@ -266,15 +273,40 @@ class XYZGrid(DefaultScript):
         else:
             raise RuntimeError(f"The 'z' coordinate/name '{z}' is not found on the grid.")
 
+        # what each map looked like the last time it was spawned
+        spawn_states = self.db.spawn_states
+        spawn_states = spawn_states.deserialize() if spawn_states else {}
+        incremental = not full and x == wildcard and y == wildcard and not directions
+
         # first build all nodes/rooms
+        spawned = []
         for zcoord, xymap in xymaps.items():
             self.log(f"spawning/updating nodes for Z='{zcoord}' ...")
-            xymap.spawn_nodes(xy=(x, y))
+            spawned.extend(
+                xymap.spawn_nodes(
+                    xy=(x, y), previous_state=spawn_states.get(zcoord) if incremental else None
+                )
+            )
 
         # next build all links between nodes (including between maps)
         for zcoord, xymap in xymaps.items():
             self.log(f"spawning/updating links for Z='{zcoord}' ...")
-            xymap.spawn_links(xy=(x, y), directions=directions)
+            if incremental and zcoord in spawn_states:
+                xymap.spawn_links(xy=(x, y), nodes=spawned, previous_state=spawn_states.get(zcoord))
+            else:
+                xymap.spawn_links(xy=(x, y), directions=directions)
+
+        # remember what was spawned
+        for zcoord, xymap in xymaps.items():
+            if x == wildcard and y == wildcard and not directions:
+                spawn_states[zcoord] = xymap.get_spawn_state()
+            elif zcoord in spawn_states:
+                # only parts of the map were spawned; make sure the rest of these nodes
+                # are spawned next time
+                for node in spawned:
+                    if node.Z == zcoord:
+                        spawn_states[zcoord].pop((node.X, node.Y), None)
+        self.db.spawn_states = spawn_states
 
 
 def get_xyzgrid(print_errors=True):
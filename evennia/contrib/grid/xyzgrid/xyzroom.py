@@ -12,6 +12,7 @@ from django.db.models import Q
 
 from evennia.objects.manager import ObjectManager
 from evennia.objects.objects import DefaultExit, DefaultRoom
+from evennia.typeclasses.tags import TAG_INDEX, normalize_tag_field
 
 # name of all tag categories. Note that the Z-coordinate is
 # the `map_name` of the XYZgrid
@@ -23,6 +24,23 @@ MAP_XDEST_TAG_CATEGORY = "exit_dest_x_coordinate"
 MAP_YDEST_TAG_CATEGORY = "exit_dest_y_coordinate"
 MAP_ZDEST_TAG_CATEGORY = "exit_dest_z_coordinate"
 
+# add these to settings.TAG_INDEX_CATEGORIES to find rooms and exits by coordinate
+# without querying the Tags
+MAP_TAG_CATEGORIES = (
+    MAP_X_TAG_CATEGORY,
+    MAP_Y_TAG_CATEGORY,
+    MAP_Z_TAG_CATEGORY,
+    MAP_XDEST_TAG_CATEGORY,
+    MAP_YDEST_TAG_CATEGORY,
+    MAP_ZDEST_TAG_CATEGORY,
+)
+
+# above this many matches, leave the filtering to the database rather than querying
+# by a (very long) list of ids from the Tag index
+_MAX_INDEXED_IDS = 10000
+# the idmapper cache the Tag index was last checked against
+_INDEXED_INSTANCE_CACHE = None
+
 GET_XYZGRID = None
 
 CLIENT_DEFAULT_WIDTH = settings.CLIENT_DEFAULT_WIDTH
@@ -34,8 +52,83 @@ class XYZManager(ObjectManager):
     has all the normal Object/Room manager methods (filter/get etc) but also special helpers for
     efficiently querying the room in the database based on XY coordinates.
 
+    If the coordinate Tag categories are added to `settings.TAG_INDEX_CATEGORIES`, the
+    coordinates are looked up in the process-wide Tag index (see
+    `evennia.typeclasses.tags.TAG_INDEX`), which is kept in sync with the coordinate Tags of
+    rooms and exits, so finding a room by its coordinate needs no Tag queries. Otherwise
+    the Tags are queried as usual.
+
     """
 
+    def _get_ids_from_coordinates(self, coords):
+        """
+        Find the ids of the objects at a coordinate in the Tag index.
+
+        Args:
+            coords (iterable): Tuples `(coordinate, tag category)`. Wildcard (`'*'`)
+                coordinates are ignored.
+
+        Returns:
+            set or None: The ids of the matching objects, or `None` if all coordinates are
+                wildcards or there are too many matches to query by id.
+
+        """
+        global _INDEXED_INSTANCE_CACHE
+        instance_cache = self.model.__dbclass__.__instance_cache__
+        if instance_cache is not _INDEXED_INSTANCE_CACHE:
+            # the idmapper cache was flushed (like between unit tests, where the database is
+            # rolled back without any TagHandler involved); reload the index to be safe
+            TAG_INDEX.reset()
+            _INDEXED_INSTANCE_CACHE = instance_cache
+
+        keys, categories = [], []
+        for coord, category in coords:
+            if coord != "*":
+                keys.append(normalize_tag_field(coord))
+                categories.append(category)
+        if not keys:
+            return None
+        objids = TAG_INDEX.get_ids(
+            self.model.__dbclass__.__name__.lower(),
+            None,
+            keys,
+            categories,
+            self.model.db_tags.through,
+        )
+        if objids is not None and len(objids) > _MAX_INDEXED_IDS:
+            return None
+        return objids
+
+    def _get_indexed_matches(self, objids, coords):
+        """
+        Get the objects found in the Tag index, from the cache if possible.
+
+        Args:
+            objids (set): Object ids from `_get_ids_from_coordinates`.
+            coords (iterable): The `(coordinate, tag category)` looked up.
+
+        Returns:
+            list or None: The objects of this typeclass (or its children) at the coordinate,
+                or `None` if the Tag index turned out to be outdated (if Tags were changed
+                without going through the TagHandler), in which case it is reset.
+
+        """
+        objs = [self.model.get_cached_instance(objid) for objid in objids]
+        if None in objs:
+            objs = list(self.filter_family(id__in=objids))
+        matches = []
+        for obj in objs:
+            if not isinstance(obj, self.model):
+                continue
+            for coord, category in coords:
+                if coord != "*" and normalize_tag_field(coord) not in obj.tags.get(
+                    category=category, return_list=True
+                ):
+                    TAG_INDEX.reset()
+                    return None
+            matches.append(obj)
+        return matches
+
     def filter_xyz(self, xyz=("*", "*", "*"), **kwargs):
         """
         Filter queryset based on XYZ position on the grid. The Z-position is the name of the XYMap
@@ -56,6 +149,12 @@ class XYZManager(ObjectManager):
         x, y, z = xyz
         wildcard = "*"
 
+        objids = self._get_ids_from_coordinates(
+            ((x, MAP_X_TAG_CATEGORY), (y, MAP_Y_TAG_CATEGORY), (z, MAP_Z_TAG_CATEGORY))
+        )
+        if objids is not None:
+            return self.filter_family(id__in=objids, **kwargs)
+
         return (
             self.filter_family(**kwargs)
             .filter(
@@ -71,7 +170,7 @@ class XYZManager(ObjectManager):
             .filter(
                 Q()
                 if z == wildcard
-                else Q(db_tags__db_key__iexact=str(z), db_tags__db_category=MAP_Z_TAG_CATEGORY)
+                else Q(db_tags__db_key=str(z).lower(), db_tags__db_category=MAP_Z_TAG_CATEGORY)
             )
         )
 
@@ -95,14 +194,22 @@ class XYZManager(ObjectManager):
                 possible with a unique combination of x,y,z).
 
         """
-        # filter by tags, then figure out of we got a single match or not
-        query = self.filter_xyz(xyz=xyz, **kwargs)
-        ncount = query.count()
+        x, y, z = xyz
+        coords = ((x, MAP_X_TAG_CATEGORY), (y, MAP_Y_TAG_CATEGORY), (z, MAP_Z_TAG_CATEGORY))
+        matches = None
+        if not kwargs:
+            objids = self._get_ids_from_coordinates(coords)
+            if objids is not None:
+                matches = self._get_indexed_matches(objids, coords)
+        if matches is None:
+            # filter by tags, then figure out of we got a single match or not
+            query = self.filter_xyz(xyz=xyz, **kwargs)
+            matches = list(query[:2])
+        ncount = len(matches)
         if ncount == 1:
-            return query.first()
+            return matches[0]
 
         # error - mimic default get() behavior but with a little more info
-        x, y, z = xyz
         inp = f"Query: xyz=({x},{y},{z}), " + ",".join(
             f"{key}={val}" for key, val in kwargs.items()
         )
@@ -150,6 +257,19 @@ class XYZExitManager(XYZManager):
         xdest, ydest, zdest = xyz_destination
         wildcard = "*"
 
+        objids = self._get_ids_from_coordinates(
+            (
+                (x, MAP_X_TAG_CATEGORY),
+                (y, MAP_Y_TAG_CATEGORY),
+                (z, MAP_Z_TAG_CATEGORY),
+                (xdest, MAP_XDEST_TAG_CATEGORY),
+                (ydest, MAP_YDEST_TAG_CATEGORY),
+                (zdest, MAP_ZDEST_TAG_CATEGORY),
+            )
+        )
+        if objids is not None:
+            return self.filter_family(id__in=objids, **kwargs)
+
         return (
             self.filter_family(**kwargs)
             .filter(
@@ -165,7 +285,7 @@ class XYZExitManager(XYZManager):
             .filter(
                 Q()
                 if z == wildcard
-                else Q(db_tags__db_key__iexact=str(z), db_tags__db_category=MAP_Z_TAG_CATEGORY)
+                else Q(db_tags__db_key=str(z).lower(), db_tags__db_category=MAP_Z_TAG_CATEGORY)
             )
             .filter(
                 Q()
@@ -181,7 +301,7 @@ class XYZExitManager(XYZManager):
                 Q()
                 if zdest == wildcard
                 else Q(
-                    db_tags__db_key__iexact=str(zdest), db_tags__db_category=MAP_ZDEST_TAG_CATEGORY
+                    db_tags__db_key=str(zdest).lower(), db_tags__db_category=MAP_ZDEST_TAG_CATEGORY
                 )
             )
         )
@@ -214,6 +334,29 @@ class XYZExitManager(XYZManager):
         """
         x, y, z = xyz
         xdest, ydest, zdest = xyz_destination
+        inp = f"xyz=({x},{y},{z}),xyz_destination=({xdest},{ydest},{zdest})," + ",".join(
+            f"{key}={val}" for key, val in kwargs.items()
+        )
+
+        if not kwargs and "*" not in (x, y, z, xdest, ydest, zdest):
+            coords = (
+                (x, MAP_X_TAG_CATEGORY),
+                (y, MAP_Y_TAG_CATEGORY),
+                (z, MAP_Z_TAG_CATEGORY),
+                (xdest, MAP_XDEST_TAG_CATEGORY),
+                (ydest, MAP_YDEST_TAG_CATEGORY),
+                (zdest, MAP_ZDEST_TAG_CATEGORY),
+            )
+            objids = self._get_ids_from_coordinates(coords)
+            matches = None if objids is None else self._get_indexed_matches(objids, coords)
+            if matches is not None:
+                if len(matches) == 1:
+                    return matches[0]
+                if not matches:
+                    raise self.model.DoesNotExist(
+                        f"{self.model.__name__} matching query {inp} does not exist."
+                    )
+
         # mimic get_family
         paths = [self.model.path] + [
             "%s.%s" % (cls.__module__, cls.__name__) for cls in self._get_subclasses(self.model)
@@ -222,20 +365,17 @@ class XYZExitManager(XYZManager):
 
         try:
             return (
-                self.filter(db_tags__db_key__iexact=str(z), db_tags__db_category=MAP_Z_TAG_CATEGORY)
+                self.filter(db_tags__db_key=str(z).lower(), db_tags__db_category=MAP_Z_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(x), db_tags__db_category=MAP_X_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(y), db_tags__db_category=MAP_Y_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(xdest), db_tags__db_category=MAP_XDEST_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(ydest), db_tags__db_category=MAP_YDEST_TAG_CATEGORY)
                 .filter(
-                    db_tags__db_key__iexact=str(zdest), db_tags__db_category=MAP_ZDEST_TAG_CATEGORY
+                    db_tags__db_key=str(zdest).lower(), db_tags__db_category=MAP_ZDEST_TAG_CATEGORY
                 )
                 .get(**kwargs)
             )
         except self.model.DoesNotExist:
-            inp = f"xyz=({x},{y},{z}),xyz_destination=({xdest},{ydest},{zdest})," + ",".join(
-                f"{key}={val}" for key, val in kwargs.items()
-            )
             raise self.model.DoesNotExist(
                 f"{self.model.__name__} matching query {inp} does not exist."
             )
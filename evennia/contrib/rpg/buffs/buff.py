@@ -326,11 +326,17 @@ class Mod:
         self.perstack = perstack
 
 
+# Hooks which make a buff's mods depend on more than its cache. Buffs overriding any of
+# these are instanced and evaluated on every check instead of being pre-summed.
+_CHECK_HOOKS = ("conditional", "at_pre_check", "at_post_check")
+
+
 class BuffHandler:
     ownerref = None
     dbkey = "buffs"
     autopause = False
     _owner = None
+    _modcache = None
 
     def __init__(self, owner, dbkey=dbkey, autopause=autopause):
         """
@@ -347,16 +353,26 @@ class BuffHandler:
             signals.SIGNAL_OBJECT_POST_UNPUPPET.connect(self._pause_playtime)
             signals.SIGNAL_OBJECT_POST_PUPPET.connect(self._unpause_playtime)
 
+    def __getstate__(self):
+        """Don't pickle the owner or the mod cache (the handler is stored with persistent delays)."""
+        state = dict(self.__dict__)
+        state.pop("_owner", None)
+        state.pop("_modcache", None)
+        return state
+
     # region properties
     @property
     def owner(self):
         """The object this handler is attached to."""
+        _owner = self._owner
+        if _owner is not None and type(_owner).get_cached_instance(_owner.pk) is _owner:
+            return _owner
+        _owner = None
         if self.ownerref:
             _owner = search.search_object(self.ownerref)
-        if _owner:
-            return _owner[0]
-        else:
-            return None
+            _owner = _owner[0] if _owner else None
+        self._owner = _owner
+        return _owner
 
     @property
     def buffcache(self):
@@ -720,8 +736,10 @@ class BuffHandler:
 
         Returns a dictionary of instanced buffs which modify the specified stat in the format {buffkey: instance}.
         """
-        _cache = self.traits if not to_filter else to_filter
-        buffs = {k: buff for k, buff in _cache.items() for m in buff.mods if m.stat == stat}
+        if not to_filter:
+            keys = self._get_modcache()["stats"].get(stat, ((),))[0]
+            return self._instance_keys(keys)
+        buffs = {k: buff for k, buff in to_filter.items() for m in buff.mods if m.stat == stat}
         return buffs
 
     def get_by_trigger(self, trigger: str, to_filter=None):
@@ -733,8 +751,9 @@ class BuffHandler:
 
         Returns a dictionary of instanced buffs which fire off the designated trigger, in the format {buffkey: instance}.
         """
-        _cache = self.effects if not to_filter else to_filter
-        buffs = {k: buff for k, buff in _cache.items() if trigger in buff.triggers}
+        if not to_filter:
+            return self._instance_keys(self._get_modcache()["triggers"].get(trigger, ()))
+        buffs = {k: buff for k, buff in to_filter.items() if trigger in buff.triggers}
         return buffs
 
     def get_by_source(self, source, to_filter=None):
@@ -804,18 +823,22 @@ class BuffHandler:
             trigger: (optional) Trigger buffs with the `stat` string as well. (default: False)
             strongest:  (optional) Applies only the strongest mods of the corresponding stat value (default: False)
 
-        Returns the value modified by relevant buffs."""
+        Returns the value modified by relevant buffs. Mods of buffs without conditional or check hooks
+        are summed up once per change to the buff cache, so only buffs with such hooks are instanced here.
+        """
         # Buff cleanup to make sure all buffs are valid before processing
         self.cleanup()
 
         # Find all buffs and traits related to the specified stat.
         if not context:
             context = {}
-        applied = self.get_by_stat(stat)
-        if not applied:
+        entry = self._get_modcache()["stats"].get(stat)
+        if not entry:
             return value
+        _, static, dynamic = entry
 
-        # Run pre-check hooks on related buffs
+        # Run pre-check hooks on related buffs that have hooks
+        applied = self._instance_keys(dynamic)
         for buff in applied.values():
             buff.at_pre_check(**context)
 
@@ -825,7 +848,7 @@ class BuffHandler:
         }
 
         # The mod totals
-        calc = self._calculate_mods(stat, applied)
+        calc = self._merge_mods(self._calculate_mods(stat, applied), static)
 
         # The calculated final value
         final = self._apply_mods(value, calc, strongest=strongest)
@@ -979,33 +1002,107 @@ class BuffHandler:
         # Find all buffs and traits related to the specified stat.
         if not context:
             context = {}
-        applied = self.get_by_stat(stat)
-        if not applied:
+        entry = self._get_modcache()["stats"].get(stat)
+        if not entry:
             return None
+        _, static, dynamic = entry
 
         # Sift out buffs that won't be applying their mods (paused, conditional)
         applied = {
-            k: buff for k, buff in applied.items() if buff.conditional(**context) if not buff.paused
+            k: buff
+            for k, buff in self._instance_keys(dynamic).items()
+            if buff.conditional(**context)
+            if not buff.paused
         }
 
         # Calculate and return our values dictionary
-        calc = self._calculate_mods(stat, applied)
+        calc = self._merge_mods(self._calculate_mods(stat, applied), static)
         return calc
 
     def cleanup(self):
         """Removes expired buffs, ensures pause state is respected."""
         self._validate_state()
-        cleanup_buffs(self)
+        # nothing can have expired before the earliest known expiration time
+        if time.time() > self._get_modcache()["expires"]:
+            cleanup_buffs(self)
 
     # region private methods
     def _validate_state(self):
         """Validates the state of paused/unpaused playtime buffs."""
         if not self.autopause:
             return
-        if self.owner.has_account:
+        puppeted = bool(self.owner.has_account)
+        if self._get_modcache().get("puppeted") is puppeted:
+            # already validated for this puppet state and these buffs
+            return
+        if puppeted:
             self._unpause_playtime()
-        elif not self.owner.has_account:
+        else:
             self._pause_playtime()
+        self._get_modcache()["puppeted"] = puppeted
+
+    def _get_modcache(self):
+        """Returns the mod cache for the current state of the buff cache, rebuilding it if needed.
+
+        The mod cache holds the keys of the buffs modifying each stat (and those firing each
+        trigger), the pre-summed mods of buffs without check hooks and the earliest time a
+        buff may expire. Any change to the buff cache attribute (adding, removing, stacking,
+        pausing, expiring, editing a buff's cache) stores a new value on the attribute, which
+        is what invalidates it."""
+        owner = self.owner
+        attr = owner.attributes.get(self.dbkey, return_obj=True) if owner else None
+        version = attr.db_value if attr else None
+        modcache = self._modcache
+        if modcache is None or modcache["version"] is not version:
+            modcache = self._modcache = self._build_modcache(version)
+        return modcache
+
+    def _build_modcache(self, version):
+        """Builds the mod cache (see _get_modcache) from the buff cache.
+
+        Args:
+            version:    The attribute value the buff cache was loaded from
+
+        Returns the mod cache dictionary."""
+        expires = float("inf")
+        stats, triggers = {}, {}
+        for key, buff in self.get_all().items():
+            buff: BaseBuff
+            if buff.stacks <= 0:
+                expires = float("-inf")
+            elif not buff.paused and buff.duration > -1:
+                expires = min(expires, buff.start + buff.duration)
+
+            hooked = any(
+                getattr(type(buff), hook) is not getattr(BaseBuff, hook) for hook in _CHECK_HOOKS
+            )
+            for mod in buff.mods:
+                mod: Mod
+                keys, static, dynamic = stats.setdefault(mod.stat, ({}, {}, {}))
+                keys[key] = None
+                if hooked:
+                    dynamic[key] = None
+                elif not buff.paused:
+                    static[key] = buff
+            for trigger in buff.triggers:
+                triggers.setdefault(trigger, {})[key] = None
+
+        return {
+            "version": version,
+            "expires": expires,
+            "stats": {
+                stat: (tuple(keys), self._calculate_mods(stat, static), tuple(dynamic))
+                for stat, (keys, static, dynamic) in stats.items()
+            },
+            "triggers": {trigger: tuple(keys) for trigger, keys in triggers.items()},
+        }
+
+    def _instance_keys(self, keys):
+        """Returns a dictionary of instanced buffs for the given buff keys, in the format {buffkey: instance}."""
+        if not keys:
+            return {}
+        _cache = self.buffcache
+        return {k: _cache[k]["ref"](self, k, _cache[k]) for k in keys if k in _cache}
 
     def _pause_playtime(self, sender=owner, **kwargs):
         """Pauses all playtime buffs when attached object is unpuppeted."""
@@ -1058,6 +1155,20 @@ class BuffHandler:
                         calculated[mod.modifier]["strongest"] = _modval
         return calculated
 
+    def _merge_mods(self, calc: dict, other: dict):
+        """Merges two dictionaries of calculated modifier values (see _calculate_mods).
+
+        Args:
+            calc:   The dictionary to merge into
+            other:  The dictionary to merge from
+
+        Returns the merged calc dictionary."""
+        for modifier, values in other.items():
+            merged = calc.setdefault(modifier, {"total": 0, "strongest": 0})
+            merged["total"] += values["total"]
+            merged["strongest"] = max(merged["strongest"], values["strongest"])
+        return calc
+
     def _apply_mods(self, value, calc: dict, strongest=False):
         """Applies modifiers to a value.
 
@@ -2,6 +2,8 @@
 Tests for the buff system contrib
 """
 
+import pickle
+import time
 from unittest.mock import Mock, call, patch
 
 from evennia import DefaultObject, create_object
@@ -425,3 +427,65 @@ class TestBuffsAndHandler(EvenniaTest):
         self.assertEqual(
             handler.get("gentest").flavor, "This buff affects the following stats: gentest"
         )
+
+    @patch("evennia.contrib.rpg.buffs.buff.utils.delay", new=Mock())
+    def test_modcache(self):
+        """tests that the cached mod sums follow changes to the buffs"""
+        # setup
+        handler: BuffHandler = self.testobj.buffs
+        handler.add(_TestModBuff)
+        self.assertEqual(handler.check(0, "stat1"), 15)
+        # unchanged buffs reuse the cache
+        modcache = handler._get_modcache()
+        self.assertEqual(handler.check(0, "stat1"), 15)
+        self.assertIs(handler._get_modcache(), modcache)
+        # stacking, editing stacks, pausing and removing all rebuild it
+        handler.add(_TestModBuff)
+        self.assertEqual(handler.check(0, "stat1"), 20)
+        handler.get("tmb").stacks = 4
+        self.assertEqual(handler.check(0, "stat1"), 30)
+        handler.remove("tmb", stacks=1)
+        self.assertEqual(handler.check(0, "stat1"), 25)
+        handler.pause("tmb")
+        self.assertEqual(handler.check(0, "stat1"), 0)
+        handler.unpause("tmb")
+        self.assertEqual(handler.check(0, "stat1"), 25)
+        # so does editing the attribute directly
+        self.testobj.db.buffs["tmb"]["stacks"] = 1
+        self.assertEqual(handler.check(0, "stat1"), 15)
+        # buffs with check hooks are still evaluated on every check
+        handler.add(_TestComplexBuff)
+        self.assertEqual(handler.check(0, "com1"), 75)
+        self.assertEqual(handler.check(0, "com1", context={"cond": True}), 0)
+        self.assertEqual(handler.view_modifiers("com1", context={"cond": True})["add"]["total"], 0)
+        self.assertEqual(handler.check(0, "stat1", context={"cond": True}), 15)
+        handler.remove("tmb")
+        self.assertFalse(handler.get_by_stat("stat1"))
+        self.assertEqual(handler.check(0, "stat1"), 0)
+
+    @patch("evennia.contrib.rpg.buffs.buff.utils.delay", new=Mock())
+    def test_modcache_expiry(self):
+        """tests that cleanup only looks for expired buffs once one may have expired"""
+        # setup
+        handler: BuffHandler = self.testobj.buffs
+        handler.add(_TestModBuff)
+        handler.add(_TestTimeBuff)
+        self.assertEqual(handler._get_modcache()["expires"], handler.get("ttib").start + 5)
+        with patch("evennia.contrib.rpg.buffs.buff.cleanup_buffs") as mock_cleanup:
+            handler.check(0, "stat1")
+            mock_cleanup.assert_not_called()
+        # expire the timed buff
+        with patch("evennia.contrib.rpg.buffs.buff.time.time", return_value=time.time() + 10):
+            self.assertEqual(handler.check(0, "timetest"), 0)
+        self.assertFalse(handler.has("ttib"))
+        self.assertTrue(handler.has("tmb"))
+        self.assertEqual(handler._get_modcache()["expires"], float("inf"))
+
+    def test_pickle(self):
+        """tests that the handler can still be stored with persistent delays"""
+        handler: BuffHandler = self.testobj.buffs
+        handler.check(0, "stat1")
+        copied = pickle.loads(pickle.dumps(handler))
+        self.assertEqual(copied.ownerref, self.testobj.dbref)
+        self.assertIsNone(copied._modcache)
+        self.assertEqual(copied.owner, self.testobj)
@@ -19,14 +19,19 @@ DEFAULT_LLM_PATH = "/api/v1/generate"
 DEFAULT_LLM_HEADERS = {"Content-Type": "application/json"}
 DEFAULT_LLM_PROMPT_KEYNAME = "prompt"
 DEFAULT_LLM_REQUEST_BODY = {...}   # see below, this controls how to prompt the LLM server.
+DEFAULT_LLM_MAX_CONCURRENT_REQUESTS = 4  # max number of requests sent to the server at a time
+DEFAULT_LLM_STREAM = False  # ask the server to stream the response, if the caller can use it
 
 """
 
 import json
+import re
+from collections import OrderedDict, deque
 
 from django.conf import settings
 from twisted.internet import defer, protocol, reactor
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import inlineCallbacks, maybeDeferred
+from twisted.python.failure import Failure
 from twisted.web.client import Agent, HTTPConnectionPool, _HTTP11ClientFactory
 from twisted.web.http_headers import Headers
 from twisted.web.iweb import IBodyProducer
@@ -44,6 +49,8 @@ DEFAULT_LLM_REQUEST_BODY = {
     "max_new_tokens": 250,  # max number of tokens to generate
     "temperature": 0.7,  # higher = more random, lower = more predictable
 }
+DEFAULT_LLM_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_LLM_STREAM = False
 
 
 @implementer(IBodyProducer)
@@ -84,6 +91,96 @@ class SimpleResponseReceiver(protocol.Protocol):
         self.d.callback((self.status_code, self.buf))
 
 
+def get_streamed_text(event):
+    """
+    Get the generated text from an event in a streamed response. This understands
+    the formats of OpenAI-compatible servers, Hugging Face's text-generation-inference
+    and text-generation-webui.
+
+    Args:
+        event (dict): The decoded data of a server-sent event.
+
+    Returns:
+        str: The text in the event (usually a token or a few).
+
+    """
+    if "choices" in event:
+        choice = event["choices"][0] if event["choices"] else {}
+        return choice.get("text") or (choice.get("delta") or {}).get("content") or ""
+    if "token" in event:
+        return event["token"].get("text", "")
+    if "results" in event:
+        return event["results"][0]["text"]
+    return event.get("text", "")
+
+
+class StreamingResponseReceiver(protocol.Protocol):
+    """
+    Used for pulling a streamed response (server-sent events) out of an HTTP
+    response as it arrives, passing the text on a sentence at a time.
+    """
+
+    # the end of a sentence, possibly followed by closing quotes/brackets
+    sentence_end = re.compile(r"[.!?]+[\"')\]]*\s+")
+    # pass on text without a sentence end once it gets this long
+    max_chunk_length = 300
+
+    def __init__(self, status_code, d, on_chunk):
+        self.status_code = status_code
+        self.d = d
+        self.on_chunk = on_chunk
+        self.buf = b""  # data of events not fully received
+        self.text = ""  # text not yet passed on
+        self.texts = []  # all text so far
+
+    def _handle_event(self, event):
+        """Get the text out of a server-sent event"""
+        for line in event.split(b"\n"):
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if not data or data == b"[DONE]":
+                continue
+            try:
+                text = get_streamed_text(json.loads(data))
+            except (ValueError, LookupError, TypeError, AttributeError):
+                logger.log_err(f"LLM: could not parse streamed event: {data!r}")
+                continue
+            self.text += text
+            self.texts.append(text)
+
+    def _pass_on_sentences(self, flush=False):
+        """Pass on complete sentences (or all text, if `flush`)"""
+        while self.text:
+            match = self.sentence_end.search(self.text)
+            if match:
+                end = match.end()
+            elif len(self.text) > self.max_chunk_length:
+                end = self.text.rfind(" ", 0, self.max_chunk_length) + 1 or self.max_chunk_length
+            elif flush:
+                end = len(self.text)
+            else:
+                break
+            chunk, self.text = self.text[:end].strip(), self.text[end:]
+            if chunk:
+                try:
+                    self.on_chunk(chunk)
+                except Exception:
+                    logger.log_trace("LLM: error passing on a streamed chunk.")
+
+    def dataReceived(self, data):
+        *events, self.buf = (self.buf + data).replace(b"\r\n", b"\n").split(b"\n\n")
+        for event in events:
+            self._handle_event(event)
+        self._pass_on_sentences()
+
+    def connectionLost(self, reason=protocol.connectionDone):
+        self._handle_event(self.buf)
+        self.buf = b""
+        self._pass_on_sentences(flush=True)
+        self.d.callback((self.status_code, "".join(self.texts)))
+
+
 class QuietHTTP11ClientFactory(_HTTP11ClientFactory):
     """
     Silences the obnoxious factory start/stop messages in the default client.
@@ -92,15 +189,115 @@ class QuietHTTP11ClientFactory(_HTTP11ClientFactory):
     noisy = False
 
 
+class LLMRequestScheduler:
+    """
+    Schedules the requests to the LLM server, so a lot of NPCs talking at
+    the same time don't flood it.
+
+    - At most `max_concurrent_requests` requests are sent to the server at a
+      time. The rest are queued until a request finishes.
+    - Each requester (usually an `LLMClient`, of which each `LLMNPC` has its
+      own) gets its own queue, and the queues take turns, with a requester that
+      had nothing queued going first. So an NPC with a lot of queued requests
+      does not hold up the others.
+    - A request identical to one that is already queued or waiting for the
+      server is not sent again; it gets the same response.
+
+    """
+
+    def __init__(self, max_concurrent_requests=None):
+        """
+        Args:
+            max_concurrent_requests (int, optional): The max number of requests to
+                run at a time. Defaults to the `LLM_MAX_CONCURRENT_REQUESTS` setting.
+
+        """
+        if max_concurrent_requests is None:
+            max_concurrent_requests = getattr(
+                settings, "LLM_MAX_CONCURRENT_REQUESTS", DEFAULT_LLM_MAX_CONCURRENT_REQUESTS
+            )
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.running = 0
+        # {requester: deque(request_key, ...)}, in the order they take turns
+        self._queues = OrderedDict()
+        # {request_key: (request_func, [deferred, ...])} for queued and running requests
+        self._requests = {}
+
+    def __len__(self):
+        """The number of requests queued or running."""
+        return len(self._requests)
+
+    def schedule(self, request_key, request_func, requester=None):
+        """
+        Schedule a request.
+
+        Args:
+            request_key (hashable): Identifies the request. A request with the same
+                key as one already queued or running will get the same result.
+            request_func (callable): Called without arguments to make the request,
+                returning the result or a Deferred firing with it.
+            requester (hashable, optional): Who is making the request. Requests from
+                different requesters take turns.
+
+        Returns:
+            Deferred: Fires with the result of the request.
+
+        """
+        d = defer.Deferred()
+        if request_key in self._requests:
+            # coalesce with the identical request
+            self._requests[request_key][1].append(d)
+            return d
+        self._requests[request_key] = (request_func, [d])
+        if requester not in self._queues:
+            # a requester with nothing queued gets the next turn
+            self._queues[requester] = deque()
+            self._queues.move_to_end(requester, last=False)
+        self._queues[requester].append(request_key)
+        self._run_queued()
+        return d
+
+    def _run_queued(self):
+        """Start queued requests, one per requester in turn, while there is room."""
+        while self._queues and self.running < self.max_concurrent_requests:
+            requester, queue = next(iter(self._queues.items()))
+            request_key = queue.popleft()
+            if queue:
+                # go to the back of the line
+                self._queues.move_to_end(requester)
+            else:
+                del self._queues[requester]
+
+            self.running += 1
+            maybeDeferred(self._requests[request_key][0]).addBoth(self._finish, request_key)
+
+    def _finish(self, result, request_key):
+        """Pass the result of a request on to everyone waiting for it."""
+        self.running -= 1
+        _, deferreds = self._requests.pop(request_key)
+        for d in deferreds:
+            if isinstance(result, Failure):
+                d.errback(result)
+            else:
+                d.callback(result)
+        self._run_queued()
+
+
+LLM_REQUEST_SCHEDULER = LLMRequestScheduler()
+
+
 class LLMClient:
     """
     A client for communicating with an LLM server.
 
     """
 
-    def __init__(self, on_bad_request=None):
+    def __init__(self, on_bad_request=None, scheduler=None):
+        self.scheduler = LLM_REQUEST_SCHEDULER if scheduler is None else scheduler
+
         self._conn_pool = HTTPConnectionPool(reactor)
         self._conn_pool._factory = QuietHTTP11ClientFactory
+        self._conn_pool.maxPersistentPerHost = self.scheduler.max_concurrent_requests
 
         self.prompt_keyname = getattr(settings, "LLM_PROMPT_KEYNAME", DEFAULT_LLM_PROMPT_KEYNAME)
         self.hostname = getattr(settings, "LLM_HOST", DEFAULT_LLM_HOST)
@@ -109,23 +306,31 @@ class LLMClient:
         self.request_body = getattr(settings, "LLM_REQUEST_BODY", DEFAULT_LLM_REQUEST_BODY)
 
         self.api_type = getattr(settings, "LLM_API_TYPE", DEFAULT_LLM_API_TYPE)
+        self.stream = getattr(settings, "LLM_STREAM", DEFAULT_LLM_STREAM)
 
         self.agent = Agent(reactor, pool=self._conn_pool)
 
-    def _format_request_body(self, prompt):
+    def _format_request_body(self, prompt, stream=False):
         """Structure the request body for the LLM server"""
         request_body = self.request_body.copy()
 
         prompt = "\n".join(make_iter(prompt))
 
         request_body[self.prompt_keyname] = prompt
+        if stream:
+            request_body["stream"] = True
 
         return request_body
 
-    def _handle_llm_response_body(self, response):
+    def _handle_llm_response_body(self, response, on_chunk=None):
         """Get the response body from the response"""
         d = defer.Deferred()
-        response.deliverBody(SimpleResponseReceiver(response.code, d))
+        content_type = (response.headers.getRawHeaders(b"content-type") or [b""])[0]
+        if on_chunk and response.code == 200 and content_type.startswith(b"text/event-stream"):
+            response.deliverBody(StreamingResponseReceiver(response.code, d, on_chunk))
+        else:
+            # also if we asked for a stream but the server doesn't support it
+            response.deliverBody(SimpleResponseReceiver(response.code, d))
         return d
 
     def _handle_llm_error(self, failure):
@@ -133,9 +338,16 @@ class LLMClient:
         failure.trap(Exception)
         return (500, failure.getErrorMessage())
 
-    def _get_response_from_llm_server(self, prompt):
+    def _get_request_key(self, prompt, stream=False):
+        """Identify the request, for coalescing identical ones"""
+        return (
+            self.hostname + self.pathname,
+            json.dumps(self._format_request_body(prompt, stream=stream), sort_keys=True),
+        )
+
+    def _get_response_from_llm_server(self, prompt, on_chunk=None):
         """Call the LLM server and handle the response/failure"""
-        request_body = self._format_request_body(prompt)
+        request_body = self._format_request_body(prompt, stream=bool(on_chunk))
 
         if settings.DEBUG:
             logger.log_info(f"LLM request body: {request_body}")
@@ -147,11 +359,15 @@ class LLMClient:
             bodyProducer=StringProducer(json.dumps(request_body)),
         )
 
-        d.addCallbacks(self._handle_llm_response_body, self._handle_llm_error)
+        d.addCallbacks(
+            self._handle_llm_response_body,
+            self._handle_llm_error,
+            callbackKeywords={"on_chunk": on_chunk},
+        )
         return d
 
     @inlineCallbacks
-    def get_response(self, prompt):
+    def get_response(self, prompt, on_chunk=None):
         """
         Get a response from the LLM server for the given npc.
 
@@ -159,17 +375,35 @@ class LLMClient:
             prompt (str or list): The prompt to send to the LLM server. If a list,
                 this is assumed to be the chat history so far, and will be added to the
                 prompt in a way suitable for the api.
+            on_chunk (callable, optional): If given and the `LLM_STREAM` setting is
+                set, ask the server to stream the response, and call this with each
+                sentence of it as it arrives, as `on_chunk(text)`. If the server does
+                not stream the response (or the same request was already running),
+                this is never called and the response is only returned.
 
         Returns:
             str: The generated text response. Will return an empty string
                 if there is an issue with the server, in which case the
                 the caller is expected to handle this gracefully.
 
+        Notes:
+            The request is queued in the client's `scheduler`, so it may have
+            to wait for other requests to the server to finish first. If the
+            same request is already queued or running, its response is reused.
+
         """
-        status_code, response = yield self._get_response_from_llm_server(prompt)
+        on_chunk = on_chunk if self.stream else None
+        status_code, response = yield self.scheduler.schedule(
+            self._get_request_key(prompt, stream=bool(on_chunk)),
+            lambda: self._get_response_from_llm_server(prompt, on_chunk=on_chunk),
+            requester=self,
+        )
         if status_code == 200:
             if settings.DEBUG:
                 logger.log_info(f"LLM response: {response}")
+            if isinstance(response, str):
+                # a streamed response, already put together
+                return response
             return json.loads(response)["results"][0]["text"]
         else:
             logger.log_err(f"LLM API error (status {status_code}): {response}")
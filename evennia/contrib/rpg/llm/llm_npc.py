@@ -5,11 +5,16 @@ It comes with a `talk` command; use `talk npc <something>` to talk to the NPC. T
 respond using the LLM response.
 
 Makes use of the LLMClient for communicating with the server. The NPC will also
-echo a 'thinking...' message if the LLM server takes too long to respond.
+echo a 'thinking...' message if the LLM server takes too long to respond. If the server
+streams its response, the NPC says it a sentence at a time as it arrives. Responses
+can be cached, so things said to the NPC over and over don't all have to go to the server.
 
 
 """
 
+import hashlib
+import re
+import time
 from collections import defaultdict
 from random import choice
 
@@ -41,6 +46,8 @@ class LLMNPC(DefaultCharacter):
     response_template = AttributeProperty(
         "$You() $conj(say) (to $You(character)): {response}", autocreate=False
     )
+    # used for the sentences after the first one of a streamed response
+    response_continue_template = AttributeProperty("{response}", autocreate=False)
     thinking_timeout = AttributeProperty(2, autocreate=False)  # seconds
     thinking_messages = AttributeProperty(
         [
@@ -55,6 +62,14 @@ class LLMNPC(DefaultCharacter):
     # this is a store of {character: [chat, chat, ...]}
     chat_memory = AttributeProperty(defaultdict(list))
 
+    # max number of responses to cache (0 to not cache), how long they are
+    # valid, in seconds (None for no limit) and if the cache is stored in the
+    # database, so it survives a reload. Off by default, since a cached response
+    # ignores who is talking and what was said before.
+    response_cache_size = AttributeProperty(0, autocreate=False)
+    response_cache_ttl = AttributeProperty(60 * 60, autocreate=False)
+    response_cache_persistent = AttributeProperty(False, autocreate=False)
+
     @property
     def llm_client(self):
         if not self.ndb.llm_client:
@@ -81,6 +96,89 @@ class LLMNPC(DefaultCharacter):
         memory = memory[-self.max_chat_memory_size :]
         self.chat_memory[character] = memory
 
+    def get_persona_key(self):
+        """
+        Get a key identifying the NPC's persona - what makes it respond the way
+        it does. The response cache is emptied if this changes.
+
+        Returns:
+            str: The persona key.
+
+        """
+        persona = (
+            self.llm_prompt_prefix,
+            self.key,
+            self.db.desc,
+            self.location.key if self.location else None,
+        )
+        return hashlib.md5(repr(persona).encode("utf-8")).hexdigest()
+
+    def get_response_cache_key(self, character, speech):
+        """
+        Get the key to cache the response to some speech under. By default this
+        is the speech with case, punctuation and extra whitespace removed, so
+        the NPC answers the same question the same way, no matter who asks or
+        what was said before.
+
+        Args:
+            character (Object): The one talking to the NPC.
+            speech (str): The latest speech from the character.
+
+        Returns:
+            str or None: The cache key, or `None` to not cache the response.
+
+        """
+        return " ".join(re.sub(r"[^\w\s]", " ", speech.lower()).split()) or None
+
+    def _get_response_cache(self):
+        """Get the response cache `{cache_key: (time, response)}`, for the current persona"""
+        storage = self.db if self.response_cache_persistent else self.ndb
+        persona_key = self.get_persona_key()
+        if storage.response_cache is None or storage.response_cache_persona != persona_key:
+            storage.response_cache = {}
+            storage.response_cache_persona = persona_key
+        return storage.response_cache
+
+    def get_cached_response(self, cache_key):
+        """
+        Get a cached response.
+
+        Args:
+            cache_key (str): The key from `get_response_cache_key`.
+
+        Returns:
+            str or None: The cached response, or `None` if there was none (or it expired).
+
+        """
+        if not self.response_cache_size or cache_key is None:
+            return None
+        response_cache = self._get_response_cache()
+        cached = response_cache.get(cache_key)
+        if cached:
+            timestamp, response = cached
+            ttl = self.response_cache_ttl
+            if ttl is None or time.time() - timestamp < ttl:
+                return response
+            del response_cache[cache_key]
+        return None
+
+    def cache_response(self, cache_key, response):
+        """
+        Cache a response. If the cache is full, the oldest response is forgotten.
+
+        Args:
+            cache_key (str): The key from `get_response_cache_key`.
+            response (str): The response to cache.
+
+        """
+        if not self.response_cache_size or cache_key is None:
+            return
+        response_cache = self._get_response_cache()
+        response_cache.pop(cache_key, None)
+        while len(response_cache) >= self.response_cache_size:
+            del response_cache[next(iter(response_cache))]
+        response_cache[cache_key] = (time.time(), response)
+
     def build_prompt(self, character, speech):
         """
         Build the prompt to send to the LLM server.
@@ -111,7 +209,32 @@ class LLMNPC(DefaultCharacter):
     def at_talked_to(self, speech, character):
         """Called when this NPC is talked to by a character."""
 
-        def _respond(response):
+        # sentences of a streamed response already told
+        streamed = []
+
+        def _say(response, template):
+            """Tell the character (and the room) the response"""
+            response = template.format(name=self.get_display_name(character), response=response)
+
+            if character.location:
+                character.location.msg_contents(
+                    response,
+                    mapping={"character": character},
+                    from_obj=self,
+                )
+            else:
+                # fallback if character is not in a location
+                character.msg(f"{self.get_display_name(character)} says, {response}")
+
+        def _respond_chunk(chunk):
+            """Tell the next sentence of a streamed response, as it arrives"""
+            if thinking_defer and not thinking_defer.called:
+                thinking_defer.cancel()
+
+            _say(chunk, self.response_continue_template if streamed else self.response_template)
+            streamed.append(chunk)
+
+        def _respond(response, cached=False):
             """Async handling of the server response"""
 
             if thinking_defer and not thinking_defer.called:
@@ -121,23 +244,14 @@ class LLMNPC(DefaultCharacter):
             if response:
                 # remember this response
                 self._add_to_memory(character, self, response)
+                if not cached:
+                    self.cache_response(cache_key, response)
             else:
                 response = "... I'm sorry, I was distracted. Can you repeat?"
 
-            response = self.response_template.format(
-                name=self.get_display_name(character), response=response
-            )
-
-            # tell the character about it
-            if character.location:
-                character.location.msg_contents(
-                    response,
-                    mapping={"character": character},
-                    from_obj=self,
-                )
-            else:
-                # fallback if character is not in a location
-                character.msg(f"{self.get_display_name(character)} says, {response}")
+            if not streamed:
+                # tell the character about it
+                _say(response, self.response_template)
 
         # if response takes too long, note that the NPC is thinking.
 
@@ -157,18 +271,26 @@ class LLMNPC(DefaultCharacter):
             """Suppress task-cancel errors only"""
             failure.trap(CancelledError)
 
+        # remember latest input in memory, so it's included in the prompt
+        self._add_to_memory(character, character, speech)
+
+        # respond right away if we already know what to say
+        cache_key = self.get_response_cache_key(character, speech)
+        response = self.get_cached_response(cache_key)
+        if response:
+            thinking_defer = None
+            _respond(response, cached=True)
+            return
+
         thinking_defer = task.deferLater(
             reactor, self.thinking_timeout, _echo_thinking_message
         ).addErrback(_handle_cancel_error)
 
-        # remember latest input in memory, so it's included in the prompt
-        self._add_to_memory(character, character, speech)
-
         # build the prompt
         prompt = self.build_prompt(character, speech)
 
-        # get the response from the LLM server
-        yield self.llm_client.get_response(prompt).addCallback(_respond)
+        # get the response from the LLM server, streamed if possible
+        yield self.llm_client.get_response(prompt, on_chunk=_respond_chunk).addCallback(_respond)
 
 
 class CmdLLMTalk(Command):
@@ -0,0 +1,143 @@
+"""
+A stand-in for an LLM server, for testing and benchmarking the LLMClient without a real LLM.
+
+It answers requests in the `text-generation-webui` format the LLMClient uses by default,
+echoing the end of the prompt back. Like a real LLM server it can only generate a few
+responses at a time (`capacity`), each taking `latency` seconds; other requests wait in
+line. It also counts the requests it gets and the most requests it had waiting.
+
+With `stream` set, requests asking for a stream (`"stream": true`) are answered with
+server-sent events in the OpenAI format, a word at a time spread out over the `latency`.
+
+It only needs Twisted, so it can be started in its own terminal with
+
+    python path/to/evennia/contrib/rpg/llm/llm_stub_server.py --port 5000 --latency 1 --capacity 1 --stream
+
+and point the `LLM_HOST` setting at it (`LLM_HOST = "http://127.0.0.1:5000"`). Or start
+it in the same process as the client, with `listen_stub_server`.
+
+"""
+
+import argparse
+import json
+from collections import deque
+
+from twisted.internet import reactor
+from twisted.web import resource, server
+
+
+class LLMStubResource(resource.Resource):
+    """
+    Answers every POST with a made-up response after a delay.
+
+    """
+
+    isLeaf = True
+
+    def __init__(self, latency=1.0, capacity=1, stream=False, clock=reactor):
+        """
+        Args:
+            latency (float, optional): Seconds to 'generate' each response.
+            capacity (int, optional): Number of responses to generate at a time.
+            stream (bool, optional): Stream the responses to requests asking for it.
+            clock (IReactorTime, optional): The clock to schedule the responses with.
+
+        """
+        super().__init__()
+        self.latency = latency
+        self.capacity = capacity
+        self.stream = stream
+        self.clock = clock
+        self.generating = 0
+        self.queue = deque()
+        self.num_requests = 0
+        self.max_queued = 0
+
+    def render_POST(self, request):
+        self.num_requests += 1
+        try:
+            body = json.loads(request.content.read())
+        except ValueError:
+            request.setResponseCode(400)
+            return b"Bad request body."
+        self.queue.append((request, body.get("prompt", ""), self.stream and body.get("stream")))
+        self.max_queued = max(self.max_queued, len(self.queue))
+        self._generate_queued()
+        return server.NOT_DONE_YET
+
+    def _generate_queued(self):
+        """Start generating queued responses while there is capacity."""
+        while self.queue and self.generating < self.capacity:
+            request, prompt, stream = self.queue.popleft()
+            self.generating += 1
+            last_line = prompt.rsplit("\n", 1)[-1]
+            text = f"You said '{last_line}'. That is interesting! Tell me more."
+            if stream:
+                request.setHeader(b"Content-Type", b"text/event-stream")
+                words = text.split(" ")
+                for iword, word in enumerate(words):
+                    token = word if iword == 0 else f" {word}"
+                    delay = self.latency * (iword + 1) / len(words)
+                    self.clock.callLater(delay, self._send_event, request, {"text": token})
+                self.clock.callLater(self.latency, self._finish, request, b"data: [DONE]\n\n")
+            else:
+                body = json.dumps({"results": [{"text": text}]}).encode("utf-8")
+                self.clock.callLater(self.latency, self._finish, request, body)
+
+    def _send_event(self, request, choice):
+        """Send one server-sent event of a streamed response."""
+        if not request._disconnected:
+            event = json.dumps({"choices": [choice]})
+            request.write(f"data: {event}\n\n".encode("utf-8"))
+
+    def _finish(self, request, data):
+        """Send the (rest of the) generated response."""
+        self.generating -= 1
+        if not request._disconnected:
+            if not request.responseHeaders.hasHeader(b"Content-Type"):
+                request.setHeader(b"Content-Type", b"application/json")
+            request.write(data)
+            request.finish()
+        self._generate_queued()
+
+
+def listen_stub_server(port=5000, interface="127.0.0.1", latency=1.0, capacity=1, stream=False):
+    """
+    Start the stub server on the running (or soon-to-be running) reactor.
+
+    Args:
+        port (int, optional): The port to listen to. Use 0 to pick a free one.
+        interface (str, optional): The interface to listen to.
+        latency (float, optional): Seconds to 'generate' each response.
+        capacity (int, optional): Number of responses to generate at a time.
+        stream (bool, optional): Stream the responses to requests asking for it.
+
+    Returns:
+        tuple: `(listening_port, stub_resource)`. Get the actual port with
+            `listening_port.getHost().port` and stop the server with
+            `listening_port.stopListening()`.
+
+    """
+    stub = LLMStubResource(latency=latency, capacity=capacity, stream=stream)
+    site = server.Site(stub)
+    site.noisy = False
+    return reactor.listenTCP(port, site, interface=interface), stub
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stand-in LLM server.")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--interface", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per response")
+    parser.add_argument("--capacity", type=int, default=1, help="responses generated at a time")
+    parser.add_argument("--stream", action="store_true", help="stream responses if asked to")
+    args = parser.parse_args()
+    listen_stub_server(
+        port=args.port,
+        interface=args.interface,
+        latency=args.latency,
+        capacity=args.capacity,
+        stream=args.stream,
+    )
+    print(f"LLM stub server listening on http://{args.interface}:{args.port}")
+    reactor.run()
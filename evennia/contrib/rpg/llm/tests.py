@@ -3,13 +3,18 @@ Unit tests for the LLM Client and npc.
 
 """
 
+from time import time
+
 from anything import Something
 from django.test import override_settings
 from mock import Mock, patch
+from twisted.internet import defer
+from twisted.web.http_headers import Headers
 
 from evennia.utils.create import create_object
 from evennia.utils.test_resources import BaseEvenniaTestCase
 
+from .llm_client import LLMClient, LLMRequestScheduler, SimpleResponseReceiver
 from .llm_npc import LLMNPC
 
 
@@ -40,4 +45,182 @@ class TestLLMClient(BaseEvenniaTestCase):
         self.npc.at_talked_to("Hello", self.npc)
 
         mock_deferLater.assert_called_with(Something, self.npc.thinking_timeout, Something)
-        mock_LLMClient.get_response.assert_called_with("You are a test bot.\nTest NPC: Hello")
+        mock_LLMClient.get_response.assert_called_with(
+            "You are a test bot.\nTest NPC: Hello", on_chunk=Something
+        )
+
+    @patch("evennia.contrib.rpg.llm.llm_npc.task.deferLater")
+    def test_npc_response_cache(self, mock_deferLater):
+        """
+        Test that the npc caches its responses.
+        """
+        mock_LLMClient = Mock()
+        mock_LLMClient.get_response.side_effect = lambda *args, **kwargs: defer.succeed("Hi there!")
+        self.npc.ndb.llm_client = mock_LLMClient
+        self.npc.msg = Mock()
+
+        # off by default
+        self.npc.at_talked_to("Hello!", self.npc)
+        self.npc.at_talked_to("Hello!", self.npc)
+        self.assertEqual(mock_LLMClient.get_response.call_count, 2)
+        mock_LLMClient.get_response.reset_mock()
+        self.npc.msg.reset_mock()
+
+        self.npc.response_cache_size = 100
+        self.npc.at_talked_to("Hello!", self.npc)
+        self.npc.at_talked_to("  hello ", self.npc)
+        self.assertEqual(mock_LLMClient.get_response.call_count, 1)
+        self.assertEqual(self.npc.msg.call_count, 2)
+        self.assertEqual(self.npc.chat_memory[self.npc][-1], "Test NPC: Hi there!")
+
+        # expired
+        with patch("evennia.contrib.rpg.llm.llm_npc.time.time", return_value=time() + 3601):
+            self.npc.at_talked_to("Hello", self.npc)
+        self.assertEqual(mock_LLMClient.get_response.call_count, 2)
+
+        # changing the persona empties the cache
+        self.npc.db.desc = "grumpy old man"
+        self.npc.at_talked_to("Hello", self.npc)
+        self.assertEqual(mock_LLMClient.get_response.call_count, 3)
+
+    @patch("evennia.contrib.rpg.llm.llm_npc.task.deferLater")
+    def test_npc_streamed_response(self, mock_deferLater):
+        """
+        Test that the npc says a streamed response as it arrives.
+        """
+
+        def _get_response(prompt, on_chunk=None):
+            on_chunk("Hi there!")
+            on_chunk("How are you?")
+            return defer.succeed("Hi there! How are you?")
+
+        mock_LLMClient = Mock()
+        mock_LLMClient.get_response.side_effect = _get_response
+        self.npc.ndb.llm_client = mock_LLMClient
+        self.npc.msg = Mock()
+
+        self.npc.at_talked_to("Hello", self.npc)
+        self.assertEqual(
+            [call.args[0] for call in self.npc.msg.call_args_list],
+            [
+                "Test NPC says, $You() $conj(say) (to $You(character)): Hi there!",
+                "Test NPC says, How are you?",
+            ],
+        )
+        self.assertEqual(self.npc.chat_memory[self.npc][-1], "Test NPC: Hi there! How are you?")
+
+    def test_npc_response_cache__size(self):
+        """
+        Test that the response cache is bounded and can be persistent.
+        """
+        self.npc.response_cache_size = 2
+        self.npc.response_cache_persistent = True
+        for speech in ("one", "two", "three"):
+            self.npc.cache_response(speech, speech.upper())
+        self.assertIsNone(self.npc.get_cached_response("one"))
+        self.assertEqual(self.npc.get_cached_response("three"), "THREE")
+
+        self.npc.ndb.response_cache = None
+        self.assertEqual(self.npc.get_cached_response("two"), "TWO")
+        self.assertEqual(len(self.npc.db.response_cache), 2)
+
+        self.npc.response_cache_size = 0
+        self.assertIsNone(self.npc.get_cached_response("two"))
+
+
+class TestLLMRequestScheduler(BaseEvenniaTestCase):
+    """
+    Test the scheduling of requests to the LLM server.
+
+    """
+
+    def setUp(self):
+        self.scheduler = LLMRequestScheduler(max_concurrent_requests=2)
+        self.started = []
+        self.requests = {}
+
+    def _request(self, key):
+        def _request_func():
+            self.started.append(key)
+            self.requests[key] = defer.Deferred()
+            return self.requests[key]
+
+        return _request_func
+
+    def test_max_concurrent_requests(self):
+        results = [self.scheduler.schedule(key, self._request(key)) for key in "abc"]
+        self.assertEqual(self.started, ["a", "b"])
+        self.assertEqual(self.scheduler.running, 2)
+
+        self.requests["a"].callback("response a")
+        self.assertEqual(results[0].result, "response a")
+        self.assertEqual(self.started, ["a", "b", "c"])
+
+        self.requests["b"].errback(RuntimeError("bad request"))
+        self.assertRaises(RuntimeError, results[1].result.raiseException)
+        results[1].addErrback(lambda failure: None)
+        self.requests["c"].callback("response c")
+        self.assertEqual((self.scheduler.running, len(self.scheduler)), (0, 0))
+
+    def test_requesters_take_turns(self):
+        for key in ("a1", "a2", "a3", "a4"):
+            self.scheduler.schedule(key, self._request(key), requester="a")
+        for key in ("b1", "b2"):
+            self.scheduler.schedule(key, self._request(key), requester="b")
+        for key in ("a1", "a2", "b1", "a3", "b2"):
+            self.requests[key].callback(key)
+        self.assertEqual(self.started, ["a1", "a2", "b1", "a3", "b2", "a4"])
+
+    def test_coalesce_identical_requests(self):
+        results = [
+            self.scheduler.schedule(key, self._request(key), requester=requester)
+            for key, requester in (("a", 1), ("b", 2), ("c", 3), ("c", 4), ("a", 5))
+        ]
+        self.assertEqual(len(self.scheduler), 3)
+        self.requests["a"].callback("response a")
+        self.requests["c"].callback("response c")
+        self.assertEqual(self.started, ["a", "b", "c"])
+        self.assertEqual(
+            [result.result for result in results if result.called],
+            ["response a", "response c", "response c", "response a"],
+        )
+
+    @override_settings(LLM_STREAM=True)
+    def test_client_streamed_response(self):
+        client = LLMClient(scheduler=self.scheduler)
+        chunks = []
+        response = Mock(code=200, headers=Headers({"Content-Type": ["text/event-stream"]}))
+        result = client._handle_llm_response_body(response, on_chunk=chunks.append)
+        receiver = response.deliverBody.call_args[0][0]
+
+        for data in (
+            b'data: {"choices": [{"text": "Hello"}]}\n\ndata: {"choices": [{"te',
+            b'xt": " there!"}]}\n\ndata: {"choices": [{"delta": {"content": " How"}}]}\n\n',
+            b'data: {"token": {"text": " are you?"}}\r\n\r\ndata: {"choices": [{"text": " Fin',
+        ):
+            receiver.dataReceived(data)
+        self.assertEqual(chunks, ["Hello there!"])
+        receiver.dataReceived(b'e."}]}\n\ndata: [DONE]\n\n')
+        receiver.connectionLost()
+        self.assertEqual(chunks, ["Hello there!", "How are you?", "Fine."])
+        self.assertEqual(result.result, (200, "Hello there! How are you? Fine."))
+
+        # a server not streaming its response
+        response = Mock(code=200, headers=Headers({"Content-Type": ["application/json"]}))
+        client._handle_llm_response_body(response, on_chunk=chunks.append)
+        self.assertIsInstance(response.deliverBody.call_args[0][0], SimpleResponseReceiver)
+
+    @patch("evennia.contrib.rpg.llm.llm_client.LLMClient._get_response_from_llm_server")
+    def test_client_get_response(self, mock_get_response):
+        server_response = defer.Deferred()
+        mock_get_response.return_value = server_response
+        client1 = LLMClient(scheduler=self.scheduler)
+        client2 = LLMClient(scheduler=self.scheduler)
+
+        response1 = client1.get_response("Hello!")
+        response2 = client2.get_response("Hello!")
+        server_response.callback((200, b'{"results": [{"text": "Hi there!"}]}'))
+
+        mock_get_response.assert_called_once_with("Hello!", on_chunk=None)
+        self.assertEqual(response1.result, "Hi there!")
+        self.assertEqual(response2.result, "Hi there!")
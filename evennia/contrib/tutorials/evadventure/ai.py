@@ -11,6 +11,11 @@ switching to the next state when the conditions are met.
 The AIMixin class is a mixin that can be added to any object that needs AI. It provides the `.ai`
 reference to the AIHandler and a few basic `ai_*` methods for basic AI behaviour.
 
+The AIScheduler is a global Script that ticks the AI of all started NPCs, a batch at a time.
+Since no one will notice what an NPC does far away from any player, NPCs in rooms with no
+puppeted character nearby are only ticked now and then (or not at all). They catch up on
+(some of) the ticks they missed when someone comes close again.
+
 
 Example usage:
 
@@ -29,13 +34,20 @@ mob.ai.set_state("roam")
 # tick the ai whenever needed
 mob.ai.run()
 
+# or let the AIScheduler tick it regularly
+mob.ai.start()
+
 ```
 
 """
 
 import random
 
+import evennia
+from evennia.scripts.scripts import DefaultScript
+from evennia.utils.create import create_script
 from evennia.utils.logger import log_trace
+from evennia.utils.search import search_script
 from evennia.utils.utils import lazy_property
 
 from .enums import Ability
@@ -47,11 +59,16 @@ class AIHandler:
     attribute_name = "ai_state"
     attribute_category = "ai_state"
 
+    # max number of missed ticks to catch up on when observed again
+    max_catch_up_ticks = 5
+
     def __init__(self, obj):
         self.obj = obj
         self.ai_state = obj.attributes.get(
             self.attribute_name, category=self.attribute_category, default="idle"
         )
+        # ticks skipped by the AIScheduler while no one was around (not persistent)
+        self.missed_ticks = 0
 
     def set_state(self, state):
         self.ai_state = state
@@ -112,6 +129,177 @@ class AIHandler:
         except Exception:
             log_trace(f"AI error in {self.obj.name} (running state: {state})")
 
+    def catch_up(self):
+        """
+        Run the ticks missed while no one was around, up to `max_catch_up_ticks`.
+
+        """
+        nticks, self.missed_ticks = min(self.missed_ticks, self.max_catch_up_ticks), 0
+        for _ in range(nticks):
+            self.run()
+
+    def start(self):
+        """
+        Let the AIScheduler tick this AI regularly.
+
+        """
+        get_ai_scheduler().add(self.obj)
+
+    def stop(self):
+        """
+        Stop the AIScheduler from ticking this AI.
+
+        """
+        get_ai_scheduler().remove(self.obj)
+
+
+class AIScheduler(DefaultScript):
+    """
+    Global Script ticking the AI of all started objects (see `AIHandler.start`).
+
+    The objects are split into `num_batches` batches, and the Script ticks one
+    batch at a time, so each object is ticked every `ai_tick_interval` seconds
+    without them all being ticked at once.
+
+    Objects in rooms close (within `interest_distance` exits) to a room with a
+    puppeted character are always ticked. Others only every `unobserved_tick_rate`
+    ticks, or never if it is 0. When such an object is close to a player again,
+    it first catches up on (some of) the ticks it missed.
+
+    """
+
+    # seconds between two ticks of the same object
+    ai_tick_interval = 5
+    # the objects are ticked in this many batches, spread over `ai_tick_interval`
+    num_batches = 5
+    # how many exits away from a puppeted character objects are always ticked
+    interest_distance = 1
+    # objects farther away are only ticked every this many ticks (0 to not tick them)
+    unobserved_tick_rate = 10
+
+    def at_script_creation(self):
+        self.key = "evadventure_ai_scheduler"
+        self.desc = "Ticks the AI of NPCs"
+        self.interval = self.ai_tick_interval / self.num_batches
+        self.persistent = True
+        self.db.objects = []
+
+    def get_objects(self):
+        """
+        Get the objects whose AI is ticked. These are stored in an Attribute but
+        kept in memory, to not have to load them from it every tick.
+
+        Returns:
+            list: The objects, in the order they were added.
+
+        """
+        if self.ndb.objects is None:
+            self.ndb.objects = [obj for obj in self.db.objects or [] if obj and obj.pk]
+        return self.ndb.objects
+
+    def add(self, obj):
+        """
+        Start ticking the AI of an object.
+
+        Args:
+            obj (Object): An object with an `.ai` AIHandler.
+
+        """
+        objects = self.get_objects()
+        if obj not in objects:
+            objects.append(obj)
+            self.db.objects = objects
+
+    def remove(self, obj):
+        """
+        Stop ticking the AI of an object.
+
+        Args:
+            obj (Object): An object added with `add`.
+
+        """
+        objects = self.get_objects()
+        if obj in objects:
+            objects.remove(obj)
+            self.db.objects = objects
+
+    def get_puppet_locations(self):
+        """
+        Get the rooms where there are puppeted characters.
+
+        Returns:
+            set: The locations of all puppets.
+
+        """
+        return {
+            session.puppet.location
+            for session in evennia.SESSION_HANDLER.get_sessions()
+            if session.puppet and session.puppet.location
+        }
+
+    def get_observed_rooms(self):
+        """
+        Get the rooms in which the AI is ticked every time; those within
+        `interest_distance` exits of a puppeted character.
+
+        Returns:
+            set: The observed rooms.
+
+        """
+        observed = set(self.get_puppet_locations())
+        edge = observed
+        for _ in range(self.interest_distance):
+            edge = {
+                exi.destination
+                for room in edge
+                for exi in room.exits
+                if exi.destination and exi.destination not in observed
+            }
+            observed |= edge
+        return observed
+
+    def at_repeat(self, **kwargs):
+        """
+        Tick the next batch of objects.
+
+        """
+        ibatch = self.ndb.next_batch or 0
+        self.ndb.next_batch = (ibatch + 1) % self.num_batches
+
+        objects = self.get_objects()
+        if not all(obj.pk for obj in objects):
+            # forget deleted objects
+            objects = self.ndb.objects = self.db.objects = [obj for obj in objects if obj.pk]
+        batch = objects[ibatch :: self.num_batches]
+        if not batch:
+            return
+        observed_rooms = self.get_observed_rooms()
+
+        for obj in batch:
+            ai = obj.ai
+            if obj.location in observed_rooms:
+                ai.catch_up()
+                ai.run()
+            elif self.unobserved_tick_rate and ai.missed_ticks + 1 >= self.unobserved_tick_rate:
+                ai.missed_ticks = 0
+                ai.run()
+            else:
+                ai.missed_ticks += 1
+
+
+def get_ai_scheduler():
+    """
+    Get the global AIScheduler, creating it if it doesn't exist.
+
+    Returns:
+        AIScheduler: The scheduler.
+
+    """
+    schedulers = search_script("evadventure_ai_scheduler", typeclass=AIScheduler)
+    if schedulers:
+        return schedulers[0]
+    return create_script(AIScheduler, key="evadventure_ai_scheduler")
+
 
 class AIMixin:
     """
@@ -8,6 +8,7 @@ from unittest.mock import Mock, patch
 from evennia import create_object
 from evennia.utils.test_resources import BaseEvenniaTest
 
+from ..ai import get_ai_scheduler
 from ..characters import EvAdventureCharacter
 from ..npcs import EvAdventureMob
 
@@ -46,3 +47,49 @@ class TestAI(BaseEvenniaTest):
 
         self.npc.ai.run()
         self.assertEqual(self.npc.ai.get_state(), "combat")
+
+    def test_ai_scheduler(self):
+        scheduler = get_ai_scheduler()
+        self.addCleanup(scheduler.delete)
+        self.assertEqual(get_ai_scheduler(), scheduler)
+        self.npc.ai.start()
+        self.assertEqual(scheduler.db.objects, [self.npc])
+
+        def _tick_round(puppet_location):
+            with patch.object(scheduler, "get_puppet_locations", return_value={puppet_location}):
+                for _ in range(scheduler.num_batches):
+                    scheduler.at_repeat()
+
+        with patch.object(self.npc.ai, "run") as mock_run:
+            # a player is in the next room
+            _tick_round(self.room1)
+            self.assertEqual(mock_run.call_count, 1)
+
+            # no one around (the exit only goes from room1 to room2)
+            for _ in range(3):
+                _tick_round(self.room2)
+            self.assertEqual(mock_run.call_count, 1)
+            self.assertEqual(self.npc.ai.missed_ticks, 3)
+            scheduler.unobserved_tick_rate = 4
+            _tick_round(self.room2)
+            self.assertEqual(mock_run.call_count, 2)
+            self.assertEqual(self.npc.ai.missed_ticks, 0)
+
+            # suspended until someone is around again, then catching up
+            scheduler.unobserved_tick_rate = 0
+            for _ in range(10):
+                _tick_round(self.room2)
+            self.assertEqual(mock_run.call_count, 2)
+            _tick_round(self.room1)
+            self.assertEqual(mock_run.call_count, 3 + self.npc.ai.max_catch_up_ticks)
+
+        self.npc.ai.stop()
+        self.assertEqual(scheduler.db.objects, [])
+
+    def test_ai_scheduler_observed_rooms(self):
+        scheduler = get_ai_scheduler()
+        self.addCleanup(scheduler.delete)
+        with patch.object(scheduler, "get_puppet_locations", return_value={self.room1}):
+            self.assertEqual(scheduler.get_observed_rooms(), {self.room1, self.room2})
+            scheduler.interest_distance = 0
+            self.assertEqual(scheduler.get_observed_rooms(), {self.room1})
@@ -8,9 +8,12 @@ from unittest import mock
 
 from parameterized import parameterized
 
+from evennia.commands.command import Command
 from evennia.help import filehelp
 from evennia.help import utils as help_utils
-from evennia.utils.test_resources import TestCase
+from evennia.help.models import HelpEntry
+from evennia.utils import create
+from evennia.utils.test_resources import BaseEvenniaTest, TestCase
 from evennia.utils.utils import dedent
 
 
@@ -195,3 +198,70 @@ class HelpUtils(TestCase):
         entries, _ = help_utils.help_search_with_index(search_term, self.candidate_entries)
 
         self.assertEqual(entries, expected_entry, error_msg)
+
+
+class TestHelpIndexCache(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.cache = help_utils.HelpIndexCache()
+
+    def test_get_index(self):
+        fields = [{"field_name": "key", "boost": 10}]
+        documents = [{"key": "foo"}, {"key": "bar"}]
+        with mock.patch.object(
+            help_utils.LunrSearch, "index", autospec=True, side_effect=help_utils.LunrSearch.index
+        ) as mock_index:
+            index = self.cache.get_index(fields, documents)
+            self.assertIs(self.cache.get_index(fields, list(reversed(documents))), index)
+            self.assertEqual(mock_index.call_count, 1)
+            # other documents or fields give another index
+            self.assertIsNot(self.cache.get_index(fields, documents[:1]), index)
+            self.assertIsNot(self.cache.get_index([{"field_name": "key"}], documents), index)
+            self.assertEqual(mock_index.call_count, 3)
+        self.assertEqual(index.search("foo")[0]["ref"], "foo")
+
+    def test_db_entries(self):
+        entry = create.create_help_entry("indextopic", "Index text", aliases=["idx"])
+        self.assertIn(entry, self.cache.get_db_entries())
+        search_entry = self.cache.get_search_entry(entry)
+        self.assertEqual(search_entry["aliases"], "idx")
+        self.assertIs(self.cache.get_search_entry(entry), search_entry)
+
+        entry.aliases.add("indx")
+        search_entry = self.cache.get_search_entry(entry)
+        self.assertEqual(search_entry["aliases"], "idx indx")
+        entry.key = "indextopic2"
+        self.assertEqual(self.cache.get_search_entry(entry)["key"], "indextopic2")
+
+        entry.delete()
+        self.assertNotIn(entry, self.cache.get_db_entries())
+        self.assertFalse(HelpEntry.objects.filter(db_key="indextopic2").exists())
+
+    def test_can_cache_access(self):
+        class CmdPerm(Command):
+            key = "permcmd"
+            locks = "cmd:perm(Builder);read:all()"
+
+        class CmdAttr(Command):
+            key = "attrcmd"
+            locks = "cmd:attr(is_builder)"
+
+        class CmdCustomAccess(CmdPerm):
+            def access(self, srcobj, access_type="cmd", default=False):
+                return True
+
+        self.assertTrue(self.cache.can_cache_access(CmdPerm()))
+        self.assertFalse(self.cache.can_cache_access(CmdAttr()))
+        self.assertFalse(self.cache.can_cache_access(CmdCustomAccess()))
+        entry = create.create_help_entry("locktopic", "Text", locks="read:pperm(Admin)")
+        self.assertTrue(self.cache.can_cache_access(entry))
+        entry.locks.add("view:id(1)")
+        self.assertFalse(self.cache.can_cache_access(entry))
+
+    def test_get_access_key(self):
+        key = self.cache.get_access_key(self.char2)
+        self.assertEqual(self.cache.get_access_key(self.char2), key)
+        self.account2.permissions.add("Admin")
+        self.assertNotEqual(self.cache.get_access_key(self.char2), key)
+        self.assertNotEqual(self.cache.get_access_key(self.account2), key)
+        self.assertIsNone(self.cache.get_access_key(None))
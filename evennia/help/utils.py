@@ -7,16 +7,44 @@ This is used primarily by the default `help` command.
 """
 
 import re
+from collections import OrderedDict
 
 from django.conf import settings
 from lunr.stemmer import stemmer
 
+from evennia.utils.utils import inherits_from
+
 _RE_HELP_SUBTOPICS_START = re.compile(r"^\s*?#\s*?subtopics\s*?$", re.I + re.M)
 _RE_HELP_SUBTOPIC_SPLIT = re.compile(r"^\s*?(\#{2,6}\s*?\w+?[a-z0-9 \-\?!,\.]*?)$", re.M + re.I)
 _RE_HELP_SUBTOPIC_PARSE = re.compile(r"^(?P<nesting>\#{2,6})\s*?(?P<name>.*?)$", re.I + re.M)
 
 MAX_SUBTOPIC_NESTING = 5
 
+# how many built search indexes and collections of help topics to keep in memory
+_MAX_CACHED_INDEXES = 32
+_MAX_CACHED_TOPICS = 256
+
+# lock functions whose result only depends on the accessing object's
+# permissions (and superuser/quell status) or on the game settings, so their
+# result can be reused for everyone with the same permissions.
+_CACHEABLE_LOCKFUNCS = (
+    "all",
+    "true",
+    "false",
+    "none",
+    "superuser",
+    "perm",
+    "perm_above",
+    "pperm",
+    "pperm_above",
+    "serversetting",
+)
+_RE_LOCKFUNC = re.compile(r"(\w+)\s*?\(")
+
+_HELP_ENTRY = None
+_FILE_HELP_ENTRY = None
+_COMMAND = None
+
 
 def wildcard_stemmer(token, i, tokens):
     """
@@ -133,6 +161,285 @@ class LunrSearch:
         return self.lunr(ref, fields, documents, builder=builder)
 
 
+class HelpIndexCache:
+    """
+    Cache for searching and listing help topics, used by
+    `help_search_with_index` and the default `help` command.
+
+    - Built search indexes are kept (least-recently-used are dropped first)
+      and reused whenever the same set of search entries is searched again.
+      Since the searchable topics depend on the caller's cmdset and
+      permissions, this ends up being one index per distinct cmdset and
+      permission set in use.
+    - All database help entries and their search entries are kept in memory.
+      Saving or deleting a `HelpEntry` (or changing its aliases or tags)
+      updates them, which makes the next search build a new index. They are
+      reloaded if the idmapper cache is flushed.
+    - The help command stores the topics a caller may access, keyed on the
+      caller's permissions (see `get_access_key`). This is only done for
+      topics whose locks only check permissions or settings (see
+      `can_cache_access`); other topics are checked on every call.
+
+    Everything is dropped on a hot reload or when settings are changed (like
+    by `override_settings` in tests). Call `clear()` after changing
+    help entries in ways that don't send Django signals (like
+    `QuerySet.update`).
+
+    """
+
+    def __init__(self, max_indexes=_MAX_CACHED_INDEXES, max_topics=_MAX_CACHED_TOPICS):
+        self.max_indexes = max_indexes
+        self.max_topics = max_topics
+        self.version = 0
+        self._connected = False
+        self._indexes = OrderedDict()
+        self._topics = OrderedDict()
+        self._cacheable_locks = {}
+        self._instance_cache = None
+        self._db_entries = None
+        self._db_search_entries = {}
+        self._file_search_entries = {}
+
+    def _connect(self):
+        """
+        Start listening for changes to help entries, and for hot reloads.
+
+        """
+        global _HELP_ENTRY, _FILE_HELP_ENTRY, _COMMAND
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from django.test.signals import setting_changed
+
+        from evennia.commands.command import Command
+        from evennia.help.filehelp import FileHelpEntry
+        from evennia.help.models import HelpEntry
+        from evennia.server.signals import SIGNAL_SERVER_POST_HOT_RELOAD
+
+        _HELP_ENTRY, _FILE_HELP_ENTRY, _COMMAND = HelpEntry, FileHelpEntry, Command
+        post_save.connect(self._at_help_entry_change, sender=HelpEntry, weak=False)
+        post_delete.connect(self._at_help_entry_change, sender=HelpEntry, weak=False)
+        m2m_changed.connect(
+            self._at_help_entry_change, sender=HelpEntry.db_tags.through, weak=False
+        )
+        SIGNAL_SERVER_POST_HOT_RELOAD.connect(self.clear, weak=False)
+        # `serversetting` locks depend on the settings
+        setting_changed.connect(self.clear, weak=False)
+        self._connected = True
+
+    def _at_help_entry_change(self, sender, instance, **kwargs):
+        """
+        Signal handler called when a help entry was saved or deleted, or its
+        aliases/tags changed.
+
+        """
+        if isinstance(instance, _HELP_ENTRY):
+            self._db_search_entries.pop(instance.id, None)
+        else:
+            # a change from the tag-side of the relation
+            self._db_search_entries = {}
+        self._db_entries = None
+        self._topics.clear()
+        self.version += 1
+
+    def clear(self, **kwargs):
+        """
+        Drop everything cached.
+
+        """
+        self._indexes.clear()
+        self._topics.clear()
+        self._cacheable_locks = {}
+        self._instance_cache = None
+        self._db_entries = None
+        self._db_search_entries = {}
+        self._file_search_entries = {}
+        self.version += 1
+
+    def get_db_entries(self):
+        """
+        Get all database help entries.
+
+        Returns:
+            list: All `HelpEntry` instances. This must not be modified.
+
+        """
+        if not self._connected:
+            self._connect()
+        instance_cache = _HELP_ENTRY.__dbclass__.__instance_cache__
+        if instance_cache is not self._instance_cache:
+            # the idmapper cache was flushed - our instances may be outdated
+            self.clear()
+            self._instance_cache = instance_cache
+        if self._db_entries is None:
+            self._db_entries = list(_HELP_ENTRY.objects.all())
+        return self._db_entries
+
+    def get_search_entry(self, candidate):
+        """
+        Get the search entry of a help candidate. The entries of database and
+        file help entries are cached, so the same entry is returned as long as
+        it has not changed.
+
+        Args:
+            candidate (any): An entity with a `.search_index_entry` property.
+
+        Returns:
+            dict: The search entry. This must not be modified.
+
+        """
+        if not self._connected:
+            self._connect()
+
+        if isinstance(candidate, _HELP_ENTRY) and candidate.id:
+            entry = self._db_search_entries.get(candidate.id)
+            if entry is None:
+                entry = self._db_search_entries[candidate.id] = candidate.search_index_entry
+            return entry
+        if isinstance(candidate, _FILE_HELP_ENTRY):
+            # file help entries don't change, but are not hashable by identity
+            cached = self._file_search_entries.get(id(candidate))
+            if cached is None or cached[0] is not candidate:
+                cached = self._file_search_entries[id(candidate)] = (
+                    candidate,
+                    candidate.search_index_entry,
+                )
+            return cached[1]
+        return candidate.search_index_entry
+
+    def get_index(self, fields, documents):
+        """
+        Get a Lunr search index for the given documents, building it only if
+        the same documents were not indexed before.
+
+        Args:
+            fields (list): The Lunr field mappings ``{"field_name": str, "boost": int}``.
+            documents (list): The search entries to index. These are compared
+                by identity, so they should not be modified after being indexed.
+
+        Returns:
+            lunr.Index: The search index.
+
+        """
+        key = (
+            tuple((field["field_name"], field.get("boost", 1)) for field in fields),
+            frozenset(map(id, documents)),
+        )
+        cached = self._indexes.get(key)
+        if cached:
+            self._indexes.move_to_end(key)
+            return cached[1]
+        index = LunrSearch().index(ref="key", fields=fields, documents=documents)
+        # we store the documents too, so their ids can't be reused while we are cached
+        self._indexes[key] = (documents, index)
+        if len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+        return index
+
+    def get_access_key(self, caller):
+        """
+        Get a key describing everything a permission-only lock (see
+        `can_cache_access`) checks on the caller.
+
+        Args:
+            caller (Object or Account): The one accessing help topics.
+
+        Returns:
+            tuple or None: The key, or `None` if the caller's access can't be cached.
+
+        """
+        try:
+            bypass = caller.locks.lock_bypass
+            perms = tuple(sorted(caller.permissions.all()))
+        except AttributeError:
+            return None
+        if not inherits_from(caller, "evennia.objects.objects.DefaultObject"):
+            return (bypass, perms)
+        account = caller.account
+        if not account:
+            return (bypass, perms, None)
+        return (
+            bypass,
+            perms,
+            tuple(sorted(account.permissions.all())),
+            bool(account.attributes.get("_quell")),
+            account.is_superuser,
+        )
+
+    def can_cache_access(self, topic):
+        """
+        Check if access to a topic can be cached per access key. This is true
+        for commands and help entries (with their default `access` methods)
+        whose locks only use lock functions checking permissions or settings.
+
+        Args:
+            topic (Command, HelpEntry or FileHelpEntry): The topic to check.
+
+        Returns:
+            bool: If the result of checking the topic's locks only depends on
+                the caller's access key.
+
+        """
+        if not self._connected:
+            self._connect()
+
+        if isinstance(topic, _COMMAND):
+            if type(topic).access is not _COMMAND.access:
+                return False
+            lockstring = topic.lock_storage
+        elif type(topic) in (_HELP_ENTRY, _FILE_HELP_ENTRY):
+            lockstring = topic.db_lock_storage if type(topic) is _HELP_ENTRY else topic.lock_storage
+        else:
+            return False
+
+        cacheable = self._cacheable_locks.get(lockstring)
+        if cacheable is None:
+            from evennia.locks import lockfuncs
+            from evennia.locks.lockhandler import get_all_lockfuncs
+
+            all_lockfuncs = get_all_lockfuncs()
+            cacheable = self._cacheable_locks[lockstring] = all(
+                funcname in _CACHEABLE_LOCKFUNCS
+                and all_lockfuncs.get(funcname) is getattr(lockfuncs, funcname)
+                for funcname in _RE_LOCKFUNC.findall(lockstring or "")
+            )
+        return cacheable
+
+    def get_topics(self, key):
+        """
+        Get topics stored with `add_topics`.
+
+        Args:
+            key (tuple): The key the topics were stored with.
+
+        Returns:
+            any: The stored topics, or `None`.
+
+        """
+        cached = self._topics.get(key)
+        if cached:
+            self._topics.move_to_end(key)
+            return cached[1]
+        return None
+
+    def add_topics(self, key, topics, sources=()):
+        """
+        Store topics available to a caller.
+
+        Args:
+            key (tuple): The key to store with. This should include the
+                access key of the caller and the ids of all `sources`.
+            topics (any): The topics to store.
+            sources (iterable, optional): Objects the topics were collected
+                from. These are kept so their ids can't be reused while cached.
+
+        """
+        self._topics[key] = (sources, topics)
+        if len(self._topics) > self.max_topics:
+            self._topics.popitem(last=False)
+
+
+HELP_INDEX_CACHE = HelpIndexCache()
+
+
 def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields=None):
     """
     Lunr-powered fast index search and suggestion wrapper. See https://lunrjs.com/.
@@ -152,10 +459,14 @@ def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields
         tuple: A tuple (matches, suggestions), each a list, where the `suggestion_maxnum` limits
             how many suggestions are included.
 
+    Notes:
+        The search index is cached in `HELP_INDEX_CACHE` and only built again if
+        the search entries of the candidates change.
+
     """
     from lunr.exceptions import QueryParseError
 
-    indx = [cnd.search_index_entry for cnd in candidate_entries]
+    indx = [HELP_INDEX_CACHE.get_search_entry(cnd) for cnd in candidate_entries]
     mapping = {indx[ix]["key"]: cand for ix, cand in enumerate(candidate_entries)}
 
     if not fields:
@@ -166,9 +477,7 @@ def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields
             {"field_name": "tags", "boost": 5},
         ]
 
-    lunr_search = LunrSearch()
-
-    search_index = lunr_search.index(ref="key", fields=fields, documents=indx)
+    search_index = HELP_INDEX_CACHE.get_index(fields, indx)
 
     try:
         matches = search_index.search(query)[:suggestion_maxnum]
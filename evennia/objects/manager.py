@@ -312,8 +312,7 @@ class ObjectDBManager(TypedObjectManager):
                         & type_restriction
                         & (
                             Q(db_key__iexact=ostring)
-                            | Q(db_tags__db_key__iexact=ostring)
-                            & Q(db_tags__db_tagtype__iexact="alias")
+                            | Q(db_tags__db_key=ostring.lower()) & Q(db_tags__db_tagtype="alias")
                         )
                     )
                 )
@@ -332,8 +331,7 @@ class ObjectDBManager(TypedObjectManager):
                     & type_restriction
                     & (
                         Q(db_key__iregex=search_regex)
-                        | Q(db_tags__db_key__iregex=search_regex)
-                        & Q(db_tags__db_tagtype__iexact="alias")
+                        | Q(db_tags__db_key__iregex=search_regex) & Q(db_tags__db_tagtype="alias")
                     )
                 )
             )
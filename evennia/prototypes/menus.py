@@ -471,9 +471,7 @@ def _search_object(caller):
             results = caller.search_account(searchstring, quiet=True)
     else:
         keyquery = Q(db_key__istartswith=searchstring)
-        aliasquery = Q(
-            db_tags__db_key__istartswith=searchstring, db_tags__db_tagtype__iexact="alias"
-        )
+        aliasquery = Q(db_tags__db_key__istartswith=searchstring, db_tags__db_tagtype="alias")
         results = ObjectDB.objects.filter(keyquery | aliasquery).distinct()
 
     caller.msg("Searching for '{}' ...".format(searchstring))
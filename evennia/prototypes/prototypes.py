@@ -7,16 +7,19 @@ Handling storage of prototypes, both database-based ones (DBPrototypes) and thos
 
 import hashlib
 import time
+from collections import defaultdict
 
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models.signals import post_delete
 from django.utils.translation import gettext as _
 
 from evennia.locks.lockhandler import check_lockstring, validate_lockstring
 from evennia.objects.models import ObjectDB
+from evennia.scripts.models import ScriptDB
 from evennia.scripts.scripts import DefaultScript
 from evennia.typeclasses.attributes import Attribute
+from evennia.typeclasses.tags import normalize_tag_field
 from evennia.utils import dbserialize, logger
 from evennia.utils.create import create_script
 from evennia.utils.evmore import EvMore
@@ -220,6 +223,8 @@ def load_module_prototypes(*mod_or_prototypes, override=True):
     """
     global _MODULE_PROTOTYPE_MODULES, _MODULE_PROTOTYPES
 
+    FLATTENED_PROTOTYPE_CACHE.clear()
+
     def _prototypes_from_module(mod):
         """
         Load prototypes from a module, first by looking for a global list PROTOTYPE_LIST (a list of
@@ -328,6 +333,9 @@ def load_module_prototypes(*mod_or_prototypes, override=True):
 
             # make sure the prototype contains all meta info
             _MODULE_PROTOTYPES[actual_prototype_key] = prototype
+            MODULE_PROTOTYPE_INDEX.add(
+                actual_prototype_key, actual_prototype_key, prototype["prototype_tags"]
+            )
             # track module path for display purposes
             _MODULE_PROTOTYPE_MODULES[actual_prototype_key.lower()] = mod
 
@@ -365,6 +373,215 @@ class DBPrototypeCache:
 DB_PROTOTYPE_CACHE = DBPrototypeCache()
 
 
+class PrototypeIndex:
+    """
+    Index of prototype keys and tags, used by `search_prototype` to find
+    prototypes without looking through (or deserializing) all of them.
+
+    Each indexed prototype is identified by an `ident` (the prototype-key for
+    module prototypes and the database id for db-prototypes) and has
+
+    - a (lowercase) key, stored in a `{key: {ident, ...}}` mapping for exact
+      lookups and in an n-gram index `{ngram: {ident, ...}}` (all substrings of
+      length `ngram_size`) for finding keys containing a given string.
+    - tags, stored in an inverted index `{tag: {ident, ...}}`.
+    - a sort key, determining the order of search results.
+
+    """
+
+    def __init__(self, ngram_size=3):
+        self.ngram_size = ngram_size
+        self.clear()
+
+    def clear(self):
+        """
+        Remove everything from the index.
+
+        """
+        self._entries = {}
+        self._keys = defaultdict(set)
+        self._ngrams = defaultdict(set)
+        self._tags = defaultdict(set)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, ident):
+        return ident in self._entries
+
+    def _get_ngrams(self, key):
+        size = self.ngram_size
+        return {key[inum : inum + size] for inum in range(len(key) - size + 1)}
+
+    def add(self, ident, key, tags=(), sortkey=None):
+        """
+        Add or update a prototype in the index.
+
+        Args:
+            ident (str or int): The unique identifier of the prototype.
+            key (str): The prototype-key.
+            tags (iterable, optional): The prototype's tags.
+            sortkey (any, optional): What to sort search results on. If not given,
+                prototypes are sorted in the order they were first added.
+
+        """
+        if sortkey is None:
+            sortkey = self._entries[ident][0] if ident in self._entries else len(self._entries)
+        self.remove(ident)
+        key = key.lower()
+        tags = {tuple(tag) if isinstance(tag, list) else tag for tag in tags}
+        self._entries[ident] = (sortkey, key, tags)
+        self._keys[key].add(ident)
+        for ngram in self._get_ngrams(key):
+            self._ngrams[ngram].add(ident)
+        for tag in tags:
+            self._tags[tag].add(ident)
+
+    def remove(self, ident):
+        """
+        Remove a prototype from the index, if it is indexed.
+
+        Args:
+            ident (str or int): The unique identifier of the prototype.
+
+        """
+        entry = self._entries.pop(ident, None)
+        if not entry:
+            return
+        _, key, tags = entry
+        for index, index_keys in (
+            (self._keys, (key,)),
+            (self._ngrams, self._get_ngrams(key)),
+            (self._tags, tags),
+        ):
+            for index_key in index_keys:
+                idents = index[index_key]
+                idents.discard(ident)
+                if not idents:
+                    del index[index_key]
+
+    def search(self, key=None, tags=None, match_any=False, fuzzy=True):
+        """
+        Search the index.
+
+        Args:
+            key (str, optional): An exact or partial (lowercase) key to look for. If
+                there is an exact match, only exact matches are returned.
+            tags (list, optional): Tags to look for.
+            match_any (bool, optional): If it's enough to match any one of `tags`,
+                rather than all of them.
+            fuzzy (bool, optional): If partial key matches should be returned if
+                there is no exact match.
+
+        Returns:
+            tuple: `(idents, exact)`, where `idents` are the sorted identifiers
+                of the matches and `exact` is `True` if `key` matched exactly.
+
+        """
+        matches = None
+        if tags:
+            tag_matches = [self._tags.get(tag, set()) for tag in tags]
+            if match_any:
+                matches = set().union(*tag_matches)
+            else:
+                matches = set.intersection(*tag_matches)
+
+        exact = False
+        if key:
+            key_matches = self._keys.get(key, set())
+            if matches is not None:
+                key_matches = key_matches & matches
+            if key_matches:
+                exact = True
+            elif fuzzy:
+                if len(key) >= self.ngram_size:
+                    candidates = set.intersection(
+                        *(self._ngrams.get(ngram, set()) for ngram in self._get_ngrams(key))
+                    )
+                else:
+                    candidates = self._entries.keys()
+                key_matches = {ident for ident in candidates if key in self._entries[ident][1]}
+                if matches is not None:
+                    key_matches &= matches
+            matches = key_matches
+        elif matches is None:
+            matches = self._entries.keys()
+
+        return sorted(matches, key=lambda ident: self._entries[ident][0]), exact
+
+
+MODULE_PROTOTYPE_INDEX = PrototypeIndex()
+
+
+class FlattenedPrototypeCache:
+    """
+    Cache the result of validating a prototype and merging its inheritance
+    chain, so spawning the same prototype many times only has to look up its
+    parents and merge them once.
+
+    Entries are keyed on `(prototype_key, version)`. The version is bumped
+    (and all entries dropped) whenever a prototype may have changed - that
+    is, when module prototypes are (re)loaded or when `save_prototype` or
+    `delete_prototype` is called. A flattening started before a change will
+    thus never be served after it. Each entry also stores the prototype it
+    was made from, so a different prototype dict with the same key will not
+    match it.
+
+    Only the merged parents are cached, not the prototype's own values. Those
+    may be database objects that compare equal to (but are not the same
+    instance as) the ones given last time, so they are always taken from the
+    prototype being spawned.
+
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._cache = {}
+
+    def get(self, prototype_key, prototype):
+        """
+        Get the cached parents of a prototype.
+
+        Args:
+            prototype_key (str): The key of the prototype.
+            prototype (dict): The (homogenized) prototype to flatten.
+
+        Returns:
+            dict or None: The validated prototype's parents merged into one
+                prototype. This must not be modified. `None` if not cached.
+
+        """
+        entry = self._cache.get((prototype_key, self.version))
+        if entry and entry[0] == prototype:
+            return entry[1]
+        return None
+
+    def add(self, prototype_key, version, prototype, parents):
+        """
+        Cache the parents of a validated prototype.
+
+        Args:
+            prototype_key (str): The key of the prototype.
+            version (int): The cache version when the validation was started.
+            prototype (dict): The (homogenized) prototype that was validated.
+            parents (dict): The prototype's parents merged into one prototype.
+
+        """
+        if version == self.version:
+            self._cache[(prototype_key, version)] = (prototype, parents)
+
+    def clear(self):
+        """
+        Invalidate all cached flattenings.
+
+        """
+        self.version += 1
+        self._cache = {}
+
+
+FLATTENED_PROTOTYPE_CACHE = FlattenedPrototypeCache()
+
+
 class DbPrototype(DefaultScript):
     """
     This stores a single prototype, in an Attribute `prototype`.
@@ -386,6 +603,119 @@ class DbPrototype(DefaultScript):
         self.attributes.add("prototype", prototype)
 
 
+class DbPrototypeIndex(PrototypeIndex):
+    """
+    Index of the db-prototypes. This is loaded (without deserializing any
+    prototypes) the first time it's used, after which `save_prototype` and
+    `delete_prototype` keep it up to date. It's reloaded if the idmapper
+    cache is flushed.
+
+    """
+
+    def __init__(self, ngram_size=3):
+        super().__init__(ngram_size=ngram_size)
+        self._instance_cache = None
+        post_delete.connect(self._at_post_delete, weak=False)
+
+    def _at_post_delete(self, sender, instance, **kwargs):
+        if isinstance(instance, ScriptDB) and self._instance_cache is not None:
+            self.remove(instance.id)
+
+    def load(self):
+        """
+        Make sure the index is loaded and current.
+
+        """
+        instance_cache = ScriptDB.__dbclass__.__instance_cache__
+        if instance_cache is self._instance_cache:
+            return
+        self.clear()
+        self._instance_cache = instance_cache
+        prototype_ids = {}
+        for db_id, db_key in DbPrototype.objects.values_list("id", "db_key"):
+            prototype_ids[db_id] = (db_key, [])
+        for db_id, tagkey in ScriptDB.db_tags.through.objects.filter(
+            tag__db_category=_PROTOTYPE_TAG_META_CATEGORY, tag__db_model="scriptdb"
+        ).values_list("scriptdb_id", "tag__db_key"):
+            if db_id in prototype_ids:
+                prototype_ids[db_id][1].append(tagkey)
+        for db_id, (db_key, tags) in prototype_ids.items():
+            self.add(db_id, db_key, tags, sortkey=(db_key, db_id))
+
+    def add_prototype(self, stored_prototype):
+        """
+        Add or update a stored prototype in the index.
+
+        Args:
+            stored_prototype (DbPrototype): The stored prototype.
+
+        """
+        if self._instance_cache is None:
+            # not loaded yet - it will be found when loading
+            return
+        tags = stored_prototype.tags.get(category=_PROTOTYPE_TAG_META_CATEGORY, return_list=True)
+        self.add(
+            stored_prototype.id,
+            stored_prototype.db_key,
+            tags,
+            sortkey=(stored_prototype.db_key, stored_prototype.id),
+        )
+
+
+DB_PROTOTYPE_INDEX = DbPrototypeIndex()
+
+
+def _get_db_prototypes(db_ids):
+    """
+    Get (deserialized) db-prototypes, from the cache if possible.
+
+    Args:
+        db_ids (list): The database ids of `DbPrototype`s.
+
+    Returns:
+        list: The prototypes, in the order of `db_ids`. Ids that no longer
+            exist are skipped (and removed from the index).
+
+    """
+    prototypes = {db_id: DB_PROTOTYPE_CACHE.get(db_id) for db_id in db_ids}
+    not_found = [db_id for db_id, prot in prototypes.items() if prot is None]
+    if not_found:
+        for db_id, value in Attribute.objects.filter(
+            scriptdb__pk__in=not_found, db_key="prototype"
+        ).values_list("scriptdb__id", "db_value"):
+            prot = dbserialize.from_pickle(value)
+            DB_PROTOTYPE_CACHE.add(db_id, prot)
+            prototypes[db_id] = prot
+        for db_id in not_found:
+            if prototypes[db_id] is None:
+                DB_PROTOTYPE_INDEX.remove(db_id)
+    return [prototypes[db_id] for db_id in db_ids if prototypes[db_id] is not None]
+
+
+class DbPrototypeList:
+    """
+    A sequence of db-prototypes that only loads the prototypes when accessed.
+    This is returned by `search_prototype` with `return_iterators=True`, so a
+    paginated listing only has to deserialize the prototypes on the current
+    page.
+
+    """
+
+    def __init__(self, db_ids):
+        self.db_ids = db_ids
+
+    def __len__(self):
+        return len(self.db_ids)
+
+    def __iter__(self):
+        return iter(_get_db_prototypes(self.db_ids))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _get_db_prototypes(self.db_ids[index])
+        return _get_db_prototypes([self.db_ids[index]])[0]
+
+
 # Prototype manager functions
 
 
@@ -475,6 +805,8 @@ def save_prototype(prototype):
             attributes=[("prototype", in_prototype)],
         )
     DB_PROTOTYPE_CACHE.add(stored_prototype.id, stored_prototype.prototype)
+    DB_PROTOTYPE_INDEX.add_prototype(stored_prototype)
+    FLATTENED_PROTOTYPE_CACHE.clear()
     return stored_prototype.prototype
 
 
@@ -520,6 +852,8 @@ def delete_prototype(prototype_key, caller=None):
                 ).format(caller=caller, prototype_key=prototype_key)
             )
     DB_PROTOTYPE_CACHE.remove(stored_prototype.id)
+    DB_PROTOTYPE_INDEX.remove(stored_prototype.id)
+    FLATTENED_PROTOTYPE_CACHE.clear()
     stored_prototype.delete()
     return True
 
@@ -552,9 +886,9 @@ def search_prototype(
         matches (list): Default return, all found prototype dicts. Empty list if
             no match was found. Note that if neither `key` nor `tags`
             were given, *all* available prototypes will be returned.
-        list, queryset: If `return_iterators` are found, this is a list of
-            module-based prototypes followed by a queryset of
-            db-prototypes.
+        DbPrototypeList, list: If `return_iterators` is set, this is a sequence
+            of the db-prototypes (only deserialized as they are accessed) followed
+            by a list of the module-based prototypes.
 
     Raises:
         KeyError: If `require_single` is True and there are 0 or >1 matches.
@@ -563,107 +897,44 @@ def search_prototype(
         The available prototypes is a combination of those supplied in
         PROTOTYPE_MODULES and those stored in the database. Note that if
         tags are given and the prototype has no tags defined, it will not
-        be found as a match.
+        be found as a match. The keys and tags are looked up in
+        `MODULE_PROTOTYPE_INDEX` and `DB_PROTOTYPE_INDEX`.
 
     """
 
-    def _search_module_based_prototypes(key, tags):
-        """
-        Helper function to load module-based prots.
-
-        """
-        # This will load the prototypes the first time they are searched
-        loaded = getattr(load_module_prototypes, "_LOADED", False)
-        if not loaded:
-            load_module_prototypes()
-            setattr(load_module_prototypes, "_LOADED", True)
-
-        # search module prototypes
-
-        mod_matches = {}
-        if tags:
-            # use tags to limit selection
-            tagset = set(tags)
-            mod_matches = {
-                prototype_key: prototype
-                for prototype_key, prototype in _MODULE_PROTOTYPES.items()
-                if tagset.intersection(prototype.get("prototype_tags", []))
-            }
-        else:
-            mod_matches = _MODULE_PROTOTYPES
-
-        fuzzy_match_db = True
-        if key:
-            if key in mod_matches:
-                # exact match
-                module_prototypes = [mod_matches[key].copy()]
-                fuzzy_match_db = False
-            else:
-                # fuzzy matching
-                module_prototypes = [
-                    prototype
-                    for prototype_key, prototype in mod_matches.items()
-                    if key in prototype_key
-                ]
-        else:
-            # note - we return a copy of the prototype dict, otherwise using this with e.g.
-            # prototype_from_object will modify the base prototype for every object
-            module_prototypes = [match.copy() for match in mod_matches.values()]
-
-        return module_prototypes, fuzzy_match_db
-
-    def _search_db_based_prototypes(key, tags, fuzzy_matching):
-        """
-        Helper function for loading db-based prots.
-
-        """
-        # search db-stored prototypes
-        if tags:
-            # exact match on tag(s)
-            tags = make_iter(tags)
-            tag_categories = ["db_prototype" for _ in tags]
-            query = DbPrototype.objects.get_by_tag(tags, tag_categories)
-        else:
-            query = DbPrototype.objects.all()
-
-        if key:
-            # exact or partial match on key
-            exact_match = query.filter(Q(db_key__iexact=key))
-            if not exact_match and fuzzy_matching:
-                # try with partial match instead
-                query = query.filter(Q(db_key__icontains=key))
-            else:
-                query = exact_match
-
-        # convert to prototype, cached or from db
-
-        db_matches = []
-        not_found = []
-        for db_id in query.values_list("id", flat=True).order_by("db_key"):
-            prot = DB_PROTOTYPE_CACHE.get(db_id)
-            if prot:
-                db_matches.append(prot)
-            else:
-                not_found.append(db_id)
-
-        if not_found:
-            new_db_matches = (
-                Attribute.objects.filter(scriptdb__pk__in=not_found, db_key="prototype")
-                .values_list("db_value", flat=True)
-                .order_by("scriptdb__db_key")
-            )
-            for db_id, prot in zip(not_found, new_db_matches):
-                DB_PROTOTYPE_CACHE.add(db_id, prot)
-            db_matches.extend(list(new_db_matches))
-
-        return db_matches
+    # this will load the module prototypes the first time they are searched
+    if not getattr(load_module_prototypes, "_LOADED", False):
+        load_module_prototypes()
+        setattr(load_module_prototypes, "_LOADED", True)
 
     if key:
         key = key.lower()
+    tags = [tag for tag in make_iter(tags) if tag]
 
-    module_prototypes, fuzzy_match_db = _search_module_based_prototypes(key, tags)
-
-    db_prototypes = [] if no_db else _search_db_based_prototypes(key, tags, fuzzy_match_db)
+    # search module prototypes (they must match any of the tags)
+    prototype_keys, exact = MODULE_PROTOTYPE_INDEX.search(key, tags, match_any=True)
+    # (the index may have prototypes removed from _MODULE_PROTOTYPES after loading)
+    module_prototypes = [
+        _MODULE_PROTOTYPES[prototype_key]
+        for prototype_key in prototype_keys
+        if prototype_key in _MODULE_PROTOTYPES
+    ]
+    exact = exact and bool(module_prototypes)
+    if exact or not key:
+        # note - we return a copy of the prototype dict, otherwise using this with e.g.
+        # prototype_from_object will modify the base prototype for every object
+        module_prototypes = [prototype.copy() for prototype in module_prototypes]
+
+    # search db-stored prototypes (they must match all tags), only matching partially
+    # on key if there was no exact module match
+    if no_db:
+        db_prototypes = []
+    else:
+        DB_PROTOTYPE_INDEX.load()
+        db_ids, _ = DB_PROTOTYPE_INDEX.search(
+            key, [normalize_tag_field(tag) for tag in tags], fuzzy=not exact
+        )
+        db_prototypes = DbPrototypeList(db_ids)
 
     if key and require_single:
         num = len(module_prototypes) + len(db_prototypes)
@@ -979,7 +1250,18 @@ def validate_prototype(
         if _flags["warnings"]:
             raise RuntimeWarning(f"{_WARNSTR}: " + f"\n{_WARNSTR}: ".join(_flags["warnings"]))
 
-    # make sure prototype_locks are set to defaults
+    set_default_prototype_locks(prototype)
+
+
+def set_default_prototype_locks(prototype):
+    """
+    Make sure the `prototype_locks` of a prototype include the default `spawn` and `edit`
+    locks. This is done as part of `validate_prototype`.
+
+    Args:
+        prototype (dict): The prototype to update in-place.
+
+    """
     prototype_locks = [
         lstring.split(":", 1)
         for lstring in prototype.get("prototype_locks", "").split(";")
@@ -137,10 +137,14 @@ import hashlib
 import time
 
 from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save
 from django.utils.translation import gettext as _
+from twisted.internet import defer, task
 
 import evennia
 from evennia.objects.models import ObjectDB
+from evennia.objects.objects import DefaultObject
 from evennia.prototypes import prototypes as protlib
 from evennia.prototypes.prototypes import (
     PROTOTYPE_TAG_CATEGORY,
@@ -149,10 +153,13 @@ from evennia.prototypes.prototypes import (
     value_to_obj,
     value_to_obj_or_any,
 )
+from evennia.server.signals import SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE
+from evennia.typeclasses.tags import TAG_INDEX
 from evennia.utils import logger
 from evennia.utils.utils import class_from_module, is_iter, make_iter
 
 _CREATE_OBJECT_KWARGS = ("key", "location", "home", "destination")
+_MONITOR_HANDLER = None
 _PROTOTYPE_META_NAMES = (
     "prototype_key",
     "prototype_desc",
@@ -173,6 +180,22 @@ _PROTOTYPE_ROOT_NAMES = (
     "destination",
 )
 _NON_CREATE_KWARGS = _CREATE_OBJECT_KWARGS + _PROTOTYPE_META_NAMES
+# how batch_update_objects_with_prototype applies the prototype keys
+_FIELD_NAMES = {
+    "key": "db_key",
+    "typeclass": "db_typeclass_path",
+    "location": "db_location",
+    "home": "db_home",
+    "destination": "db_destination",
+}
+_TAG_TYPES = {"permissions": "permission", "aliases": "alias", "tags": None}
+_UPDATE_CHUNK_SIZE = 1000
+# modules of the post_save receivers whose work `_bulk_create_objects` does itself
+_BULK_CREATE_POST_SAVE_MODULES = (
+    "evennia.typeclasses.models",
+    "evennia.utils.idmapper.models",
+    "evennia.web.api.cache",
+)
 
 
 class Unset:
@@ -268,6 +291,54 @@ def _get_prototype(inprot, protparents=None, uninherited=None, _workprot=None):
     return _workprot
 
 
+def _get_flattened_prototype(prototype, protparents):
+    """
+    Validate and flatten a prototype for spawning. For prototypes with a
+    `prototype_key`, the validation and merged parents are cached in
+    `FLATTENED_PROTOTYPE_CACHE`, so the parents only have to be found and
+    merged once.
+
+    Args:
+        prototype (dict): The (homogenized) prototype to spawn.
+        protparents (dict): Custom protparents given to `spawn`. Flattenings
+            using custom protparents are not cached.
+
+    Returns:
+        tuple: `(validated, flattened)`, where `validated` is the prototype after
+            validation and `flattened` is the flattened prototype, ready to spawn
+            from. Both may be modified by the caller.
+
+    Raises:
+        RuntimeError: If the prototype is not valid.
+
+    """
+    uninherited = {"prototype_key": prototype.get("prototype_key")}
+    prototype_key = None if protparents else prototype.get("prototype_key")
+    if not prototype_key:
+        protlib.validate_prototype(prototype, None, protparents=protparents, is_prototype_base=True)
+        return prototype, _get_prototype(
+            prototype, protparents=protparents, uninherited=uninherited
+        )
+
+    cache = protlib.FLATTENED_PROTOTYPE_CACHE
+    parents = cache.get(prototype_key, prototype)
+    if parents is None:
+        version = cache.version
+        source = dict(prototype)
+        protlib.validate_prototype(prototype, None, is_prototype_base=True)
+        parents = {}
+        if "prototype_parent" in prototype:
+            parents = _get_prototype({"prototype_parent": prototype["prototype_parent"]})
+        cache.add(prototype_key, version, source, parents)
+    else:
+        # the validation was cached, but it also sets the default locks
+        protlib.set_default_prototype_locks(prototype)
+
+    # merge the prototype's own values onto (a copy of) its parents
+    own = {key: value for key, value in prototype.items() if key != "prototype_parent"}
+    return prototype, _get_prototype(own, _workprot=dict(parents), uninherited=uninherited)
+
+
 def flatten_prototype(prototype, validate=False, no_db=False):
     """
     Produce a 'flattened' prototype, where all prototype parents in the inheritance tree have been
@@ -634,8 +705,218 @@ def format_diff(diff, minimal=True):
     return "\n ".join(line for line in texts if line)
 
 
+def _is_dynamic(value):
+    """
+    Check if a prototype value may evaluate differently for every object,
+    because it is a callable or contains a protfunc.
+
+    """
+    if callable(value):
+        return True
+    if isinstance(value, str):
+        return "$" in value
+    if isinstance(value, dict):
+        return any(_is_dynamic(val) for val in value.items())
+    if is_iter(value):
+        return any(_is_dynamic(val) for val in value)
+    return False
+
+
+def _merge_locks(obj, storage, lockstring):
+    """
+    Get the lock storage `obj.locks.add(lockstring)` would save, starting from
+    `storage`, without saving it.
+
+    """
+    storage = f"{storage};{lockstring}" if storage else lockstring
+    return ";".join(tup[2] for tup in obj.locks._parse_lockstring(storage).values())
+
+
+def _get_prototype_changes(new_prototype, diff, exact):
+    """
+    Get the changes to apply from a flattened diff, as `(key, directive)`.
+
+    """
+    changes = []
+    for key, directive in diff.items():
+        if key not in new_prototype and not exact:
+            # we don't update the object if the prototype does not actually
+            # contain the key (the diff will report REMOVE but we ignore it
+            # since exact=False)
+            continue
+        if key in _PROTOTYPE_META_NAMES or key == "exec":
+            # prototype meta keys are not stored on-object, and we don't
+            # auto-rerun exec statements, it would be huge security risk!
+            continue
+        if directive in ("UPDATE", "REPLACE", "REMOVE"):
+            changes.append((key, directive))
+    return changes
+
+
+def _update_objects_chunk(objs, prototype, new_prototype, changes, init):
+    """
+    Apply prototype changes to a chunk of objects, with a few bulk queries.
+
+    Args:
+        objs (list): The objects to update.
+        prototype (str or dict): The prototype, as passed to `batch_update_objects_with_prototype`.
+        new_prototype (dict): The prototype to apply.
+        changes (list): The `(key, directive)` to apply, from `_get_prototype_changes`.
+        init (callable): Called as `init(key, value, validator)` to get the value to
+            apply from a prototype value.
+
+    Returns:
+        int: The number of objects that had changes applied to them.
+
+    """
+    global _MONITOR_HANDLER
+    if not _MONITOR_HANDLER:
+        from evennia.scripts.monitorhandler import MONITOR_HANDLER as _MONITOR_HANDLER
+
+    fields = {}  # {fieldname: {value: [obj, ...]}}
+    tagclear = {"permission": [], "alias": [], None: []}
+    tagadd = {"permission": [], "alias": [], None: []}
+    attrclear = []
+    attrremove = {}  # {key: [obj, ...]}
+    attradd = []
+    lockstorages = {}  # {(old lock storage, lockstring): new lock storage}
+    changed = []
+
+    def _set(fieldname, value, obj):
+        fields.setdefault(fieldname, {}).setdefault(value, []).append(obj)
+
+    for obj in objs:
+        try:
+            # collect everything first, so nothing is applied if a value fails
+            objfields = []
+            objtagclear, objtagadd = [], []
+            objattrclear, objattrremove, objattradd = False, [], []
+            for key, directive in changes:
+                if directive == "REMOVE":
+                    if key in _FIELD_NAMES:
+                        value = settings.BASE_OBJECT_TYPECLASS if key == "typeclass" else None
+                        objfields.append((_FIELD_NAMES[key], "" if key == "key" else value))
+                    elif key == "locks":
+                        objfields.append(("db_lock_storage", ""))
+                    elif key in _TAG_TYPES:
+                        objtagclear.append(_TAG_TYPES[key])
+                    elif key == "attrs":
+                        objattrclear = True
+                    else:
+                        objattrremove.append(key)
+                    continue
+
+                val = new_prototype[key]
+                if key in ("key", "typeclass"):
+                    objfields.append((_FIELD_NAMES[key], init(key, val, str)))
+                elif key in _FIELD_NAMES:
+                    objfields.append((_FIELD_NAMES[key], init(key, val, value_to_obj)))
+                elif key == "locks":
+                    storage = "" if directive == "REPLACE" else obj.db_lock_storage
+                    lockstring = init(key, val, str)
+                    if (storage, lockstring) not in lockstorages:
+                        lockstorages[(storage, lockstring)] = _merge_locks(obj, storage, lockstring)
+                    objfields.append(("db_lock_storage", lockstorages[(storage, lockstring)]))
+                elif key in _TAG_TYPES:
+                    tagtype = _TAG_TYPES[key]
+                    if directive == "REPLACE":
+                        objtagclear.append(tagtype)
+                    if key == "tags":
+                        tags = [
+                            (init((key, itag, 0), ttag, str), tcategory, tdata)
+                            for itag, (ttag, tcategory, tdata) in enumerate(val)
+                        ]
+                    else:
+                        tags = [init((key, itag), tag, str) for itag, tag in enumerate(val)]
+                    objtagadd.append((tagtype, tags))
+                elif key == "attrs":
+                    objattrclear = objattrclear or directive == "REPLACE"
+                    objattradd.extend(
+                        (
+                            init((key, iattr, 0), akey, str),
+                            init((key, iattr, 1), aval, value_to_obj),
+                            acategory,
+                            alocks,
+                        )
+                        for iattr, (akey, aval, acategory, alocks) in enumerate(val)
+                    )
+                else:
+                    objattradd.append((key, init(key, val, value_to_obj)))
+        except Exception:
+            logger.log_trace(
+                f"Failed to apply prototype '{new_prototype['prototype_key']}' to {obj}."
+            )
+            continue
+
+        for fieldname, value in objfields:
+            _set(fieldname, value, obj)
+        for tagtype in objtagclear:
+            tagclear[tagtype].append(obj)
+        for tagtype, tags in objtagadd:
+            tagadd[tagtype].append((obj, tags))
+        if objattrclear:
+            attrclear.append(obj)
+        for key in objattrremove:
+            attrremove.setdefault(key, []).append(obj)
+        if objattradd:
+            attradd.append((obj, objattradd))
+        changed.append(obj)
+
+    prototype_key = new_prototype["prototype_key"]
+    with transaction.atomic():
+        for fieldname, values in fields.items():
+            for value, fieldobjs in values.items():
+                ObjectDB.objects.filter(id__in=[obj.id for obj in fieldobjs]).update(
+                    **{fieldname: value}
+                )
+                # update the cached instances
+                for obj in fieldobjs:
+                    if fieldname == "db_location":
+                        if obj.db_location:
+                            obj.db_location.contents_cache.remove(obj)
+                        if value:
+                            value.contents_cache.add(obj)
+                    setattr(obj, fieldname, value)
+                    if fieldname == "db_lock_storage" and "locks" in obj.__dict__:
+                        obj.locks.reset()
+                    _MONITOR_HANDLER.at_update(obj, fieldname)
+
+        for tagtype, tagobjs in tagclear.items():
+            if tagobjs:
+                ObjectDB.objects.bulk_remove_tags(tagobjs, tagtype=tagtype)
+        for tagtype, objtags in tagadd.items():
+            if objtags:
+                ObjectDB.objects.bulk_add_tags(objtags, tagtype=tagtype)
+        if attrclear:
+            ObjectDB.objects.bulk_remove_attributes(attrclear)
+        for key, attrobjs in attrremove.items():
+            ObjectDB.objects.bulk_remove_attributes(attrobjs, key=key)
+        if attradd:
+            ObjectDB.objects.bulk_add_attributes(attradd)
+
+        # we must always make sure to re-add the prototype tag
+        ObjectDB.objects.bulk_remove_tags(objs, category=PROTOTYPE_TAG_CATEGORY)
+        ObjectDB.objects.bulk_add_tags(
+            (obj, [(prototype_key, PROTOTYPE_TAG_CATEGORY)]) for obj in objs
+        )
+
+    if changes:
+        for obj in changed:
+            if spawn_hook := getattr(obj, "at_object_post_spawn", None):
+                spawn_hook(prototype=prototype)
+        return len(changed)
+    return 0
+
+
 def batch_update_objects_with_prototype(
-    prototype, diff=None, objects=None, exact=False, caller=None, protfunc_raise_errors=True
+    prototype,
+    diff=None,
+    objects=None,
+    exact=False,
+    caller=None,
+    protfunc_raise_errors=True,
+    chunk_size=_UPDATE_CHUNK_SIZE,
+    run_async=False,
 ):
     """
     Update existing objects with the latest version of the prototype.
@@ -656,8 +937,20 @@ def batch_update_objects_with_prototype(
         caller (Object or Account, optional): This may be used by protfuncs to do permission checks.
         protfunc_raise_errors (bool): Have protfuncs raise explicit errors if malformed/not found.
             This is highly recommended.
+        chunk_size (int, optional): The objects are updated this many at a time, each
+            chunk in its own transaction.
+        run_async (bool, optional): If set, update one chunk per reactor iteration, so
+            the server keeps running while a large number of objects are updated.
     Returns:
-        changed (int): The number of objects that had changes applied to them.
+        changed (int or Deferred): The number of objects that had changes applied to them.
+            With `run_async`, a Deferred firing with this number when all chunks are done.
+
+    Notes:
+        The diff is applied to all objects at once: fields are changed with one
+        query per new value, and Tags and Attributes are added and removed in bulk.
+        Prototype values are evaluated once for all objects, unless they are
+        callables or contain protfuncs, which are evaluated for every object.
+        Since objects are not saved one by one, no Django save signals are sent.
 
     """
     prototype = protlib.homogenize_prototype(prototype)
@@ -673,143 +966,189 @@ def batch_update_objects_with_prototype(
 
     if not objects:
         objects = ObjectDB.objects.get_by_tag(prototype_key, category=PROTOTYPE_TAG_CATEGORY)
+    objects = list(objects)
 
     if not objects:
-        return 0
+        return defer.succeed(0) if run_async else 0
 
     if not diff:
         diff, _ = prototype_diff_from_object(new_prototype, objects[0])
 
     # make sure the diff is flattened
-    diff = flatten_diff(diff)
+    changes = _get_prototype_changes(new_prototype, flatten_diff(diff), exact)
 
-    changed = 0
-    for obj in objects:
-        do_save = False
+    static_values = {}
 
-        old_prot_key = obj.tags.get(category=PROTOTYPE_TAG_CATEGORY, return_list=True)
-        old_prot_key = old_prot_key[0] if old_prot_key else None
+    def _init(key, val, typ):
+        # evaluate each prototype value only once, unless it may differ per object
+        if key in static_values:
+            return static_values[key]
+        value = init_spawn_value(
+            val,
+            typ,
+            caller=caller,
+            prototype=new_prototype,
+            protfunc_raise_errors=protfunc_raise_errors,
+        )
+        if not _is_dynamic(val):
+            static_values[key] = value
+        return value
 
-        try:
-            for key, directive in diff.items():
-                if key not in new_prototype and not exact:
-                    # we don't update the object if the prototype does not actually
-                    # contain the key (the diff will report REMOVE but we ignore it
-                    # since exact=False)
-                    continue
+    chunks = [objects[start : start + chunk_size] for start in range(0, len(objects), chunk_size)]
+    changed = []
 
-                if directive in ("UPDATE", "REPLACE"):
-                    if key in _PROTOTYPE_META_NAMES:
-                        # prototype meta keys are not stored on-object
-                        continue
-
-                    val = new_prototype[key]
-                    do_save = True
-
-                    def _init(val, typ):
-                        return init_spawn_value(
-                            val,
-                            typ,
-                            caller=caller,
-                            prototype=new_prototype,
-                            protfunc_raise_errors=protfunc_raise_errors,
-                        )
+    def _update_chunks():
+        for chunk in chunks:
+            changed.append(_update_objects_chunk(chunk, prototype, new_prototype, changes, _init))
+            yield
 
-                    if key == "key":
-                        obj.db_key = _init(val, str)
-                    elif key == "typeclass":
-                        obj.db_typeclass_path = _init(val, str)
-                    elif key == "location":
-                        obj.db_location = _init(val, value_to_obj)
-                    elif key == "home":
-                        obj.db_home = _init(val, value_to_obj)
-                    elif key == "destination":
-                        obj.db_destination = _init(val, value_to_obj)
-                    elif key == "locks":
-                        if directive == "REPLACE":
-                            obj.locks.clear()
-                        obj.locks.add(_init(val, str))
-                    elif key == "permissions":
-                        if directive == "REPLACE":
-                            obj.permissions.clear()
-                        obj.permissions.batch_add(*(_init(perm, str) for perm in val))
-                    elif key == "aliases":
-                        if directive == "REPLACE":
-                            obj.aliases.clear()
-                        obj.aliases.batch_add(*(_init(alias, str) for alias in val))
-                    elif key == "tags":
-                        if directive == "REPLACE":
-                            obj.tags.clear()
-                        obj.tags.batch_add(
-                            *(
-                                (_init(ttag, str), tcategory, tdata)
-                                for ttag, tcategory, tdata in val
-                            )
-                        )
-                    elif key == "attrs":
-                        if directive == "REPLACE":
-                            obj.attributes.clear()
-                        obj.attributes.batch_add(
-                            *(
-                                (
-                                    _init(akey, str),
-                                    _init(aval, value_to_obj),
-                                    acategory,
-                                    alocks,
-                                )
-                                for akey, aval, acategory, alocks in val
-                            )
-                        )
-                    elif key == "exec":
-                        # we don't auto-rerun exec statements, it would be huge security risk!
-                        pass
-                    else:
-                        obj.attributes.add(key, _init(val, value_to_obj))
-                elif directive == "REMOVE":
-                    do_save = True
-                    if key == "key":
-                        obj.db_key = ""
-                    elif key == "typeclass":
-                        # fall back to default
-                        obj.db_typeclass_path = settings.BASE_OBJECT_TYPECLASS
-                    elif key == "location":
-                        obj.db_location = None
-                    elif key == "home":
-                        obj.db_home = None
-                    elif key == "destination":
-                        obj.db_destination = None
-                    elif key == "locks":
-                        obj.locks.clear()
-                    elif key == "permissions":
-                        obj.permissions.clear()
-                    elif key == "aliases":
-                        obj.aliases.clear()
-                    elif key == "tags":
-                        obj.tags.clear()
-                    elif key == "attrs":
-                        obj.attributes.clear()
-                    elif key == "exec":
-                        # we don't auto-rerun exec statements, it would be huge security risk!
-                        pass
-                    else:
-                        obj.attributes.remove(key)
-        except Exception:
-            logger.log_trace(f"Failed to apply prototype '{prototype_key}' to {obj}.")
-        finally:
-            # we must always make sure to re-add the prototype tag
-            obj.tags.clear(category=PROTOTYPE_TAG_CATEGORY)
-            obj.tags.add(prototype_key, category=PROTOTYPE_TAG_CATEGORY)
-
-        if do_save:
-            changed += 1
-            obj.save()
-            if spawn_hook := getattr(obj, "at_object_post_spawn", None):
-                spawn_hook(prototype=prototype)
+    if run_async:
+        return task.cooperate(_update_chunks()).whenDone().addCallback(lambda _: sum(changed))
+    for _ in _update_chunks():
+        pass
+    return sum(changed)
+
+
+def _has_custom_post_save(typeclass):
+    """
+    Check if anything but Evennia's own receivers listens to `post_save` for a typeclass.
+
+    """
+    sync_receivers, async_receivers = post_save._live_receivers(typeclass)
+    for receiver in sync_receivers + async_receivers:
+        func = getattr(receiver, "__func__", receiver)
+        if getattr(func, "__module__", None) not in _BULK_CREATE_POST_SAVE_MODULES:
+            return True
+    return False
+
+
+def _can_bulk_create(objs):
+    """
+    Check if objects can be created with `_bulk_create_objects`. This requires
+    a database that returns the ids of bulk-created rows (like PostgreSQL and
+    SQLite 3.35+), and that no typeclass customizes `save` or `at_first_save`
+    or has custom `post_save` receivers, since `bulk_create` doesn't call
+    `save` nor send `post_save` and the steps of `at_first_save` are run
+    separately.
+
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        return False
+    for typeclass in set(type(obj) for obj in objs):
+        if (
+            typeclass.save is not ObjectDB.save
+            or typeclass.at_first_save is not DefaultObject.at_first_save
+            or _has_custom_post_save(typeclass)
+        ):
+            logger.log_info(
+                f"Spawning {typeclass.__name__} objects one at a time, since it customizes "
+                "save, at_first_save or post_save."
+            )
+            return False
+    return True
 
-    return changed
 
+def _bulk_create_objects(objs, objparams):
+    """
+    Create many objects with a few bulk queries. The result is the same as
+    calling `obj.save()` on each object with a `_createdict` (which runs
+    `at_first_save`), but the database rows and the prototype's permissions,
+    aliases, Tags and Attributes are created in bulk, in one transaction.
+
+    Args:
+        objs (list): Unsaved `ObjectDB` instances.
+        objparams (list): The parameters for each object, as for `batch_create_object`.
+
+    Returns:
+        list: The created objects.
+
+    Notes:
+        The hooks of `at_first_save` are called per object, in the same order,
+        but each step is done for all objects before the next one. So
+        `at_object_creation` has been called on all objects before the first
+        object gets the prototype's Attributes.
+
+        The prototype's `exec`s and `at_object_post_spawn` are run after the
+        transaction, so an error in them leaves all objects created (the other
+        objects are still run, then the first error is re-raised).
 
-def batch_create_object(*objparams):
+    """
+    try:
+        with transaction.atomic():
+            ObjectDB.objects.bulk_create(objs)
+            for obj in objs:
+                # what obj.save() does for a new object
+                obj.cache_instance(obj, new=True)
+                obj.at_db_location_postsave(True)
+            # the new objects have no Tags or Attributes yet; knowing that saves the
+            # creation hooks from querying for them (the bulk-adds below reset the caches)
+            ObjectDB.objects.prefetch_handlers(objs)
+
+            # at_first_save, before the _createdict is applied
+            for obj in objs:
+                obj.basetype_setup()
+                obj.at_object_creation()
+                obj.init_evennia_properties()
+
+            # apply the _createdict
+            ObjectDB.objects.bulk_add_tags(
+                ((obj, make_iter(objparam[1])) for obj, objparam in zip(objs, objparams)),
+                tagtype="permission",
+            )
+            for obj, objparam in zip(objs, objparams):
+                if objparam[2]:
+                    obj.locks.add(objparam[2])
+            ObjectDB.objects.bulk_add_tags(
+                ((obj, make_iter(objparam[3])) for obj, objparam in zip(objs, objparams)),
+                tagtype="alias",
+            )
+            ObjectDB.objects.bulk_add_tags(
+                (obj, make_iter(objparam[6])) for obj, objparam in zip(objs, objparams)
+            )
+            ObjectDB.objects.bulk_add_attributes(
+                (obj, objparam[5]) for obj, objparam in zip(objs, objparams)
+            )
+
+            for obj, objparam in zip(objs, objparams):
+                for key, value in (objparam[4] or {}).items():
+                    obj.nattributes.add(key, value)
+                # the rest of at_first_save
+                obj.at_object_post_creation()
+                obj.basetype_posthook_setup()
+    except Exception:
+        # the objects were rolled back, so they can't stay in the caches
+        for obj in objs:
+            if obj.pk:
+                obj.flush_from_cache(force=True)
+                TAG_INDEX.remove_obj("objectdb", obj.pk)
+                if obj.db_location:
+                    obj.db_location.contents_cache.remove(obj)
+                obj.pk = None
+        raise
+    # the objects were created without post_save signals
+    SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.send(sender=ObjectDB, objs=objs, models=())
+
+    error = None
+    for obj, objparam in zip(objs, objparams):
+        try:
+            # run eventual extra code
+            for code in objparam[7]:
+                if code:
+                    exec(code, {}, {"evennia": evennia, "obj": obj})
+            # run the spawned hook
+            if spawn_hook := getattr(obj, "at_object_post_spawn", None):
+                spawn_hook()
+        except Exception as err:
+            if error:
+                logger.log_trace(f"Error running the spawn code of {obj}.")
+            else:
+                error = err
+    if error:
+        raise error
+    return objs
+
+
+def batch_create_object(*objparams, bulk=False):
     """
     This is a cut-down version of the create_object() function,
     optimized for speed. It does NOT check and convert various input
@@ -835,6 +1174,13 @@ def batch_create_object(*objparams):
                         (the newly created object) available in the namespace. Execution
                         will happend after all other properties have been assigned and
                         is intended for calling custom handlers etc.
+    Keyword Args:
+        bulk (bool, optional): Create the objects with a few bulk queries instead of
+            saving them one by one. This is much faster for many objects, but
+            `post_save` is not sent for them (`SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE` is
+            sent instead) and the objects' creation hooks are run step by step for all
+            objects. Typeclasses customizing `save`, `at_first_save` or `post_save` are
+            still created one at a time.
 
     Returns:
         objects (list): A list of created objects
@@ -845,17 +1191,12 @@ def batch_create_object(*objparams):
 
     """
 
-    # bulk create all objects in one go
-
-    # unfortunately this doesn't work since bulk_create doesn't creates pks;
-    # the result would be duplicate objects at the next stage, so we comment
-    # it out for now:
-    #  dbobjs = _ObjectDB.objects.bulk_create(dbobjs)
+    dbobjs = [ObjectDB(**objparam[0]) for objparam in objparams]
+    if bulk and len(dbobjs) > 1 and _can_bulk_create(dbobjs):
+        return _bulk_create_objects(dbobjs, objparams)
 
     objs = []
-    for objparam in objparams:
-        obj = ObjectDB(**objparam[0])
-
+    for obj, objparam in zip(dbobjs, objparams):
         # setup
         obj._createdict = {
             "permissions": make_iter(objparam[1]),
@@ -903,17 +1244,19 @@ def spawn(*prototypes, caller=None, **kwargs):
             (no object creation) and return the create-kwargs.
         protfunc_raise_errors (bool): Raise explicit exceptions on a malformed/not-found
             protfunc. Defaults to True.
+        bulk (bool): Create the objects in bulk. See `batch_create_object`. Defaults to False.
 
     Returns:
         object (Object, dict or list): Spawned object(s). If `only_validate` is given, return
             a list of the creation kwargs to build the object(s) without actually creating it.
 
     """
-    # search string (=prototype_key) from input
-    prototypes = [
-        protlib.search_prototype(prot, require_single=True)[0] if isinstance(prot, str) else prot
-        for prot in prototypes
-    ]
+    # search string (=prototype_key) from input. The same key is only searched for once.
+    found = {}
+    for prot in prototypes:
+        if isinstance(prot, str) and prot not in found:
+            found[prot] = protlib.search_prototype(prot, require_single=True)[0]
+    prototypes = [dict(found[prot]) if isinstance(prot, str) else prot for prot in prototypes]
 
     if not kwargs.get("only_validate"):
         # homogenization to be more lenient about prototype format when entering the prototype
@@ -931,15 +1274,8 @@ def spawn(*prototypes, caller=None, **kwargs):
 
     objsparams = []
     for prototype in prototypes:
-        # run validation and homogenization of provided prototypes
-        protlib.validate_prototype(
-            prototype, None, protparents=custom_protparents, is_prototype_base=True
-        )
-        prot = _get_prototype(
-            prototype,
-            protparents=custom_protparents,
-            uninherited={"prototype_key": prototype.get("prototype_key")},
-        )
+        # run validation and flattening of provided prototypes
+        prototype, prot = _get_flattened_prototype(prototype, custom_protparents)
         if not prot:
             continue
 
@@ -1072,4 +1408,4 @@ def spawn(*prototypes, caller=None, **kwargs):
 
     if kwargs.get("only_validate"):
         return objsparams
-    return batch_create_object(*objsparams)
+    return batch_create_object(*objsparams, bulk=kwargs.get("bulk", False))
@@ -3,23 +3,28 @@ Unit tests for the prototypes and spawner
 
 """
 
+import copy
 import uuid
 from random import randint, sample
 from time import time
 
 import mock
 from anything import Something
+from django.db.models.signals import post_save
 from django.test.utils import override_settings
+from twisted.internet.task import Clock, Cooperator
 
 from evennia.commands.default import building
 from evennia.objects.models import ObjectDB
+from evennia.objects.objects import DefaultObject
 from evennia.prototypes import menus as olc_menus
 from evennia.prototypes import protfuncs as protofuncs
 from evennia.prototypes import prototypes as protlib
 from evennia.prototypes import spawner
 from evennia.prototypes.prototypes import _PROTOTYPE_TAG_META_CATEGORY
+from evennia.typeclasses.attributes import AttributeProperty
 from evennia.utils.create import create_object
-from evennia.utils.test_resources import BaseEvenniaTest, EvenniaCommandTest
+from evennia.utils.test_resources import BaseEvenniaTest, EvenniaCommandTest, TestCase
 from evennia.utils.tests.test_evmenu import TestEvMenu
 
 _PROTPARENTS = {
@@ -56,6 +61,24 @@ _PROTPARENTS = {
 }
 
 
+class BulkSpawnTestObject(DefaultObject):
+    health = AttributeProperty(5)
+
+    def at_object_creation(self):
+        self.db.strength = 1
+        self.db.created = True
+        self.tags.add("created", category="hooks")
+
+    def at_object_post_creation(self):
+        self.ndb.post_creation_strength = self.db.strength
+
+
+class SaveOverridingTestObject(DefaultObject):
+    def save(self, *args, **kwargs):
+        self.ndb.saved = True
+        super().save(*args, **kwargs)
+
+
 class TestSpawner(BaseEvenniaTest):
     def setUp(self):
         super().setUp()
@@ -96,6 +119,276 @@ class TestSpawner(BaseEvenniaTest):
             ["goblin grunt", "goblin archwizard"],
         )
 
+    def test_flattened_prototype_cache(self):
+        protlib.save_prototype(
+            {
+                "prototype_key": "cachebase",
+                "typeclass": "evennia.objects.objects.DefaultObject",
+                "key": "base",
+                "attrs": [("strength", 10)],
+            }
+        )
+        protlib.save_prototype({"prototype_key": "cachechild", "prototype_parent": "cachebase"})
+
+        with (
+            mock.patch(
+                "evennia.prototypes.prototypes.search_prototype", wraps=protlib.search_prototype
+            ) as mock_search,
+            mock.patch("evennia.prototypes.spawner.search_prototype", new=mock_search),
+        ):
+            objs = spawner.spawn("cachechild", "cachechild", "cachechild")
+            # the child is looked up once and its parent only while validating and
+            # flattening the first time
+            self.assertEqual(mock_search.call_count, 3)
+        self.assertEqual([obj.key for obj in objs], ["base", "base", "base"])
+        self.assertEqual([obj.db.strength for obj in objs], [10, 10, 10])
+
+        # changing the parent invalidates the cache
+        protlib.save_prototype(
+            {
+                "prototype_key": "cachebase",
+                "typeclass": "evennia.objects.objects.DefaultObject",
+                "key": "newbase",
+                "attrs": [("strength", 12)],
+            }
+        )
+        obj = spawner.spawn("cachechild")[0]
+        self.assertEqual((obj.key, obj.db.strength), ("newbase", 12))
+
+        # a different dict with the same prototype_key is not served from the cache
+        obj = spawner.spawn(
+            {
+                "prototype_key": "cachechild",
+                "typeclass": "evennia.objects.objects.DefaultObject",
+                "key": "other",
+            }
+        )[0]
+        self.assertEqual(obj.key, "other")
+
+    def test_flattened_prototype_cache__own_values(self):
+        """The prototype's own values are not served from the cache"""
+        prot = {"prototype_key": "cacheloc", "key": "thing", "location": self.room1}
+        obj = spawner.spawn(dict(prot))[0]
+        self.assertIs(obj.location, self.room1)
+        # an instance equal to room1 (same id) but not the same object
+        room_copy = copy.copy(self.room1)
+        obj = spawner.spawn(dict(prot, location=room_copy))[0]
+        self.assertIs(obj.location, room_copy)
+
+    def test_flattened_prototype_cache__default_locks(self):
+        """The default prototype_locks are set also when validation is cached"""
+        prot = {"prototype_key": "cachelocks", "typeclass": "evennia.objects.objects.DefaultObject"}
+        for _ in range(2):
+            validated, _ = spawner._get_flattened_prototype(dict(prot), {})
+            self.assertEqual(validated["prototype_locks"], "spawn:all();edit:all()")
+
+    def test_bulk_spawn(self):
+        """Spawning many objects in bulk gives the same result as spawning one"""
+        prot = {
+            "prototype_key": "bulkprototype",
+            "typeclass": "evennia.prototypes.tests.BulkSpawnTestObject",
+            "key": "bulky",
+            "location": self.room1,
+            "permissions": ["Builder"],
+            "locks": "get:false()",
+            "aliases": ["bulk", "lump"],
+            "tags": [("heavy", "weight", "tagdata"), ("grey", None)],
+            "attrs": [("strength", 10), ("health", 20), ("desc", "A lump.", None, "read:all()")],
+            "ndb_temp": "nattr",
+        }
+
+        def _state(obj):
+            return (
+                obj.key,
+                obj.location,
+                sorted(obj.permissions.all()),
+                sorted(obj.aliases.all()),
+                sorted(obj.tags.all(return_key_and_category=True)),
+                sorted(
+                    (attr.key, attr.category, attr.value, attr.lock_storage)
+                    for attr in obj.attributes.all()
+                ),
+                obj.locks.get("get"),
+                obj.ndb.temp,
+                obj.ndb.post_creation_strength,
+            )
+
+        single = spawner.spawn(prot)
+        with mock.patch(
+            "evennia.prototypes.spawner._bulk_create_objects",
+            wraps=spawner._bulk_create_objects,
+        ) as mock_bulk:
+            spawner.spawn(prot, prot)
+            mock_bulk.assert_not_called()
+            bulk = spawner.spawn(prot, prot, prot, bulk=True)
+            mock_bulk.assert_called_once()
+        self.assertEqual(len(bulk), 3)
+
+        expected = _state(single[0])
+        self.assertEqual(expected[4][-1], ("heavy", "weight"))
+        self.assertIn(("strength", None, 10, ""), expected[5])
+        self.assertEqual(expected[8], 10)
+        for obj in bulk:
+            self.assertEqual(_state(obj), expected)
+            # check that the database agrees with the caches
+            obj.flush_from_cache(force=True)
+            self.assertEqual(_state(ObjectDB.objects.get(id=obj.id))[:7], expected[:7])
+        self.assertEqual(ObjectDB.objects.get_tag("heavy", "weight")[0].db_data, "tagdata")
+        self.assertEqual(set(ObjectDB.objects.get_by_tag("heavy", "weight")), set(single + bulk))
+        for obj in single + bulk:
+            self.assertIn(obj, self.room1.contents)
+
+    def test_bulk_spawn_rollback(self):
+        prot = {
+            "prototype_key": "bulkprototype",
+            "typeclass": "evennia.objects.objects.DefaultObject",
+            "location": self.room1,
+        }
+        with (
+            mock.patch.object(DefaultObject, "at_object_creation", side_effect=RuntimeError),
+            self.assertRaises(RuntimeError),
+        ):
+            spawner.spawn(prot, prot, bulk=True)
+        self.assertFalse(protlib.search_objects_with_prototype("bulkprototype"))
+        self.assertCountEqual(
+            self.room1.contents, [self.char1, self.char2, self.exit, self.obj1, self.obj2]
+        )
+
+    def test_bulk_spawn_post_spawn_error(self):
+        """An error in one object's spawn hook leaves all objects created and hooked"""
+        prot = {
+            "prototype_key": "bulkprototype",
+            "typeclass": "evennia.objects.objects.DefaultObject",
+            "location": self.room1,
+        }
+        with (
+            mock.patch.object(
+                DefaultObject, "at_object_post_spawn", side_effect=[RuntimeError, None, None]
+            ) as mock_hook,
+            self.assertRaises(RuntimeError),
+        ):
+            spawner.spawn(prot, prot, prot, bulk=True)
+        self.assertEqual(mock_hook.call_count, 3)
+        self.assertEqual(len(protlib.search_objects_with_prototype("bulkprototype")), 3)
+
+    def test_bulk_spawn_fallback(self):
+        """Typeclasses customizing save or post_save are spawned one at a time"""
+        prot = {
+            "prototype_key": "bulkprototype",
+            "typeclass": "evennia.prototypes.tests.SaveOverridingTestObject",
+        }
+        with mock.patch("evennia.prototypes.spawner._bulk_create_objects") as mock_bulk:
+            objs = spawner.spawn(prot, prot, bulk=True)
+            mock_bulk.assert_not_called()
+        self.assertTrue(all(obj.ndb.saved for obj in objs))
+
+        receiver = mock.Mock()
+        prot["typeclass"] = "evennia.objects.objects.DefaultObject"
+        post_save.connect(receiver, sender=DefaultObject, weak=False)
+        try:
+            with mock.patch("evennia.prototypes.spawner._bulk_create_objects") as mock_bulk:
+                spawner.spawn(prot, prot, bulk=True)
+                mock_bulk.assert_not_called()
+        finally:
+            post_save.disconnect(receiver, sender=DefaultObject)
+        self.assertEqual(receiver.call_count, 2)
+
+    def test_batch_update_objects_with_prototype(self):
+        """Updating many objects at once, with caches kept in sync with the database"""
+        prot = {
+            "prototype_key": "updateprototype",
+            "typeclass": "evennia.objects.objects.DefaultObject",
+            "key": "rock",
+            "location": self.room1,
+            "locks": "get:false()",
+            "aliases": ["stone"],
+            "tags": [("heavy", "weight"), ("grey", None)],
+            "attrs": [("strength", 10), ("desc", "A rock.")],
+            "color": "grey",
+        }
+        objs = spawner.spawn(prot, prot, prot)
+        rolls = iter(range(3))
+
+        new_prot = dict(prot)
+        new_prot.update(
+            {
+                "key": "boulder",
+                "location": self.room2,
+                "locks": "get:true()",
+                "aliases": ["big rock"],
+                "tags": [("heavy", "weight")],
+                "attrs": [("strength", 20), ("size", "huge")],
+                "roll": lambda: next(rolls),
+            }
+        )
+        del new_prot["color"]
+
+        def _state(obj):
+            return (
+                obj.key,
+                obj.location,
+                obj.locks.get("get"),
+                sorted(obj.aliases.all()),
+                sorted(obj.tags.all(return_key_and_category=True)),
+                sorted((attr.key, attr.value) for attr in obj.attributes.all()),
+            )
+
+        count = spawner.batch_update_objects_with_prototype(new_prot, exact=True, chunk_size=2)
+        self.assertEqual(count, 3)
+
+        self.assertEqual(self.room2.contents.count(objs[0]), 1)
+        self.assertNotIn(objs[0], self.room1.contents)
+        expected = (
+            "boulder",
+            self.room2,
+            "get:true()",
+            # lists are updated, not replaced
+            ["big rock", "stone"],
+            [("grey", None), ("heavy", "weight"), ("updateprototype", "from_prototype")],
+            # lists are updated, and the diff only covers the prototype's own keys
+            [("color", "grey"), ("desc", "A rock."), ("size", "huge"), ("strength", 20)],
+        )
+        rolled = []
+        for obj in objs:
+            state = _state(obj)
+            self.assertEqual(state[5][2][0], "roll")
+            rolled.append(state[5][2][1])
+            self.assertEqual(state[:5], expected[:5])
+            self.assertEqual(state[5][:2] + state[5][3:], expected[5])
+            # check that the database agrees with the caches
+            obj.flush_from_cache(force=True)
+            self.assertEqual(_state(ObjectDB.objects.get(id=obj.id)), state)
+        # callables are evaluated for every object
+        self.assertEqual(sorted(rolled), [0, 1, 2])
+
+    def test_batch_update_objects_with_prototype_async(self):
+        prot = {
+            "prototype_key": "updateprototype",
+            "typeclass": "evennia.objects.objects.DefaultObject",
+            "attrs": [("strength", 10)],
+        }
+        objs = spawner.spawn(prot, prot, prot)
+        new_prot = dict(prot, attrs=[("strength", 20)])
+
+        clock = Clock()
+        cooperator = Cooperator(
+            terminationPredicateFactory=lambda: lambda: True,
+            scheduler=lambda step: clock.callLater(1, step),
+        )
+        result = []
+        with mock.patch("evennia.prototypes.spawner.task.cooperate", cooperator.cooperate):
+            deferred = spawner.batch_update_objects_with_prototype(
+                new_prot, chunk_size=1, run_async=True
+            )
+            deferred.addCallback(result.append)
+            # one chunk per reactor iteration
+            clock.advance(1)
+            self.assertEqual(sorted(obj.db.strength for obj in objs), [10, 10, 20])
+            for _ in range(3):
+                clock.advance(1)
+        self.assertEqual(result, [3])
+        self.assertEqual([obj.db.strength for obj in objs], [20, 20, 20])
+
 
 class TestUtils(BaseEvenniaTest):
     def test_prototype_from_object(self):
@@ -493,6 +786,72 @@ class TestPrototypeStorage(BaseEvenniaTest):
 
         self.assertTrue(str(str(protlib.list_prototypes(self.char1))))
 
+    def test_prototype_index(self):
+        prot1 = protlib.create_prototype(self.prot1)
+        prot2 = protlib.create_prototype(self.prot2)
+        with mock.patch("evennia.prototypes.prototypes._MODULE_PROTOTYPES", {}):
+            self.assertEqual(protlib.search_prototype("testprototype1"), [prot1])
+            self.assertEqual(protlib.search_prototype("TYPE"), [prot1, prot2])
+            self.assertEqual(protlib.search_prototype("pr"), [prot1, prot2])
+            self.assertEqual(protlib.search_prototype(tags=["FOO1"]), [prot1, prot2])
+            self.assertEqual(protlib.search_prototype("type2", tags=["foo1"]), [prot2])
+            self.assertEqual(protlib.search_prototype(tags=["foo1", "foo2"]), [])
+
+            # kept in sync when saving and deleting
+            prot1b = protlib.save_prototype(
+                {"prototype_key": "testprototype1", "prototype_tags": ["foo2"]}
+            )
+            self.assertEqual(protlib.search_prototype(tags=["foo1", "foo2"]), [prot1b])
+            protlib.delete_prototype("testprototype1")
+            self.assertEqual(protlib.search_prototype("type"), [prot2])
+            # also when deleted directly
+            protlib.DbPrototype.objects.get(db_key="testprototype2").delete()
+            self.assertEqual(protlib.search_prototype("type"), [])
+
+    def test_db_prototype_list(self):
+        prot1 = protlib.create_prototype(self.prot1)
+        prot2 = protlib.create_prototype(self.prot2)
+        protlib.DB_PROTOTYPE_CACHE.clear()
+        db_prototypes, _ = protlib.search_prototype("testprototype", return_iterators=True)
+        self.assertEqual(len(db_prototypes), 2)
+        with mock.patch.object(
+            protlib.dbserialize, "from_pickle", wraps=protlib.dbserialize.from_pickle
+        ) as mock_from_pickle:
+            self.assertEqual(db_prototypes[1:], [prot2])
+            self.assertEqual(mock_from_pickle.call_count, 1)
+        self.assertEqual(list(db_prototypes), [prot1, prot2])
+
+
+class TestPrototypeIndex(TestCase):
+    def setUp(self):
+        self.index = protlib.PrototypeIndex()
+        self.index.add("goblin", "goblin", ["monster", "green"])
+        self.index.add("goblin_chief", "goblin_chief", ["monster"])
+        self.index.add("sword", "sword", ["weapon"])
+
+    def test_search(self):
+        self.assertEqual(self.index.search("goblin"), (["goblin"], True))
+        self.assertEqual(self.index.search("lin"), (["goblin", "goblin_chief"], False))
+        self.assertEqual(self.index.search("lin", fuzzy=False), ([], False))
+        self.assertEqual(self.index.search("w"), (["sword"], False))
+        self.assertEqual(self.index.search("goblin", tags=["weapon"]), ([], False))
+        self.assertEqual(self.index.search(tags=["monster", "green"]), (["goblin"], False))
+        self.assertEqual(
+            self.index.search(tags=["green", "weapon"], match_any=True),
+            (["goblin", "sword"], False),
+        )
+        self.assertEqual(self.index.search(), (["goblin", "goblin_chief", "sword"], False))
+
+    def test_add_remove(self):
+        self.index.add("goblin", "goblin", ["weapon"])
+        self.assertEqual(self.index.search(tags=["monster"]), (["goblin_chief"], False))
+        self.assertEqual(self.index.search(tags=["weapon"]), (["goblin", "sword"], False))
+        self.index.remove("goblin_chief")
+        self.index.remove("goblin_chief")
+        self.assertNotIn("goblin_chief", self.index)
+        self.assertEqual(self.index.search("chief"), ([], False))
+        self.assertEqual(len(self.index), 2)
+
 
 class _MockMenu(object):
     pass
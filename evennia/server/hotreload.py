@@ -0,0 +1,310 @@
+"""
+In-process hot reload of game code.
+
+A normal `reload` restarts the whole Server process. This drops the idmapper
+cache, all non-persistent (`ndb`) state and all cmdset caches, and the game
+pauses while everything is loaded back in. A hot reload instead re-imports
+the changed game modules (typeclasses, commands, cmdsets, prototypes, lock
+functions) inside the running Server:
+
+- All already imported modules matching `settings.HOT_RELOAD_MODULES` whose
+  source files changed since the Server started (or since they were last
+  hot-reloaded) are re-imported, together with the game modules that import
+  them, in dependency order.
+- Cached typeclassed entities using a class from a re-imported module get
+  their `__class__` re-pointed to the new class with
+  `set_class_from_typeclass`. Their database caches and `ndb` data remain.
+- Cmdsets from the re-imported modules are re-imported on all cached
+  entities and sessions. If lock functions changed, the lock function cache
+  and the parsed locks are rebuilt too.
+- Module prototypes are reloaded if a prototype module was re-imported.
+
+Only code is re-imported. Changes to settings, or to modules imported when
+the Server starts (like `server.conf.at_server_startstop`), still need a
+full reload. Module-level state in re-imported modules is re-initialized.
+
+Usage (or use `reload/hot` in-game):
+
+```python
+from evennia.server.hotreload import hot_reload
+
+modules = hot_reload()
+```
+
+"""
+
+import importlib
+import os
+import sys
+import types
+import warnings
+
+from django.apps import apps
+from django.conf import settings
+
+import evennia
+from evennia.utils import gametime, logger
+
+
+class HotReloadError(RuntimeError):
+    """
+    Raised if a changed game module could not be re-imported.
+
+    """
+
+
+# module name: mtime of its source file when it was last (re)loaded
+_MODULE_MTIMES = {}
+
+
+def _match_prefixes(modulename, prefixes):
+    return any(modulename == prefix or modulename.startswith(prefix + ".") for prefix in prefixes)
+
+
+def _get_game_modules(prefixes=None):
+    """
+    Get all imported game modules.
+
+    Args:
+        prefixes (list, optional): Module-path prefixes of the game modules.
+            Defaults to `settings.HOT_RELOAD_MODULES`.
+
+    Returns:
+        dict: `{modulename: module}`.
+
+    """
+    prefixes = settings.HOT_RELOAD_MODULES if prefixes is None else prefixes
+    return {
+        name: module
+        for name, module in list(sys.modules.items())
+        if isinstance(module, types.ModuleType) and _match_prefixes(name, prefixes)
+    }
+
+
+def _get_mtime(module):
+    try:
+        return os.path.getmtime(module.__file__)
+    except (AttributeError, TypeError, OSError):
+        return None
+
+
+def get_changed_modules(prefixes=None):
+    """
+    Find the game modules whose source changed since they were loaded.
+
+    Args:
+        prefixes (list, optional): Module-path prefixes of the game modules.
+            Defaults to `settings.HOT_RELOAD_MODULES`.
+
+    Returns:
+        list: The names of the changed modules.
+
+    """
+    changed = []
+    for name, module in _get_game_modules(prefixes).items():
+        mtime = _get_mtime(module)
+        if mtime is not None and mtime > _MODULE_MTIMES.get(name, gametime.SERVER_START_TIME):
+            changed.append(name)
+    return sorted(changed)
+
+
+def _get_dependencies(module, modulenames):
+    """
+    Get the modules among `modulenames` that `module` uses at the module level.
+
+    """
+    dependencies = set()
+    for value in list(vars(module).values()):
+        if isinstance(value, types.ModuleType):
+            name = value.__name__
+        else:
+            try:
+                name = getattr(value, "__module__", None)
+            except Exception:
+                continue
+        if name in modulenames and name != module.__name__:
+            dependencies.add(name)
+    return dependencies
+
+
+def get_reload_order(modulenames, prefixes=None):
+    """
+    Get the modules to re-import when `modulenames` changed.
+
+    Args:
+        modulenames (list): Names of the changed modules.
+        prefixes (list, optional): Module-path prefixes of the game modules. Modules
+            depending on the changed modules are only looked for among these. Defaults to
+            `settings.HOT_RELOAD_MODULES`.
+
+    Returns:
+        list: The names of the changed modules and all game modules depending on
+            them, in the order they should be re-imported (dependencies first).
+
+    """
+    modules = _get_game_modules(prefixes)
+    modules.update({name: sys.modules[name] for name in modulenames if name in sys.modules})
+    dependencies = {
+        name: _get_dependencies(module, modules.keys()) for name, module in modules.items()
+    }
+
+    # add everything depending (also indirectly) on the changed modules
+    to_reload = set(name for name in modulenames if name in modules)
+    added = True
+    while added:
+        added = False
+        for name, deps in dependencies.items():
+            if name not in to_reload and deps & to_reload:
+                to_reload.add(name)
+                added = True
+
+    # sort so dependencies come first. Circular imports are re-imported in name order.
+    order = []
+    remaining = sorted(to_reload)
+    while remaining:
+        ready = [name for name in remaining if not (dependencies[name] & set(remaining))]
+        for name in ready or remaining[:1]:
+            order.append(name)
+            remaining.remove(name)
+    return order
+
+
+def _get_cached_entities():
+    """
+    Get all typeclassed entities in the idmapper cache.
+
+    """
+    from evennia.typeclasses.models import TypedObject
+
+    entities = []
+    for model in apps.get_models():
+        if issubclass(model, TypedObject) and not model._meta.proxy:
+            entities.extend(model.get_all_cached_instances())
+    return entities
+
+
+def _get_sessions():
+    sessionhandler = evennia.SERVER_SESSION_HANDLER
+    return list(sessionhandler.values()) if sessionhandler else []
+
+
+def _reload_modules(order):
+    """
+    Re-import the modules in order.
+
+    """
+    # check the changed sources before touching anything
+    for name in order:
+        path = getattr(sys.modules[name], "__file__", None)
+        if path and path.endswith(".py"):
+            try:
+                with open(path, "rb") as fil:
+                    compile(fil.read(), path, "exec")
+            except (SyntaxError, ValueError, OSError) as err:
+                raise HotReloadError(f"Could not compile {name}: {err}")
+
+    with warnings.catch_warnings():
+        # re-importing typeclasses re-registers their proxy models with Django
+        warnings.filterwarnings("ignore", message=r"Model .* was already registered")
+        for name in order:
+            module = sys.modules[name]
+            mtime = _get_mtime(module)
+            try:
+                importlib.reload(module)
+            except Exception as err:
+                logger.log_trace(f"Hot reload: error re-importing {name}.")
+                raise HotReloadError(f"Error re-importing {name}: {err}")
+            if mtime is not None:
+                _MODULE_MTIMES[name] = mtime
+
+
+def _update_cmdsets(cmdsethandlers, reloaded, reset_all=False):
+    """
+    Re-import the cmdsets from re-imported modules.
+
+    """
+    from evennia.commands import cmdhandler, cmdsethandler
+
+    for path, cmdsetclass in list(cmdsethandler._CACHED_CMDSETS.items()):
+        if reset_all or cmdsetclass.__module__ in reloaded:
+            del cmdsethandler._CACHED_CMDSETS[path]
+    cmdhandler._CMDSET_MERGE_CACHE.clear()
+
+    for handler in cmdsethandlers:
+        if reset_all or any(type(cmdset).__module__ in reloaded for cmdset in handler.cmdset_stack):
+            handler.reset()
+
+
+def hot_reload(modulenames=None, prefixes=None):
+    """
+    Re-import changed game modules inside the running Server and update all
+    cached entities to use the new code.
+
+    Args:
+        modulenames (list, optional): Names of the modules to re-import. If not given,
+            the game modules changed since they were loaded are used (see
+            `get_changed_modules`).
+        prefixes (list, optional): Module-path prefixes of the game modules. Defaults to
+            `settings.HOT_RELOAD_MODULES`.
+
+    Returns:
+        list: The names of all re-imported modules, in the order they were re-imported.
+            Empty if nothing changed.
+
+    Raises:
+        HotReloadError: If a module could not be re-imported. Modules re-imported
+            before the error are left as they are; use a full reload to recover.
+
+    """
+    from evennia.locks import lockhandler
+    from evennia.prototypes import prototypes as protlib
+    from evennia.server.signals import SIGNAL_SERVER_POST_HOT_RELOAD
+
+    if modulenames is None:
+        modulenames = get_changed_modules(prefixes)
+    order = get_reload_order(modulenames, prefixes)
+    if not order:
+        return []
+
+    _reload_modules(order)
+    reloaded = set(order)
+
+    entities = _get_cached_entities()
+
+    # re-point typeclasses
+    for entity in entities:
+        if type(entity).__module__ in reloaded:
+            entity.set_class_from_typeclass()
+
+    # lock functions
+    lockfuncs_changed = bool(reloaded.intersection(settings.LOCK_FUNC_MODULES))
+    if lockfuncs_changed:
+        lockhandler._cache_lockfuncs()
+        for entity in entities:
+            if "locks" in entity.__dict__:
+                entity.locks.reset()
+
+    # cmdsets (commands hold their own parsed locks, so renew all if lock functions changed)
+    cmdsethandlers = [
+        entity.__dict__["cmdset"] for entity in entities if "cmdset" in entity.__dict__
+    ]
+    cmdsethandlers.extend(
+        session.cmdset for session in _get_sessions() if getattr(session, "cmdset", None)
+    )
+    _update_cmdsets(cmdsethandlers, reloaded, reset_all=lockfuncs_changed)
+
+    # module prototypes
+    prototype_modules = [name for name in order if name in settings.PROTOTYPE_MODULES]
+    if prototype_modules and getattr(protlib.load_module_prototypes, "_LOADED", False):
+        # if not loaded yet, they will be loaded from the new modules on first use
+        for modulename in prototype_modules:
+            for prototype_key, mod in list(protlib._MODULE_PROTOTYPE_MODULES.items()):
+                if mod == repr(modulename):
+                    protlib._MODULE_PROTOTYPES.pop(prototype_key, None)
+                    protlib.MODULE_PROTOTYPE_INDEX.remove(prototype_key)
+                    del protlib._MODULE_PROTOTYPE_MODULES[prototype_key]
+        protlib.load_module_prototypes(*prototype_modules)
+
+    SIGNAL_SERVER_POST_HOT_RELOAD.send(sender=None, modules=order)
+    logger.log_info(f"Hot reload: re-imported {', '.join(order)}.")
+    return order
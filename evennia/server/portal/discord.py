@@ -24,6 +24,7 @@ from twisted.internet import protocol, reactor, ssl, task
 from twisted.web.client import Agent, FileBodyProducer, HTTPConnectionPool, readBody
 from twisted.web.http_headers import Headers
 
+from evennia.server.portal.outbound import OutboundQueue, RetryLater
 from evennia.server.session import Session
 from evennia.utils import class_from_module, get_evennia_version, logger
 from evennia.utils.utils import delay
@@ -48,6 +49,14 @@ OP_INVALID_SESSION = 9
 OP_RECONNECT = 7
 OP_RESUME = 6
 
+# Discord allows 5 messages per 5 seconds per channel; the actual limits are
+# reported back with every message sent and will replace these
+DISCORD_CHANNEL_RATE_LIMIT = 5
+DISCORD_CHANNEL_RATE_WINDOW = 5
+DISCORD_MAX_MESSAGE_LENGTH = 2000
+# seconds to wait before retrying a message Discord failed to handle
+DISCORD_RETRY_DELAY = 300
+
 
 # create quiet HTTP pool to muffle GET/POST requests
 class QuietConnectionPool(HTTPConnectionPool):
@@ -102,6 +111,8 @@ class DiscordWebsocketServerFactory(WebSocketClientFactory, protocol.Reconnectin
         self.sessionhandler = sessionhandler
         self.port = None
         self.bot = None
+        # queued channel messages, kept across reconnects
+        self.outbound = None
 
     def get_gateway_url(self, *args, **kwargs):
         # get the websocket gateway URL from Discord
@@ -227,6 +238,7 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
     last_sequence = 0
     session_id = None
     discord_id = None
+    outbound = None
 
     def __init__(self):
         WebSocketClientProtocol.__init__(self)
@@ -248,6 +260,19 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
         self.logged_in = True
         self.sessionhandler.connect(self)
 
+        if self.factory.outbound is None:
+            self.factory.outbound = OutboundQueue(
+                self._send_queued,
+                limit=DISCORD_CHANNEL_RATE_LIMIT,
+                window=DISCORD_CHANNEL_RATE_WINDOW,
+                max_length=DISCORD_MAX_MESSAGE_LENGTH,
+            )
+        self.outbound = self.factory.outbound
+        self.outbound.send_func = self._send_queued
+        self.outbound.on_busy = self.at_outbound_busy
+        # let the new session know if it should hold back its messages
+        self.at_outbound_busy(self.outbound.busy)
+
     def onMessage(self, payload, isBinary):
         """
         Callback fired when a complete WebSocket message was received.
@@ -343,19 +368,22 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
         """
         return self.sendMessage(json.dumps(data).encode("utf-8"))
 
-    def _post_json(self, url, data, **kwargs):
+    def _request(self, url, data, request_type="POST"):
         """
-        Post JSON data to a REST API endpoint
+        Send JSON data to a REST API endpoint
 
         Args:
             url (str) - The API path which is being posted to
             data (dict) - Content to be sent
+            request_type (str) - The HTTP method to use
+
+        Returns:
+            Deferred - Fires with the response.
         """
         url = f"{DISCORD_API_BASE_URL}/{url}"
         body = FileBodyProducer(BytesIO(json.dumps(data).encode("utf-8")))
-        request_type = kwargs.pop("type", "POST")
 
-        d = _AGENT.request(
+        return _AGENT.request(
             request_type.encode("utf-8"),
             url.encode("utf-8"),
             Headers(
@@ -368,15 +396,84 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
             body,
         )
 
+    def _post_json(self, url, data, **kwargs):
+        """
+        Post JSON data to a REST API endpoint
+
+        Args:
+            url (str) - The API path which is being posted to
+            data (dict) - Content to be sent
+        """
+        request_type = kwargs.pop("type", "POST")
+        d = self._request(url, data, request_type)
+
+        def cbResponse(response):
+            if response.code == 200 or response.code == 204:
+                d = readBody(response)
+                d.addCallback(self.post_response)
+                return d
+            elif should_retry(response.code):
+                delay(DISCORD_RETRY_DELAY, self._post_json, url, data, type=request_type)
+
+        d.addCallback(cbResponse)
+
+    def _send_queued(self, channel_id, text):
+        """
+        Send a (coalesced) message from the outbound queue to a Discord channel,
+        updating the queue with the rate limits Discord reports back.
+
+        Args:
+            channel_id (str) - The Discord channel to send to
+            text (str) - The message
+
+        Returns:
+            Deferred - Fires with the seconds to wait before sending the message
+                again if it was refused, otherwise with None. Fails with `RetryLater`
+                on a temporary server error.
+        """
+        d = self._request(f"channels/{channel_id}/messages", {"content": text})
+
+        def _header(response, name, convert):
+            values = response.headers.getRawHeaders(name)
+            return convert(values[0]) if values else None
+
         def cbResponse(response):
+            self.outbound.update_bucket(
+                channel_id,
+                remaining=_header(response, "X-RateLimit-Remaining", int),
+                reset_after=_header(response, "X-RateLimit-Reset-After", float),
+                limit=_header(response, "X-RateLimit-Limit", int),
+                bucket_key=_header(response, "X-RateLimit-Bucket", str),
+            )
             if response.code == 200 or response.code == 204:
                 d = readBody(response)
                 d.addCallback(self.post_response)
                 return d
+            elif response.code == 429:
+                # rate limited after all; Discord tells us how long to wait
+                d = readBody(response)
+                d.addCallback(cbRateLimited, response)
+                return d
             elif should_retry(response.code):
-                delay(300, self._post_json, url, data, **kwargs)
+                # a temporary server error; retry just this message, shortly
+                raise RetryLater(f"Discord answered {response.code}")
+            else:
+                d = readBody(response)
+                d.addCallback(self.post_response)
+                return d
+
+        def cbRateLimited(body, response):
+            try:
+                data = json.loads(body)
+            except ValueError:
+                data = {}
+            retry_after = data.get("retry_after") or _header(response, "Retry-After", float) or 1
+            if data.get("global"):
+                self.outbound.block_all(retry_after)
+            return retry_after
 
         d.addCallback(cbResponse)
+        return d
 
     def post_response(self, body, **kwargs):
         """
@@ -385,7 +482,7 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
         Args:
             body (bytes) - The post response body
         """
-        data = json.loads(body)
+        data = json.loads(body) if body else {}
         if "errors" in data:
             self.handle_error(data)
 
@@ -486,9 +583,13 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
 
         """
 
-        data = {"content": text}
-        data.update(kwargs)
-        self._post_json(f"channels/{channel_id}/messages", data)
+        if kwargs or self.outbound is None:
+            # not a plain text message; send as-is
+            data = {"content": text}
+            data.update(kwargs)
+            self._post_json(f"channels/{channel_id}/messages", data)
+        else:
+            self.outbound.send(channel_id, text)
 
     def send_nickname(self, text, guild_id, user_id, **kwargs):
         """
@@ -505,6 +606,18 @@ class DiscordClient(WebSocketClientProtocol, _BASE_SESSION_CLASS):
         data = kwargs
         self._post_json(f"guilds/{guild_id}/members/{user_id}/roles/{role_id}", data, type="PUT")
 
+    def at_outbound_busy(self, busy):
+        """
+        Called when more channel messages are waiting to be sent than Discord's rate
+        limits let us keep up with, and again when the queue has caught up. This tells
+        the Server to hold back (or resume) sending us channel messages.
+
+        Args:
+            busy (bool) - If the outbound queue is busy.
+
+        """
+        self.sessionhandler.data_in(self, bot_data_in=("", {"type": "busy", "busy": busy}))
+
     def send_default(self, *args, **kwargs):
         """
         Ignore other outputfuncs
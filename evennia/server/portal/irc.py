@@ -6,10 +6,12 @@ more Evennia channels.
 
 import re
 
+from django.conf import settings
 from twisted.application import internet
 from twisted.internet import protocol, reactor
 from twisted.words.protocols import irc
 
+from evennia.server.portal.outbound import OutboundQueue
 from evennia.server.session import Session
 from evennia.utils import ansi, logger, utils
 
@@ -157,6 +159,11 @@ class IRCBot(irc.IRCClient, Session):
     """
 
     lineRate = 1
+    # queued channel messages are coalesced into lines this long
+    max_line_length = 400
+    line_separator = " | "
+    # while reconnecting, queued lines are held and retried this often (in seconds)
+    reconnect_retry_delay = 2
 
     # assigned by factory at creation
 
@@ -165,6 +172,7 @@ class IRCBot(irc.IRCClient, Session):
     factory = None
     channel = None
     sourceURL = "http://code.evennia.com"
+    outbound = None
 
     def signedOn(self):
         """
@@ -181,6 +189,21 @@ class IRCBot(irc.IRCClient, Session):
         self.uid = int(self.factory.uid)
         self.logged_in = True
         self.factory.sessionhandler.connect(self)
+        if self.factory.outbound is None:
+            self.factory.outbound = OutboundQueue(
+                self._send_queued,
+                limit=settings.IRC_OUTBOUND_LIMIT,
+                window=settings.IRC_OUTBOUND_WINDOW,
+                max_length=self.max_line_length,
+                separator=self.line_separator,
+                bucket_key="irc",
+            )
+        # the queue is kept across reconnects; send what's left of it with this connection
+        self.outbound = self.factory.outbound
+        self.outbound.send_func = self._send_queued
+        self.outbound.on_busy = self.at_outbound_busy
+        # let the new session know if it should hold back its messages
+        self.at_outbound_busy(self.outbound.busy)
         logger.log_info(
             "IRC bot '%s' connected to %s at %s:%s."
             % (self.nickname, self.channel, self.network, self.port)
@@ -198,6 +221,18 @@ class IRCBot(irc.IRCClient, Session):
         self.stopping = True
         self.transport.loseConnection()
 
+    def connectionLost(self, reason):
+        """
+        Called when the connection to the network was lost. Lines still in the
+        outbound queue are held until we have reconnected.
+
+        Args:
+            reason (Failure): Why the connection was lost.
+
+        """
+        irc.IRCClient.connectionLost(self, reason)
+        self.connected = 0
+
     def at_login(self):
         pass
 
@@ -298,7 +333,10 @@ class IRCBot(irc.IRCClient, Session):
         text = args[0] if args else ""
         if text:
             text = parse_ansi_to_irc(text)
-            self.say(self.channel, text)
+            if self.outbound is None:
+                self.say(self.channel, text)
+            else:
+                self.outbound.send(self.channel, text)
 
     def send_privmsg(self, *args, **kwargs):
         """
@@ -316,7 +354,42 @@ class IRCBot(irc.IRCClient, Session):
         user = kwargs.get("user", None)
         if text and user:
             text = parse_ansi_to_irc(text)
-            self.msg(user, text)
+            if self.outbound is None:
+                self.msg(user, text)
+            else:
+                self.outbound.send(user, text)
+
+    def _send_queued(self, destination, text):
+        """
+        Send a (coalesced) line from the outbound queue.
+
+        Args:
+            destination (str): The channel or nick to send to.
+            text (str): The line to send.
+
+        Returns:
+            float or None: If the connection was lost, the seconds after which to retry
+                sending the line, by which time we may have reconnected.
+
+        """
+        if not self.connected:
+            return self.reconnect_retry_delay
+        if destination == self.channel:
+            self.say(self.channel, text)
+        else:
+            self.msg(destination, text)
+
+    def at_outbound_busy(self, busy):
+        """
+        Called when more messages are waiting to be sent than the IRC network's
+        rate limits let us keep up with, and again when the queue has caught up.
+        This tells the Server to hold back (or resume) sending us messages.
+
+        Args:
+            busy (bool): If the outbound queue is busy.
+
+        """
+        self.data_in(text="", type="busy", user="server", channel=self.channel, busy=busy)
 
     def send_request_nicklist(self, *args, **kwargs):
         """
@@ -394,6 +467,8 @@ class IRCBotFactory(protocol.ReconnectingClientFactory):
         self.ssl = ssl
         self.bot = None
         self.nicklists = {}
+        # queued outgoing lines, kept across reconnects
+        self.outbound = None
 
     def buildProtocol(self, addr):
         """
@@ -0,0 +1,398 @@
+"""
+Rate-limited outbound queues for the bridge protocols (IRC, Discord).
+
+The bridges relay everything said on a linked in-game channel to an external
+chat service. Those services only accept so many messages in a given time; if a
+busy channel goes over that limit, messages are refused (Discord answers with
+HTTP 429) or the bot is kicked off the network for flooding (IRC).
+
+An `OutboundQueue` sits between the protocol and the wire. Messages are queued
+per destination (an IRC channel or user, a Discord channel id) and sent only as
+fast as the destination's rate-limit bucket allows. Whenever messages have to
+wait, the next send coalesces as many of them as fit into one multi-line message,
+so a burst of 20 channel messages will usually go out as one or two upstream
+messages instead of being refused.
+
+A rate-limit bucket allows `limit` sends until its window resets. The protocol
+can update a bucket from what the upstream service reports (such as Discord's
+`X-RateLimit-*` headers) or leave it at the static limit it was given (IRC). The
+`send_func` given to the queue does the actual sending; it may return a Deferred.
+If it returns (or the Deferred fires with) a number, the message was refused by
+a rate limit and is re-queued and retried after that many seconds. If it fails
+with `RetryLater` (such as on a temporary server error), only that message is
+retried, after a short delay doubling with every failure in a row; the rate-limit
+bucket is left alone. After `max_retries` failures in a row the message is dropped.
+
+If the queue keeps growing anyway, it applies backpressure: once more than
+`busy_queued` messages are waiting, `on_busy(True)` is called so the protocol
+can tell the Server to hold back; when the queue has drained to half of that,
+`on_busy(False)` is called. Each destination never holds more than `max_queued`
+messages; beyond that the oldest are dropped (and counted in `num_dropped`).
+
+"""
+
+from collections import deque
+
+from django.conf import settings
+from twisted.internet import reactor
+from twisted.internet.defer import maybeDeferred
+
+from evennia.utils import logger
+
+_MAX_QUEUED = settings.BOT_OUTBOUND_MAX_QUEUED
+_BUSY_QUEUED = settings.BOT_OUTBOUND_BUSY_QUEUED
+
+
+class RetryLater(Exception):
+    """
+    Raised by (or failing the Deferred of) a queue's `send_func` when a message could
+    not be sent because of a temporary error, and should be retried shortly.
+
+    """
+
+
+class RateLimitBucket:
+    """
+    Allows `limit` sends per window of `window` seconds.
+
+    """
+
+    def __init__(self, limit=1, window=1.0):
+        """
+        Args:
+            limit (int, optional): Sends allowed per window.
+            window (float, optional): Seconds until the sends allowed reset.
+
+        """
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0
+
+    def get_wait(self, now):
+        """
+        Get how long to wait before the next send is allowed.
+
+        Args:
+            now (float): The current time.
+
+        Returns:
+            float: Seconds to wait, 0 if a send is allowed now.
+
+        """
+        if now >= self.reset_at:
+            return 0
+        return 0 if self.remaining > 0 else self.reset_at - now
+
+    def consume(self, now):
+        """
+        Use up one send, starting a new window if the last one has passed.
+
+        Args:
+            now (float): The current time.
+
+        """
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        self.remaining = max(0, self.remaining - 1)
+
+    def update(self, now, remaining=None, reset_after=None, limit=None):
+        """
+        Update the bucket from what the upstream service reported.
+
+        Args:
+            now (float): The current time.
+            remaining (int, optional): Sends left in the current window.
+            reset_after (float, optional): Seconds until the window resets.
+            limit (int, optional): Sends allowed per window.
+
+        """
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset_after is not None:
+            self.reset_at = now + reset_after
+            self.window = max(self.window, reset_after)
+
+    def block(self, now, retry_after):
+        """
+        Allow no more sends for `retry_after` seconds.
+
+        Args:
+            now (float): The current time.
+            retry_after (float): Seconds to block.
+
+        """
+        self.remaining = 0
+        self.reset_at = now + retry_after
+
+
+class OutboundQueue:
+    """
+    Per-destination queues of outgoing messages, sent within the rate limits.
+
+    """
+
+    def __init__(
+        self,
+        send_func,
+        limit=1,
+        window=1.0,
+        max_length=2000,
+        separator="\n",
+        bucket_key=None,
+        max_queued=_MAX_QUEUED,
+        busy_queued=_BUSY_QUEUED,
+        on_busy=None,
+        retry_delay=1.0,
+        max_retries=5,
+        clock=reactor,
+    ):
+        """
+        Args:
+            send_func (callable): Called as `send_func(destination, text)` to send a
+                message. If it returns a number (or a Deferred firing with one), the
+                message was refused because of a rate limit and is retried after that
+                many seconds. If it fails with `RetryLater`, the message is retried
+                after a backoff delay.
+            limit (int, optional): Sends allowed per window, per destination, until
+                the protocol updates the bucket with `update_bucket`.
+            window (float, optional): Length of a rate-limit window, in seconds.
+            max_length (int, optional): Queued messages are coalesced into one as long
+                as the result is no longer than this.
+            separator (str, optional): What to join coalesced messages with.
+            bucket_key (str, optional): If given, all destinations share one rate-limit
+                bucket with this key, for services limiting the connection as a whole.
+            max_queued (int, optional): Max messages to queue per destination. Beyond
+                this, the oldest are dropped.
+            busy_queued (int, optional): Call `on_busy(True)` when more than this many
+                messages are queued in total, and `on_busy(False)` when down to half.
+            on_busy (callable, optional): Called as `on_busy(busy)`.
+            retry_delay (float, optional): Seconds to wait before retrying a message
+                failing with `RetryLater`. This doubles for every failure in a row.
+            max_retries (int, optional): Drop a message failing with `RetryLater`
+                this many times in a row.
+            clock (IReactorTime, optional): The clock to time the sends with.
+
+        """
+        self.send_func = send_func
+        self.limit = limit
+        self.window = window
+        self.max_length = max_length
+        self.separator = separator
+        self.bucket_key = bucket_key
+        self.max_queued = max_queued
+        self.busy_queued = busy_queued
+        self.on_busy = on_busy
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.clock = clock
+        self.queues = {}
+        self.buckets = {}
+        # destination -> bucket key, for destinations sharing a bucket
+        self.bucket_keys = {}
+        # time until which nothing may be sent, to any destination
+        self.blocked_until = 0
+        # destination -> (failures in a row, time until which to wait), for retries
+        self.retries = {}
+        self.busy = False
+        self.num_sent = 0
+        self.num_coalesced = 0
+        self.num_dropped = 0
+        self._sending = set()
+        self._calls = {}
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def get_bucket(self, destination):
+        """
+        Get the rate-limit bucket of a destination, creating it if needed.
+
+        Args:
+            destination (any): The destination.
+
+        Returns:
+            RateLimitBucket: The bucket.
+
+        """
+        key = self.bucket_keys.get(
+            destination, destination if self.bucket_key is None else self.bucket_key
+        )
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = RateLimitBucket(limit=self.limit, window=self.window)
+        return bucket
+
+    def update_bucket(
+        self, destination, remaining=None, reset_after=None, limit=None, bucket_key=None
+    ):
+        """
+        Update the rate-limit bucket of a destination from what the upstream service
+        reported about it.
+
+        Args:
+            destination (any): The destination.
+            remaining (int, optional): Sends left in the current window.
+            reset_after (float, optional): Seconds until the window resets.
+            limit (int, optional): Sends allowed per window.
+            bucket_key (str, optional): Id of the bucket, if the upstream service
+                lets several destinations share one.
+
+        """
+        if bucket_key is not None and self.bucket_keys.get(destination) != bucket_key:
+            self.bucket_keys[destination] = bucket_key
+            if bucket_key not in self.buckets:
+                self.buckets[bucket_key] = self.buckets.pop(destination, None) or RateLimitBucket(
+                    limit=self.limit, window=self.window
+                )
+        self.get_bucket(destination).update(
+            self.clock.seconds(), remaining=remaining, reset_after=reset_after, limit=limit
+        )
+
+    def block_all(self, retry_after):
+        """
+        Stop sending to all destinations for a while, such as when the upstream service
+        reports a global rate limit.
+
+        Args:
+            retry_after (float): Seconds to wait.
+
+        """
+        self.blocked_until = max(self.blocked_until, self.clock.seconds() + retry_after)
+        for destination in list(self._calls):
+            self._calls.pop(destination).cancel()
+            self._schedule(destination)
+
+    def send(self, destination, text):
+        """
+        Queue a message and send it as soon as the rate limits allow.
+
+        Args:
+            destination (any): Where to send the message.
+            text (str): The message.
+
+        """
+        queue = self.queues.get(destination)
+        if queue is None:
+            queue = self.queues[destination] = deque()
+        queue.append(text)
+        if len(queue) > self.max_queued:
+            queue.popleft()
+            self.num_dropped += 1
+            if self.num_dropped == 1 or not self.num_dropped % 100:
+                logger.log_warn(
+                    f"Outbound queue to {destination} is full; {self.num_dropped} "
+                    "messages dropped so far."
+                )
+        self._update_busy()
+        self._schedule(destination)
+
+    def _schedule(self, destination):
+        """
+        Send the next message to `destination` now, or schedule it for when the rate
+        limits allow.
+
+        """
+        if destination not in self._sending and destination not in self._calls:
+            self._send_next(destination)
+
+    def _pop_coalesced(self, queue):
+        """
+        Pop the first message off the queue, joined with as many of the following ones
+        as fit in `max_length`.
+
+        """
+        texts = [queue.popleft()]
+        length = len(texts[0])
+        while queue and length + len(self.separator) + len(queue[0]) <= self.max_length:
+            length += len(self.separator) + len(queue[0])
+            texts.append(queue.popleft())
+        self.num_coalesced += len(texts) - 1
+        return self.separator.join(texts)
+
+    def _send_next(self, destination):
+        """
+        Send the next (coalesced) message to `destination`, or wait until the rate
+        limits allow it.
+
+        """
+        self._calls.pop(destination, None)
+        queue = self.queues.get(destination)
+        if not queue:
+            self.queues.pop(destination, None)
+            return
+        now = self.clock.seconds()
+        # the buckets may have been updated since this send was scheduled
+        wait = max(
+            self.blocked_until - now,
+            self.retries.get(destination, (0, 0))[1] - now,
+            self.get_bucket(destination).get_wait(now),
+        )
+        if wait > 0:
+            self._calls[destination] = self.clock.callLater(wait, self._send_next, destination)
+            return
+        text = self._pop_coalesced(queue)
+        self.get_bucket(destination).consume(now)
+        self._sending.add(destination)
+        d = maybeDeferred(self.send_func, destination, text)
+        d.addCallback(self._sent, destination, text)
+        d.addErrback(self._send_failed, destination, text)
+
+    def _sent(self, retry_after, destination, text):
+        """
+        Called when a message was sent, or refused because of a rate limit.
+
+        """
+        self._sending.discard(destination)
+        self.retries.pop(destination, None)
+        if retry_after is None:
+            self.num_sent += 1
+        else:
+            # refused; put it back first in line and wait
+            queue = self.queues.get(destination)
+            if queue is None:
+                queue = self.queues[destination] = deque()
+            queue.appendleft(text)
+            self.get_bucket(destination).block(self.clock.seconds(), retry_after)
+        self._update_busy()
+        self._schedule(destination)
+
+    def _send_failed(self, failure, destination, text):
+        """
+        Called when sending failed for a reason other than a rate limit. The message is
+        retried after a backoff delay if the failure was `RetryLater`, otherwise dropped.
+
+        """
+        self._sending.discard(destination)
+        num_failed = self.retries.get(destination, (0, 0))[0] + 1
+        if failure.check(RetryLater) and num_failed < self.max_retries:
+            # put it back first in line, without blocking the bucket for the others
+            queue = self.queues.get(destination)
+            if queue is None:
+                queue = self.queues[destination] = deque()
+            queue.appendleft(text)
+            retry_at = self.clock.seconds() + self.retry_delay * 2 ** (num_failed - 1)
+            self.retries[destination] = (num_failed, retry_at)
+        else:
+            self.retries.pop(destination, None)
+            logger.log_err(f"Failed to send message to {destination}: {failure.getErrorMessage()}")
+        self._update_busy()
+        self._schedule(destination)
+
+    def _update_busy(self):
+        """
+        Report to `on_busy` if the queue became busy, or is no longer busy.
+
+        """
+        num_queued = len(self)
+        if not self.busy and num_queued > self.busy_queued:
+            self.busy = True
+        elif self.busy and num_queued <= self.busy_queued // 2:
+            self.busy = False
+        else:
+            return
+        if self.on_busy:
+            self.on_busy(self.busy)
@@ -0,0 +1,126 @@
+"""
+Render cache for outgoing text on the Portal.
+
+When the Server broadcasts the same text to many sessions (channel messages,
+room emotes, global announcements), every receiving protocol would normally
+re-parse the Evennia markup on its own. All sessions sharing the same client
+capabilities (ANSI, xterm256, truecolor, MXP, screenreader mode or html for
+the webclient) will always end up with the same rendered output, so this
+module caches the result keyed on the text and such a 'capability profile'.
+
+The key is a `(text, profile)` tuple. Python caches the hash of a string on
+the string itself, so looking up the same message object for the 500th
+receiver does not need to re-hash or copy the text.
+
+The cache is an LRU capped by `settings.PORTAL_RENDER_CACHE_SIZE` entries.
+Texts longer than `settings.PORTAL_RENDER_CACHE_MAX_TEXT_LENGTH` characters
+are rendered but never stored, which bounds the memory used by the cache.
+
+"""
+
+from collections import OrderedDict
+
+from django.conf import settings
+
+_RENDER_CACHE_SIZE = settings.PORTAL_RENDER_CACHE_SIZE
+_RENDER_CACHE_MAX_TEXT_LENGTH = settings.PORTAL_RENDER_CACHE_MAX_TEXT_LENGTH
+
+
+class RenderCache:
+    """
+    A bounded LRU cache mapping `(text, profile)` to rendered output.
+
+    """
+
+    def __init__(self, maxsize=_RENDER_CACHE_SIZE, max_text_length=_RENDER_CACHE_MAX_TEXT_LENGTH):
+        """
+        Args:
+            maxsize (int, optional): Max number of cached renderings. If 0,
+                the cache is disabled and all calls render directly.
+            max_text_length (int, optional): Texts longer than this are not cached.
+
+        """
+        self.maxsize = maxsize
+        self.max_text_length = max_text_length
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def render(self, text, profile, renderer):
+        """
+        Get the rendered version of `text` for a given capability profile,
+        calling `renderer` only if this combination is not already cached.
+
+        Args:
+            text (str): The text to render.
+            profile (tuple): A hashable tuple describing everything (apart from
+                the text itself) that affects the output, such as the protocol
+                kind and color/mxp/screenreader flags.
+            renderer (callable): Called as `renderer(text, profile)` to produce
+                the output on a cache miss. Must be deterministic for a given
+                input.
+
+        Returns:
+            any: The rendered output.
+
+        """
+        if not self.maxsize or type(text) is not str or len(text) > self.max_text_length:
+            # ANSIStrings and other str-subclasses carry their own state, so
+            # we don't risk mixing them up with a plain string.
+            self.misses += 1
+            return renderer(text, profile)
+
+        key = (text, profile)
+        cache = self._cache
+        try:
+            result = cache[key]
+        except KeyError:
+            self.misses += 1
+            result = renderer(text, profile)
+            cache[key] = result
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            cache.move_to_end(key)
+        return result
+
+    def stats(self):
+        """
+        Get statistics about cache usage.
+
+        Returns:
+            dict: With keys `hits`, `misses`, `evictions`, `size`, `maxsize` and
+                `hitrate` (a float 0..1).
+
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hitrate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self, reset_stats=False):
+        """
+        Empty the cache.
+
+        Args:
+            reset_stats (bool, optional): Also zero the hit/miss counters.
+
+        """
+        self._cache.clear()
+        if reset_stats:
+            self.hits = self.misses = self.evictions = 0
+
+
+# the Portal-wide cache shared by all protocols
+RENDER_CACHE = RenderCache()
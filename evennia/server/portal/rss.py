@@ -4,15 +4,27 @@ RSS parser for Evennia
 This connects an RSS feed to an in-game Evennia channel, sending messages
 to the channel whenever the feed updates.
 
+Feeds are requested with the ETag/Last-Modified of the last response, so a
+feed that didn't change since is answered with a short '304 Not Modified' and
+not downloaded or parsed again. A feed that had no news is checked less and
+less often, up to `settings.RSS_UPDATE_INTERVAL` seconds apart, and again at
+its normal rate as soon as it has news. The entries already relayed (and the
+ETag/Last-Modified) are stored on the RSS bot account on the Server, so they
+are not relayed again after a restart.
+
 """
 
+from collections import OrderedDict
+
 from django.conf import settings
-from twisted.internet import task, threads
+from twisted.internet import reactor, threads
 
 from evennia.server.session import Session
 from evennia.utils import logger
 
 RSS_ENABLED = settings.RSS_ENABLED
+_MAX_UPDATE_INTERVAL = settings.RSS_UPDATE_INTERVAL
+_MAX_SEEN_ENTRIES = settings.RSS_MAX_SEEN_ENTRIES
 # RETAG = re.compile(r'<[^>]*?>')
 
 if RSS_ENABLED:
@@ -30,33 +42,69 @@ class RSSReader(Session):
 
     """
 
-    def __init__(self, factory, url, rate):
+    # for every update without news, the time to the next update grows by this factor
+    backoff_factor = 1.5
+
+    def __init__(self, factory, url, rate, etag=None, modified=None, seen=None):
         """
         Initialize the reader.
 
         Args:
             factory (RSSFactory): The protocol factory.
             url (str): The RSS url.
-            rate (int): The seconds between RSS lookups.
+            rate (int): The seconds between RSS lookups, when the feed has news.
+            etag (str, optional): The ETag of the feed when last requested.
+            modified (str, optional): The Last-Modified of the feed when last requested.
+            seen (list, optional): Keys of the entries already seen, oldest first.
 
         """
         self.url = url
         self.rate = rate
+        self.interval = rate
         self.factory = factory
-        self.old_entries = {}
+        self.etag = etag
+        self.modified = modified
+        self.seen = OrderedDict.fromkeys(seen or ())
+        self.state_changed = False
+
+    def get_entry_key(self, entry):
+        """
+        Get the key identifying an entry (and its version) in the seen-entry index.
+
+        Args:
+            entry (dict): The feed entry.
+
+        Returns:
+            str: The key.
+
+        """
+        idval = entry.get("id") or entry.get("link") or entry.get("title", "")
+        return idval + entry.get("updated", "")
 
     def get_new(self):
         """
         Returns list of new items.
 
         """
-        feed = feedparser.parse(self.url)
+        feed = feedparser.parse(self.url, etag=self.etag, modified=self.modified)
+        if feed.get("status") == 304:
+            # not modified since the last request
+            return []
+        etag, modified = feed.get("etag"), feed.get("modified")
+        if (etag, modified) != (self.etag, self.modified):
+            self.etag, self.modified = etag, modified
+            self.state_changed = True
         new_entries = []
         for entry in feed["entries"]:
-            idval = entry["id"] + entry.get("updated", "")
-            if idval not in self.old_entries:
-                self.old_entries[idval] = entry
+            key = self.get_entry_key(entry)
+            if key not in self.seen:
+                self.seen[key] = None
                 new_entries.append(entry)
+        if new_entries:
+            self.state_changed = True
+            # always remember at least the entries still in the feed
+            while len(self.seen) > max(_MAX_SEEN_ENTRIES, len(feed["entries"])):
+                self.seen.popitem(last=False)
         return new_entries
 
     def disconnect(self, reason=None):
@@ -67,8 +115,7 @@ class RSSReader(Session):
             reason (str, optional): Motivation for the disconnect.
 
         """
-        if self.factory.task and self.factory.task.running:
-            self.factory.task.stop()
+        self.factory.stop()
         self.sessionhandler.disconnect(self)
 
     def _callback(self, new_entries, init):
@@ -85,6 +132,33 @@ class RSSReader(Session):
             # for initialization we just ignore old entries
             for entry in reversed(new_entries):
                 self.data_in(entry)
+        if self.state_changed:
+            self.state_changed = False
+            self.sessionhandler.data_in(
+                self,
+                bot_data_in=(
+                    "",
+                    {
+                        "type": "rss_state",
+                        "etag": self.etag,
+                        "modified": self.modified,
+                        "seen": list(self.seen),
+                    },
+                ),
+            )
+        if new_entries:
+            self.interval = self.rate
+        else:
+            self._back_off()
+
+    def _back_off(self):
+        """
+        Wait longer until the next update, up to `settings.RSS_UPDATE_INTERVAL`.
+
+        """
+        self.interval = min(
+            max(self.rate, _MAX_UPDATE_INTERVAL), self.interval * self.backoff_factor
+        )
 
     def data_in(self, text=None, **kwargs):
         """
@@ -100,6 +174,7 @@ class RSSReader(Session):
     def _errback(self, fail):
         "Report error"
         logger.log_err("RSS feed error: %s" % fail.value)
+        self._back_off()
 
     def update(self, init=False):
         """
@@ -126,7 +201,11 @@ class RSSBotFactory(object):
     Initializes new bots.
     """
 
-    def __init__(self, sessionhandler, uid=None, url=None, rate=None):
+    clock = reactor
+
+    def __init__(
+        self, sessionhandler, uid=None, url=None, rate=None, etag=None, modified=None, seen=None
+    ):
         """
         Initialize the bot.
 
@@ -135,32 +214,60 @@ class RSSBotFactory(object):
             uid (int): User id for the bot.
             url (str): The RSS URL.
             rate (int): How often for the RSS to request the latest RSS entries.
+            etag (str, optional): The ETag of the feed when last requested.
+            modified (str, optional): The Last-Modified of the feed when last requested.
+            seen (list, optional): Keys of the entries already relayed, oldest first. If
+                not given, the entries in the feed at startup are not relayed.
 
         """
         self.sessionhandler = sessionhandler
         self.url = url
         self.rate = rate
         self.uid = uid
-        self.bot = RSSReader(self, url, rate)
+        self.bot = RSSReader(self, url, rate, etag=etag, modified=modified, seen=seen)
+        self.init = seen is None
         self.task = None
+        self.stopped = False
 
     def start(self):
         """
         Called by portalsessionhandler. Starts the bot.
 
         """
-
-        def errback(fail):
-            logger.log_err(fail.value)
-
         # set up session and connect it to sessionhandler
         self.bot.init_session("rssbot", self.url, self.sessionhandler)
         self.bot.uid = self.uid
         self.bot.logged_in = True
         self.sessionhandler.connect(self.bot)
 
-        # start repeater task
-        self.bot.update(init=True)
-        self.task = task.LoopingCall(self.bot.update)
-        if self.rate:
-            self.task.start(self.rate, now=False).addErrback(errback)
+        # first update, then keep updating at the (adaptive) rate
+        self.update(init=self.init)
+
+    def update(self, init=False):
+        """
+        Update the feed and schedule the next update.
+
+        Args:
+            init (bool, optional): If the entries in the feed should not be relayed.
+
+        """
+        self.task = None
+        self.bot.update(init=init).addCallback(lambda _: self.schedule())
+
+    def schedule(self):
+        """
+        Schedule the next update of the feed, `bot.interval` seconds from now.
+
+        """
+        if self.rate and not self.stopped:
+            self.task = self.clock.callLater(self.bot.interval, self.update)
+
+    def stop(self):
+        """
+        Stop updating the feed.
+
+        """
+        self.stopped = True
+        if self.task and self.task.active():
+            self.task.cancel()
+        self.task = None
@@ -32,6 +32,7 @@ from evennia.server.portal import mssp, naws, suppress_ga, telnet_oob, ttype
 from evennia.server.portal.mccp import MCCP, Mccp, mccp_compress
 from evennia.server.portal.mxp import Mxp, mxp_parse
 from evennia.server.portal.naws import NAWS
+from evennia.server.portal.rendercache import RENDER_CACHE
 from evennia.utils import ansi
 from evennia.utils.utils import class_from_module, to_bytes
 
@@ -62,6 +63,47 @@ _HTTP_WARNING = bytes(
 _BASE_SESSION_CLASS = class_from_module(settings.BASE_SESSION_CLASS)
 
 
+def _render_text(text, profile):
+    """
+    Convert outgoing text to what should be sent over the wire for a given
+    telnet capability profile. This is called by the Portal render cache
+    so it must only depend on its inputs.
+
+    Args:
+        text (str): The text to render.
+        profile (tuple): `(protocol_key, prompt, raw, nocolor, xterm256,
+            truecolor, mxp, screenreader)`.
+
+    Returns:
+        str: The rendered text.
+
+    """
+    _, prompt, raw, nocolor, xterm256, truecolor, mxp, screenreader = profile
+
+    if screenreader:
+        # screenreader mode cleans up output
+        text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+
+    if raw:
+        # no processing
+        return text
+
+    # we need to make sure to kill the color at the end in order
+    # to match the webclient output.
+    text = ansi.parse_ansi(
+        _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
+        strip_ansi=nocolor,
+        xterm256=xterm256,
+        # prompts strip mxp links, but are still mxp-escaped below
+        mxp=mxp and not prompt,
+        truecolor=truecolor,
+    )
+    if mxp:
+        text = mxp_parse(text)
+    return text
+
+
 class TelnetServerFactory(protocol.ServerFactory):
     """
     This exists only to name this better in logs.
@@ -462,25 +504,15 @@ class TelnetProtocol(Telnet, StatefulTelnetProtocol, _BASE_SESSION_CLASS):
         mxp = options.get("mxp", flags.get("MXP", False))
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
+        send_prompt = bool(options.get("send_prompt"))
 
-        if options.get("send_prompt"):
+        # sessions with the same capabilities share the rendered result
+        profile = ("telnet", send_prompt, raw, nocolor, xterm256, truecolor, mxp, screenreader)
+        text = RENDER_CACHE.render(text, profile, _render_text)
+
+        if send_prompt:
             # send a prompt instead.
-            prompt = text
-            if not raw:
-                # processing
-                prompt = ansi.parse_ansi(
-                    _RE_N.sub("", prompt) + ("||n" if prompt.endswith("|") else "|n"),
-                    strip_ansi=nocolor,
-                    xterm256=xterm256,
-                    truecolor=truecolor,
-                )
-                if mxp:
-                    prompt = mxp_parse(prompt)
-            prompt = to_bytes(prompt, self)
+            prompt = to_bytes(text, self)
             prompt = prompt.replace(IAC, IAC + IAC).replace(b"\n", b"\r\n")
             if not self.protocol_flags.get(
                 "NOPROMPTGOAHEAD", self.protocol_flags.get("NOGOAHEAD", True)
@@ -501,23 +533,7 @@ class TelnetProtocol(Telnet, StatefulTelnetProtocol, _BASE_SESSION_CLASS):
                     # by telling the client that WE WILL echo, the client can
                     # safely turn OFF its OWN echo.
                     self.transport.write(mccp_compress(self, IAC + WILL + ECHO))
-            if raw:
-                # no processing
-                self.sendLine(text)
-                return
-            else:
-                # we need to make sure to kill the color at the end in order
-                # to match the webclient output.
-                linetosend = ansi.parse_ansi(
-                    _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
-                    strip_ansi=nocolor,
-                    xterm256=xterm256,
-                    mxp=mxp,
-                    truecolor=truecolor,
-                )
-                if mxp:
-                    linetosend = mxp_parse(linetosend)
-                self.sendLine(linetosend)
+            self.sendLine(text)
 
     def send_prompt(self, *args, **kwargs):
         """
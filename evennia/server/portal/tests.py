@@ -12,17 +12,23 @@ import json
 import pickle
 import string
 import sys
+from unittest import skipIf
 
 import mock
 from autobahn.twisted.websocket import WebSocketServerFactory
+from django.test import override_settings
 from mock import MagicMock, Mock
 from twisted.conch.telnet import DO, DONT, IAC, NAWS, SB, SE, WILL
+from twisted.internet import reactor, task
 from twisted.internet.base import DelayedCall
+from twisted.internet.defer import inlineCallbacks, succeed
 from twisted.test import proto_helpers
 from twisted.trial.unittest import TestCase as TwistedTestCase
+from twisted.web import resource, server
+from twisted.web.client import Agent, HTTPConnectionPool
 
 import evennia
-from evennia.server.portal import irc
+from evennia.server.portal import irc, rss, telnet
 from evennia.server.portal.portalsessionhandler import PortalSessionHandler
 from evennia.server.portal.service import EvenniaPortalService
 from evennia.utils.test_resources import BaseEvenniaTest
@@ -38,12 +44,21 @@ from .mccp import MCCP
 from .mssp import MSSP
 from .mxp import MXP
 from .naws import DEFAULT_HEIGHT, DEFAULT_WIDTH
+from .outbound import OutboundQueue, RetryLater
+from .rendercache import RenderCache
 from .suppress_ga import SUPPRESS_GA
 from .telnet import TelnetProtocol, TelnetServerFactory
 from .telnet_oob import MSDP, MSDP_VAL, MSDP_VAR
 from .ttype import IS, TTYPE
 from .webclient import WebSocketClient
 
+_SKIP_DISCORD = False
+try:
+    from evennia.server.portal import discord
+except ImportError:
+    # the discord protocol requires pyopenssl
+    _SKIP_DISCORD = True
+
 
 class TestAMPServer(TwistedTestCase):
     """
@@ -334,3 +349,394 @@ class TestWebSocket(BaseEvenniaTest):
         msg = json.dumps(["logged_in", (), {}])
         self.proto.sessionhandler.data_out(self.proto, text=[["Excepting Alice"], {}])
         self.proto.sendLine.assert_called_with(json.dumps(["text", ["Excepting Alice"], {}]))
+
+
+class TestRenderCache(TestCase):
+    def setUp(self):
+        self.cache = RenderCache(maxsize=2, max_text_length=20)
+        self.calls = []
+
+    def _renderer(self, text, profile):
+        self.calls.append((text, profile))
+        return f"{text}:{profile[0]}"
+
+    def test_render_hit(self):
+        self.assertEqual(self.cache.render("foo", ("a",), self._renderer), "foo:a")
+        self.assertEqual(self.cache.render("foo", ("a",), self._renderer), "foo:a")
+        self.assertEqual(self.cache.render("foo", ("b",), self._renderer), "foo:b")
+        self.assertEqual(len(self.calls), 2)
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["size"], 2)
+
+    def test_render_evict(self):
+        self.cache.render("foo", ("a",), self._renderer)
+        self.cache.render("bar", ("a",), self._renderer)
+        # touch foo so bar is the least recently used
+        self.cache.render("foo", ("a",), self._renderer)
+        self.cache.render("baz", ("a",), self._renderer)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.cache.render("foo", ("a",), self._renderer)
+        self.assertEqual(len(self.calls), 3)
+        self.cache.render("bar", ("a",), self._renderer)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_render_uncached(self):
+        long_text = "x" * 21
+        self.cache.render(long_text, ("a",), self._renderer)
+        self.cache.render(long_text, ("a",), self._renderer)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.cache), 0)
+
+        self.cache.clear(reset_stats=True)
+        self.assertEqual(self.cache.stats()["misses"], 0)
+
+
+class TestTelnetRender(TestCase):
+    def test_render_text(self):
+        profile = ("telnet", False, False, False, False, False, False, False)
+        self.assertEqual(telnet._render_text("|rred", profile), "\x1b[1m\x1b[31mred\x1b[0m")
+        nocolor = ("telnet", False, False, True, False, False, False, False)
+        self.assertEqual(telnet._render_text("|rred", nocolor), "red")
+        raw = ("telnet", False, True, False, False, False, False, False)
+        self.assertEqual(telnet._render_text("|rred", raw), "|rred")
+        screenreader = ("telnet", False, False, False, False, False, False, True)
+        self.assertEqual(telnet._render_text("|rred|n ----", screenreader), "red \x1b[0m")
+        mxp = ("telnet", False, False, False, False, False, True, False)
+        self.assertEqual(
+            telnet._render_text("|lclook|ltLook|le", mxp),
+            '\x1b[4z<SEND HREF="look">Look\x1b[4z</SEND>\x1b[0m',
+        )
+
+
+class TestOutboundQueue(TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        self.sent = []
+        self.busy = []
+        self.queue = OutboundQueue(
+            self._send,
+            limit=2,
+            window=10,
+            max_length=20,
+            max_queued=5,
+            busy_queued=4,
+            on_busy=self.busy.append,
+            clock=self.clock,
+        )
+
+    def _send(self, destination, text):
+        self.sent.append((destination, text))
+
+    def test_rate_limit_and_coalesce(self):
+        for imsg in range(5):
+            self.queue.send("chan", f"msg {imsg}")
+        # two sends allowed per window, the rest waits and is sent as one
+        self.assertEqual(self.sent, [("chan", "msg 0"), ("chan", "msg 1")])
+        self.assertEqual(len(self.queue), 3)
+        self.clock.advance(10)
+        self.assertEqual(self.sent[2:], [("chan", "msg 2\nmsg 3\nmsg 4")])
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.num_coalesced, 2)
+
+    def test_destinations_rate_limited_separately(self):
+        for imsg in range(3):
+            self.queue.send("chan1", f"msg {imsg}")
+            self.queue.send("chan2", f"msg {imsg}")
+        self.assertEqual(len(self.sent), 4)
+        self.queue.update_bucket("chan2", remaining=1, reset_after=20, bucket_key="shared")
+        self.queue.update_bucket("chan1", bucket_key="shared")
+        self.clock.advance(10)
+        # chan1 now shares the bucket of chan2, which has one send left
+        self.assertEqual(len(self.sent), 5)
+        self.clock.advance(10)
+        self.assertEqual(len(self.sent), 6)
+
+    def test_refused(self):
+        refused = []
+
+        def _send(destination, text):
+            if not refused:
+                refused.append(text)
+                return 3
+            self.sent.append((destination, text))
+
+        self.queue.send_func = _send
+        self.queue.send("chan", "msg 0")
+        self.queue.send("chan", "msg 1")
+        self.assertEqual(self.sent, [])
+        self.clock.advance(3)
+        self.assertEqual(self.sent, [("chan", "msg 0\nmsg 1")])
+
+    def test_retry_later(self):
+        failures = []
+
+        def _send(destination, text):
+            if destination == "chan1" and len(failures) < 2:
+                failures.append(text)
+                raise RetryLater("server error")
+            self.sent.append((destination, text))
+
+        self.queue.send_func = _send
+        self.queue.limit = 10
+        self.queue.send("chan1", "msg 0")
+        self.queue.send("chan1", "msg 1")
+        self.queue.send("chan2", "msg 0")
+        # the bucket is not blocked; other destinations are unaffected
+        self.assertEqual(self.sent, [("chan2", "msg 0")])
+        self.assertEqual(self.queue.get_bucket("chan1").get_wait(self.clock.seconds()), 0)
+        self.clock.advance(1)
+        self.assertEqual(failures, ["msg 0", "msg 0\nmsg 1"])
+        # the delay doubles for every failure in a row
+        self.clock.advance(1)
+        self.assertEqual(len(self.sent), 1)
+        self.clock.advance(1)
+        self.assertEqual(self.sent[1:], [("chan1", "msg 0\nmsg 1")])
+        self.assertEqual(self.queue.retries, {})
+
+    def test_retry_later_dropped(self):
+        def _send(destination, text):
+            raise RetryLater("server error")
+
+        self.queue.send_func = _send
+        self.queue.limit = 10
+        self.queue.send("chan", "msg 0")
+        with mock.patch("evennia.server.portal.outbound.logger") as mock_logger:
+            self.clock.pump([1, 2, 4])
+            mock_logger.log_err.assert_not_called()
+            self.clock.advance(8)
+            mock_logger.log_err.assert_called_once()
+        self.assertEqual(len(self.queue), 0)
+
+    def test_backpressure(self):
+        for imsg in range(8):
+            self.queue.send("chan", f"message {imsg}")
+        # 2 sent, 6 queued but only room for 5
+        self.assertEqual(self.busy, [True])
+        self.assertEqual(len(self.queue), 5)
+        self.assertEqual(self.queue.num_dropped, 1)
+        self.clock.advance(10)
+        self.assertEqual(self.busy, [True, False])
+        self.assertEqual(self.sent[2], ("chan", "message 3\nmessage 4"))
+
+
+class TestIRCOutbound(TestCase):
+    def setUp(self):
+        self.factory = Mock(uid=1, outbound=None)
+        self.bot, self.transport = self._connect()
+        self.bot.outbound.clock = self.clock = task.Clock()
+        self.transport.clear()
+
+    def _connect(self):
+        bot = irc.IRCBot()
+        bot.factory = self.factory
+        bot.nickname = "evbot"
+        bot.channel = "#evennia"
+        bot.network = "irc.example.com"
+        bot.port = 6667
+        bot.lineRate = None
+        bot.nicklist = []
+        transport = proto_helpers.StringTransport()
+        bot.makeConnection(transport)
+        with override_settings(IRC_OUTBOUND_LIMIT=4, IRC_OUTBOUND_WINDOW=8):
+            bot.signedOn()
+        return bot, transport
+
+    def test_send_channel(self):
+        self.bot.factory.sessionhandler.data_in.assert_called_with(
+            self.bot,
+            bot_data_in=[
+                "",
+                {"type": "busy", "user": "server", "channel": "#evennia", "busy": False},
+            ],
+        )
+        for imsg in range(5):
+            self.bot.send_channel(f"msg {imsg}")
+        self.bot.send_privmsg("hello", user="somenick")
+        lines = self.transport.value().decode().splitlines()
+        self.assertEqual(lines, [f"PRIVMSG #evennia :msg {imsg}" for imsg in range(4)])
+        self.transport.clear()
+        self.clock.advance(8)
+        lines = self.transport.value().decode().splitlines()
+        # the whole connection shares one rate limit
+        self.assertEqual(lines, ["PRIVMSG #evennia :msg 4", "PRIVMSG somenick :hello"])
+
+    def test_reconnect(self):
+        for imsg in range(6):
+            self.bot.send_channel(f"msg {imsg}")
+        self.bot.connectionLost(None)
+        # lines due while disconnected are held until we reconnect
+        self.clock.advance(8)
+        self.assertEqual(len(self.bot.outbound), 1)
+        bot, transport = self._connect()
+        self.assertIs(bot.outbound, self.bot.outbound)
+        transport.clear()
+        self.clock.advance(irc.IRCBot.reconnect_retry_delay)
+        self.assertEqual(transport.value().decode(), "PRIVMSG #evennia :msg 4 | msg 5\r\n")
+        self.assertEqual(len(bot.outbound), 0)
+
+
+class _FakeDiscordResource(resource.Resource):
+    """
+    Accepts Discord channel messages, reporting rate limits like Discord does. The
+    first `refuse` messages are refused as if rate limited, the first `fail` messages
+    with a server error.
+
+    """
+
+    isLeaf = True
+
+    def __init__(self, refuse=0, fail=0):
+        super().__init__()
+        self.refuse = refuse
+        self.fail = fail
+        self.messages = []
+        self.num_refused = 0
+        self.num_failed = 0
+
+    def render_POST(self, request):
+        request.setHeader(b"Content-Type", b"application/json")
+        if self.num_failed < self.fail:
+            self.num_failed += 1
+            request.setResponseCode(502)
+            return b"{}"
+        if self.num_refused < self.refuse:
+            self.num_refused += 1
+            request.setResponseCode(429)
+            return json.dumps({"retry_after": 0.05, "global": False}).encode()
+        self.messages.append((request.path, json.loads(request.content.read())["content"]))
+        request.setHeader(b"X-RateLimit-Limit", b"5")
+        request.setHeader(b"X-RateLimit-Remaining", b"4")
+        request.setHeader(b"X-RateLimit-Reset-After", b"0.05")
+        request.setHeader(b"X-RateLimit-Bucket", b"channelbucket")
+        return json.dumps({"id": str(len(self.messages))}).encode()
+
+
+@skipIf(_SKIP_DISCORD, "pyopenssl not installed")
+class TestDiscordOutbound(TwistedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub = _FakeDiscordResource(refuse=1)
+        site = server.Site(self.stub)
+        site.noisy = False
+        self.port = reactor.listenTCP(0, site, interface="127.0.0.1")
+        self.addCleanup(self.port.stopListening)
+        url = f"http://127.0.0.1:{self.port.getHost().port}/api"
+        agent = Agent(reactor, pool=HTTPConnectionPool(reactor, persistent=False))
+        patchers = [
+            mock.patch.object(discord, "DISCORD_API_BASE_URL", url),
+            mock.patch.object(discord, "_AGENT", agent),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = discord.DiscordClient()
+        self.client.factory = Mock(uid=1, outbound=None)
+        self.client.onOpen()
+
+    @inlineCallbacks
+    def test_send_channel(self):
+        for imsg in range(10):
+            self.client.send_channel(f"msg {imsg}", "1234")
+        while len(self.client.outbound) or self.client.outbound._sending:
+            yield task.deferLater(reactor, 0.01, lambda: None)
+        # the first was refused, and retried together with the rest as one message
+        self.assertEqual(self.stub.num_refused, 1)
+        self.assertEqual(
+            self.stub.messages,
+            [(b"/api/channels/1234/messages", "\n".join(f"msg {imsg}" for imsg in range(10)))],
+        )
+        self.assertEqual(self.client.outbound.bucket_keys, {"1234": "channelbucket"})
+        self.assertEqual(self.client.outbound.get_bucket("1234").limit, 5)
+        self.assertEqual(self.client.factory.outbound, self.client.outbound)
+
+    @inlineCallbacks
+    def test_send_channel_server_error(self):
+        self.stub.refuse, self.stub.fail = 0, 2
+        self.client.outbound.retry_delay = 0.01
+        self.client.send_channel("msg 0", "1234")
+        while len(self.client.outbound) or self.client.outbound._sending:
+            yield task.deferLater(reactor, 0.01, lambda: None)
+        # retried shortly, without blocking the channel's bucket
+        self.assertEqual(self.stub.num_failed, 2)
+        self.assertEqual(self.stub.messages, [(b"/api/channels/1234/messages", "msg 0")])
+        self.assertEqual(self.client.outbound.retries, {})
+
+
+class TestRSS(TestCase):
+    def setUp(self):
+        self.factory = rss.RSSBotFactory(Mock(), uid=1, url="http://example.com/rss", rate=10)
+        self.reader = self.factory.bot
+        self.reader.sessionhandler = self.factory.sessionhandler
+        self.entries = [{"id": "entry1", "title": "One"}, {"id": "entry2", "title": "Two"}]
+
+    def test_get_new(self):
+        feed = {"status": 200, "etag": '"v1"', "entries": self.entries}
+        with mock.patch.object(rss, "feedparser", create=True) as mock_feedparser:
+            mock_feedparser.parse.return_value = feed
+            self.assertEqual(self.reader.get_new(), self.entries)
+            mock_feedparser.parse.assert_called_with(
+                "http://example.com/rss", etag=None, modified=None
+            )
+            self.reader._callback(self.entries, True)
+            # the state is passed to the Server, but the entries only when not initializing
+            self.factory.sessionhandler.data_in.assert_called_once_with(
+                self.reader,
+                bot_data_in=(
+                    "",
+                    {
+                        "type": "rss_state",
+                        "etag": '"v1"',
+                        "modified": None,
+                        "seen": ["entry1", "entry2"],
+                    },
+                ),
+            )
+            self.factory.sessionhandler.data_in.reset_mock()
+
+            # unchanged feeds are not parsed or passed on
+            mock_feedparser.parse.return_value = {"status": 304, "entries": []}
+            self.assertEqual(self.reader.get_new(), [])
+            mock_feedparser.parse.assert_called_with(
+                "http://example.com/rss", etag='"v1"', modified=None
+            )
+            self.reader._callback([], False)
+            self.factory.sessionhandler.data_in.assert_not_called()
+            self.assertEqual(self.reader.interval, 15)
+
+            entry3 = {"id": "entry3", "title": "Three"}
+            mock_feedparser.parse.return_value = dict(feed, entries=[entry3] + self.entries)
+            self.assertEqual(self.reader.get_new(), [entry3])
+            self.reader._callback([entry3], False)
+            self.factory.sessionhandler.data_in.assert_any_call(self.reader, bot_data_in=entry3)
+            self.assertEqual(self.reader.interval, 10)
+
+    def test_seen_restored(self):
+        factory = rss.RSSBotFactory(
+            Mock(), uid=1, url="http://example.com/rss", rate=10, etag='"v1"', seen=["entry1"]
+        )
+        self.assertFalse(factory.init)
+        with mock.patch.object(rss, "feedparser", create=True) as mock_feedparser:
+            mock_feedparser.parse.return_value = {"status": 200, "entries": self.entries}
+            self.assertEqual(factory.bot.get_new(), self.entries[1:])
+
+    @mock.patch.object(rss, "_MAX_UPDATE_INTERVAL", 30)
+    def test_adaptive_interval(self):
+        clock = task.Clock()
+        self.factory.clock = clock
+        updates = []
+
+        def _update(init=False):
+            updates.append(clock.seconds())
+            self.reader._callback([], init)
+            return succeed(None)
+
+        with mock.patch.object(self.reader, "update", _update):
+            self.factory.update()
+            clock.pump([0.5] * 200)
+            # 15, 22.5, then capped at 30 seconds apart
+            self.assertEqual(updates, [0, 15, 37.5, 67.5, 97.5])
+            self.reader.disconnect()
+            clock.pump([0.5] * 200)
+            self.assertEqual(len(updates), 5)
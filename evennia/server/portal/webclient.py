@@ -23,6 +23,7 @@ from autobahn.exception import Disconnected
 from autobahn.twisted.websocket import WebSocketServerProtocol
 from django.conf import settings
 
+from evennia.server.portal.rendercache import RENDER_CACHE
 from evennia.utils.ansi import parse_ansi
 from evennia.utils.text2html import parse_html
 from evennia.utils.utils import class_from_module, mod_import
@@ -44,6 +45,32 @@ GOING_AWAY = WebSocketServerProtocol.CLOSE_STATUS_CODE_GOING_AWAY
 _BASE_SESSION_CLASS = class_from_module(settings.BASE_SESSION_CLASS)
 
 
+def _render_text(text, profile):
+    """
+    Convert outgoing text to html for a given webclient capability profile.
+    This is called by the Portal render cache so it must only depend on
+    its inputs.
+
+    Args:
+        text (str): The text to render.
+        profile (tuple): `(protocol_key, raw, client_raw, nocolor, screenreader)`.
+
+    Returns:
+        str: The rendered text.
+
+    """
+    _, raw, client_raw, nocolor, screenreader = profile
+    if screenreader:
+        # screenreader mode cleans up output
+        text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        if client_raw:
+            return text
+        return html.escape(text)  # escape html!
+    return parse_html(text, strip_ansi=nocolor)
+
+
 class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
     """
     Implements the server-side of the Websocket connection.
@@ -287,18 +314,10 @@ class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
-        if raw:
-            if client_raw:
-                args[0] = text
-            else:
-                args[0] = html.escape(text)  # escape html!
-        else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+        # sessions with the same capabilities share the rendered result
+        profile = ("webclient", raw, client_raw, nocolor, screenreader)
+        args[0] = RENDER_CACHE.render(text, profile, _render_text)
 
         # send to client on required form [cmdname, args, kwargs]
         self.sendLine(json.dumps([cmd, args, kwargs]))
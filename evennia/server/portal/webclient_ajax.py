@@ -29,6 +29,7 @@ from twisted.internet.task import LoopingCall
 from twisted.web import resource, server
 
 from evennia.server import session
+from evennia.server.portal.rendercache import RENDER_CACHE
 from evennia.utils import utils
 from evennia.utils.ansi import parse_ansi
 from evennia.utils.text2html import parse_html
@@ -42,6 +43,30 @@ _SERVERNAME = settings.SERVERNAME
 _KEEPALIVE = 30  # how often to check keepalive
 
 
+def _render_text(text, profile):
+    """
+    Convert outgoing text to html for a given ajax-client capability profile.
+    This is called by the Portal render cache so it must only depend on
+    its inputs.
+
+    Args:
+        text (str): The text to render.
+        profile (tuple): `(protocol_key, raw, nocolor, screenreader)`.
+
+    Returns:
+        str: The rendered text.
+
+    """
+    _, raw, nocolor, screenreader = profile
+    if screenreader:
+        # screenreader mode cleans up output
+        text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        return text
+    return parse_html(text, strip_ansi=nocolor)
+
+
 # defining a simple json encoder for returning
 # django data to the client. Might need to
 # extend this if one wants to send more
@@ -163,15 +188,10 @@ class AjaxWebClientSession(session.Session):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
-        if raw:
-            args[0] = text
-        else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+        # sessions with the same capabilities share the rendered result
+        profile = ("ajax", raw, nocolor, screenreader)
+        args[0] = RENDER_CACHE.render(text, profile, _render_text)
 
         # send to client on required form [cmdname, args, kwargs]
         self.client.lineSend(self.csessid, [cmd, args, kwargs])
@@ -0,0 +1,111 @@
+"""
+Benchmark for achievement tracking.
+
+This generates a large number of achievement definitions and tracks a stream of
+random kill/craft/loot events against a temporary achiever. For comparison it
+also times the candidate lookup when filtering all achievements linearly (the
+way `track_achievements` did before it used an index).
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.achievements_benchmark import run_benchmark
+    >>> run_benchmark(nachievements=5000, nevents=10000)
+
+"""
+
+import random
+import time
+from unittest.mock import patch
+
+from evennia.contrib.game_systems.achievements import achievements
+from evennia.utils import create
+from evennia.utils.utils import make_iter
+
+CATEGORIES = ("defeat", "craft", "loot", "explore", "trade")
+
+
+def _make_achievements(nachievements, ntracked=200):
+    """
+    Generate achievement definitions, some with prereqs and multiple tracked items.
+
+    """
+    data = {}
+    for inum in range(nachievements):
+        key = f"ACHIEVE_{inum}"
+        achievement = {
+            "name": f"Achievement {inum}",
+            "desc": f"Do thing {inum}.",
+            "category": CATEGORIES[inum % len(CATEGORIES)],
+            "tracking": [f"item{random.randint(0, ntracked)}" for _ in range(inum % 3 + 1)],
+            "count": random.randint(1, 50),
+        }
+        if inum > 10 and not inum % 4:
+            achievement["prereqs"] = f"ACHIEVE_{inum - 10}"
+        data[key] = achievement
+    return data
+
+
+def _linear_candidates(data, progress_data, category, tracking):
+    """
+    The old, linear way of finding relevant achievements.
+
+    """
+    return [
+        key
+        for key, val in data.items()
+        if (not category or category in make_iter(val.get("category", [])))
+        and (not tracking or not val.get("tracking") or tracking in make_iter(val.get("tracking")))
+        and not progress_data.get(key, {}).get("completed")
+        and all(
+            progress_data.get(prereq, {}).get("completed")
+            for prereq in make_iter(val.get("prereqs", []))
+        )
+    ]
+
+
+def run_benchmark(nachievements=5000, nevents=10000, ntracked=200):
+    """
+    Track `nevents` random events against `nachievements` achievements.
+
+    Args:
+        nachievements (int, optional): Number of achievement definitions.
+        nevents (int, optional): Number of events to track.
+        ntracked (int, optional): Number of distinct items to track.
+
+    Returns:
+        tuple: `(index_build_time, linear_lookup_time, track_time)` in seconds.
+
+    """
+    data = _make_achievements(nachievements, ntracked=ntracked)
+    events = [
+        (random.choice(CATEGORIES), f"item{random.randint(0, ntracked)}") for _ in range(nevents)
+    ]
+    achiever = create.create_object(key="achievement_benchmarker", nohome=True)
+
+    try:
+        with patch.object(achievements, "_ACHIEVEMENT_DATA", data):
+            t0 = time.perf_counter()
+            achievements._get_index()
+            t_index = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            for category, tracking in events:
+                _linear_candidates(data, {}, category, tracking)
+            t_linear = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            ncompleted = 0
+            for category, tracking in events:
+                ncompleted += len(achievements.track_achievements(achiever, category, tracking))
+            achievements.save_achievement_progress(achiever)
+            t_track = time.perf_counter() - t0
+    finally:
+        achiever.delete()
+
+    print(f"{nachievements} achievements, {nevents} events ({ncompleted} completions):")
+    print(f"  index build:                       {t_index:.3f}s")
+    print(f"  linear candidate filtering (old):  {t_linear:.3f}s")
+    print(f"  track_achievements (index+cache):  {t_track:.3f}s")
+    return t_index, t_linear, t_track
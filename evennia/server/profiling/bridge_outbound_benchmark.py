@@ -0,0 +1,175 @@
+"""
+Benchmark for relaying a busy channel to Discord, against a local fake Discord endpoint.
+
+This starts a fake Discord REST endpoint in-process that, like Discord, accepts `limit`
+messages per channel per `window` seconds, reports its rate limits in `X-RateLimit-*`
+headers and refuses messages beyond that with HTTP 429. A DiscordClient then relays
+`nmessages` channel messages to it, `nburst` at a time, `interval` seconds apart,
+
+- the way it worked before, with every message posted as soon as it arrives (forced
+  here by giving the client no outbound queue),
+- through the outbound queue, which waits for the rate limits and coalesces the
+  messages waiting into multi-line messages.
+
+It reports how many of the relayed messages made it to the channel, how many requests
+were made and refused, and how long it took until the last message was delivered.
+
+This needs a running reactor, so it runs the reactor until done. Since a Twisted reactor
+can only be run once per process, restart the shell to run it again. It also needs the
+pyopenssl package, as the Discord protocol does.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.bridge_outbound_benchmark import run_benchmark
+    >>> run_benchmark(nmessages=100, nburst=10)
+
+"""
+
+import json
+import time
+from unittest.mock import Mock, patch
+
+from twisted.internet import reactor, task
+from twisted.internet.defer import inlineCallbacks
+from twisted.web import resource, server
+from twisted.web.client import Agent, HTTPConnectionPool
+
+from evennia.server.portal import discord
+
+
+class FakeDiscordResource(resource.Resource):
+    """
+    Accepts channel messages within Discord-like rate limits.
+
+    """
+
+    isLeaf = True
+
+    def __init__(self, limit=5, window=1.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.windows = {}
+        self.num_requests = 0
+        self.num_refused = 0
+        self.lines = []
+        self.last_delivery = 0
+
+    def render_POST(self, request):
+        self.num_requests += 1
+        now = time.perf_counter()
+        reset_at, remaining = self.windows.get(request.path, (0, self.limit))
+        if now >= reset_at:
+            reset_at, remaining = now + self.window, self.limit
+        request.setHeader(b"Content-Type", b"application/json")
+        request.setHeader(b"X-RateLimit-Limit", str(self.limit).encode())
+        request.setHeader(b"X-RateLimit-Reset-After", f"{reset_at - now:.3f}".encode())
+        request.setHeader(b"X-RateLimit-Bucket", request.path)
+        if not remaining:
+            self.num_refused += 1
+            request.setResponseCode(429)
+            request.setHeader(b"X-RateLimit-Remaining", b"0")
+            return json.dumps({"retry_after": reset_at - now, "global": False}).encode()
+        remaining -= 1
+        self.windows[request.path] = (reset_at, remaining)
+        request.setHeader(b"X-RateLimit-Remaining", str(remaining).encode())
+        self.lines.extend(json.loads(request.content.read())["content"].split("\n"))
+        self.last_delivery = now
+        return json.dumps({"id": str(self.num_requests)}).encode()
+
+
+def _run_reactor(func):
+    """Run the reactor until the Deferred returned by `func` fires."""
+
+    def _run():
+        func().addErrback(lambda failure: failure.printTraceback()).addBoth(
+            lambda _: reactor.stop()
+        )
+
+    reactor.callWhenRunning(_run)
+    reactor.run(installSignalHandlers=False)
+
+
+@inlineCallbacks
+def _relay(stub, nmessages, nburst, interval, queued):
+    """
+    Relay the messages to the fake endpoint.
+
+    Returns:
+        Deferred: Fires with `(delivered, requests, refused, seconds)`.
+
+    """
+    stub.windows.clear()
+    stub.num_requests = stub.num_refused = 0
+    stub.lines = []
+    client = discord.DiscordClient()
+    client.factory = Mock(uid=1, outbound=None)
+    client.onOpen()
+    if not queued:
+        client.outbound = None
+
+    t0 = time.perf_counter()
+    for imsg in range(nmessages):
+        client.send_channel(f"message {imsg}", "1234")
+        if not (imsg + 1) % nburst:
+            yield task.deferLater(reactor, interval, lambda: None)
+    # wait for the last requests to be answered
+    if queued:
+        while len(client.outbound) or client.outbound._sending:
+            yield task.deferLater(reactor, 0.01, lambda: None)
+    else:
+        while stub.num_requests < nmessages:
+            yield task.deferLater(reactor, 0.01, lambda: None)
+    delivered = len(set(stub.lines))
+    return delivered, stub.num_requests, stub.num_refused, stub.last_delivery - t0
+
+
+def run_benchmark(nmessages=100, nburst=10, interval=0.1, limit=5, window=1.0):
+    """
+    Time relaying `nmessages` channel messages to a fake Discord endpoint allowing `limit`
+    messages per `window` seconds.
+
+    Args:
+        nmessages (int, optional): Number of messages to relay.
+        nburst (int, optional): Number of messages relayed at a time.
+        interval (float, optional): Seconds between bursts.
+        limit (int, optional): Messages accepted per channel per window.
+        window (float, optional): Length of the rate-limit window, in seconds.
+
+    Returns:
+        dict: `{name: (messages delivered, requests, requests refused, seconds)}`.
+
+    """
+    stub = FakeDiscordResource(limit=limit, window=window)
+    site = server.Site(stub)
+    site.noisy = False
+    listening_port = reactor.listenTCP(0, site, interface="127.0.0.1")
+    url = f"http://127.0.0.1:{listening_port.getHost().port}/api"
+    agent = Agent(reactor, pool=HTTPConnectionPool(reactor))
+    results = {}
+
+    @inlineCallbacks
+    def _relay_both_ways():
+        try:
+            with (
+                patch.object(discord, "DISCORD_API_BASE_URL", url),
+                patch.object(discord, "_AGENT", agent),
+            ):
+                results["immediate (old)"] = yield _relay(stub, nmessages, nburst, interval, False)
+                results["queued"] = yield _relay(stub, nmessages, nburst, interval, True)
+        finally:
+            yield agent._pool.closeCachedConnections()
+            yield listening_port.stopListening()
+
+    _run_reactor(_relay_both_ways)
+
+    print(
+        f"Relaying {nmessages} messages to Discord, {nburst} every {interval}s, "
+        f"with {limit} messages allowed per {window}s:"
+    )
+    print(f"  {'':<16} {'delivered':>10} {'requests':>9} {'refused':>8} {'last at':>8}")
+    for name, (delivered, nrequests, nrefused, timing) in results.items():
+        print(f"  {name:<16} {delivered:10d} {nrequests:9d} {nrefused:8d} {timing:7.2f}s")
+    return results
@@ -0,0 +1,116 @@
+"""
+Benchmark for buff checks.
+
+This sets up a number of combatants, each with a stack of buffs, and times
+combat rounds where every combatant checks a handful of stats. For comparison
+it also times the same rounds when every check cleans up and instances all
+buffs (the way `BuffHandler.check` worked before it cached the mod sums).
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.buffs_benchmark import run_benchmark
+    >>> run_benchmark(ncombatants=20, nbuffs=30, nrounds=50)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from evennia.contrib.rpg.buffs.buff import BaseBuff, BuffHandler, Mod, cleanup_buffs
+from evennia.utils import create
+
+STATS = ("damage", "armor", "speed", "accuracy", "evasion")
+
+
+class _BenchBuff(BaseBuff):
+    key = "benchbuff"
+    maxstacks = 5
+    duration = 600
+    mods = [
+        Mod("damage", "add", 2, 1),
+        Mod("armor", "mult", 0.1),
+        Mod("speed", "add", 1),
+    ]
+
+
+class _BenchConditionalBuff(BaseBuff):
+    key = "benchcond"
+    mods = [Mod("accuracy", "add", 5), Mod("evasion", "mult", 0.2)]
+
+    def conditional(self, *args, **kwargs):
+        return not kwargs.get("blinded")
+
+
+def _uncached_check(handler, value, stat, context=None):
+    """
+    The old way of checking a stat: clean up and instance all buffs every time.
+
+    """
+    context = context or {}
+    cleanup_buffs(handler)
+    applied = {k: buff for k, buff in handler.all.items() for mod in buff.mods if mod.stat == stat}
+    if not applied:
+        return value
+    for buff in applied.values():
+        buff.at_pre_check(**context)
+    applied = {
+        k: buff for k, buff in applied.items() if buff.conditional(**context) if not buff.paused
+    }
+    calc = handler._calculate_mods(stat, applied)
+    final = handler._apply_mods(value, calc)
+    for buff in applied.values():
+        buff.at_post_check(**context)
+    return final
+
+
+def _combat(handlers, nrounds, check):
+    t0 = time.perf_counter()
+    for _ in range(nrounds):
+        for handler in handlers:
+            for stat in STATS:
+                check(handler, 10, stat)
+    return time.perf_counter() - t0
+
+
+def run_benchmark(ncombatants=20, nbuffs=30, nrounds=50):
+    """
+    Run `nrounds` combat rounds with `ncombatants` combatants carrying `nbuffs` buffs each.
+
+    Args:
+        ncombatants (int, optional): Number of combatants.
+        nbuffs (int, optional): Number of buffs on each combatant.
+        nrounds (int, optional): Number of combat rounds.
+
+    Returns:
+        tuple: `(uncached_time, cached_time)` in seconds.
+
+    """
+    combatants = [
+        create.create_object(key=f"buff_benchmarker{inum}", nohome=True)
+        for inum in range(ncombatants)
+    ]
+    try:
+        # no expiry/tick timers needed for this
+        with patch("evennia.contrib.rpg.buffs.buff.utils.delay"):
+            handlers = []
+            for combatant in combatants:
+                handler = BuffHandler(combatant)
+                for ibuff in range(nbuffs):
+                    bufftype = _BenchConditionalBuff if ibuff % 5 == 0 else _BenchBuff
+                    handler.add(bufftype, key=f"buff{ibuff}", stacks=ibuff % 3 + 1)
+                handlers.append(handler)
+
+        uncached = _combat(handlers, nrounds, _uncached_check)
+        cached = _combat(handlers, nrounds, lambda handler, value, stat: handler.check(value, stat))
+    finally:
+        for combatant in combatants:
+            combatant.delete()
+
+    nchecks = ncombatants * nrounds * len(STATS)
+    print(f"{nrounds} rounds, {ncombatants} combatants with {nbuffs} buffs ({nchecks} checks):")
+    print(f"  uncached checks (old): {uncached:.3f}s ({uncached / nchecks * 1e6:.1f}us/check)")
+    print(f"  cached checks:         {cached:.3f}s ({cached / nchecks * 1e6:.1f}us/check)")
+    print(f"  speedup: {uncached / cached:.1f}x")
+    return uncached, cached
@@ -0,0 +1,79 @@
+"""
+Benchmark for spawning many objects in one call.
+
+This spawns `n` objects from one prototype with attributes, tags, aliases and
+a location, in one `spawn` call. It compares creating the objects one at a
+time (the default, and the way `batch_create_object` always worked before)
+with the opt-in bulk path (`bulk=True`), which creates the objects, tags,
+attributes and their relations with a few `bulk_create` calls in one
+transaction. The objects are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.bulkspawn_benchmark import run_benchmark
+    >>> run_benchmark(n=10000)
+
+"""
+
+import time
+
+from evennia.objects.models import ObjectDB
+from evennia.prototypes import spawner
+from evennia.utils import create
+
+_KEY = "bulkspawn_benchmark_obj"
+_ROOM_KEY = "bulkspawn_benchmark_room"
+
+
+def _get_prototype(location):
+    return {
+        "typeclass": "evennia.objects.objects.DefaultObject",
+        "key": _KEY,
+        "location": location,
+        "home": location,
+        "aliases": ["benchobj"],
+        "attrs": [("strength", 10), ("inventory", ["sword", "shield"])],
+        "tags": [("benchmark", "bulkspawn"), ("monster", "type")],
+        "locks": "get:false()",
+    }
+
+
+def _time(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def _cleanup():
+    for obj in ObjectDB.objects.filter(db_key=_KEY):
+        obj.delete()
+
+
+def run_benchmark(n=10000):
+    """
+    Time spawning `n` objects one at a time and in bulk.
+
+    Args:
+        n (int, optional): Number of objects to spawn.
+
+    Returns:
+        tuple: `(per_object_time, bulk_time)` in seconds.
+
+    """
+    room = create.create_object("evennia.objects.objects.DefaultRoom", key=_ROOM_KEY, nohome=True)
+    prototypes = [_get_prototype(room)] * n
+    try:
+        per_object = _time(lambda: spawner.spawn(*prototypes))
+        _cleanup()
+        bulk = _time(lambda: spawner.spawn(*prototypes, bulk=True))
+        assert len(room.contents) == n
+    finally:
+        _cleanup()
+        room.delete()
+
+    print(f"Spawning {n} objects in one call:")
+    print(f"  one at a time:       {per_object:.3f}s ({per_object / n * 1e3:.2f}ms/object)")
+    print(f"  bulk:                {bulk:.3f}s ({bulk / n * 1e3:.2f}ms/object)")
+    return per_object, bulk
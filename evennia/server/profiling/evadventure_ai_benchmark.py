@@ -0,0 +1,104 @@
+"""
+Benchmark for the AIScheduler of the EvAdventure tutorial game.
+
+This creates a line of `nrooms` rooms connected by exits and `nmobs` roaming mobs spread
+out over them, with a (pretend) player in the first room. It times ticking the AI of all
+mobs (one round of the AIScheduler, all its batches) and counts the AI runs per round,
+
+- the way it worked before, with every mob ticked whether anyone is around or not
+  (forced here by treating all rooms as observed),
+- with only the mobs close to the player ticked every time and the rest throttled.
+
+The rooms and mobs are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.evadventure_ai_benchmark import run_benchmark
+    >>> run_benchmark(nrooms=50, nmobs=200)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from evennia.contrib.tutorials.evadventure.ai import AIHandler, AIScheduler
+from evennia.contrib.tutorials.evadventure.npcs import EvAdventureMob
+from evennia.contrib.tutorials.evadventure.rooms import EvAdventureRoom
+from evennia.objects.objects import DefaultExit
+from evennia.utils.create import create_script
+
+
+def _time_rounds(scheduler, nrounds):
+    """
+    Run `nrounds` rounds of the scheduler.
+
+    Returns:
+        tuple: `(seconds per round, AI runs per round)`.
+
+    """
+    runs = []
+    real_run = AIHandler.run
+
+    def _counted_run(handler):
+        runs.append(handler)
+        real_run(handler)
+
+    with patch.object(AIHandler, "run", _counted_run):
+        t0 = time.perf_counter()
+        for _ in range(nrounds * scheduler.num_batches):
+            scheduler.at_repeat()
+        timing = time.perf_counter() - t0
+    return timing / nrounds, len(runs) / nrounds
+
+
+def run_benchmark(nrooms=50, nmobs=200, nrounds=10):
+    """
+    Time ticking the AI of `nmobs` mobs in `nrooms` rooms, with one player around.
+
+    Args:
+        nrooms (int, optional): Number of rooms.
+        nmobs (int, optional): Number of mobs.
+        nrounds (int, optional): Number of rounds to average over.
+
+    Returns:
+        dict: `{name: (seconds per round, AI runs per round)}`.
+
+    """
+    print(f"Creating {nrooms} rooms and {nmobs} mobs ...")
+    rooms = [
+        EvAdventureRoom.create(f"ai benchmark room {iroom}", nohome=True)[0]
+        for iroom in range(nrooms)
+    ]
+    exits = []
+    for room1, room2 in zip(rooms, rooms[1:]):
+        exits.append(DefaultExit.create("east", room1, room2, nohome=True)[0])
+        exits.append(DefaultExit.create("west", room2, room1, nohome=True)[0])
+    mobs = [
+        EvAdventureMob.create(f"ai benchmark mob {imob}", location=rooms[imob % nrooms])[0]
+        for imob in range(nmobs)
+    ]
+    # a scheduler of our own, so we don't tick the mobs of the game
+    scheduler = create_script(AIScheduler, autostart=False)
+    timings = {}
+    try:
+        for mob in mobs:
+            mob.ai.set_state("roam")
+            scheduler.add(mob)
+
+        with patch.object(AIScheduler, "get_puppet_locations", return_value={rooms[0]}):
+            with patch.object(AIScheduler, "get_observed_rooms", return_value=set(rooms)):
+                timings["all ticked (old)"] = _time_rounds(scheduler, nrounds)
+            timings["throttled"] = _time_rounds(scheduler, nrounds)
+            with patch.object(AIScheduler, "unobserved_tick_rate", 0):
+                timings["suspended"] = _time_rounds(scheduler, nrounds)
+    finally:
+        scheduler.delete()
+        for obj in mobs + exits + rooms:
+            obj.delete()
+
+    print(f"Ticking the AI of {nmobs} mobs in {nrooms} rooms, one player around (per round):")
+    for name, (timing, nruns) in timings.items():
+        print(f"  {name:<18} {timing * 1e3:9.2f}ms {nruns:7.1f} AI runs")
+    return timings
@@ -0,0 +1,131 @@
+"""
+Benchmark for the help command.
+
+This creates `nentries` database help entries and times `help <query>` for a
+Character puppeted by an Account, with the default Account and Character cmdsets
+merged like when playing. It compares running without the
+help cache (every call loads all help entries, checks all locks and builds a
+new search index, the way `help` worked before the cache) with repeated calls
+using the cache. The help entries, the Account and the Character are removed
+again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.help_benchmark import run_benchmark
+    >>> run_benchmark(nentries=2000)
+
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+from evennia.commands.default.cmdset_account import AccountCmdSet
+from evennia.commands.default.cmdset_character import CharacterCmdSet
+from evennia.commands.default.help import CmdHelp
+from evennia.help.models import HelpEntry
+from evennia.help.utils import HELP_INDEX_CACHE, LunrSearch
+from evennia.utils import create
+
+_CATEGORY = "helpbenchmark"
+_BATCH_SIZE = 1000
+
+
+def _create_entries(nentries):
+    for start in range(0, nentries, _BATCH_SIZE):
+        HelpEntry.objects.bulk_create(
+            HelpEntry(
+                db_key=f"benchtopic {inum}",
+                db_help_category=_CATEGORY,
+                db_entrytext=f"Help text of benchmark topic number {inum}, about thing{inum % 97}.",
+            )
+            for inum in range(start, min(start + _BATCH_SIZE, nentries))
+        )
+
+
+def _help(caller, cmdset, args):
+    cmd = CmdHelp()
+    cmd.caller = caller
+    cmd.cmdname = cmd.raw_cmdname = "help"
+    cmd.args = args
+    cmd.raw_string = f"help {args}"
+    cmd.cmdset = cmdset
+    cmd.session = None
+    cmd.account = caller.account
+    cmd.obj = caller
+    cmd.msg_help = Mock()
+    cmd.parse()
+    cmd.func()
+    return cmd.msg_help.call_args[0][0]
+
+
+def _time(caller, cmdset, args, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        _help(caller, cmdset, args)
+    return (time.perf_counter() - t0) / repeats
+
+
+def _time_uncached(caller, cmdset, args, repeats):
+    with (
+        patch.object(HELP_INDEX_CACHE, "get_topics", return_value=None),
+        patch.object(
+            HELP_INDEX_CACHE, "get_db_entries", side_effect=lambda: list(HelpEntry.objects.all())
+        ),
+        patch.object(
+            HELP_INDEX_CACHE,
+            "get_search_entry",
+            side_effect=lambda candidate: candidate.search_index_entry,
+        ),
+        patch.object(
+            HELP_INDEX_CACHE,
+            "get_index",
+            side_effect=lambda fields, documents: LunrSearch().index("key", fields, documents),
+        ),
+    ):
+        return _time(caller, cmdset, args, repeats)
+
+
+def run_benchmark(nentries=2000, repeats=20):
+    """
+    Time help queries with `nentries` database help entries.
+
+    Args:
+        nentries (int, optional): Number of help entries to create.
+        repeats (int, optional): Number of repeated calls to average over.
+
+    Returns:
+        dict: The timings per call, in seconds.
+
+    """
+    account = create.create_account("helpbenchmark_account", email=None, password="tEst-pw_71839")
+    _create_entries(nentries)
+    char = create.create_object(
+        "evennia.objects.objects.DefaultCharacter", key="helpbenchmark_char", nohome=True
+    )
+    char.account = account
+    # the Character cmdset merged onto the Account cmdset, as for a puppeting Account
+    cmdset = AccountCmdSet() + CharacterCmdSet()
+    timings = {}
+    try:
+        queries = [
+            ("look", "look"),
+            ("topic", f"benchtopic {nentries // 2}"),
+            ("no match", "xyzzy"),
+        ]
+        # warm up (load the search engine etc)
+        _help(char, cmdset, "look")
+        for name, args in queries:
+            timings[f"help {name}, uncached (old)"] = _time_uncached(char, cmdset, args, 2)
+            _help(char, cmdset, args)
+            timings[f"help {name}, cached"] = _time(char, cmdset, args, repeats)
+    finally:
+        HelpEntry.objects.filter(db_help_category=_CATEGORY).delete()
+        char.delete()
+        account.delete()
+
+    print(f"Help command with {nentries} help entries (per call):")
+    for name, timing in timings.items():
+        print(f"  {name:<32} {timing * 1e3:.2f}ms")
+    return timings
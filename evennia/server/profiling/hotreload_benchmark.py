@@ -0,0 +1,143 @@
+"""
+Benchmark for the in-process hot reload.
+
+This seeds a world of `nobjs` objects using a typeclass from a temporary game
+module (every tenth object also gets a cmdset from that module), loads them
+all into the cache and then changes the module. It compares
+
+- the pause of a hot reload (`evennia.server.hotreload.hot_reload`), with
+- what a full reload must at least redo: start a new Server process (import
+  Evennia, set up Django and initialize the API, timed in a subprocess) and
+  load all objects and their cmdsets back into the cache.
+
+The full reload estimate does not include the Portal/Server handshake or any
+reload hooks, so the real difference is larger. The objects are removed
+again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.hotreload_benchmark import run_benchmark
+    >>> run_benchmark(nobjs=20000)
+
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from evennia.objects.models import ObjectDB
+from evennia.server.hotreload import hot_reload
+
+_MODULENAME = "_hotreload_benchmark_typeclasses"
+_KEY = "hotreload_benchmark_obj"
+_BATCH_SIZE = 2000
+
+_MODULE = """
+from evennia.commands.cmdset import CmdSet
+from evennia.commands.command import Command
+from evennia.objects.objects import DefaultObject
+
+
+class CmdBenchmark(Command):
+    key = "benchmark"
+
+    def func(self):
+        self.msg("version {version}")
+
+
+class BenchmarkCmdSet(CmdSet):
+    key = "BenchmarkCmdSet"
+
+    def at_cmdset_creation(self):
+        self.add(CmdBenchmark)
+
+
+class BenchmarkObject(DefaultObject):
+    version = {version}
+"""
+
+
+def _write_module(tmpdir, version):
+    with open(os.path.join(tmpdir, f"{_MODULENAME}.py"), "w") as fil:
+        fil.write(_MODULE.format(version=version))
+
+
+def _load_world():
+    """
+    Load all benchmark objects and their cmdsets into the cache.
+
+    """
+    objs = list(ObjectDB.objects.filter(db_key=_KEY).order_by("id"))
+    for obj in objs[::10]:
+        obj.cmdset.add(f"{_MODULENAME}.BenchmarkCmdSet")
+    return objs
+
+
+def _time_server_startup():
+    env = os.environ.copy()
+    env.setdefault("DJANGO_SETTINGS_MODULE", "server.conf.settings")
+    env["PYTHONPATH"] = os.pathsep.join([os.getcwd(), env.get("PYTHONPATH", "")])
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import django, evennia; django.setup(); evennia._init()"],
+        env=env,
+        check=True,
+    )
+    return time.perf_counter() - t0
+
+
+def run_benchmark(nobjs=20000):
+    """
+    Compare a hot reload with a full reload on a world of `nobjs` objects.
+
+    Args:
+        nobjs (int, optional): Number of objects in the world.
+
+    Returns:
+        tuple: `(full_reload_time, hot_reload_time)` in seconds.
+
+    """
+    tmpdir = tempfile.mkdtemp()
+    sys.path.insert(0, tmpdir)
+    _write_module(tmpdir, 1)
+    typeclass_path = f"{_MODULENAME}.BenchmarkObject"
+    try:
+        print(f"Creating {nobjs} objects ...")
+        for start in range(0, nobjs, _BATCH_SIZE):
+            ObjectDB.objects.bulk_create(
+                ObjectDB(db_key=_KEY, db_typeclass_path=typeclass_path)
+                for _ in range(start, min(start + _BATCH_SIZE, nobjs))
+            )
+        objs = _load_world()
+
+        _write_module(tmpdir, 2)
+        t0 = time.perf_counter()
+        hot_reload([_MODULENAME])
+        hot = time.perf_counter() - t0
+        assert all(obj.version == 2 for obj in objs)
+
+        startup = _time_server_startup()
+        for obj in objs:
+            ObjectDB.flush_cached_instance(obj)
+        del objs
+        t0 = time.perf_counter()
+        _load_world()
+        warmup = time.perf_counter() - t0
+    finally:
+        for obj in ObjectDB.objects.filter(db_key=_KEY):
+            ObjectDB.flush_cached_instance(obj)
+        ObjectDB.objects.filter(db_key=_KEY).delete()
+        sys.path.remove(tmpdir)
+        sys.modules.pop(_MODULENAME, None)
+        shutil.rmtree(tmpdir)
+
+    full = startup + warmup
+    print(f"Reloading a world of {nobjs} objects:")
+    print(f"  full reload: >= {full:.3f}s (startup {startup:.3f}s + cache warm-up {warmup:.3f}s)")
+    print(f"  hot reload:     {hot:.3f}s")
+    return full, hot
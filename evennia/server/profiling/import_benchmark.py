@@ -0,0 +1,110 @@
+"""
+Benchmark for the Evennia startup imports.
+
+This runs `python -X importtime` in a fresh subprocess for a few startup
+scenarios and reports the total import time of each together with the
+slowest imports. The scenarios are
+
+- `import evennia` - just importing the flat API. This should not import
+  any subsystems, nor call out to git for the version.
+- `portal` - setting up Django and initializing the API the way the Portal
+  does (`evennia._init(portal_mode=True)`).
+- `server` - the same, the way the Server does (`evennia._init()`).
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.import_benchmark import run_benchmark
+    >>> run_benchmark()
+
+"""
+
+import os
+import subprocess
+import sys
+
+_SCENARIOS = {
+    "import evennia": "import evennia",
+    "portal": "import django, evennia; django.setup(); evennia._init(portal_mode=True)",
+    "server": "import django, evennia; django.setup(); evennia._init()",
+}
+
+
+def parse_importtime(output):
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+        output (str): The stderr output of the process.
+
+    Returns:
+        list: A list of `(cumulative_us, self_us, modulename)` for every
+            imported module, in import order.
+
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        selftime, cumulative, modulename = line[len("import time:") :].split("|")
+        if not selftime.strip().isdigit():
+            # the header line
+            continue
+        imports.append((int(cumulative), int(selftime), modulename.rstrip()))
+    return imports
+
+
+def time_imports(code, env=None):
+    """
+    Run `code` in a new Python process with `-X importtime`.
+
+    Args:
+        code (str): The Python code to run.
+        env (dict, optional): Environment of the process. Defaults to the
+            current environment.
+
+    Returns:
+        list: The parsed imports, as returned by `parse_importtime`.
+
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env or os.environ.copy(),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr)
+    return parse_importtime(proc.stderr)
+
+
+def run_benchmark(scenarios=None, ntop=10):
+    """
+    Time the imports of the startup scenarios.
+
+    Args:
+        scenarios (list, optional): Names of the scenarios to run. Defaults
+            to all of them.
+        ntop (int, optional): Number of the slowest (by self-time) imports
+            to print for each scenario.
+
+    Returns:
+        dict: `{scenario: (total_seconds, nmodules)}`.
+
+    """
+    env = os.environ.copy()
+    env.setdefault("DJANGO_SETTINGS_MODULE", "server.conf.settings")
+    env["PYTHONPATH"] = os.pathsep.join([os.getcwd(), env.get("PYTHONPATH", "")])
+
+    results = {}
+    for name in scenarios or _SCENARIOS:
+        imports = time_imports(_SCENARIOS[name], env=env)
+        total = sum(selftime for _, selftime, _ in imports) / 1e6
+        results[name] = (total, len(imports))
+        print(f"{name}: {total:.3f}s importing {len(imports)} modules")
+        for cumulative, selftime, modulename in sorted(imports, key=lambda tup: -tup[1])[:ntop]:
+            print(
+                f"  {selftime / 1e3:8.1f}ms self {cumulative / 1e3:8.1f}ms cumulative {modulename}"
+            )
+    return results
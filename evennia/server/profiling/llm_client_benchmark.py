@@ -0,0 +1,198 @@
+"""
+Benchmark for the LLMClient of the `llm` contrib, against the bundled stub LLM server.
+
+This starts the stub server (`evennia.contrib.rpg.llm.llm_stub_server`) in-process, with
+a `latency` per response and room for `capacity` responses at a time, and lets `nnpcs`
+NPCs (each with their own LLMClient) talk to it at once:
+
+- one chatty NPC sends `nchatty` prompts at once,
+- the other NPCs each send one prompt of their own and one greeting that is the same for
+  all of them.
+
+It times this with the requests sent straight to the server, the way the client worked
+before, and with them going through an `LLMRequestScheduler` allowing `capacity` requests
+at a time. It reports the total time, the number of requests that reached the server and
+the response times of the NPCs other than the chatty one.
+
+`run_streaming_benchmark` instead times how long it takes before an NPC can say the
+first sentence of a response, with the response returned in one go and streamed.
+
+These need a running reactor, so they run the reactor until done. Since a Twisted reactor
+can only be run once per process, restart the shell to run another one.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.llm_client_benchmark import run_benchmark
+    >>> run_benchmark(nnpcs=10, nchatty=30)
+
+or
+
+    >>> from evennia.server.profiling.llm_client_benchmark import run_streaming_benchmark
+    >>> run_streaming_benchmark(nprompts=5, latency=2.0)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from django.test.utils import override_settings
+from twisted.internet import defer, reactor
+from twisted.internet.defer import inlineCallbacks, maybeDeferred
+
+from evennia.contrib.rpg.llm.llm_client import LLMClient, LLMRequestScheduler
+from evennia.contrib.rpg.llm.llm_stub_server import listen_stub_server
+
+
+def _schedule_unbounded(scheduler, request_key, request_func, requester=None):
+    return maybeDeferred(request_func)
+
+
+def _run_reactor(func):
+    """Run the reactor until the Deferred returned by `func` fires."""
+
+    def _run():
+        func().addErrback(lambda failure: failure.printTraceback()).addBoth(
+            lambda _: reactor.stop()
+        )
+
+    reactor.callWhenRunning(_run)
+    reactor.run(installSignalHandlers=False)
+
+
+def _percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(fraction * len(timings)))]
+
+
+@inlineCallbacks
+def _talk(port, nnpcs, nchatty, scheduler):
+    """
+    Let the NPCs talk to the server at once.
+
+    Returns:
+        Deferred: Fires with `(seconds, [response time of quiet NPCs, ...])`.
+
+    """
+    with override_settings(LLM_HOST=f"http://127.0.0.1:{port}", LLM_PATH="/"):
+        clients = [LLMClient(scheduler=scheduler) for _ in range(nnpcs)]
+    quiet_timings = []
+
+    def _timed(client, prompt, quiet):
+        t0 = time.perf_counter()
+
+        def _done(response):
+            if quiet:
+                quiet_timings.append(time.perf_counter() - t0)
+            return response
+
+        return client.get_response(prompt).addCallback(_done)
+
+    t0 = time.perf_counter()
+    requests = [_timed(clients[0], f"chatty prompt {iprompt}", False) for iprompt in range(nchatty)]
+    for inpc, client in enumerate(clients[1:]):
+        requests.append(_timed(client, f"prompt from npc {inpc}", True))
+        requests.append(_timed(client, "Hello there!", True))
+    yield defer.gatherResults(requests)
+    return time.perf_counter() - t0, quiet_timings
+
+
+def run_benchmark(nnpcs=10, nchatty=30, latency=0.05, capacity=2):
+    """
+    Time `nnpcs` NPCs talking to a stub LLM server at once.
+
+    Args:
+        nnpcs (int, optional): Number of NPCs, including the chatty one.
+        nchatty (int, optional): Number of prompts sent by the chatty NPC.
+        latency (float, optional): Seconds for the server to generate a response.
+        capacity (int, optional): Number of responses the server generates at a time.
+
+    Returns:
+        dict: `{name: (seconds, number of server requests, [quiet npc response times])}`.
+
+    """
+    listening_port, stub = listen_stub_server(port=0, latency=latency, capacity=capacity)
+    port = listening_port.getHost().port
+    results = {}
+
+    @inlineCallbacks
+    def _talk_both_ways():
+        try:
+            with patch.object(LLMRequestScheduler, "schedule", _schedule_unbounded):
+                stub.num_requests = 0
+                timing, quiet_timings = yield _talk(port, nnpcs, nchatty, LLMRequestScheduler())
+                results["unbounded (old)"] = (timing, stub.num_requests, quiet_timings)
+            stub.num_requests = 0
+            scheduler = LLMRequestScheduler(max_concurrent_requests=capacity)
+            timing, quiet_timings = yield _talk(port, nnpcs, nchatty, scheduler)
+            results["scheduled"] = (timing, stub.num_requests, quiet_timings)
+        finally:
+            yield listening_port.stopListening()
+
+    _run_reactor(_talk_both_ways)
+
+    print(
+        f"{nnpcs} NPCs talking to a server generating {capacity} responses at a time "
+        f"({latency}s each):"
+    )
+    print(f"  {'':<16} {'total':>8} {'requests':>9} {'quiet p50':>10} {'quiet max':>10}")
+    for name, (timing, nrequests, quiet_timings) in results.items():
+        print(
+            f"  {name:<16} {timing:7.2f}s {nrequests:9d} "
+            f"{_percentile(quiet_timings, 0.5):9.2f}s {max(quiet_timings):9.2f}s"
+        )
+    return results
+
+
+def run_streaming_benchmark(nprompts=5, latency=2.0):
+    """
+    Time how long it takes to get the first sentence and the whole response from a
+    stub LLM server taking `latency` seconds per response, with and without streaming.
+
+    Args:
+        nprompts (int, optional): Number of prompts to send, one after the other.
+        latency (float, optional): Seconds for the server to generate a response.
+
+    Returns:
+        dict: `{name: (seconds to first sentence, seconds to whole response)}`, averaged.
+
+    """
+    listening_port, _ = listen_stub_server(port=0, latency=latency, stream=True)
+    port = listening_port.getHost().port
+    results = {}
+
+    @inlineCallbacks
+    def _talk(stream):
+        with override_settings(
+            LLM_HOST=f"http://127.0.0.1:{port}", LLM_PATH="/", LLM_STREAM=stream
+        ):
+            client = LLMClient(scheduler=LLMRequestScheduler())
+        first_timings, whole_timings = [], []
+        for iprompt in range(nprompts):
+            first = []
+            t0 = time.perf_counter()
+            yield client.get_response(
+                f"prompt {iprompt}",
+                on_chunk=lambda chunk, first=first: first or first.append(time.perf_counter()),
+            )
+            t1 = time.perf_counter()
+            first_timings.append((first[0] if first else t1) - t0)
+            whole_timings.append(t1 - t0)
+        return sum(first_timings) / nprompts, sum(whole_timings) / nprompts
+
+    @inlineCallbacks
+    def _talk_both_ways():
+        try:
+            results["one-shot (old)"] = yield _talk(False)
+            results["streamed"] = yield _talk(True)
+        finally:
+            yield listening_port.stopListening()
+
+    _run_reactor(_talk_both_ways)
+
+    print(f"Getting a response from a server taking {latency}s per response (average):")
+    print(f"  {'':<16} {'first sentence':>15} {'whole response':>15}")
+    for name, (first_timing, whole_timing) in results.items():
+        print(f"  {name:<16} {first_timing:14.2f}s {whole_timing:14.2f}s")
+    return results
@@ -0,0 +1,117 @@
+"""
+Benchmark for searching prototypes.
+
+This saves `nprototypes` database prototypes and times `search_prototype` by
+exact key, partial key and tag, and getting the first page of a paginated
+listing (what `spawn/list` does). It compares this with how the database
+prototypes were searched before the prototype indexes (a database query per
+search, with all matches deserialized), reproduced in `_search_db_old`. The
+prototypes are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.prototype_search_benchmark import run_benchmark
+    >>> run_benchmark(nprototypes=2000)
+
+"""
+
+import time
+
+from django.db.models import Q
+
+from evennia.prototypes import prototypes as protlib
+from evennia.typeclasses.attributes import Attribute
+
+_TAG_CATEGORY = "db_prototype"
+_PAGE_SIZE = 20
+
+
+def _search_db_old(key=None, tags=None):
+    """
+    Search db-prototypes the way `search_prototype` did before the indexes.
+
+    """
+    if tags:
+        query = protlib.DbPrototype.objects.get_by_tag(tags, [_TAG_CATEGORY for _ in tags])
+    else:
+        query = protlib.DbPrototype.objects.all()
+    if key:
+        exact_match = query.filter(Q(db_key__iexact=key))
+        query = exact_match if exact_match else query.filter(Q(db_key__icontains=key))
+    db_ids = list(query.values_list("id", flat=True).order_by("db_key"))
+    return list(
+        Attribute.objects.filter(scriptdb__pk__in=db_ids, db_key="prototype").values_list(
+            "db_value", flat=True
+        )
+    )
+
+
+def _search_new(key=None, tags=None):
+    return protlib.search_prototype(key=key, tags=tags)
+
+
+def _list_page_old():
+    return _search_db_old()[:_PAGE_SIZE]
+
+
+def _list_page_new():
+    db_prototypes, _ = protlib.search_prototype(return_iterators=True)
+    return db_prototypes[:_PAGE_SIZE]
+
+
+def _time(func, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - t0) / repeats
+
+
+def run_benchmark(nprototypes=2000, repeats=20):
+    """
+    Time searching among `nprototypes` db-prototypes.
+
+    Args:
+        nprototypes (int, optional): Number of prototypes to save.
+        repeats (int, optional): Number of repeated calls to average over.
+
+    Returns:
+        dict: The timings per call, in seconds.
+
+    """
+    print(f"Saving {nprototypes} prototypes ...")
+    for inum in range(nprototypes):
+        protlib.save_prototype(
+            {
+                "prototype_key": f"benchmark_prototype_{inum}",
+                "prototype_tags": [f"benchmark_tag_{inum % 10}", "benchmark"],
+                "key": f"thing {inum}",
+                "attrs": [("strength", inum)],
+            }
+        )
+    searches = {
+        "exact key": {"key": f"benchmark_prototype_{nprototypes // 2}"},
+        "partial key": {"key": f"prototype_{nprototypes // 2}"},
+        "tag": {"tags": ["benchmark_tag_3"]},
+    }
+    timings = {}
+    try:
+        for name, kwargs in searches.items():
+            timings[f"{name}, old"] = _time(lambda kwargs=kwargs: _search_db_old(**kwargs), repeats)
+            _search_new(**kwargs)
+            timings[f"{name}, indexed"] = _time(
+                lambda kwargs=kwargs: _search_new(**kwargs), repeats
+            )
+        timings["list page, old"] = _time(_list_page_old, repeats)
+        protlib.DB_PROTOTYPE_CACHE.clear()
+        timings["list page, indexed (uncached)"] = _time(_list_page_new, 1)
+        timings["list page, indexed"] = _time(_list_page_new, repeats)
+    finally:
+        for inum in range(nprototypes):
+            protlib.delete_prototype(f"benchmark_prototype_{inum}")
+
+    print(f"Searching {nprototypes} db-prototypes (per call):")
+    for name, timing in timings.items():
+        print(f"  {name:<32} {timing * 1e3:.2f}ms")
+    return timings
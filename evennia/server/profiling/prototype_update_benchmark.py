@@ -0,0 +1,93 @@
+"""
+Benchmark for re-applying a changed prototype to spawned objects.
+
+This spawns `n` objects from a prototype, changes the prototype (new key,
+locks, aliases, Tags and Attribute values) and times
+`batch_update_objects_with_prototype` updating all of them, once with
+`chunk_size=1`, which updates the objects one by one like before the update
+was set-based, and once with the default chunk size. The objects are removed
+again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.prototype_update_benchmark import run_benchmark
+    >>> run_benchmark(n=10000)
+
+"""
+
+import time
+
+from evennia.objects.models import ObjectDB
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes import spawner
+
+_KEY = "benchmark_update_sword"
+
+_PROTOTYPE = {
+    "prototype_key": _KEY,
+    "typeclass": "evennia.objects.objects.DefaultObject",
+    "key": "sword",
+    "home": None,
+    "locks": "get:all()",
+    "aliases": ["blade"],
+    "tags": [("weapon", "itemtype"), ("iron", "material")],
+    "attrs": [("damage", 5), ("weight", 3), ("desc", "A plain sword.")],
+}
+
+
+def _get_updated_prototype(version):
+    prototype = dict(_PROTOTYPE)
+    prototype.update(
+        {
+            "key": f"sword v{version}",
+            "locks": f"get:all();drop:attr(version, {version})",
+            "aliases": ["blade", f"sword{version}"],
+            "tags": [("weapon", "itemtype"), ("steel", "material")],
+            "attrs": [("damage", 5 + version), ("weight", 3), ("desc", "A balanced sword.")],
+        }
+    )
+    return prototype
+
+
+def _time(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def run_benchmark(n=10000):
+    """
+    Time updating `n` spawned objects with a changed prototype.
+
+    Args:
+        n (int, optional): Number of objects to update.
+
+    Returns:
+        tuple: `(per_object_time, bulk_time)` in seconds.
+
+    """
+    print(f"Spawning {n} objects ...")
+    objs = spawner.spawn(*[_PROTOTYPE] * n)
+    try:
+        per_object = _time(
+            lambda: spawner.batch_update_objects_with_prototype(
+                _get_updated_prototype(1), objects=objs, chunk_size=1
+            )
+        )
+        bulk = _time(
+            lambda: spawner.batch_update_objects_with_prototype(
+                _get_updated_prototype(2), objects=objs
+            )
+        )
+        obj = ObjectDB.objects.get(id=objs[-1].id)
+        assert obj.key == "sword v2" and obj.db.damage == 7
+    finally:
+        for obj in protlib.search_objects_with_prototype(_KEY):
+            obj.delete()
+
+    print(f"Updating {n} objects with a changed prototype:")
+    print(f"  one at a time (old): {per_object:.3f}s ({per_object / n * 1e3:.2f}ms/object)")
+    print(f"  bulk:                {bulk:.3f}s ({bulk / n * 1e3:.2f}ms/object)")
+    return per_object, bulk
@@ -0,0 +1,114 @@
+"""
+Benchmark for the Portal render cache.
+
+This broadcasts messages to a crowd of fake, unconnected clients with a mix of
+telnet (plain ansi, xterm256, truecolor, MXP, nocolor, screenreader) and
+webclient (websocket and ajax) capabilities and times how long it takes for
+the Portal to render the outgoing text, with and without the render cache.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.render_benchmark import run_benchmark
+    >>> run_benchmark(nclients=500, nmessages=50)
+
+"""
+
+import time
+from itertools import cycle
+
+from mock import MagicMock
+
+from evennia.server.portal import rendercache
+from evennia.server.portal.telnet import TelnetProtocol
+from evennia.server.portal.webclient import WebSocketClient
+from evennia.server.portal.webclient_ajax import AjaxWebClientSession
+from evennia.utils import ansi
+
+# (protocol class, protocol_flags)
+CLIENT_PROFILES = (
+    (TelnetProtocol, {"TTYPE": True, "ANSI": True}),
+    (TelnetProtocol, {"TTYPE": True, "ANSI": True, "XTERM256": True}),
+    (TelnetProtocol, {"TTYPE": True, "ANSI": True, "XTERM256": True, "TRUECOLOR": True}),
+    (TelnetProtocol, {"TTYPE": True, "ANSI": True, "XTERM256": True, "MXP": True}),
+    (TelnetProtocol, {"TTYPE": True, "NOCOLOR": True}),
+    (TelnetProtocol, {"TTYPE": True, "ANSI": True, "SCREENREADER": True}),
+    (WebSocketClient, {}),
+    (WebSocketClient, {"SCREENREADER": True}),
+    (AjaxWebClientSession, {}),
+)
+
+MESSAGE = (
+    "|c+-------------------------------------------------+|n\n"
+    "|wGriatch|n shouts: |rThe |555dragon|r is attacking the |[B|ycastle|n!\n"
+    "|ySee |lchelp dragon|lthelp dragon|le for more info. |#ff8800Run!|n\n"
+    "|c+-------------------------------------------------+|n"
+)
+
+
+def _make_client(protocol_class, flags):
+    """
+    Create an unconnected protocol instance with its output going nowhere.
+
+    """
+    client = protocol_class()
+    client.protocol_flags = dict(flags)
+    client.sendLine = MagicMock()
+    client.transport = MagicMock()
+    client.client = MagicMock()  # ajax
+    client.csessid = "csessid"
+    return client
+
+
+def _broadcast(clients, nmessages):
+    t0 = time.perf_counter()
+    for imsg in range(nmessages):
+        # a new message each time, like a busy channel
+        text = f"{MESSAGE} #{imsg}"
+        for client in clients:
+            client.send_text(text, options={})
+    return time.perf_counter() - t0
+
+
+def run_benchmark(nclients=500, nmessages=50):
+    """
+    Broadcast `nmessages` messages to `nclients` mixed clients, with and without
+    the render cache, and print the result.
+
+    Args:
+        nclients (int, optional): Number of clients to send to.
+        nmessages (int, optional): Number of messages to broadcast.
+
+    Returns:
+        tuple: `(uncached_time, cached_time, stats)`, where stats is the render
+            cache statistics dict.
+
+    """
+    profiles = cycle(CLIENT_PROFILES)
+    clients = [_make_client(*next(profiles)) for _ in range(nclients)]
+
+    cache = rendercache.RENDER_CACHE
+    old_maxsize = cache.maxsize
+
+    try:
+        ansi._PARSE_CACHE.clear()
+        cache.maxsize = 0
+        cache.clear(reset_stats=True)
+        uncached = _broadcast(clients, nmessages)
+
+        ansi._PARSE_CACHE.clear()
+        cache.maxsize = old_maxsize or rendercache._RENDER_CACHE_SIZE
+        cache.clear(reset_stats=True)
+        cached = _broadcast(clients, nmessages)
+        stats = cache.stats()
+    finally:
+        cache.maxsize = old_maxsize
+        cache.clear(reset_stats=True)
+
+    nsends = nclients * nmessages
+    print(f"Broadcast {nmessages} messages to {nclients} mixed clients ({nsends} sends):")
+    print(f"  without render cache: {uncached:.3f}s ({uncached / nsends * 1e6:.1f}us/send)")
+    print(f"  with render cache:    {cached:.3f}s ({cached / nsends * 1e6:.1f}us/send)")
+    print(f"  speedup: {uncached / cached:.1f}x, cache stats: {stats}")
+    return uncached, cached, stats
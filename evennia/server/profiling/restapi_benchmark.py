@@ -0,0 +1,139 @@
+"""
+Benchmark for the REST API.
+
+This creates `nobjs` objects with a few Attributes and Tags each and lists
+them all in one page (`?limit=nobjs`), counting the database queries and
+timing each request (including rendering the JSON). It compares
+
+- the shortened listing and a listing with the full serializer (Attributes,
+  Tags, aliases etc, like the detail view) without the response cache and
+  without prefetching the Tags and Attributes, the way the API worked before,
+- the same with prefetching, with the cache cold and warm, and
+- a conditional GET with the ETag of the last response (`304 Not Modified`).
+
+The viewsets are called directly, so this works without `REST_API_ENABLED`.
+The objects and the account are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.restapi_benchmark import run_benchmark
+    >>> run_benchmark(nobjs=1000)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from evennia.objects.models import ObjectDB
+from evennia.typeclasses.managers import TypedObjectManager
+from evennia.utils import create
+from evennia.web.api import serializers, views
+from evennia.web.api.cache import API_RESPONSE_CACHE
+
+_KEY = "restapi_benchmark_obj"
+_ACCOUNT_KEY = "restapi_benchmark_account"
+_BATCH_SIZE = 1000
+
+
+class _FullObjectViewSet(views.ObjectDBViewSet):
+    list_serializer_class = serializers.ObjectDBSerializer
+
+
+def _reset_handlers(objs):
+    for obj in objs:
+        for handler in (obj.tags, obj.aliases, obj.permissions, obj.attributes, obj.nicks):
+            handler.reset_cache()
+
+
+def _request(view, account, nobjs, etag=None):
+    """
+    Make one listing request.
+
+    Returns:
+        tuple: `(seconds, number of queries, response)`
+
+    """
+    headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+    request = APIRequestFactory().get("/api/objects/", {"db_key": _KEY, "limit": nobjs}, **headers)
+    force_authenticate(request, user=account)
+    queries = []
+
+    def _count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(_count_queries):
+        t0 = time.perf_counter()
+        response = view(request)
+        response.render()
+        timing = time.perf_counter() - t0
+    return timing, len(queries), response
+
+
+def run_benchmark(nobjs=1000):
+    """
+    Time listing `nobjs` objects through the REST API.
+
+    Args:
+        nobjs (int, optional): Number of objects to list.
+
+    Returns:
+        dict: `{name: (seconds, number of queries)}` per request.
+
+    """
+    account = create.create_account(_ACCOUNT_KEY, "", "Tr0ub4dor&3")
+    account.is_superuser = True
+    account.save()
+    print(f"Creating {nobjs} objects ...")
+    for start in range(0, nobjs, _BATCH_SIZE):
+        ObjectDB.objects.bulk_create(
+            ObjectDB(db_key=_KEY, db_typeclass_path="evennia.objects.objects.DefaultObject")
+            for _ in range(start, min(start + _BATCH_SIZE, nobjs))
+        )
+    objs = list(ObjectDB.objects.filter(db_key=_KEY))
+    ObjectDB.objects.bulk_add_attributes(
+        (obj, [("strength", inum), ("inventory", ["sword", "shield"])])
+        for inum, obj in enumerate(objs)
+    )
+    ObjectDB.objects.bulk_add_tags((obj, ["benchmark", ("monster", "type")]) for obj in objs)
+    ObjectDB.objects.bulk_add_tags(((obj, ["benchobj"]) for obj in objs), tagtype="alias")
+
+    listviews = {
+        "short": views.ObjectDBViewSet.as_view({"get": "list"}),
+        "full": _FullObjectViewSet.as_view({"get": "list"}),
+    }
+    timings = {}
+    try:
+        for name, view in listviews.items():
+            _reset_handlers(objs)
+            with (
+                patch.object(API_RESPONSE_CACHE, "maxsize", 0),
+                patch.object(TypedObjectManager, "prefetch_handlers"),
+            ):
+                timings[f"{name} list, old"] = _request(view, account, nobjs)[:2]
+            _reset_handlers(objs)
+            API_RESPONSE_CACHE.clear()
+            timings[f"{name} list, cold"] = _request(view, account, nobjs)[:2]
+            timing, nqueries, response = _request(view, account, nobjs)
+            timings[f"{name} list, cached"] = (timing, nqueries)
+            timing, nqueries, response = _request(view, account, nobjs, etag=response["ETag"])
+            assert response.status_code == 304
+            timings[f"{name} list, 304"] = (timing, nqueries)
+    finally:
+        ObjectDB.objects.bulk_remove_tags(objs)
+        ObjectDB.objects.bulk_remove_tags(objs, tagtype="alias")
+        ObjectDB.objects.bulk_remove_attributes(objs)
+        for obj in objs:
+            ObjectDB.flush_cached_instance(obj)
+        ObjectDB.objects.filter(db_key=_KEY).delete()
+        account.delete()
+
+    print(f"Listing {nobjs} objects through the REST API (per request):")
+    for name, (timing, nqueries) in timings.items():
+        print(f"  {name:<20} {timing * 1e3:8.2f}ms {nqueries:6d} queries")
+    return timings
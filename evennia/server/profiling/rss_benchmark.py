@@ -0,0 +1,177 @@
+"""
+Benchmark for polling RSS feeds, against local feeds.
+
+This serves `nfeeds` feeds of `nentries` entries each from a local HTTP server that
+supports ETag/Last-Modified, and polls each of them `npolls` times with the RSS reader,
+with one new entry showing up in each feed halfway through. It times the polls and
+counts the bytes downloaded,
+
+- the way it worked before, with every poll downloading and parsing the whole feed
+  (forced here by not passing the ETag/Last-Modified on),
+- with conditional requests, so an unchanged feed is answered with '304 Not Modified'.
+
+It also counts how often a feed with no news would be polled in an hour, at a fixed
+rate (as before) and with the adaptive interval.
+
+This needs the feedparser package, as the RSS reader does.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.rss_benchmark import run_benchmark
+    >>> run_benchmark(nfeeds=20, nentries=50, npolls=10)
+
+"""
+
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import feedparser
+
+from evennia.server.portal import rss
+
+_ITEM = (
+    "<item><title>Entry {ientry}</title><link>http://example.com/{ientry}</link>"
+    "<guid>http://example.com/{ientry}</guid><description>{text}</description></item>"
+)
+
+
+def _get_feed(nentries):
+    items = "".join(
+        _ITEM.format(ientry=ientry, text="Lorem ipsum dolor sit amet. " * 10)
+        for ientry in reversed(range(nentries))
+    )
+    return (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>Benchmark</title>'
+        f"<link>http://example.com</link>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+class _FeedServer(ThreadingHTTPServer):
+    """
+    Serves `/<ifeed>` feeds, answering conditional requests for unchanged feeds with 304.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, nfeeds, nentries):
+        super().__init__(("127.0.0.1", 0), _FeedHandler)
+        self.nentries = nentries
+        self.feeds = {}
+        self.bytes_sent = 0
+        self.num_not_modified = 0
+        for ifeed in range(nfeeds):
+            self.set_feed(ifeed, nentries)
+
+    def set_feed(self, ifeed, nentries):
+        self.feeds[f"/{ifeed}"] = (_get_feed(nentries), f'"{nentries}"', formatdate(usegmt=True))
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body, etag, modified = self.server.feeds[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.server.num_not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", modified)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _parse_unconditionally(url, etag=None, modified=None):
+    return feedparser.parse(url)
+
+
+def _poll(feed_server, nfeeds, npolls):
+    """
+    Poll all feeds `npolls` times, adding an entry to each halfway through.
+
+    Returns:
+        tuple: `(seconds, bytes downloaded, 304 responses, new entries found)`.
+
+    """
+    port = feed_server.server_address[1]
+    feed_server.bytes_sent = feed_server.num_not_modified = 0
+    for ifeed in range(nfeeds):
+        feed_server.set_feed(ifeed, feed_server.nentries)
+    readers = [
+        rss.RSSReader(Mock(), f"http://127.0.0.1:{port}/{ifeed}", 10) for ifeed in range(nfeeds)
+    ]
+    num_new = 0
+    t0 = time.perf_counter()
+    for ipoll in range(npolls):
+        if ipoll == npolls // 2:
+            for ifeed in range(nfeeds):
+                feed_server.set_feed(ifeed, feed_server.nentries + 1)
+        for reader in readers:
+            new_entries = reader.get_new()
+            if ipoll:
+                num_new += len(new_entries)
+    timing = time.perf_counter() - t0
+    return timing, feed_server.bytes_sent, feed_server.num_not_modified, num_new
+
+
+def _polls_per_hour(adaptive, rate=10):
+    reader = rss.RSSReader(Mock(), "", rate)
+    reader.sessionhandler = Mock()
+    elapsed = npolls = 0
+    while elapsed < 3600:
+        npolls += 1
+        if adaptive:
+            reader._callback([], False)
+        elapsed += reader.interval
+    return npolls
+
+
+def run_benchmark(nfeeds=20, nentries=50, npolls=10):
+    """
+    Time polling `nfeeds` feeds `npolls` times each.
+
+    Args:
+        nfeeds (int, optional): Number of feeds.
+        nentries (int, optional): Number of entries per feed.
+        npolls (int, optional): Number of times to poll each feed.
+
+    Returns:
+        dict: `{name: (seconds, bytes downloaded, 304 responses, new entries, quiet polls
+            per hour)}`.
+
+    """
+    feed_server = _FeedServer(nfeeds, nentries)
+    thread = threading.Thread(target=feed_server.serve_forever, daemon=True)
+    thread.start()
+    results = {}
+    try:
+        with patch.object(rss, "feedparser", Mock(parse=_parse_unconditionally), create=True):
+            results["unconditional (old)"] = _poll(feed_server, nfeeds, npolls) + (
+                _polls_per_hour(False),
+            )
+        with patch.object(rss, "feedparser", feedparser, create=True):
+            results["conditional"] = _poll(feed_server, nfeeds, npolls) + (_polls_per_hour(True),)
+    finally:
+        feed_server.shutdown()
+        feed_server.server_close()
+
+    print(f"Polling {nfeeds} feeds of {nentries} entries {npolls} times, with one new entry each:")
+    print(f"  {'':<20} {'time':>8} {'downloaded':>12} {'304s':>6} {'new':>5} {'quiet polls/h':>14}")
+    for name, (timing, nbytes, nnot_modified, nnew, nquiet) in results.items():
+        print(
+            f"  {name:<20} {timing:7.2f}s {nbytes / 1024:10.0f}kB {nnot_modified:6d} "
+            f"{nnew:5d} {nquiet:14d}"
+        )
+    return results
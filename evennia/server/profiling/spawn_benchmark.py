@@ -0,0 +1,95 @@
+"""
+Benchmark for spawning from prototypes with an inheritance chain.
+
+This saves a 3-deep chain of database prototypes and spawns `n` objects from
+the last one, once with the flattened-prototype cache disabled (every spawn
+finds and merges the whole chain again, the way `spawn` worked before the
+cache) and once with it. It times both only resolving the prototypes
+(`only_validate=True`) and actually creating the objects. The prototypes and
+objects are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.spawn_benchmark import run_benchmark
+    >>> run_benchmark(n=1000)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes import spawner
+
+_PROTOTYPES = (
+    {
+        "prototype_key": "benchmark_goblin_base",
+        "typeclass": "evennia.objects.objects.DefaultObject",
+        "key": "goblin",
+        "attrs": [("strength", 8), ("health", 20)],
+        "tags": [("goblin", "race")],
+    },
+    {
+        "prototype_key": "benchmark_goblin_warrior",
+        "prototype_parent": "benchmark_goblin_base",
+        "attrs": [("strength", 12), ("weapon", "club")],
+        "tags": [("warrior", "class")],
+    },
+    {
+        "prototype_key": "benchmark_goblin_chief",
+        "prototype_parent": "benchmark_goblin_warrior",
+        "key": "goblin chief",
+        "attrs": [("health", 40)],
+        "locks": "get:false()",
+    },
+)
+_KEY = "benchmark_goblin_chief"
+
+
+def _time(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def _spawn_uncached(n, **kwargs):
+    """
+    Spawn `n` times the way it worked before the cache.
+
+    """
+    with patch.object(protlib.FLATTENED_PROTOTYPE_CACHE, "get", return_value=None):
+        for _ in range(n):
+            spawner.spawn(_KEY, **kwargs)
+
+
+def run_benchmark(n=1000):
+    """
+    Time resolving and spawning `n` objects from a 3-deep prototype chain.
+
+    Args:
+        n (int, optional): Number of objects to spawn.
+
+    Returns:
+        dict: The timings, in seconds.
+
+    """
+    for prototype in _PROTOTYPES:
+        protlib.save_prototype(dict(prototype))
+    timings = {}
+    try:
+        timings["resolve, uncached (old)"] = _time(lambda: _spawn_uncached(n, only_validate=True))
+        timings["resolve, cached"] = _time(lambda: spawner.spawn(*[_KEY] * n, only_validate=True))
+        timings["spawn, uncached (old)"] = _time(lambda: _spawn_uncached(n))
+        timings["spawn, cached"] = _time(lambda: spawner.spawn(*[_KEY] * n))
+    finally:
+        for obj in protlib.search_objects_with_prototype(_KEY):
+            obj.delete()
+        for prototype in _PROTOTYPES:
+            protlib.delete_prototype(prototype["prototype_key"])
+
+    print(f"Spawning {n} objects from a 3-deep prototype chain:")
+    for name, timing in timings.items():
+        print(f"  {name:<24} {timing:.3f}s ({timing / n * 1e3:.2f}ms/object)")
+    return timings
@@ -0,0 +1,95 @@
+"""
+Benchmark for Tag lookups.
+
+This fills the Tag table with a large number of tags and compares the
+case-insensitive (`__iexact`) lookups that were used to find tags before tags
+were stored normalized with the exact lookups used now. It prints the query
+plan of both variants and the time per lookup. The tags are removed again at
+the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.tag_benchmark import run_benchmark
+    >>> run_benchmark(ntags=1000000)
+
+Creating a million tags takes a while. Don't run this on a production database.
+
+"""
+
+import random
+import time
+
+from evennia.objects.models import ObjectDB
+from evennia.typeclasses.tags import Tag
+
+_CATEGORY = "tagbenchmark"
+_BATCH_SIZE = 10000
+
+
+def _create_tags(ntags):
+    for start in range(0, ntags, _BATCH_SIZE):
+        Tag.objects.bulk_create(
+            Tag(
+                db_key=f"benchtag{inum}",
+                db_category=f"{_CATEGORY}{inum % 100}",
+                db_model="objectdb",
+            )
+            for inum in range(start, min(start + _BATCH_SIZE, ntags))
+        )
+
+
+def _time(lookups, query):
+    t0 = time.perf_counter()
+    for key, category in lookups:
+        list(query(key, category))
+    return time.perf_counter() - t0
+
+
+def run_benchmark(ntags=1000000, nlookups=200):
+    """
+    Time `nlookups` tag lookups in a Tag table with `ntags` tags.
+
+    Args:
+        ntags (int, optional): Number of tags to create.
+        nlookups (int, optional): Number of lookups to time.
+
+    Returns:
+        tuple: `(iexact_time, exact_time)` in seconds.
+
+    """
+
+    def iexact_query(key, category):
+        return Tag.objects.filter(
+            db_key__iexact=key,
+            db_category__iexact=category,
+            db_tagtype__iexact=None,
+            db_model__iexact="objectdb",
+        )
+
+    def exact_query(key, category):
+        return ObjectDB.objects.get_tag(key=key, category=category, global_search=True)
+
+    print(f"Creating {ntags} tags ...")
+    _create_tags(ntags)
+    try:
+        lookups = []
+        for _ in range(nlookups):
+            inum = random.randint(0, ntags - 1)
+            lookups.append((f"BenchTag{inum}", f"{_CATEGORY}{inum % 100}"))
+
+        print("Query plan, iexact lookup:")
+        print(f"  {iexact_query(*lookups[0]).explain()}")
+        print("Query plan, exact lookup:")
+        print(f"  {exact_query(*lookups[0]).explain()}")
+
+        iexact = _time(lookups, iexact_query)
+        exact = _time(lookups, exact_query)
+    finally:
+        Tag.objects.filter(db_category__startswith=_CATEGORY).delete()
+
+    print(f"{nlookups} lookups among {ntags} tags:")
+    print(f"  iexact (old): {iexact:.3f}s ({iexact / nlookups * 1e3:.2f}ms/lookup)")
+    print(f"  exact:        {exact:.3f}s ({exact / nlookups * 1e3:.2f}ms/lookup)")
+    return iexact, exact
@@ -18,6 +18,7 @@ from .dummyrunner_settings import (
     c_moves_s,
     c_socialize,
 )
+from .import_benchmark import parse_importtime, time_imports
 
 try:
     import memplot
@@ -158,3 +159,23 @@ class TestMemPlot(TestCase):
         handle = mocked_open()
         handle.write.assert_called_with("100.0, 0.001, 0.001, 9\n")
         script.stop()
+
+
+class TestImportBenchmark(TestCase):
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   evennia.utils\n"
+            "some other output\n"
+            "import time:      3000 |       3120 | evennia\n"
+        )
+        self.assertEqual(
+            parse_importtime(output), [(120, 120, "   evennia.utils"), (3120, 3000, " evennia")]
+        )
+
+    def test_import_is_lazy(self):
+        """Importing evennia should neither import the subsystems nor call git"""
+        imports = {modulename.strip() for _, _, modulename in time_imports("import evennia")}
+        self.assertIn("evennia", imports)
+        self.assertNotIn("subprocess", imports)
+        self.assertNotIn("evennia.objects.objects", imports)
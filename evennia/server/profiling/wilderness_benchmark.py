@@ -0,0 +1,140 @@
+"""
+Benchmark for the wilderness coordinate index.
+
+This scatters a large number of stand-in objects over a wilderness area and
+compares looking up the objects at given coordinates by scanning every
+object (the way `WildernessScript.get_objs_at_coordinates` used to work) with
+using the `WildernessCoordinateIndex` spatial hash. It also times moving objects
+around in the index and radius searches. No database is needed.
+
+`run_db_benchmark` times moving objects including saving their coordinates to
+the database, comparing saving all coordinates in one Attribute (the way the
+wilderness used to store them) with the one Attribute per object used now.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling import wilderness_benchmark
+    >>> wilderness_benchmark.run_benchmark(nitems=100000)
+    >>> wilderness_benchmark.run_db_benchmark(nitems=2000)
+
+"""
+
+import random
+import time
+
+from evennia.contrib.grid.wilderness.wilderness import WildernessCoordinateIndex, WildernessScript
+from evennia.objects.objects import DefaultObject
+from evennia.utils.create import create_object, create_script
+
+
+class _Item:
+    """
+    Stand-in for an object in the wilderness.
+
+    """
+
+
+def run_benchmark(nitems=100000, size=1000, nlookups=1000, radius=5):
+    """
+    Compare linear and indexed coordinate lookups.
+
+    Args:
+        nitems (int, optional): Number of objects in the wilderness.
+        size (int, optional): The objects are scattered over a `size` x `size` area.
+        nlookups (int, optional): Number of lookups/moves/searches to time.
+        radius (int, optional): Radius to use for the radius search.
+
+    Returns:
+        dict: The timings, in seconds.
+
+    """
+    itemcoordinates = {
+        _Item(): (random.randint(0, size), random.randint(0, size)) for _ in range(nitems)
+    }
+    lookups = [(random.randint(0, size), random.randint(0, size)) for _ in range(nlookups)]
+    timings = {}
+
+    t0 = time.perf_counter()
+    for coordinates in lookups:
+        [item for item, item_coords in itemcoordinates.items() if item_coords == coordinates]
+    timings["linear lookup"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = WildernessCoordinateIndex(itemcoordinates)
+    timings["index build"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for coordinates in lookups:
+        index.get(coordinates)
+    timings["indexed lookup"] = time.perf_counter() - t0
+
+    movers = random.sample(list(itemcoordinates), nlookups)
+    t0 = time.perf_counter()
+    for item, coordinates in zip(movers, lookups):
+        index.add(item, coordinates)
+    timings["indexed move"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for coordinates in lookups:
+        index.get_in_radius(coordinates, radius)
+    timings[f"indexed radius {radius} search"] = time.perf_counter() - t0
+
+    print(f"{nitems} objects over {size}x{size} coordinates, {nlookups} operations each:")
+    for name, timing in timings.items():
+        per_op = "" if name == "index build" else f" ({timing / nlookups * 1e6:.1f}us/op)"
+        print(f"  {name:<28} {timing:.4f}s{per_op}")
+    return timings
+
+
+def run_db_benchmark(nitems=2000, size=1000, nmoves=200):
+    """
+    Compare saving the coordinates of moved objects to the database in one
+    Attribute for all objects with one Attribute per object. This creates
+    `nitems` objects and a wilderness, removing them again at the end.
+
+    Args:
+        nitems (int, optional): Number of objects in the wilderness.
+        size (int, optional): The objects are scattered over a `size` x `size` area.
+        nmoves (int, optional): Number of moves to time.
+
+    Returns:
+        dict: The timings per move, in seconds.
+
+    """
+    print(f"Creating {nitems} objects ...")
+    items = [
+        create_object(DefaultObject, key=f"item {inum}", nohome=True) for inum in range(nitems)
+    ]
+    script = create_script(WildernessScript, key="wilderness_db_benchmark")
+    moves = [
+        (random.choice(items), (random.randint(0, size), random.randint(0, size)))
+        for _ in range(nmoves)
+    ]
+    timings = {}
+    try:
+        script.db.all_coordinates = {item: (0, 0) for item in items}
+        all_coordinates = script.db.all_coordinates
+        t0 = time.perf_counter()
+        for item, coordinates in moves:
+            # re-saves the whole dict
+            all_coordinates[item] = coordinates
+        timings["one Attribute for all"] = (time.perf_counter() - t0) / nmoves
+        script.attributes.remove("all_coordinates")
+
+        for item in items:
+            script.set_obj_coordinates(item, (0, 0))
+        t0 = time.perf_counter()
+        for item, coordinates in moves:
+            script.set_obj_coordinates(item, coordinates)
+        timings["one Attribute per object"] = (time.perf_counter() - t0) / nmoves
+    finally:
+        script.delete()
+        for item in items:
+            item.delete()
+
+    print(f"Saving the coordinates of a moved object, among {nitems} objects (per move):")
+    for name, timing in timings.items():
+        print(f"  {name:<26} {timing * 1e3:.3f}ms")
+    return timings
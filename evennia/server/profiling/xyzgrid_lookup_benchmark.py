@@ -0,0 +1,82 @@
+"""
+Benchmark for finding XYZGrid rooms by coordinate.
+
+This creates a square of `size x size` XYZRooms and times `get_xyz` (what the
+grid does for every move and map lookup) and `filter_xyz` for a row of rooms.
+It compares looking up the coordinate Tags in the database (the way the
+`XYZManager` worked before, forced here by disabling the Tag index lookup)
+with looking them up in the process-wide Tag index (as if the coordinate Tag
+categories were added to `settings.TAG_INDEX_CATEGORIES`). The rooms are removed
+again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.xyzgrid_lookup_benchmark import run_benchmark
+    >>> run_benchmark(size=50)
+
+"""
+
+import time
+from random import randint, seed
+from unittest.mock import patch
+
+from evennia.contrib.grid.xyzgrid.xyzroom import MAP_TAG_CATEGORIES, XYZManager, XYZRoom
+from evennia.typeclasses.tags import TAG_INDEX
+
+_Z = "xyzgrid_lookup_benchmark"
+
+
+def _time(func, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - t0) / repeats
+
+
+def run_benchmark(size=50, repeats=200):
+    """
+    Time finding rooms by coordinate among `size * size` rooms.
+
+    Args:
+        size (int, optional): Width and height of the square of rooms.
+        repeats (int, optional): Number of lookups to average over.
+
+    Returns:
+        dict: The timings per call, in seconds.
+
+    """
+    seed(0)
+    print(f"Creating {size * size} rooms ...")
+    rooms = [
+        XYZRoom.create(f"room {x},{y}", xyz=(x, y, _Z), nohome=True)[0]
+        for x in range(size)
+        for y in range(size)
+    ]
+    points = [(randint(0, size - 1), randint(0, size - 1), _Z) for _ in range(repeats)]
+
+    def _get_rooms():
+        for xyz in points:
+            XYZRoom.objects.get_xyz(xyz=xyz)
+
+    def _filter_row():
+        list(XYZRoom.objects.filter_xyz(xyz=("*", size // 2, _Z)))
+
+    timings = {}
+    try:
+        with patch.object(XYZManager, "_get_ids_from_coordinates", return_value=None):
+            timings["get_xyz, old"] = _time(_get_rooms, 1) / repeats
+            timings["filter_xyz row, old"] = _time(_filter_row, repeats)
+        with patch.object(TAG_INDEX, "categories", TAG_INDEX.categories | set(MAP_TAG_CATEGORIES)):
+            _get_rooms()
+            timings["get_xyz, indexed"] = _time(_get_rooms, 1) / repeats
+            timings["filter_xyz row, indexed"] = _time(_filter_row, repeats)
+    finally:
+        for room in rooms:
+            room.delete()
+
+    print(f"Finding rooms by coordinate among {size * size} rooms (per call):")
+    for name, timing in timings.items():
+        print(f"  {name:<26} {timing * 1e3:.3f}ms")
+    return timings
@@ -0,0 +1,131 @@
+"""
+Benchmark for the XYZGrid pathfinder.
+
+This builds a square grid map where each node links to its 8 neighbors and
+times preparing the pathfinder and finding shortest paths across the map. It
+compares
+
+- how the pathfinder worked before: a dense `(nnodes, nnodes)` link matrix and
+  the routes between all nodes solved when loading the map (reproduced in
+  `_calculate_dense`), only run for maps of up to `max_dense_nodes` nodes since
+  it needs several dense `nnodes x nnodes` matrices in memory,
+- a sparse link graph with the routes solved on demand from each start node,
+- baking all routes to disk (`evennia xyzgrid initpath`) and loading the
+  memory-mapped baked routes again.
+
+The baked files are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.xyzgrid_pathfinding_benchmark import run_benchmark
+    >>> run_benchmark(sizes=(30, 60, 150))
+
+"""
+
+import os
+import time
+from random import randint, seed
+
+from numpy import zeros
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from evennia.contrib.grid.xyzgrid import xymap
+
+_Z = "xyzgrid_pathfinding_benchmark"
+
+
+def _get_grid(size):
+    edge = f"+ {' ' * size * 2}"
+    l1 = f"\n  {'#-' * size}#"
+    l2 = f"\n  {'|x' * size}|"
+    return f"{edge}\n{(l1 + l2) * size}{l1}\n\n{edge}"
+
+
+def _calculate_dense(mapobj):
+    """
+    Solve the routes between all nodes the way `calculate_path_matrix` did before.
+
+    """
+    nnodes = len(mapobj.node_index_map)
+    pathfinding_graph = zeros((nnodes, nnodes))
+    for inode, node in mapobj.node_index_map.items():
+        pathfinding_graph[inode, :] = node.linkweights(nnodes)
+    return dijkstra(
+        csr_matrix(pathfinding_graph),
+        directed=True,
+        return_predecessors=True,
+        limit=mapobj.max_pathfinding_length,
+    )
+
+
+def _time(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def _time_paths(mapobj, points):
+    return _time(lambda: [mapobj.get_shortest_path(start, end) for start, end in points]) / len(
+        points
+    )
+
+
+def run_benchmark(sizes=(30, 60, 150), npaths=20, max_dense_nodes=5000):
+    """
+    Time the pathfinder on square grids.
+
+    Args:
+        sizes (tuple, optional): The grid sizes; a size of `n` has `(n + 1)**2` nodes.
+        npaths (int, optional): Number of random paths to average over.
+        max_dense_nodes (int, optional): Only time the old, dense pathfinder for maps
+            of up to this many nodes.
+
+    Returns:
+        dict: `{size: {name: seconds}}`.
+
+    """
+    seed(0)
+    results = {}
+    mapobj = None
+    try:
+        for size in sizes:
+            timings = results[size] = {}
+            mapobj = xymap.XYMap({"map": _get_grid(size)}, Z=_Z)
+            mapobj.parse()
+            nnodes = len(mapobj.node_index_map)
+            points = [((0, 0), (size, size))] + [
+                ((randint(0, size), randint(0, size)), (randint(0, size), randint(0, size)))
+                for _ in range(npaths - 1)
+            ]
+            if nnodes <= max_dense_nodes:
+                timings["dense, all routes (old)"] = _time(
+                    lambda mapobj=mapobj: _calculate_dense(mapobj)
+                )
+
+            mapobj.max_baked_nodes = 0
+            timings["sparse, prepare"] = _time(mapobj.calculate_path_matrix)
+            timings["sparse, per path (cold)"] = _time_paths(mapobj, points)
+            timings["sparse, per path (warm)"] = _time_paths(mapobj, points)
+
+            timings["bake all routes"] = _time(
+                lambda mapobj=mapobj: mapobj.calculate_path_matrix(force=True)
+            )
+            timings["load baked routes"] = _time(mapobj.calculate_path_matrix)
+            timings["baked, per path"] = _time_paths(mapobj, points)
+
+            print(f"{size + 1}x{size + 1} grid ({nnodes} nodes):")
+            for name, timing in timings.items():
+                print(f"  {name:<26} {timing * 1e3:10.2f}ms")
+    finally:
+        if mapobj:
+            mapobj.pathfinding_routes = None
+            for filename in (
+                mapobj.pathfinder_baked_filename,
+                mapobj.pathfinder_baked_routes_filename,
+            ):
+                if os.path.isfile(filename):
+                    os.remove(filename)
+    return results
@@ -0,0 +1,98 @@
+"""
+Benchmark for spawning an XYZGrid map.
+
+This builds a square grid map where each node links to its 8 neighbors and
+times spawning it into rooms and exits, then respawning it after removing one
+link from the map (a one-character edit; reloading the map is not timed). It
+compares
+
+- how spawning worked before: every node and link compared with the database
+  and created one at a time, forced here with `full=True` and without the bulk
+  creation,
+- spawning the map the first time, with the rooms and exits created in bulk,
+- respawning only what changed since the last spawn.
+
+The grid and its rooms and exits are removed again at the end.
+
+Run from your game dir with
+
+    evennia shell
+
+    >>> from evennia.server.profiling.xyzgrid_spawn_benchmark import run_benchmark
+    >>> run_benchmark(size=10)
+
+"""
+
+import time
+from unittest.mock import patch
+
+from evennia.contrib.grid.xyzgrid import xymap_legend, xyzgrid
+
+_Z = "xyzgrid_spawn_benchmark"
+
+
+def _get_grid(size):
+    edge = f"+ {' ' * size * 2}"
+    l1 = f"\n  {'#-' * size}#"
+    l2 = f"\n  {'|x' * size}|"
+    return f"{edge}\n{(l1 + l2) * size}{l1}\n\n{edge}"
+
+
+def _time(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def _load_map(grid, mapstring):
+    grid.add_maps({"map": mapstring, "zcoord": _Z})
+    grid.reload()
+
+
+def run_benchmark(size=10):
+    """
+    Time spawning a `(size + 1) x (size + 1)` grid and respawning it after a small edit.
+
+    Args:
+        size (int, optional): The grid size.
+
+    Returns:
+        dict: The timings, in seconds.
+
+    """
+    mapstring = _get_grid(size)
+    # remove one link in the middle of the map
+    lines = mapstring.split("\n")
+    node_rows = [iline for iline, line in enumerate(lines) if "#-#" in line]
+    middle = node_rows[len(node_rows) // 2]
+    lines[middle] = lines[middle].replace("#-#", "# #", 1)
+    edited_mapstring = "\n".join(lines)
+
+    grid, err = xyzgrid.XYZGrid.create("xyzgrid_spawn_benchmark")
+    if err:
+        raise RuntimeError(err)
+    grid.log = lambda msg: None
+    timings = {}
+    try:
+        _load_map(grid, mapstring)
+        with (
+            patch.object(xymap_legend.MapNode, "get_spawn_prototype", return_value=None),
+            patch.object(xymap_legend.MapNode, "get_exit_spawn_prototypes", return_value=None),
+        ):
+            timings["spawn, one at a time (old)"] = _time(lambda: grid.spawn(full=True))
+            _load_map(grid, edited_mapstring)
+            timings["respawn edit, full (old)"] = _time(lambda: grid.spawn(full=True))
+        grid.remove_map(_Z)
+
+        _load_map(grid, mapstring)
+        timings["spawn, bulk"] = _time(grid.spawn)
+        timings["respawn, unchanged"] = _time(grid.spawn)
+        _load_map(grid, edited_mapstring)
+        timings["respawn edit, changes only"] = _time(grid.spawn)
+    finally:
+        grid.delete()
+
+    print(f"Spawning a {size + 1}x{size + 1} grid:")
+    for name, timing in timings.items():
+        print(f"  {name:<28} {timing:8.3f}s")
+    return timings
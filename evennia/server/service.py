@@ -19,6 +19,7 @@ from twisted.internet.defer import Deferred
 from twisted.internet.task import LoopingCall
 
 import evennia
+from evennia.server.signals import SIGNAL_SERVER_PRE_STOP
 from evennia.utils import logger
 from evennia.utils.utils import get_evennia_version, make_iter, mod_import
 
@@ -507,6 +508,8 @@ class EvenniaServerService(MultiService):
             # once; we don't need to run the shutdown procedure again.
             defer.returnValue(None)
 
+        SIGNAL_SERVER_PRE_STOP.send(sender=None, mode=mode)
+
         if mode == "reload":
             # call restart hooks
             evennia.ServerConfig.objects.conf("server_restart_mode", "reload")
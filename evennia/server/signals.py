@@ -94,6 +94,25 @@ SIGNAL_CHANNEL_POST_CREATE = Signal()
 # Called just after at_traverse hook.
 SIGNAL_EXIT_TRAVERSED = Signal()
 
+# The sender is None. This is triggered after game modules were re-imported by an in-process
+# hot reload (see `evennia.server.hotreload`), after cached typeclasses, cmdsets and locks were
+# updated.
+# sends with kwarg 'modules' (the names of the reloaded modules)
+SIGNAL_SERVER_POST_HOT_RELOAD = Signal()
+
+# The sender is the database model (like ObjectDB) of entities changed in bulk, such as by
+# the bulk_add_tags/bulk_add_attributes/bulk_remove_* manager methods or by spawning many
+# objects at once. Such changes don't send post_save or m2m_changed for each entity.
+# sends with kwargs 'objs' (the changed entities) and 'models' (other models changed along
+# with them, like Tag or Attribute)
+SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE = Signal()
+
+# The sender is None. This is triggered when the server starts to reload, reset or shut down,
+# before any of the at_server_reload/at_server_shutdown hooks are called. Use it to save
+# state that would otherwise be lost.
+# sends with kwarg 'mode' ('reload', 'reset' or 'shutdown')
+SIGNAL_SERVER_PRE_STOP = Signal()
+
 # Used as a generic event emitter. Use to make your own signals easily in one place!
 # To use it, import SIGNALS_CUSTOM and use it like a dictionary of Signal objects.
 # Example:
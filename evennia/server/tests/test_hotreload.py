@@ -0,0 +1,155 @@
+"""
+Tests for the in-process hot reload.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from unittest.mock import MagicMock, patch
+
+from evennia.server import hotreload
+from evennia.utils import create
+from evennia.utils.test_resources import BaseEvenniaTest
+
+_TYPECLASS_MODULE = """
+from evennia.commands.cmdset import CmdSet
+from evennia.commands.command import Command
+from evennia.objects.objects import DefaultObject
+
+
+class CmdHotReloadTest(Command):
+    key = "hotreloadtest"
+
+    def func(self):
+        self.msg("version {version}")
+
+
+class HotReloadTestCmdSet(CmdSet):
+    key = "HotReloadTestCmdSet"
+
+    def at_cmdset_creation(self):
+        self.add(CmdHotReloadTest)
+
+
+class HotReloadTestObject(DefaultObject):
+    def get_version(self):
+        return {version}
+"""
+
+_CHILD_MODULE = """
+from _hotreloadtest_typeclasses import HotReloadTestObject
+
+
+class HotReloadTestChild(HotReloadTestObject):
+    pass
+"""
+
+
+_PREFIXES = ["_hotreloadtest_typeclasses", "_hotreloadtest_child"]
+
+
+class TestHotReload(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tmpdir)
+        self._write("_hotreloadtest_typeclasses", _TYPECLASS_MODULE.format(version=1))
+        self._write("_hotreloadtest_child", _CHILD_MODULE)
+        with warnings.catch_warnings():
+            # the typeclasses were registered with Django by an earlier test
+            warnings.filterwarnings("ignore", message=r"Model .* was already registered")
+            self.obj = create.create_object(
+                "_hotreloadtest_typeclasses.HotReloadTestObject", key="hotobj", location=self.room1
+            )
+            self.child = create.create_object(
+                "_hotreloadtest_child.HotReloadTestChild", key="hotchild", location=self.room1
+            )
+        self.obj.cmdset.add("_hotreloadtest_typeclasses.HotReloadTestCmdSet")
+
+    def tearDown(self):
+        self.obj.delete()
+        self.child.delete()
+        sys.path.remove(self.tmpdir)
+        for modulename in ("_hotreloadtest_typeclasses", "_hotreloadtest_child"):
+            sys.modules.pop(modulename, None)
+        shutil.rmtree(self.tmpdir)
+        super().tearDown()
+
+    def _write(self, modulename, source, mtime=None):
+        path = os.path.join(self.tmpdir, f"{modulename}.py")
+        with open(path, "w") as fil:
+            fil.write(source)
+        if mtime:
+            os.utime(path, (mtime, mtime))
+
+    def test_get_changed_modules(self):
+        now = time.time()
+        with (
+            patch.dict(
+                hotreload._MODULE_MTIMES,
+                {"_hotreloadtest_typeclasses": now, "_hotreloadtest_child": now},
+            ),
+            # another test removes this from the module
+            patch.object(hotreload.gametime, "SERVER_START_TIME", 0.0, create=True),
+        ):
+            self.assertEqual(hotreload.get_changed_modules(prefixes=_PREFIXES), [])
+            self._write(
+                "_hotreloadtest_typeclasses", _TYPECLASS_MODULE.format(version=2), mtime=now + 10
+            )
+            self.assertEqual(
+                hotreload.get_changed_modules(prefixes=_PREFIXES),
+                ["_hotreloadtest_typeclasses"],
+            )
+
+    def test_get_reload_order(self):
+        self.assertEqual(
+            hotreload.get_reload_order(["_hotreloadtest_typeclasses"], prefixes=_PREFIXES),
+            ["_hotreloadtest_typeclasses", "_hotreloadtest_child"],
+        )
+        self.assertEqual(
+            hotreload.get_reload_order(["_hotreloadtest_child"], prefixes=_PREFIXES),
+            ["_hotreloadtest_child"],
+        )
+
+    def test_hot_reload(self):
+        self.obj.ndb.state = "kept"
+        self.assertEqual(self.obj.get_version(), 1)
+        old_cmdset = self.obj.cmdset.get()[-1]
+        self._write("_hotreloadtest_typeclasses", _TYPECLASS_MODULE.format(version=2))
+
+        callback = MagicMock()
+        from evennia.server.signals import SIGNAL_SERVER_POST_HOT_RELOAD
+
+        SIGNAL_SERVER_POST_HOT_RELOAD.connect(callback)
+        try:
+            reloaded = hotreload.hot_reload(["_hotreloadtest_typeclasses"], prefixes=_PREFIXES)
+        finally:
+            SIGNAL_SERVER_POST_HOT_RELOAD.disconnect(callback)
+
+        self.assertEqual(reloaded, ["_hotreloadtest_typeclasses", "_hotreloadtest_child"])
+        callback.assert_called_once()
+        new_module = sys.modules["_hotreloadtest_typeclasses"]
+        # the same cached instances now use the new classes
+        self.assertIs(type(self.obj), new_module.HotReloadTestObject)
+        self.assertEqual(self.obj.get_version(), 2)
+        self.assertTrue(isinstance(self.child, new_module.HotReloadTestObject))
+        self.assertEqual(self.child.get_version(), 2)
+        self.assertEqual(self.obj.ndb.state, "kept")
+        # the cmdset was re-imported
+        new_cmdset = self.obj.cmdset.get()[-1]
+        self.assertIsNot(type(new_cmdset), type(old_cmdset))
+        self.assertIs(type(new_cmdset), new_module.HotReloadTestCmdSet)
+
+    def test_hot_reload_error(self):
+        self._write("_hotreloadtest_typeclasses", "this is not python")
+        with self.assertRaises(hotreload.HotReloadError):
+            hotreload.hot_reload(["_hotreloadtest_typeclasses"], prefixes=_PREFIXES)
+        # nothing was re-imported
+        self.assertEqual(self.obj.get_version(), 1)
+
+    def test_nothing_to_reload(self):
+        self.assertEqual(hotreload.hot_reload([], prefixes=_PREFIXES), [])
@@ -216,6 +216,13 @@ MXP_ENABLED = True
 # allow malevolent players to lure others to execute commands they did not
 # intend to.
 MXP_OUTGOING_ONLY = True
+# The Portal caches the rendered (ansi/mxp/html/screenreader) version of
+# outgoing text per client-capability profile, so a message broadcast to
+# many sessions is only parsed once per profile. This is the max number of
+# renderings to keep (set to 0 to disable). Texts longer than the max text
+# length (in characters) are always rendered directly and never cached.
+PORTAL_RENDER_CACHE_SIZE = 2000
+PORTAL_RENDER_CACHE_MAX_TEXT_LENGTH = 16384
 # Database objects are cached in what is known as the idmapper. The idmapper
 # caching results in a massive speedup of the server (since it dramatically
 # limits the number of database accesses needed) and also allows for
@@ -447,6 +454,12 @@ PROTOTYPE_MODULES = ["world.prototypes"]
 # Modules containining Prototype functions able to be embedded in prototype
 # definitions from in-game.
 PROT_FUNC_MODULES = ["evennia.prototypes.protfuncs"]
+# Module-path prefixes of the game modules that `reload/hot` will re-import
+# inside the running Server (without restarting the Server process) when
+# their source files have changed. Modules importing a re-imported module
+# are re-imported as well. Only modules that have already been imported
+# are considered.
+HOT_RELOAD_MODULES = ["typeclasses", "commands", "world", "server.conf.lockfuncs"]
 # Module holding settings/actions for the dummyrunner program (see the
 # dummyrunner for more information)
 DUMMYRUNNER_SETTINGS_MODULE = "evennia.server.profiling.dummyrunner_settings"
@@ -575,6 +588,15 @@ START_LOCATION = "#2"
 # out of sync between the processes. Keep on unless you face such
 # issues.
 TYPECLASS_AGGRESSIVE_CACHE = True
+# Tag categories to keep in a process-wide reverse index (tag -> objects).
+# Once a category has been loaded, `get_by_tag` / `search_tag` with only
+# indexed categories (use `None` for the default category) are answered
+# from memory rather than with a tag query. Only useful for categories
+# that are searched often, such as zones or spawn points ("account" holds
+# the `puppeted` tag checked by the server every minute). The index only
+# sees tags changed through the tag handlers (`obj.tags` etc) of this
+# process, so leave empty if you modify tags from outside the server.
+TAG_INDEX_CATEGORIES = []
 # These are fallbacks for BASE typeclasses failing to load. Usually needed only
 # during doc building. The system expects these to *always* load correctly, so
 # only modify if you are making fundamental changes to how objects/accounts
@@ -883,7 +905,13 @@ IRC_ENABLED = False
 # be installed (through package manager or from the website
 # http://code.google.com/p/feedparser/)
 RSS_ENABLED = False
+# A feed that has had no news for a while is checked less and less often, up
+# to this many seconds apart. It is checked at its normal rate again as soon as
+# it has news.
 RSS_UPDATE_INTERVAL = 60 * 10  # 10 minutes
+# Max number of entries per feed to remember as already relayed to the channel
+# (the entries currently in the feed are always remembered).
+RSS_MAX_SEEN_ENTRIES = 200
 # Grapevine (grapevine.haus) is a network for listing MUDs as well as allow
 # users of said MUDs to communicate with each other on shared channels. To use,
 # your game must first be registered by logging in and creating a game entry at
@@ -914,6 +942,19 @@ DISCORD_BOT_INTENTS = 105985
 DISCORD_BOT_TOKEN = None
 # The account typeclass which the Evennia-side Discord relay bot will use.
 DISCORD_BOT_CLASS = "evennia.accounts.bots.DiscordBot"
+# Messages relayed to IRC and Discord are queued per IRC/Discord channel and sent
+# only as fast as the upstream rate limits allow, with bursts coalesced into
+# multi-line messages. If more than BOT_OUTBOUND_BUSY_QUEUED messages are waiting
+# for a bot, the Portal asks the Server to hold back that bot's messages until
+# the queue has drained. A channel never queues more than BOT_OUTBOUND_MAX_QUEUED
+# messages; beyond that the oldest are dropped.
+BOT_OUTBOUND_MAX_QUEUED = 200
+BOT_OUTBOUND_BUSY_QUEUED = 50
+# IRC networks don't report their rate limits, but disconnect bots sending too
+# much at once ('excess flood'). This allows the IRC bot to send this many lines
+# per window of IRC_OUTBOUND_WINDOW seconds.
+IRC_OUTBOUND_LIMIT = 4
+IRC_OUTBOUND_WINDOW = 8
 
 ######################################################################
 # Django web features
@@ -1159,6 +1200,12 @@ REST_FRAMEWORK = {
 
 # To enable the REST api, turn this to True
 REST_API_ENABLED = False
+# Max number of GET responses the REST api caches (0 to not cache). Cached responses are
+# invalidated when the entities change, so this is mostly a memory trade-off.
+REST_API_CACHE_SIZE = 1000
+# Seconds after which a cached REST api response expires, to pick up changes made without
+# Django signals (like QuerySet.update).
+REST_API_CACHE_TIMEOUT = 300
 
 ######################################################################
 # Networking Replaceables
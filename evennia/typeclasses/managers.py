@@ -6,18 +6,51 @@ all Attributes and TypedObjects).
 """
 
 import shlex
+from collections import defaultdict
 
+from django.conf import settings
+from django.db import connection
 from django.db.models import Count, ExpressionWrapper, F, FloatField, Q
 from django.db.models.functions import Cast
 
-from evennia.typeclasses.attributes import Attribute
-from evennia.typeclasses.tags import Tag
+from evennia.server.signals import SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE
+from evennia.typeclasses.attributes import Attribute, ModelAttributeBackend
+from evennia.typeclasses.tags import TAG_INDEX, Tag, normalize_tag_field
 from evennia.utils import idmapper
+from evennia.utils.dbserialize import to_pickle
 from evennia.utils.utils import class_from_module, make_iter, variable_from_module
 
 __all__ = ("TypedObjectManager",)
 _GA = object.__getattribute__
+_TYPECLASS_AGGRESSIVE_CACHE = settings.TYPECLASS_AGGRESSIVE_CACHE
 _Tag = None
+# above this many matches, get_by_tag leaves the lookup to the database rather
+# than querying by a (very long) list of ids from the tag index
+_TAG_INDEX_MAX_IDS = 10000
+# max number of ids to use in one `__in` query in the bulk methods
+_BULK_BATCH_SIZE = 1000
+# the handler managing each tagtype
+_TAGTYPE_HANDLERS = {None: "tags", "alias": "aliases", "permission": "permissions"}
+# the handler managing each attrtype
+_ATTRTYPE_HANDLERS = {None: "attributes", "nick": "nicks"}
+
+
+def _batched(seq, size=_BULK_BATCH_SIZE):
+    seq = list(seq)
+    for start in range(0, len(seq), size):
+        yield seq[start : start + size]
+
+
+def _prime_cache(handler, cache):
+    """
+    Set the complete cache of a Tag handler or Attribute backend, as its own full
+    caching would, marking all categories as cached too.
+
+    """
+    handler._cache = cache
+    categories = {obj.db_category.lower() if obj.db_category else None for obj in cache.values()}
+    handler._catcache = {"-%s" % category: True for category in categories | {None}}
+    handler._cache_complete = True
 
 
 # Managers
@@ -190,6 +223,12 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
         if not _Tag:
             from evennia.typeclasses.models import Tag as _Tag
         dbmodel = self.model.__dbclass__.__name__.lower()
+        # tags are stored normalized, so we can use exact (indexed) lookups
+        key, category, tagtype = (
+            normalize_tag_field(key),
+            normalize_tag_field(category),
+            normalize_tag_field(tagtype),
+        )
         if global_search:
             # search all tags using the Tag model
             query = [("db_tagtype", tagtype), ("db_model", dbmodel)]
@@ -277,6 +316,11 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             IndexError: If `key` and `category` are both lists and `category` is shorter
                 than `key`.
 
+        Notes:
+            With `match="all"` and only categories listed in `settings.TAG_INDEX_CATEGORIES`,
+            the matching objects are found in the in-memory tag index and the
+            returned queryset just fetches them by id.
+
         """
         if not (key or category):
             return []
@@ -295,8 +339,16 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
         n_unique_categories = len(unique_categories)
 
         dbmodel = self.model.__dbclass__.__name__.lower()
+
+        if not anymatch:
+            # try to find the objects in the tag index
+            objids = self._get_ids_from_tag_index(dbmodel, tagtype, keys, categories)
+            if objids is not None:
+                return self.filter(id__in=objids).order_by("id")
+
+        # tags are stored normalized, so we can use exact (indexed) lookups
         query = (
-            self.filter(db_tags__db_tagtype__iexact=tagtype, db_tags__db_model__iexact=dbmodel)
+            self.filter(db_tags__db_tagtype=normalize_tag_field(tagtype), db_tags__db_model=dbmodel)
             .distinct()
             .order_by("id")
         )
@@ -316,15 +368,20 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             clauses = Q()
             for ikey, key in enumerate(keys):
                 # ANY mode; must match any one of the given tags/categories
-                clauses |= Q(db_key__iexact=key, db_category__iexact=categories[ikey])
+                clauses |= Q(
+                    db_key=normalize_tag_field(key),
+                    db_category=normalize_tag_field(categories[ikey]),
+                )
         else:
             # only one or more categories given
             clauses = Q()
             # ANY mode; must match any one of them
             for category in unique_categories:
-                clauses |= Q(db_category__iexact=category)
+                clauses |= Q(db_category=normalize_tag_field(category))
 
-        tags = _Tag.objects.filter(clauses)
+        tags = _Tag.objects.filter(
+            clauses, db_tagtype=normalize_tag_field(tagtype), db_model=dbmodel
+        )
         query = query.filter(db_tags__in=tags).annotate(
             matches=Count("db_tags__pk", filter=Q(db_tags__in=tags), distinct=True)
         )
@@ -339,6 +396,41 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
 
         return query
 
+    def _get_ids_from_tag_index(self, dbmodel, tagtype, keys, categories):
+        """
+        Helper for `get_by_tag`, looking up objects having all the given tags in
+        the tag index (see `settings.TAG_INDEX_CATEGORIES`).
+
+        Args:
+            dbmodel (str): The lowercase name of the database model.
+            tagtype (str or None): The type of Tag.
+            keys (list): The Tag keys.
+            categories (list): The Tag categories (one per key, or only one).
+
+        Returns:
+            set or None: The ids of the matching objects, or `None` if the
+                lookup can't be done with the tag index.
+
+        """
+        if not TAG_INDEX.categories:
+            return None
+        keys = [normalize_tag_field(key) for key in keys]
+        categories = [normalize_tag_field(category) for category in categories]
+        if keys:
+            if not categories:
+                categories = [None] * len(keys)
+            elif len(categories) == 1:
+                categories = categories * len(keys)
+            elif len(categories) < len(keys):
+                return None
+        objids = TAG_INDEX.get_ids(
+            dbmodel, normalize_tag_field(tagtype), keys, categories, self.model.db_tags.through
+        )
+        if objids is not None and len(objids) > _TAG_INDEX_MAX_IDS:
+            # leave very large results to the database
+            return None
+        return objids
+
     def get_by_permission(self, key=None, category=None):
         """
         Return objects having permissions with a given key or category or
@@ -415,6 +507,389 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             tag.save()
         return make_iter(tag)[0]
 
+    # Bulk methods, for adding Tags/Attributes to many objects at once
+
+    def bulk_add_tags(self, objtags, tagtype=None):
+        """
+        Add Tags to many objects with a few queries. This is equivalent to calling
+        `obj.tags.batch_add(*tags)` (or the alias/permission handler, depending on
+        `tagtype`) on every object.
+
+        Args:
+            objtags (iterable): Tuples `(obj, tags)`, where `tags` is a list of
+                Tags to add to `obj`, each a key or a tuple `(key, category)` or
+                `(key, category, data)`.
+            tagtype (str, optional): The type of Tag, like `"alias"` or `"permission"`.
+
+        Notes:
+            As with `TagHandler.batch_add`, `data` given for a Tag applies to all Tags
+            of that category added to the object, and replaces the data stored on
+            existing Tags.
+
+        """
+        dbclass = self.model.__dbclass__
+        dbmodel = dbclass.__name__.lower()
+        tagtype = normalize_tag_field(tagtype)
+
+        links = []
+        tagdata = {}
+        for obj, tags in objtags:
+            keys = []
+            datas = {}
+            for tup in make_iter(tags):
+                tup = make_iter(tup)
+                category = normalize_tag_field(tup[1]) if len(tup) > 1 else None
+                if len(tup) > 2:
+                    datas[category] = tup[2]
+                keys.append((normalize_tag_field(tup[0]), category))
+            for key, category in keys:
+                if not key:
+                    continue
+                links.append((obj, key, category))
+                if datas.get(category) is not None:
+                    tagdata[(key, category)] = str(datas[category])
+        if not links:
+            return
+
+        # find or create the Tags
+        wanted = set((key, category) for _, key, category in links)
+
+        def _find_tags():
+            found = {}
+            for keys in _batched(set(key for key, _ in wanted)):
+                for tag in Tag.objects.filter(
+                    db_key__in=keys, db_tagtype=tagtype, db_model=dbmodel
+                ).order_by("-id"):
+                    if (tag.db_key, tag.db_category) in wanted:
+                        # the oldest Tag wins, like for create_tag
+                        found[(tag.db_key, tag.db_category)] = tag
+            return found
+
+        tagobjs = _find_tags()
+        missing = wanted.difference(tagobjs)
+        if missing:
+            Tag.objects.bulk_create(
+                Tag(
+                    db_key=key,
+                    db_category=category,
+                    db_data=tagdata.get((key, category)),
+                    db_model=dbmodel,
+                    db_tagtype=tagtype,
+                )
+                for key, category in missing
+            )
+            tagobjs = _find_tags()
+        changed = []
+        for keycat, data in tagdata.items():
+            tag = tagobjs[keycat]
+            if keycat not in missing and tag.db_data != data:
+                tag.db_data = data
+                changed.append(tag)
+        if changed:
+            Tag.objects.bulk_update(changed, ["db_data"])
+
+        # connect them to the objects
+        through = dbclass.db_tags.through
+        through.objects.bulk_create(
+            (
+                through(**{f"{dbmodel}_id": obj.id, "tag_id": tagobjs[(key, category)].id})
+                for obj, key, category in links
+            ),
+            ignore_conflicts=True,
+        )
+
+        handlername = _TAGTYPE_HANDLERS.get(tagtype)
+        for obj, key, category in links:
+            handler = obj.__dict__.get(handlername) if handlername else None
+            if handler:
+                handler.reset_cache()
+            TAG_INDEX.add(dbmodel, tagtype, category, key, obj.id)
+        SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.send(
+            sender=dbclass, objs=list({obj.id: obj for obj, _, _ in links}.values()), models=(Tag,)
+        )
+
+    def bulk_add_attributes(self, objattrs):
+        """
+        Add Attributes to many objects with a few queries. This is equivalent to
+        calling `obj.attributes.batch_add(*attributes)` on every object.
+
+        Args:
+            objattrs (iterable): Tuples `(obj, attributes)`, where `attributes` is
+                a list of Attributes to add to `obj`, each a tuple `(key, value)`,
+                `(key, value, category)` or `(key, value, category, lockstring)`.
+
+        Notes:
+            Attributes already existing on an object are updated in bulk. New
+            Attributes are created in bulk if the database can return the ids of
+            bulk-created rows (like PostgreSQL and SQLite); otherwise they are
+            created one by one.
+
+        """
+        dbclass = self.model.__dbclass__
+        dbmodel = dbclass.__name__.lower()
+        through = dbclass.db_attributes.through
+
+        objattrs = [(obj, attrs) for obj, attrs in objattrs if attrs]
+        wanted = {}
+        for obj, attrs in objattrs:
+            objwanted = {}
+            for tup in attrs:
+                key = str(tup[0]).strip().lower()
+                category = str(tup[2]).strip().lower() if len(tup) > 2 and tup[2] else None
+                objwanted[(key, category)] = (tup[1], tup[3] if len(tup) > 3 else "")
+            wanted[obj] = objwanted
+        if not wanted:
+            return
+
+        # update the Attributes that already exist (like those set by creation hooks)
+        objs = {obj.id: obj for obj in wanted}
+        existing = {}
+        for objids in _batched(objs):
+            for objid, attrid, key, category, model, attrtype in through.objects.filter(
+                **{f"{dbmodel}_id__in": objids}
+            ).values_list(
+                f"{dbmodel}_id",
+                "attribute_id",
+                "attribute__db_key",
+                "attribute__db_category",
+                "attribute__db_model",
+                "attribute__db_attrtype",
+            ):
+                if model != dbmodel or attrtype is not None:
+                    continue
+                keycat = (key.lower(), category.lower() if category else None)
+                objwanted = wanted[objs[objid]]
+                if keycat in objwanted:
+                    existing[attrid] = (keycat[1],) + objwanted.pop(keycat)
+        # Attributes getting the same value are updated with one query
+        updates = {}
+        for attrid, (category, value, lockstring) in existing.items():
+            updates.setdefault((category, lockstring or "", id(value)), (value, []))[1].append(
+                attrid
+            )
+        for (category, lockstring, _), (value, attrids) in updates.items():
+            fields = {
+                "db_category": category,
+                "db_lock_storage": lockstring,
+                "db_value": to_pickle(value),
+                "db_strvalue": None,
+            }
+            for batch in _batched(attrids):
+                Attribute.objects.filter(id__in=batch).update(**fields)
+                # the same as AttributeHandler.batch_add does for existing Attributes
+                for attrid in batch:
+                    attr = Attribute.get_cached_instance(attrid)
+                    if attr:
+                        for fieldname, fieldvalue in fields.items():
+                            setattr(attr, fieldname, fieldvalue)
+
+        newattrs = [
+            (
+                obj,
+                Attribute(
+                    db_key=key,
+                    db_category=category,
+                    db_model=dbmodel,
+                    db_lock_storage=lockstring or "",
+                    db_attrtype=None,
+                    db_value=to_pickle(value),
+                    db_strvalue=None,
+                ),
+            )
+            for obj, objwanted in wanted.items()
+            for (key, category), (value, lockstring) in objwanted.items()
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Attribute.objects.bulk_create(attr for _, attr in newattrs)
+        else:
+            for _, attr in newattrs:
+                attr.save()
+        through.objects.bulk_create(
+            through(**{f"{dbmodel}_id": obj.id, "attribute_id": attr.id}) for obj, attr in newattrs
+        )
+
+        for obj in wanted:
+            handler = obj.__dict__.get("attributes")
+            if handler:
+                handler.reset_cache()
+        SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.send(
+            sender=dbclass, objs=list(wanted), models=(Attribute,)
+        )
+
+    def bulk_remove_tags(self, objs, key=None, category=None, tagtype=None):
+        """
+        Remove Tags from many objects with a few queries. This is equivalent to
+        calling `obj.tags.remove(key, category=category)` (or the alias/permission
+        handler, depending on `tagtype`) on every object.
+
+        Args:
+            objs (iterable): The objects to remove Tags from.
+            key (str or list, optional): The Tag(s) to remove. If not given, remove
+                all Tags (of `category`, if given).
+            category (str, optional): The Tag category.
+            tagtype (str, optional): The type of Tag, like `"alias"` or `"permission"`.
+
+        """
+        dbclass = self.model.__dbclass__
+        dbmodel = dbclass.__name__.lower()
+        through = dbclass.db_tags.through
+        tagtype = normalize_tag_field(tagtype)
+        category = normalize_tag_field(category)
+        keys = [normalize_tag_field(tkey) for tkey in make_iter(key)] if key else None
+
+        def _match(tkey, tcategory, ttagtype, tmodel):
+            if tmodel != dbmodel or ttagtype != tagtype:
+                return False
+            if keys:
+                return tkey in keys and tcategory == category
+            return not category or tcategory == category
+
+        # the Tags are matched here rather than in the query, since the database
+        # may otherwise scan all Tags of the category for every object
+        objs = list(objs)
+        linkids = []
+        for batch in _batched(objs):
+            for linkid, *tag in through.objects.filter(
+                **{f"{dbmodel}_id__in": [obj.id for obj in batch]}
+            ).values_list(
+                "id", "tag__db_key", "tag__db_category", "tag__db_tagtype", "tag__db_model"
+            ):
+                if _match(*tag):
+                    linkids.append(linkid)
+        for batch in _batched(linkids):
+            through.objects.filter(id__in=batch).delete()
+
+        handlername = _TAGTYPE_HANDLERS.get(tagtype)
+        for obj in objs:
+            handler = obj.__dict__.get(handlername) if handlername else None
+            if handler:
+                handler.reset_cache()
+            if keys:
+                for tkey in keys:
+                    TAG_INDEX.remove(dbmodel, tagtype, category, tkey, obj.id)
+            else:
+                TAG_INDEX.remove_obj(
+                    dbmodel, obj.id, tagtype=tagtype, category=category, all_tagtypes=False
+                )
+        SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.send(sender=dbclass, objs=objs, models=(Tag,))
+
+    def bulk_remove_attributes(self, objs, key=None, category=None):
+        """
+        Remove Attributes from many objects with a few queries. This is equivalent
+        to calling `obj.attributes.remove(key, category=category)` on every object.
+
+        Args:
+            objs (iterable): The objects to remove Attributes from.
+            key (str or list, optional): The Attribute(s) to remove. If not given,
+                remove all Attributes (of `category`, if given).
+            category (str, optional): The Attribute category.
+
+        """
+        dbclass = self.model.__dbclass__
+        dbmodel = dbclass.__name__.lower()
+        through = dbclass.db_attributes.through
+        category = str(category).strip().lower() if category is not None else None
+        keys = [str(akey).strip().lower() for akey in make_iter(key)] if key else None
+
+        def _match(akey, acategory, amodel, attrtype):
+            if amodel != dbmodel or attrtype is not None:
+                return False
+            acategory = acategory.lower() if acategory else None
+            if keys:
+                return akey.lower() in keys and acategory == category
+            return not category or acategory == category
+
+        objs = list(objs)
+        attrids = []
+        for batch in _batched(objs):
+            for attrid, *attr in through.objects.filter(
+                **{f"{dbmodel}_id__in": [obj.id for obj in batch]}
+            ).values_list(
+                "attribute_id",
+                "attribute__db_key",
+                "attribute__db_category",
+                "attribute__db_model",
+                "attribute__db_attrtype",
+            ):
+                if _match(*attr):
+                    attrids.append(attrid)
+        for batch in _batched(attrids):
+            Attribute.objects.filter(id__in=batch).delete()
+
+        for obj in objs:
+            handler = obj.__dict__.get("attributes")
+            if handler:
+                handler.reset_cache()
+        SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.send(sender=dbclass, objs=objs, models=(Attribute,))
+
+    def prefetch_handlers(self, objs):
+        """
+        Load the Tags and Attributes of many objects into the caches of their
+        handlers with a few queries. Getting all Tags, aliases, permissions,
+        Attributes or nicks of these objects afterwards needs no more queries.
+
+        Args:
+            objs (iterable): The objects to prefetch for.
+
+        Notes:
+            This does nothing if `settings.TYPECLASS_AGGRESSIVE_CACHE` is off,
+            since the handlers do not cache then.
+
+        """
+        if not _TYPECLASS_AGGRESSIVE_CACHE:
+            return
+        dbclass = self.model.__dbclass__
+        dbmodel = dbclass.__name__.lower()
+        objs = {obj.id: obj for obj in objs if obj.id}
+        if not objs:
+            return
+
+        # {(objid, tagtype): {cachekey: tag}}
+        tags = defaultdict(dict)
+        through = dbclass.db_tags.through
+        for objids in _batched(objs):
+            # filtering on the Tag fields in the query makes for a slow join
+            for conn in through.objects.filter(**{f"{dbmodel}_id__in": objids}).select_related(
+                "tag"
+            ):
+                tag = conn.tag
+                if tag.db_model != dbmodel:
+                    continue
+                cachekey = "%s-%s" % (
+                    tag.db_key.lower(),
+                    tag.db_category.lower() if tag.db_category else None,
+                )
+                tags[(getattr(conn, f"{dbmodel}_id"), tag.db_tagtype)][cachekey] = tag
+        for objid, obj in objs.items():
+            for tagtype, handlername in _TAGTYPE_HANDLERS.items():
+                handler = getattr(obj, handlername, None)
+                if handler is not None:
+                    _prime_cache(handler, tags.get((objid, tagtype), {}))
+
+        if not hasattr(dbclass, "db_attributes"):
+            return
+        # {(objid, attrtype): {cachekey: attribute}}
+        attrs = defaultdict(dict)
+        through = dbclass.db_attributes.through
+        for objids in _batched(objs):
+            for conn in through.objects.filter(**{f"{dbmodel}_id__in": objids}).select_related(
+                "attribute"
+            ):
+                attr = conn.attribute
+                if attr.db_model.lower() != dbmodel:
+                    continue
+                cachekey = "%s-%s" % (
+                    attr.db_key.lower(),
+                    attr.db_category.lower() if attr.db_category else None,
+                )
+                attrs[(getattr(conn, f"{dbmodel}_id"), attr.db_attrtype)][cachekey] = attr
+        for objid, obj in objs.items():
+            for attrtype, handlername in _ATTRTYPE_HANDLERS.items():
+                handler = getattr(obj, handlername, None)
+                backend = getattr(handler, "backend", None)
+                if isinstance(backend, ModelAttributeBackend):
+                    _prime_cache(backend, attrs.get((objid, attrtype), {}))
+
     def dbref(self, dbref, reqhash=True):
         """
         Determing if input is a valid dbref.
@@ -0,0 +1,80 @@
+"""
+Normalize Tag key/category/tagtype/model to stripped lowercase, so tag
+lookups can use exact matches on the Tag indexes. Tags differing only in
+case are merged into one.
+
+"""
+
+from django.db import migrations
+from django.db.models import Q
+from django.db.models.functions import Lower, Trim
+
+# (app_label, model_name) of all models with a db_tags m2m field
+_TAGGED_MODELS = (
+    ("objects", "ObjectDB"),
+    ("accounts", "AccountDB"),
+    ("scripts", "ScriptDB"),
+    ("comms", "ChannelDB"),
+    ("comms", "Msg"),
+    ("help", "HelpEntry"),
+)
+
+_TAG_FIELDS = ("db_key", "db_category", "db_tagtype", "db_model")
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else None
+
+
+def normalize_tags(apps, schema_editor):
+    Tag = apps.get_model("typeclasses", "Tag")
+
+    throughs = []
+    for app_label, model_name in _TAGGED_MODELS:
+        field = apps.get_model(app_label, model_name)._meta.get_field("db_tags")
+        throughs.append(
+            (field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name())
+        )
+
+    not_normalized = Q()
+    for fieldname in _TAG_FIELDS:
+        not_normalized |= Q(**{f"{fieldname}__isnull": False}) & ~Q(
+            **{fieldname: Lower(Trim(fieldname))}
+        )
+
+    # load the ids up front, since the tags are updated and deleted as we go
+    tag_ids = list(Tag.objects.filter(not_normalized).order_by("id").values_list("id", flat=True))
+    for tag_id in tag_ids:
+        tag = Tag.objects.filter(id=tag_id).first()
+        if not tag:
+            continue
+        normalized = {fieldname: _normalize(getattr(tag, fieldname)) for fieldname in _TAG_FIELDS}
+        existing = Tag.objects.filter(**normalized).exclude(id=tag.id).order_by("id").first()
+        if not existing:
+            Tag.objects.filter(id=tag.id).update(**normalized)
+            continue
+        # merge into the existing, normalized tag
+        for through, objfield, tagfield in throughs:
+            already_tagged = through.objects.filter(**{tagfield: existing.id}).values_list(
+                f"{objfield}_id", flat=True
+            )
+            through.objects.filter(**{tagfield: tag.id}).exclude(
+                **{f"{objfield}_id__in": already_tagged}
+            ).update(**{tagfield: existing.id})
+        if tag.db_data and not existing.db_data:
+            Tag.objects.filter(id=existing.id).update(db_data=tag.db_data)
+        tag.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("typeclasses", "0017_use_index_instead_of_index_together_in_tags"),
+        ("objects", "0013_defaultobject_alter_objectdb_id_defaultcharacter_and_more"),
+        ("accounts", "0012_defaultaccount_alter_accountdb_id_account_bot_and_more"),
+        ("scripts", "0016_scriptbase_alter_scriptdb_id_defaultscript_and_more"),
+        ("comms", "0022_defaultchannel_alter_channeldb_id_alter_msg_id_and_more"),
+        ("help", "0006_alter_helpentry_id"),
+    ]
+
+    operations = [migrations.RunPython(normalize_tags, migrations.RunPython.noop)]
@@ -51,6 +51,7 @@ from evennia.typeclasses.attributes import (
     ModelAttributeBackend,
 )
 from evennia.typeclasses.tags import (
+    TAG_INDEX,
     AliasHandler,
     PermissionHandler,
     Tag,
@@ -772,6 +773,8 @@ class TypedObject(SharedMemoryModel):
         self.aliases.clear()
         if hasattr(self, "nicks"):
             self.nicks.clear()
+        # the remaining tags are deleted along with the object
+        TAG_INDEX.remove_obj(self.__dbclass__.__name__.lower(), self.id)
         # scrambling properties
         self.delete = self._deleted
         super().delete()
@@ -10,10 +10,11 @@ respective handlers.
 
 """
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import m2m_changed
 
 from evennia.locks.lockfuncs import perm as perm_lockfunc
 from evennia.utils.utils import make_iter, to_str
@@ -27,6 +28,22 @@ _TYPECLASS_AGGRESSIVE_CACHE = settings.TYPECLASS_AGGRESSIVE_CACHE
 # ------------------------------------------------------------
 
 
+def normalize_tag_field(value):
+    """
+    Normalize a Tag key, category, tagtype or model the way it is stored in the
+    database. Tags are case-insensitive; storing them normalized lets all lookups
+    be exact matches that can use the Tag indexes.
+
+    Args:
+        value (str or None): The value to normalize.
+
+    Returns:
+        str or None: The stripped, lowercase value, or `None` if `value` was `None`.
+
+    """
+    return str(value).strip().lower() if value is not None else None
+
+
 class Tag(models.Model):
     """
     Tags are quick markers for objects in-game. An typeobject can have
@@ -84,6 +101,17 @@ class Tag(models.Model):
         unique_together = (("db_key", "db_category", "db_tagtype", "db_model"),)
         indexes = [models.Index(fields=["db_key", "db_category", "db_tagtype", "db_model"])]
 
+    def save(self, *args, **kwargs):
+        """
+        Make sure the Tag is stored normalized (see `normalize_tag_field`).
+
+        """
+        self.db_key = normalize_tag_field(self.db_key)
+        self.db_category = normalize_tag_field(self.db_category)
+        self.db_tagtype = normalize_tag_field(self.db_tagtype)
+        self.db_model = normalize_tag_field(self.db_model)
+        super().save(*args, **kwargs)
+
     def __lt__(self, other):
         return str(self) < str(other)
 
@@ -94,6 +122,168 @@ class Tag(models.Model):
         )
 
 
+#
+# Process-wide reverse index of Tags
+#
+
+
+class TagIndex:
+    """
+    Process-wide, opt-in reverse index of Tags, mapping `(model, tagtype, category)`
+    to `{tagkey: set of object ids}`. Only categories listed in
+    `settings.TAG_INDEX_CATEGORIES` are indexed. A category is loaded from the
+    database the first time it's needed and is from then on kept complete by the
+    `TagHandler` (add/remove/clear) and by object deletion, so `get_by_tag` can
+    find the matching objects without a tag query.
+
+    Notes:
+        Tags changed without going through the `TagHandler` (such as by
+        manipulating the `db_tags` m2m field or the Tag table directly, or from
+        another process) will not be seen by the index. Call `reset` after such
+        changes to have it reloaded from the database.
+
+    """
+
+    def __init__(self, categories=None):
+        """
+        Args:
+            categories (list, optional): The Tag categories to index. `None` is
+                the default Tag category.
+
+        """
+        self.categories = set(normalize_tag_field(category) for category in categories or [])
+        self._index = {}
+
+    def reset(self):
+        """
+        Forget everything indexed, so it will be reloaded from the database.
+
+        """
+        self._index = {}
+
+    def _get_category(self, dbmodel, tagtype, category, through):
+        """
+        Get the index for a category, loading it from the database if needed.
+
+        Args:
+            dbmodel (str): The lowercase name of the database model, like "objectdb".
+            tagtype (str or None): The type of Tag.
+            category (str or None): The Tag category.
+            through (Model): The through-model of the `db_tags` m2m field.
+
+        Returns:
+            dict: `{tagkey: set of object ids}` for the category.
+
+        """
+        indexkey = (dbmodel, tagtype, category)
+        index = self._index.get(indexkey)
+        if index is None:
+            index = defaultdict(set)
+            for tagkey, objid in through.objects.filter(
+                tag__db_model=dbmodel, tag__db_tagtype=tagtype, tag__db_category=category
+            ).values_list("tag__db_key", "%s__id" % dbmodel):
+                index[tagkey].add(objid)
+            index = self._index[indexkey] = dict(index)
+        return index
+
+    def get_ids(self, dbmodel, tagtype, keys, categories, through):
+        """
+        Find the ids of the objects having all the given tags. This matches what
+        `get_by_tag` finds in the database with `match="all"`.
+
+        Args:
+            dbmodel (str): The lowercase name of the database model, like "objectdb".
+            tagtype (str or None): The type of Tag.
+            keys (list): Normalized Tag keys.
+            categories (list): Normalized Tag categories, one per key. If no `keys`
+                are given, find the objects having at least as many tags in these
+                categories as there are (unique) categories.
+            through (Model): The through-model of the `db_tags` m2m field.
+
+        Returns:
+            set or None: The object ids, or `None` if not all categories are indexed.
+
+        """
+        if not all(category in self.categories for category in categories):
+            return None
+        if keys:
+            idsets = [
+                self._get_category(dbmodel, tagtype, category, through).get(key, set())
+                for key, category in zip(keys, categories)
+            ]
+            return set.intersection(*idsets) if idsets else set()
+        categories = set(categories)
+        matches = Counter()
+        for category in categories:
+            for objids in self._get_category(dbmodel, tagtype, category, through).values():
+                matches.update(objids)
+        return set(objid for objid, nmatches in matches.items() if nmatches >= len(categories))
+
+    def add(self, dbmodel, tagtype, category, key, objid):
+        """
+        Register that an object got a Tag.
+
+        Args:
+            dbmodel (str): The lowercase name of the database model, like "objectdb".
+            tagtype (str or None): The type of Tag.
+            category (str or None): The normalized Tag category.
+            key (str): The normalized Tag key.
+            objid (int): The id of the object.
+
+        """
+        index = self._index.get((dbmodel, tagtype, category))
+        if index is not None:
+            index.setdefault(key, set()).add(objid)
+
+    def remove(self, dbmodel, tagtype, category, key, objid):
+        """
+        Register that a Tag was removed from an object.
+
+        Args:
+            dbmodel (str): The lowercase name of the database model, like "objectdb".
+            tagtype (str or None): The type of Tag.
+            category (str or None): The normalized Tag category.
+            key (str): The normalized Tag key.
+            objid (int): The id of the object.
+
+        """
+        index = self._index.get((dbmodel, tagtype, category))
+        if index is not None and key in index:
+            index[key].discard(objid)
+            if not index[key]:
+                del index[key]
+
+    def remove_obj(self, dbmodel, objid, tagtype=None, category=None, all_tagtypes=True):
+        """
+        Register that some or all Tags were removed from an object.
+
+        Args:
+            dbmodel (str): The lowercase name of the database model, like "objectdb".
+            objid (int): The id of the object.
+            tagtype (str or None, optional): Only remove Tags of this type. Ignored
+                if `all_tagtypes` is set.
+            category (str or None, optional): Only remove Tags of this category.
+                If not given, remove Tags of all categories.
+            all_tagtypes (bool, optional): Remove Tags of all types, such as
+                when the object is deleted.
+
+        """
+        for (indexmodel, indextagtype, indexcategory), index in self._index.items():
+            if (
+                indexmodel != dbmodel
+                or (not all_tagtypes and indextagtype != tagtype)
+                or (category is not None and indexcategory != category)
+            ):
+                continue
+            for key in [key for key, objids in index.items() if objid in objids]:
+                index[key].discard(objid)
+                if not index[key]:
+                    del index[key]
+
+
+TAG_INDEX = TagIndex(settings.TAG_INDEX_CATEGORIES)
+
+
 #
 # Handlers making use of the Tags model
 #
@@ -384,13 +574,16 @@ class TagHandler(object):
                 del self._cache[cachekey]
             if tag:
                 return [tag]  # return cached entity
+            elif _TYPECLASS_AGGRESSIVE_CACHE and self._cache_complete:
+                # all tags are cached, so there is no such tag
+                return []
             else:
                 query = {
                     "%s__id" % self._model: self._objid,
                     "tag__db_model": self._model,
                     "tag__db_tagtype": self._tagtype,
-                    "tag__db_key__iexact": key.lower(),
-                    "tag__db_category__iexact": category.lower() if category else None,
+                    "tag__db_key": key,
+                    "tag__db_category": category,
                 }
                 conn = getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query)
                 if conn:
@@ -403,7 +596,7 @@ class TagHandler(object):
             # assume the cache to be complete unless we have queried
             # for this category before
             catkey = "-%s" % category
-            if _TYPECLASS_AGGRESSIVE_CACHE and catkey in self._catcache:
+            if _TYPECLASS_AGGRESSIVE_CACHE and (self._cache_complete or catkey in self._catcache):
                 return [tag for key, tag in self._cache.items() if key.endswith(catkey)]
             else:
                 # we have to query to make this category up-date in the cache
@@ -411,7 +604,7 @@ class TagHandler(object):
                     "%s__id" % self._model: self._objid,
                     "tag__db_model": self._model,
                     "tag__db_tagtype": self._tagtype,
-                    "tag__db_category__iexact": category.lower() if category else None,
+                    "tag__db_category": category,
                 }
                 tags = [
                     conn.tag
@@ -521,6 +714,7 @@ class TagHandler(object):
             )
             getattr(self.obj, self._m2m_fieldname).add(tagobj)
             self._setcache(tagstr, category, tagobj)
+            TAG_INDEX.add(self._model, self._tagtype, category, tagstr, self._objid)
 
     def has(self, key=None, category=None, return_list=False):
         """
@@ -643,6 +837,7 @@ class TagHandler(object):
             )
             if tagobj:
                 getattr(self.obj, self._m2m_fieldname).remove(tagobj[0])
+                TAG_INDEX.remove(self._model, self._tagtype, category, tagstr, self._objid)
             self._delcache(key, category)
 
     def clear(self, category=None):
@@ -663,8 +858,30 @@ class TagHandler(object):
             "tag__db_tagtype": self._tagtype,
         }
         if category:
-            query["tag__db_category"] = category.strip().lower()
-        getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query).delete()
+            category = category.strip().lower()
+            query["tag__db_category"] = category
+        through = getattr(self.obj, self._m2m_fieldname).through
+        links = through.objects.filter(**query)
+        tag_ids = set(links.values_list("tag_id", flat=True))
+        links.delete()
+        if tag_ids:
+            # unlike the m2m field's remove(), deleting the links directly sends no signal
+            m2m_changed.send(
+                sender=through,
+                instance=self.obj,
+                action="post_remove",
+                reverse=False,
+                model=Tag,
+                pk_set=tag_ids,
+                using=links.db,
+            )
+        TAG_INDEX.remove_obj(
+            self._model,
+            self._objid,
+            tagtype=self._tagtype,
+            category=category or None,
+            all_tagtypes=False,
+        )
         self._cache = {}
         self._catcache = {}
         self._cache_complete = False
@@ -749,7 +966,7 @@ class TagHandler(object):
             elif nlen > 1:
                 keys[tup[1]].append(tup[0])
         for category, key in keys.items():
-            self.remove(key=key, category=category, data=data.get(category, None))
+            self.remove(key=key, category=category)
 
     def __str__(self):
         return ",".join(self.all())
@@ -3,11 +3,16 @@ Unit tests for typeclass base system
 
 """
 
+import importlib
+
+from django.apps import apps as django_apps
 from django.test import override_settings
 from mock import patch
 from parameterized import parameterized
 
+from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultObject
+from evennia.typeclasses.tags import TAG_INDEX, Tag
 from evennia.utils.test_resources import BaseEvenniaTest, EvenniaTestCase
 
 # ------------------------------------------------------------
@@ -213,6 +218,197 @@ class TestTypedObjectManager(BaseEvenniaTest):
         self.assertEqual(tagobj.db_category, "category4")
         self.assertEqual(tagobj.db_data, "data4")
 
+    def test_get_by_tag_case_insensitive(self):
+        self.obj1.tags.add("tagA", "categoryA")
+        self.obj2.tags.add("taga", "CATEGORYA")
+        self.obj2.aliases.add("Obj2Alias")
+        self.assertEqual(self._manager("get_by_tag", "TAGA", "CategoryA"), [self.obj1, self.obj2])
+        self.assertEqual(
+            self._manager("get_by_tag", category=" categorya "), [self.obj1, self.obj2]
+        )
+        self.assertEqual(self._manager("get_by_alias", "OBJ2ALIAS"), [self.obj2])
+        self.assertEqual(self._manager("get_by_tag", "obj2alias", tagtype="ALIAS"), [self.obj2])
+        self.assertEqual(len(self._manager("get_tag", "TagA", "CategoryA")), 1)
+        # mixed case creates no new tag
+        tag = self.obj1.__class__.objects.create_tag("TAGA", "categoryA")
+        self.assertEqual((tag.db_key, tag.db_category), ("taga", "categorya"))
+        self.assertEqual(Tag.objects.filter(db_key="taga").count(), 1)
+
+    def test_tag_save_normalizes(self):
+        tag = Tag(db_key=" TagX ", db_category="CatX", db_tagtype="Alias", db_model="ObjectDB")
+        tag.save()
+        self.assertEqual(
+            (tag.db_key, tag.db_category, tag.db_tagtype, tag.db_model),
+            ("tagx", "catx", "alias", "objectdb"),
+        )
+
+    def test_normalize_tags_migration(self):
+        migration = importlib.import_module(
+            "evennia.typeclasses.migrations.0018_normalize_tags_may_be_slow"
+        )
+        self.obj1.tags.add("taga", "categorya")
+        self.obj2.tags.add("tagb", "categoryb")
+        self.obj2.tags.add("tagc", "categoryc")
+        # simulate tags stored before tags were normalized
+        Tag.objects.filter(db_key="tagb").update(db_key="TagA", db_category=" CategoryA")
+        Tag.objects.filter(db_key="tagc").update(db_key="TagC", db_tagtype="Alias")
+
+        migration.normalize_tags(django_apps, None)
+
+        self.obj1.tags.reset_cache()
+        self.obj2.tags.reset_cache()
+        self.assertEqual(Tag.objects.filter(db_key="taga", db_category="categorya").count(), 1)
+        self.assertFalse(Tag.objects.filter(db_key="TagA").exists())
+        self.assertEqual(self._manager("get_by_tag", "taga", "categorya"), [self.obj1, self.obj2])
+        self.assertEqual(Tag.objects.get(db_key="tagc").db_tagtype, "alias")
+
+    def test_bulk_tags(self):
+        objs = [self.obj1, self.obj2]
+        self.obj1.tags.add("tag1", "cat1")
+        ObjectDB.objects.bulk_add_tags([(obj, ["tag1", ("tag2", "cat1")]) for obj in objs])
+        ObjectDB.objects.bulk_add_tags([(obj, ["alias1"]) for obj in objs], tagtype="alias")
+        self.assertEqual(
+            self.obj2.tags.all(return_key_and_category=True), [("tag1", None), ("tag2", "cat1")]
+        )
+
+        ObjectDB.objects.bulk_remove_tags(objs, "tag2", category="cat1")
+        self.assertEqual(self.obj2.tags.all(), ["tag1"])
+        self.assertEqual(self.obj1.tags.get(category="cat1"), "tag1")
+        ObjectDB.objects.bulk_remove_tags(objs, category="cat1")
+        self.assertEqual(self.obj1.tags.all(), ["tag1"])
+        ObjectDB.objects.bulk_remove_tags(objs)
+        self.assertEqual(self.obj1.tags.all(), [])
+        self.assertIn("alias1", self.obj1.aliases.all())
+
+    def test_bulk_attributes(self):
+        objs = [self.obj1, self.obj2]
+        self.obj1.attributes.add("attr1", "old")
+        self.obj1.attributes.add("attr2", 1, category="cat1")
+        ObjectDB.objects.bulk_add_attributes(
+            [(obj, [("attr1", "new"), ("attr2", 2, "cat1", "attrread:false()")]) for obj in objs]
+        )
+        for obj in objs:
+            self.assertEqual(obj.attributes.get("attr1"), "new")
+            self.assertEqual(obj.attributes.get("attr2", category="cat1"), 2)
+            attr = obj.attributes.get("attr2", category="cat1", return_obj=True)
+            self.assertFalse(attr.access(self.char1, "attrread"))
+
+        ObjectDB.objects.bulk_remove_attributes(objs, "attr2")
+        self.assertEqual(self.obj1.attributes.get("attr2", category="cat1"), 2)
+        ObjectDB.objects.bulk_remove_attributes(objs, "attr2", category="cat1")
+        self.assertIsNone(self.obj2.attributes.get("attr2", category="cat1"))
+        self.assertEqual(self.obj2.attributes.get("attr1"), "new")
+        ObjectDB.objects.bulk_remove_attributes(objs)
+        self.assertFalse(self.obj1.attributes.all())
+        # check that the database agrees with the caches
+        self.obj1.attributes.reset_cache()
+        self.assertFalse(self.obj1.attributes.all())
+
+    def test_prefetch_handlers(self):
+        objs = [self.obj1, self.obj2]
+        self.obj1.tags.add("tag1")
+        self.obj1.tags.add("Tag-2", "Cat-1")
+        self.obj1.aliases.add("alias1")
+        self.obj1.attributes.add("attr1", 1)
+        self.obj1.attributes.add("attr2", 2, category="cat1")
+        self.obj1.nicks.add("nick1", "replacement")
+        for obj in objs:
+            for handler in (obj.tags, obj.aliases, obj.permissions, obj.attributes, obj.nicks):
+                handler.reset_cache()
+
+        with self.assertNumQueries(2):
+            ObjectDB.objects.prefetch_handlers(objs)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.obj1.tags.get(return_list=True), ["tag1"])
+            self.assertEqual(self.obj1.tags.get(category="cat-1"), "tag-2")
+            self.assertCountEqual(self.obj1.tags.all(), ["tag1", "tag-2"])
+            self.assertIn("alias1", self.obj1.aliases.all())
+            self.assertEqual(self.obj1.attributes.get("attr2", category="cat1"), 2)
+            self.assertEqual([attr.key for attr in self.obj1.attributes.all()], ["attr1", "attr2"])
+            self.assertEqual(self.obj1.nicks.get("nick1"), "replacement")
+            self.assertEqual(self.obj2.tags.all(), [])
+            self.assertEqual(self.obj2.attributes.all(), [])
+            # tags missing from a complete cache are not looked for in the database
+            self.assertIsNone(self.obj1.tags.get("missing"))
+            self.assertIsNone(self.obj1.tags.get(category="missing"))
+        # the handlers keep working as usual
+        self.obj2.tags.add("tag3")
+        self.obj2.tags.reset_cache()
+        self.assertEqual(self.obj2.tags.all(), ["tag3"])
+
+
+class TestTagIndex(BaseEvenniaTest):
+    """
+    Test that get_by_tag gives the same results with and without the tag index.
+
+    """
+
+    def setUp(self):
+        super().setUp()
+        TAG_INDEX.reset()
+        self.objs = [self.obj1, self.obj2, self.char1, self.char2, self.exit]
+        self.categories = (None, "zone", "spawnpoint")
+        self.queries = [
+            (("zone_a", "zone"), {}),
+            (("ZONE_B", "Zone"), {}),
+            ((["zone_a", "tag1"], ["zone", None]), {}),
+            ((["tag1", "tag2"],), {}),
+            ((None, "zone"), {}),
+            ((None, ["zone", "spawnpoint"]), {}),
+            ((None, [None, "spawnpoint"]), {}),
+            (("spawn1", "spawnpoint"), {}),
+            (("alias1",), {"tagtype": "alias"}),
+            (("nomatch", "zone"), {}),
+        ]
+
+    def tearDown(self):
+        TAG_INDEX.reset()
+        super().tearDown()
+
+    def _assert_consistent(self):
+        for args, kwargs in self.queries:
+            with patch.object(TAG_INDEX, "categories", set()):
+                expected = list(ObjectDB.objects.get_by_tag(*args, **kwargs))
+            with patch.object(TAG_INDEX, "categories", set(self.categories)):
+                indexed = list(ObjectDB.objects.get_by_tag(*args, **kwargs))
+            self.assertEqual(indexed, expected, f"get_by_tag{args} {kwargs}")
+
+    def test_consistency(self):
+        self.obj1.tags.add("zone_a", "zone")
+        self.obj2.tags.add("zone_a", "zone")
+        self.char1.tags.batch_add(("zone_b", "zone"), "tag1", ("spawn1", "spawnpoint"))
+        self.exit.tags.add(["tag1", "tag2"])
+        self.char2.aliases.add("alias1")
+        self._assert_consistent()
+        # the index was loaded; now keep changing things
+        self.obj1.tags.add("tag1")
+        self.obj2.tags.remove("zone_a", "zone")
+        self.char2.tags.add("zone_a", "zone")
+        self.char1.tags.batch_remove(("spawn1", "spawnpoint"))
+        self.obj1.aliases.add("alias1")
+        self._assert_consistent()
+        self.char2.tags.clear(category="zone")
+        self.exit.tags.clear()
+        self._assert_consistent()
+        self.obj1.delete()
+        self._assert_consistent()
+
+    def test_index_used(self):
+        self.obj1.tags.add("zone_a", "zone")
+        with patch.object(TAG_INDEX, "categories", {"zone"}):
+            self.assertEqual(list(ObjectDB.objects.get_by_tag("zone_a", "zone")), [self.obj1])
+            self.assertIn(("objectdb", None, "zone"), TAG_INDEX._index)
+            # the index is now complete for the category and is used instead of the tags
+            self.obj2.tags.add("zone_a", "zone")
+            with patch.object(TAG_INDEX, "_get_category", wraps=TAG_INDEX._get_category):
+                with self.assertNumQueries(1):
+                    result = list(ObjectDB.objects.get_by_tag("zone_a", "zone"))
+            self.assertEqual(result, [self.obj1, self.obj2])
+            # categories not indexed use the database
+            self.assertIsNone(
+                ObjectDB.objects._get_ids_from_tag_index("objectdb", None, ["a"], ["other"])
+            )
+
 
 # setting up testing typeclass with child- and parent class
 class TestSearchManagerTypeclassParent(DefaultObject):
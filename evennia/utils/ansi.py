@@ -471,9 +471,10 @@ class ANSIParser(object):
         if not string:
             return ""
 
-        # check cached parsings
+        # check cached parsings. A tuple key avoids building a new string
+        # the size of the text just to look it up.
         global _PARSE_CACHE
-        cachekey = f"{string}-{strip_ansi}-{xterm256}-{mxp}-{truecolor}"
+        cachekey = (string, strip_ansi, xterm256, mxp, truecolor)
 
         if cachekey in _PARSE_CACHE:
             return _PARSE_CACHE[cachekey]
@@ -517,7 +518,7 @@ class ANSIParser(object):
         if strip_ansi:
             # remove all ansi codes (including those manually
             # inserted in string)
-            return self.strip_raw_codes(parsed_string)
+            parsed_string = self.strip_raw_codes(parsed_string)
 
         # cache and crop old cache
         _PARSE_CACHE[cachekey] = parsed_string
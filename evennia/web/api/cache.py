@@ -0,0 +1,183 @@
+"""
+Caching of REST API responses.
+
+The viewsets cache the data of their GET responses (listings and single
+entities) per request path, user and output format, together with an ETag
+made from the data. The cache is keyed on a version per database model, which
+is bumped whenever an entity of that model is saved or deleted, or its
+many-to-many relations (like Tags and Attributes) change, so a change in the
+game shows in the API right away. Clients sending the ETag back in an
+`If-None-Match` header get an empty `304 Not Modified` response if nothing
+changed.
+
+The bulk methods of the typeclass managers (like `bulk_add_tags`) send
+`SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE` to bump the versions. Other changes not
+sending Django signals, like `QuerySet.update` or `bulk_create`, do not bump
+them. Cached responses expire after `settings.REST_API_CACHE_TIMEOUT` seconds to
+cover for those.
+
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.http import parse_etags
+
+from evennia.server.signals import SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE
+
+_CACHE_SIZE = settings.REST_API_CACHE_SIZE
+_CACHE_TIMEOUT = settings.REST_API_CACHE_TIMEOUT
+
+
+def make_etag(data):
+    """
+    Make an ETag for response data.
+
+    Args:
+        data (any): JSON-serializable response data.
+
+    Returns:
+        str: The (quoted) ETag.
+
+    """
+    dump = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return '"%s"' % hashlib.md5(dump.encode("utf-8")).hexdigest()
+
+
+def etag_matches(etag, request):
+    """
+    Check if a request's `If-None-Match` header matches an ETag.
+
+    Args:
+        etag (str): The (quoted) ETag of the current response.
+        request (Request): The request.
+
+    Returns:
+        bool: If the client already has the current response.
+
+    """
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in (tag.removeprefix("W/") for tag in etags)
+
+
+class APIResponseCache:
+    """
+    Least-recently-used cache of API response data, invalidated by model versions.
+
+    """
+
+    def __init__(self, maxsize=_CACHE_SIZE, timeout=_CACHE_TIMEOUT):
+        """
+        Args:
+            maxsize (int, optional): Max number of responses to cache. If 0, cache
+                nothing.
+            timeout (int, optional): Seconds after which a cached response expires.
+
+        """
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._versions = defaultdict(int)
+        self._cache = OrderedDict()
+        self._connect()
+
+    def _connect(self):
+        post_save.connect(self._at_model_change, weak=False, dispatch_uid="api-cache-save")
+        post_delete.connect(self._at_model_change, weak=False, dispatch_uid="api-cache-delete")
+        m2m_changed.connect(self._at_m2m_change, weak=False, dispatch_uid="api-cache-m2m")
+        SIGNAL_TYPED_OBJECTS_POST_BULK_CHANGE.connect(
+            self._at_bulk_change, weak=False, dispatch_uid="api-cache-bulk"
+        )
+
+    def _bump(self, model):
+        meta = model._meta
+        if meta.auto_created:
+            # a row of a many-to-many relation (like an object's link to a Tag) was
+            # saved or deleted; this changes the models at both ends
+            for field in meta.get_fields():
+                if field.many_to_one:
+                    self._bump(field.related_model)
+        else:
+            self._versions[meta.concrete_model] += 1
+
+    def _at_model_change(self, sender, **kwargs):
+        self._bump(sender)
+
+    def _at_bulk_change(self, sender, models=(), **kwargs):
+        self._bump(sender)
+        for model in models:
+            self._bump(model)
+
+    def _at_m2m_change(self, sender, instance=None, model=None, action=None, **kwargs):
+        if action in ("post_add", "post_remove", "post_clear"):
+            self._bump(type(instance))
+            if model is not None:
+                self._bump(model)
+
+    def get_versions(self, models):
+        """
+        Get the current versions of database models.
+
+        Args:
+            models (iterable): The model classes (typeclasses are fine).
+
+        Returns:
+            tuple: The versions, in the order of `models`.
+
+        """
+        return tuple(self._versions[model._meta.concrete_model] for model in models)
+
+    def get(self, key):
+        """
+        Get a cached response.
+
+        Args:
+            key (tuple): The cache key, including the versions of the models the
+                response depends on.
+
+        Returns:
+            tuple or None: `(data, etag)` if cached and not expired.
+
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        data, etag, timestamp = entry
+        if time.monotonic() - timestamp > self.timeout:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return data, etag
+
+    def add(self, key, data, etag):
+        """
+        Cache a response.
+
+        Args:
+            key (tuple): The cache key.
+            data (any): The response data.
+            etag (str): The ETag of `data`.
+
+        """
+        if not self.maxsize:
+            return
+        self._cache[key] = (data, etag, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        """
+        Clear the cache.
+
+        """
+        self._cache.clear()
+
+
+API_RESPONSE_CACHE = APIResponseCache()
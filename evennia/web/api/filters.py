@@ -30,7 +30,7 @@ def get_tag_query(tag_type: Union[str, None], key: str) -> Q:
         A Q object that for searching by this tag type and name
 
     """
-    return Q(db_tags__db_tagtype=tag_type) & Q(db_tags__db_key__iexact=key)
+    return Q(db_tags__db_tagtype=tag_type) & Q(db_tags__db_key=key.lower())
 
 
 class TagTypeFilter(CharFilter):
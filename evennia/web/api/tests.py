@@ -4,14 +4,18 @@ Tests for the REST API.
 """
 
 from collections import namedtuple
+from unittest import mock
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import include, path, reverse
 from rest_framework.test import APIClient
 
+from evennia.objects.models import ObjectDB
 from evennia.utils.test_resources import BaseEvenniaTest
-from evennia.web.api import serializers
+from evennia.web.api import serializers, views
 
 urlpatterns = [
     path(r"^", include("evennia.web.website.urls")),
@@ -188,3 +192,65 @@ class TestEvenniaRESTApi(BaseEvenniaTest):
                 response = self.client.post(view_url, data=attr_data)
                 self.assertEqual(response.status_code, 200, f"Response was: {response.data}")
                 self.assertEqual(view.obj.attributes.get(attr_name), None)
+
+    def test_etag(self):
+        view_url = reverse("api:object-detail", kwargs={"pk": self.obj1.pk})
+        response = self.client.get(view_url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        # the client has the current version
+        response = self.client.get(view_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+        # changing the object gives a new version
+        self.obj1.attributes.add("some_test_attr", "test_value")
+        response = self.client.get(view_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("some_test_attr", [attr["db_key"] for attr in response.data["attributes"]])
+
+    def test_cached_tag_changes(self):
+        view_url = reverse("api:object-detail", kwargs={"pk": self.obj1.pk})
+        self.obj1.tags.add("tagged")
+        response = self.client.get(view_url)
+        self.assertEqual([tag["db_key"] for tag in response.data["tags"]], ["tagged"])
+        etag = response["ETag"]
+        # removing the Tag deletes a row of the through-model only
+        self.obj1.tags.clear()
+        response = self.client.get(view_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["tags"], [])
+        etag = response["ETag"]
+        # bulk methods send no per-object signals
+        ObjectDB.objects.bulk_add_tags([(self.obj1, ["bulktag"])])
+        response = self.client.get(view_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag["db_key"] for tag in response.data["tags"]], ["bulktag"])
+
+    def test_retrieve_gets_object_once(self):
+        view_url = reverse("api:object-detail", kwargs={"pk": self.obj1.pk})
+        get_object = views.ObjectDBViewSet.get_object
+        with mock.patch.object(
+            views.ObjectDBViewSet, "get_object", autospec=True, side_effect=get_object
+        ) as mock_get_object:
+            response = self.client.get(view_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["db_key"], self.obj1.key)
+        mock_get_object.assert_called_once()
+
+    def test_cached_list(self):
+        view_url = reverse("api:object-list")
+        response = self.client.get(view_url)
+        self.assertEqual(response.status_code, 200)
+        count = response.data["count"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(view_url)
+        self.assertFalse([query for query in queries if "objects_objectdb" in query["sql"]])
+        # changes are seen right away
+        self.obj1.key = "new_key"
+        response = self.client.get(view_url)
+        self.assertIn("new_key", [obj["db_key"] for obj in response.data["results"]])
+        self.obj2.delete()
+        response = self.client.get(view_url)
+        self.assertEqual(response.data["count"], count - 1)
@@ -16,7 +16,10 @@ from evennia.help.models import HelpEntry
 from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultCharacter, DefaultExit, DefaultRoom
 from evennia.scripts.models import ScriptDB
+from evennia.typeclasses.attributes import Attribute
+from evennia.typeclasses.tags import Tag
 from evennia.web.api import filters, serializers
+from evennia.web.api.cache import API_RESPONSE_CACHE, etag_matches, make_etag
 from evennia.web.api.permissions import EvenniaPermission
 
 
@@ -24,8 +27,15 @@ class GeneralViewSetMixin:
     """
     Mixin for both typeclass- and non-typeclass entities.
 
+    GET responses get an ETag and are cached until the entities change. Set
+    `cache_models` to the models the serialized data depends on besides the model of
+    the viewset itself, or to `None` to not cache responses at all (this is needed if
+    the data depends on things not stored in the database).
+
     """
 
+    cache_models = (Attribute, Tag)
+
     def get_serializer_class(self):
         """
         Allow different serializers for certain actions.
@@ -36,6 +46,71 @@ class GeneralViewSetMixin:
                 return self.list_serializer_class
         return self.serializer_class
 
+    def get_serializer(self, *args, **kwargs):
+        """
+        Load the Tags and Attributes of the entities to serialize in bulk, rather than
+        with queries per entity and handler.
+
+        """
+        serializer = super().get_serializer(*args, **kwargs)
+        if args and "data" not in kwargs:
+            many = kwargs.get("many", False)
+            if isinstance(
+                serializer.child if many else serializer, serializers.TypeclassSerializerMixin
+            ):
+                self.queryset.model.objects.prefetch_handlers(args[0] if many else [args[0]])
+        return serializer
+
+    def get_cached_response(self, request, get_response, *args, **kwargs):
+        """
+        Get a GET response from the cache, or create and cache it.
+
+        Args:
+            request (Request): The request.
+            get_response (callable): Creates the response if not cached, called with
+                `request`, `*args` and `**kwargs`.
+
+        Returns:
+            Response: The response, or an empty `304 Not Modified` if the request's
+            `If-None-Match` header matches its ETag.
+
+        """
+        cache_key = None
+        if self.cache_models is not None:
+            cache_key = (
+                type(self),
+                request.get_full_path(),
+                request.user.pk,
+                request.accepted_renderer.format,
+                API_RESPONSE_CACHE.get_versions((self.queryset.model,) + tuple(self.cache_models)),
+            )
+        cached = cache_key and API_RESPONSE_CACHE.get(cache_key)
+        if cached:
+            data, etag = cached
+        else:
+            response = get_response(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data, etag = response.data, make_etag(response.data)
+            if cache_key:
+                API_RESPONSE_CACHE.add(cache_key, data, etag)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(etag, request):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        # check access also when the response is cached
+        instance = self.get_object()
+
+        def _retrieve(request, *args, **kwargs):
+            return Response(self.get_serializer(instance).data)
+
+        return self.get_cached_response(request, _retrieve, *args, **kwargs)
+
 
 class TypeclassViewSetMixin(GeneralViewSetMixin):
     """
@@ -141,6 +216,8 @@ class AccountDBViewSet(TypeclassViewSetMixin, ModelViewSet):
 
     serializer_class = serializers.AccountSerializer
     queryset = AccountDB.objects.all()
+    # the session ids of the accounts are not in the database
+    cache_models = None
     filterset_class = filters.AccountDBFilterSet
     list_serializer_class = serializers.AccountListSerializer
 